@@ -0,0 +1,101 @@
+"""
+Per-model generation latency histograms.
+
+Every successful generation adds one sample (seconds from Element.created_at
+to the provider reporting success) to a fixed-bucket histogram of its AIModel.
+The status poller reads quantiles from it to place checks near the expected
+completion time instead of polling at a fixed rate.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import GenerationLatencyBucket
+
+# Upper bounds in seconds. Image models land in the first buckets,
+# video models spread over minutes. Last bucket catches everything slower.
+LATENCY_BUCKETS = (
+    5, 10, 15, 20, 30, 45, 60, 90, 120, 150, 180, 240, 300, 420, 600, 900, 1200, 1800,
+)
+# Нижняя граница бакета — предыдущая граница шкалы: пустые бакеты в профиль не попадают
+_LOWER_BOUNDS = dict(zip(LATENCY_BUCKETS, (0,) + LATENCY_BUCKETS[:-1]))
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Histogram snapshot: ((upper_bound, count), ...) sorted by bound."""
+
+    buckets: tuple[tuple[int, int], ...]
+
+    @property
+    def total(self) -> int:
+        return sum(count for _, count in self.buckets)
+
+    def quantile(self, q: float) -> float:
+        """Latency (seconds) below which a `q` share of generations finished.
+
+        Linear interpolation inside the bucket that crosses the target rank,
+        between its own bounds in LATENCY_BUCKETS (not the previous non-empty one).
+        """
+        target = q * self.total
+        seen = 0
+        previous = 0
+        for upper, count in self.buckets:
+            if count and seen + count >= target:
+                lower = _LOWER_BOUNDS.get(upper, previous)
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+            previous = upper
+        return float(previous)
+
+
+def bucket_for(seconds: float) -> int:
+    for upper in LATENCY_BUCKETS:
+        if seconds <= upper:
+            return upper
+    return LATENCY_BUCKETS[-1]
+
+
+def record_latency(ai_model_id: int, seconds: float) -> None:
+    """Add one sample to the model histogram.
+
+    Once the histogram exceeds GENERATION_LATENCY_MAX_SAMPLES all counts are
+    halved, so it tracks recent provider behaviour rather than all history.
+    """
+    if not ai_model_id or seconds < 0:
+        return
+    upper = bucket_for(seconds)
+    with transaction.atomic():
+        GenerationLatencyBucket.objects.get_or_create(ai_model_id=ai_model_id, upper_bound=upper)
+        GenerationLatencyBucket.objects.filter(
+            ai_model_id=ai_model_id, upper_bound=upper,
+        ).update(count=F('count') + 1)
+
+        total = GenerationLatencyBucket.objects.filter(
+            ai_model_id=ai_model_id,
+        ).aggregate(total=Sum('count'))['total'] or 0
+        if total > settings.GENERATION_LATENCY_MAX_SAMPLES:
+            GenerationLatencyBucket.objects.filter(ai_model_id=ai_model_id).update(count=F('count') / 2)
+
+
+def load_latency_profiles(ai_model_ids) -> dict[int, LatencyProfile]:
+    """Histograms for many models in one query. Models below
+    GENERATION_LATENCY_MIN_SAMPLES are omitted (not enough data to trust)."""
+    rows: dict[int, list[tuple[int, int]]] = {}
+    for ai_model_id, upper, count in (
+        GenerationLatencyBucket.objects.filter(ai_model_id__in=set(ai_model_ids), count__gt=0)
+        .order_by('ai_model_id', 'upper_bound')
+        .values_list('ai_model_id', 'upper_bound', 'count')
+    ):
+        rows.setdefault(ai_model_id, []).append((upper, count))
+
+    profiles = {}
+    for ai_model_id, buckets in rows.items():
+        profile = LatencyProfile(buckets=tuple(buckets))
+        if profile.total >= settings.GENERATION_LATENCY_MIN_SAMPLES:
+            profiles[ai_model_id] = profile
+    return profiles
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.7 on 2026-10-18 03:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_providers', '0013_aimodel_variant_sort_order_blank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationLatencyBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upper_bound', models.PositiveIntegerField(verbose_name='Верхняя граница (сек)')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество генераций')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ai_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latency_buckets', to='ai_providers.aimodel', verbose_name='AI модель')),
+            ],
+            options={
+                'verbose_name': 'Бакет латентности генерации',
+                'verbose_name_plural': 'Латентность генераций',
+                'ordering': ['ai_model', 'upper_bound'],
+                'unique_together': {('ai_model', 'upper_bound')},
+            },
+        ),
+    ]
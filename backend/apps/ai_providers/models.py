@@ -443,3 +443,31 @@ class ModelPricingConfig(models.Model):
 
     def __str__(self) -> str:
         return f'{self.ai_model_id}:{self.mode}'
+
+
+class GenerationLatencyBucket(models.Model):
+    """Бакет гистограммы времени генерации модели (created_at → ответ провайдера об успехе)."""
+
+    ai_model = models.ForeignKey(
+        AIModel,
+        on_delete=models.CASCADE,
+        related_name='latency_buckets',
+        verbose_name='AI модель',
+    )
+    upper_bound = models.PositiveIntegerField(
+        verbose_name='Верхняя граница (сек)',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество генераций',
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Бакет латентности генерации'
+        verbose_name_plural = 'Латентность генераций'
+        ordering = ['ai_model', 'upper_bound']
+        unique_together = [('ai_model', 'upper_bound')]
+
+    def __str__(self) -> str:
+        return f'{self.ai_model_id}:≤{self.upper_bound}s={self.count}'
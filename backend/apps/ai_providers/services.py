@@ -1,12 +1,14 @@
 """
 AI Providers module — public interface.
 
-Owns: AIProvider, AIModel, parameters, pricing compilation, generation context.
+Owns: AIProvider, AIModel, parameters, pricing compilation, generation context,
+per-model generation latency histograms.
 """
 import re
 from typing import List, Optional, Dict, Any
 
 from .compiler import compile_parameters_schema, compile_pricing_payload, extract_placeholders, match_placeholder_to_canonical
+from .latency import LatencyProfile, load_latency_profiles, record_latency
 from .models import AIProvider, AIModel
 from .validators import validate_model_admin_config
 
@@ -252,6 +254,7 @@ def build_generation_context(
 
 
 __all__ = [
+    'LatencyProfile',
     'build_generation_context',
     'build_request_from_schema',
     'collect_unresolved_placeholders',
@@ -263,7 +266,9 @@ __all__ = [
     'get_active_models',
     'get_active_providers',
     'get_provider_models',
+    'load_latency_profiles',
     'match_placeholder_to_canonical',
+    'record_latency',
     'substitute_variables',
     'validate_model_admin_config',
 ]
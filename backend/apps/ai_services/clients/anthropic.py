@@ -1,6 +1,6 @@
 """Anthropic Messages API client."""
 
-import requests
+from apps.common.http import get_session
 
 from .base import BaseLLMClient, LLMResponse
 
@@ -36,7 +36,7 @@ class AnthropicClient(BaseLLMClient):
             if key in params:
                 body[key] = params[key]
 
-        response = requests.post(
+        response = get_session(self.base_url).post(
             url,
             headers={
                 "x-api-key": self.api_key,
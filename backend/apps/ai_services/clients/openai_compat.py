@@ -4,7 +4,7 @@ Works with any provider that implements the OpenAI chat completions API
 (e.g., Polza.ai, OpenRouter, local vLLM/Ollama).
 """
 
-import requests
+from apps.common.http import get_session
 
 from .base import BaseLLMClient, LLMResponse
 
@@ -37,7 +37,7 @@ class OpenAICompatClient(BaseLLMClient):
             if key in params:
                 body[key] = params[key]
 
-        response = requests.post(
+        response = get_session(self.base_url).post(
             url,
             headers={
                 "Authorization": f"Bearer {self.api_key}",
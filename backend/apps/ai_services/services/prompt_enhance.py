@@ -45,6 +45,14 @@ def _noop(prompt: str) -> EnhanceResult:
     return EnhanceResult(prompt=prompt, was_enhanced=False, cost=Decimal("0"))
 
 
+def enhancement_cost(user) -> Decimal:
+    """Цена одного enhance_prompt для пользователя; 0 — улучшение не выполнится и не спишется."""
+    service = AIService.objects.filter(service_type=AIService.PROMPT_ENHANCE, is_active=True).first()
+    if service is None or not SubscriptionService.has_feature(user, "ai_prompt"):
+        return Decimal("0")
+    return service.cost_per_call
+
+
 def enhance_prompt(original_prompt: str, user) -> EnhanceResult:
     # 1. Find active service
     try:
@@ -31,7 +31,7 @@ class OpenAICompatClientTests(SimpleTestCase):
             mock_resp.raise_for_status.return_value = None
         return mock_resp
 
-    @patch("apps.ai_services.clients.openai_compat.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_success(self, mock_post):
         """Verify request URL, body structure, and response parsing."""
         mock_post.return_value = self._mock_response(
@@ -73,7 +73,7 @@ class OpenAICompatClientTests(SimpleTestCase):
         self.assertEqual(result.prompt_tokens, 10)
         self.assertEqual(result.completion_tokens, 5)
 
-    @patch("apps.ai_services.clients.openai_compat.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_with_custom_timeout(self, mock_post):
         """Verify timeout is passed through to requests."""
         mock_post.return_value = self._mock_response(
@@ -93,7 +93,7 @@ class OpenAICompatClientTests(SimpleTestCase):
         call_args = mock_post.call_args
         self.assertEqual(call_args[1]["timeout"], 30)
 
-    @patch("apps.ai_services.clients.openai_compat.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_api_error_raises(self, mock_post):
         """Mock 429 status and verify HTTPError is raised."""
         mock_post.return_value = self._mock_response(status_code=429)
@@ -105,7 +105,7 @@ class OpenAICompatClientTests(SimpleTestCase):
                 params={},
             )
 
-    @patch("apps.ai_services.clients.openai_compat.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_timeout_raises(self, mock_post):
         """Mock requests.exceptions.Timeout and verify it propagates."""
         mock_post.side_effect = requests.exceptions.Timeout("Connection timed out")
@@ -117,7 +117,7 @@ class OpenAICompatClientTests(SimpleTestCase):
                 params={},
             )
 
-    @patch("apps.ai_services.clients.openai_compat.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_model_param_forwarded(self, mock_post):
         """Verify model parameter is included in request body."""
         mock_post.return_value = self._mock_response(
@@ -137,7 +137,7 @@ class OpenAICompatClientTests(SimpleTestCase):
         body = mock_post.call_args[1]["json"]
         self.assertEqual(body["model"], "openai/gpt-4.1-mini")
 
-    @patch("apps.ai_services.clients.openai_compat.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_default_timeout(self, mock_post):
         """Verify default timeout is used when not specified."""
         mock_post.return_value = self._mock_response(
@@ -178,7 +178,7 @@ class AnthropicClientTests(SimpleTestCase):
             mock_resp.raise_for_status.return_value = None
         return mock_resp
 
-    @patch("apps.ai_services.clients.anthropic.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_success(self, mock_post):
         """Verify URL, system as top-level param, and response parsing."""
         mock_post.return_value = self._mock_response(
@@ -221,7 +221,7 @@ class AnthropicClientTests(SimpleTestCase):
         self.assertEqual(result.prompt_tokens, 12)
         self.assertEqual(result.completion_tokens, 8)
 
-    @patch("apps.ai_services.clients.anthropic.requests.post")
+    @patch("apps.common.http.PooledSession.post")
     def test_chat_max_tokens_required(self, mock_post):
         """Verify max_tokens is always in body even if not in params."""
         mock_post.return_value = self._mock_response(
@@ -8,7 +8,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 
 from django.db.models import (
-    Sum, Count, Avg, Q, F, Value, CharField,
+    Sum, Count, Avg, Max, Q, F, Value, CharField,
     Func, DecimalField as DjDecimalField,
 )
 from django.db.models.functions import (
@@ -283,10 +283,7 @@ def get_analytics(
         .values('element__project_id', 'element__project__name')
         .annotate(
             amount=Sum(Abs('amount')),
-            storage=Coalesce(
-                Sum('element__file_size', filter=Q(element__file_size__isnull=False)),
-                0,
-            ),
+            storage=Coalesce(Max('element__project__storage_usage__bytes'), 0),
         )
         .order_by('-amount')
     )
@@ -303,9 +300,7 @@ def get_analytics(
     # Storage
     from apps.subscriptions.services import SubscriptionService
     plan = SubscriptionService.get_active_plan(user)
-    storage_used = Element.objects.filter(
-        project__user=user, file_size__isnull=False
-    ).aggregate(total=Coalesce(Sum('file_size'), 0))['total']
+    storage_used = SubscriptionService.storage_used(user)
     storage_limit = plan.storage_limit_bytes or (1024 ** 4)  # fallback 1TB for unlimited
 
     return AnalyticsResult(
@@ -337,17 +332,14 @@ def get_storage(user: User) -> StorageResult:
     plan = SubscriptionService.get_active_plan(user)
     storage_limit = plan.storage_limit_bytes or (1024 ** 4)  # fallback 1TB for unlimited
 
-    storage_used = Element.objects.filter(
-        project__user=user, file_size__isnull=False
-    ).aggregate(total=Coalesce(Sum('file_size'), 0))['total']
+    storage_used = SubscriptionService.storage_used(user)
 
     by_project_qs = (
-        Project.objects.filter(user=user)
+        Project.objects.filter(user=user, storage_usage__elements_count__gt=0)
         .annotate(
-            el_count=Count('elements', filter=Q(elements__file_size__isnull=False)),
-            storage=Coalesce(Sum('elements__file_size'), 0),
+            el_count=F('storage_usage__elements_count'),
+            storage=F('storage_usage__bytes'),
         )
-        .filter(el_count__gt=0)
         .order_by('-storage')
     )
     by_project = [
@@ -377,22 +369,10 @@ def get_history_queryset(
     date_from: date | None = None,
     date_to: date | None = None,
 ):
-    """Return annotated Element queryset for generation history."""
+    """Return Element queryset for generation history (cost — Element.generation_cost)."""
     qs = (
         Element.objects.filter(project__user=user)
         .select_related('ai_model', 'project')
-        .annotate(
-            _generation_cost=Coalesce(
-                Sum(
-                    Abs('credits_transactions__amount'),
-                    filter=Q(
-                        credits_transactions__reason=CreditsTransaction.REASON_GENERATION_DEBIT
-                    ),
-                ),
-                Decimal('0'),
-                output_field=DjDecimalField(),
-            )
-        )
         .order_by('-created_at')
     )
 
@@ -415,7 +395,7 @@ def get_history_queryset(
 
 
 def serialize_history_entry(el: Element) -> dict:
-    """Convert Element to history dict (called after annotation)."""
+    """Convert Element to history dict."""
     return {
         'id': el.id,
         'created_at': el.created_at.isoformat(),
@@ -426,7 +406,7 @@ def serialize_history_entry(el: Element) -> dict:
         'error_message': el.error_message or '',
         'ai_model_name': el.ai_model.name if el.ai_model else None,
         'prompt_text': (el.prompt_text or '')[:500],
-        'generation_cost': str(el._generation_cost) if el._generation_cost else None,
+        'generation_cost': str(el.generation_cost) if el.generation_cost else None,
         'file_size': el.file_size,
         'project_id': el.project_id,
         'project_name': el.project.name if el.project else None,
@@ -6,15 +6,14 @@ from datetime import date
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 
+from apps.common.pagination import KeysetPagination
 from . import services
 
 
-class CabinetPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class CabinetPagination(KeysetPagination):
+    """Журнал и платежи — по (created_at, id) от новых к старым, без COUNT(*)."""
+    ordering = ('-created_at', '-id')
 
 
 @api_view(['GET'])
@@ -79,7 +78,7 @@ def analytics_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def history_view(request):
-    """GET /api/cabinet/history/?page=1&status=&ai_model_id=&source_type=&element_type=&project_id=&date_from=&date_to="""
+    """GET /api/cabinet/history/?cursor=&status=&ai_model_id=&source_type=&element_type=&project_id=&date_from=&date_to="""
     qs = services.get_history_queryset(
         user=request.user,
         status=request.query_params.get('status') or None,
@@ -100,7 +99,7 @@ def history_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def transactions_view(request):
-    """GET /api/cabinet/transactions/?page=1&reason=&date_from=&date_to="""
+    """GET /api/cabinet/transactions/?cursor=&reason=&date_from=&date_to="""
     qs = services.get_transactions_queryset(
         user=request.user,
         reason=request.query_params.get('reason') or None,
@@ -0,0 +1,113 @@
+"""
+Shared pooled HTTP sessions for outbound calls.
+
+Single source of truth for keep-alive, pool sizing, retry/backoff and
+timeouts of everything we call over HTTP: AI provider API (Kie.ai),
+provider result downloads, LLM clients, element download proxy.
+
+One session per origin (scheme://host:port) per worker process. Sessions are
+created lazily and dropped after fork, so Celery prefork children never share
+sockets with the parent.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_sessions_pid = os.getpid()
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a per-host default timeout."""
+
+    def __init__(self, default_timeout):
+        super().__init__()
+        self.default_timeout = default_timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        return super().request(method, url, **kwargs)
+
+
+def _origin(url: str) -> tuple[str, str]:
+    """Return (origin key, hostname) for a URL."""
+    parsed = urlparse(url)
+    scheme = (parsed.scheme or 'https').lower()
+    netloc = parsed.netloc.lower()
+    return f"{scheme}://{netloc}", (parsed.hostname or '').lower()
+
+
+def get_timeout(url: str):
+    """Default (connect, read) timeout for a host: HTTP_HOST_TIMEOUTS or HTTP_DEFAULT_TIMEOUT."""
+    _, host = _origin(url)
+    return settings.HTTP_HOST_TIMEOUTS.get(host, settings.HTTP_DEFAULT_TIMEOUT)
+
+
+def _build_retry() -> Retry:
+    # Connect errors are retried for every method (request never reached the
+    # server). Read errors and 5xx/429 are retried only for idempotent methods,
+    # so a generation POST is never submitted twice.
+    return Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        connect=settings.HTTP_MAX_RETRIES,
+        read=settings.HTTP_MAX_RETRIES,
+        status=settings.HTTP_MAX_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _build_session(url: str) -> PooledSession:
+    session = PooledSession(default_timeout=get_timeout(url))
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=_build_retry(),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Get the pooled session for the origin of `url`.
+
+    Pass any URL on the target host (AIProvider.base_url, a result URL, ...):
+    calls to the same host reuse TCP+TLS connections.
+    """
+    global _sessions_pid
+
+    key, _ = _origin(url)
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            # Forked worker: never reuse parent's sockets.
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session(url)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    """Close and forget all pooled sessions of this process."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
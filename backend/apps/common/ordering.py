@@ -0,0 +1,132 @@
+"""
+Ordering of grid items (order_index) — sparse keys and bulk updates.
+
+Ключи разрежены с шагом ORDER_STEP: перемещение одного элемента берёт
+середину между соседями и меняет одну строку. Когда зазор исчерпан,
+контейнер перенумеровывается целиком — одним UPDATE … SET order_index =
+CASE id WHEN … END, как и полный reorder из списка id.
+
+Новые строки получают ключ от счётчика контейнера (allocate) — без
+COUNT/MAX по контейнеру и без блокировки контейнера на всю транзакцию.
+"""
+from __future__ import annotations
+
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Value, When
+
+ORDER_STEP = 1024
+
+
+def apply_keys(queryset, keys: dict[int, int]) -> int:
+    """Set order_index for many rows in one UPDATE … CASE. Returns rows updated."""
+    if not keys:
+        return 0
+    return queryset.filter(pk__in=list(keys)).update(order_index=Case(
+        *(When(pk=pk, then=Value(key)) for pk, key in keys.items()),
+        output_field=IntegerField(),
+    ))
+
+
+def apply_order(queryset, ids: list[int], step: int = ORDER_STEP) -> int:
+    """Full reorder: ids get 0, step, 2·step, … in list order."""
+    return apply_keys(queryset, {pk: index * step for index, pk in enumerate(ids)})
+
+
+def allocate(model, pk: int, field: str, count: int = 1, step: int = ORDER_STEP) -> int:
+    """
+    Reserve `count` keys on a container counter row with one UPDATE … RETURNING
+    (no COUNT/MAX over the container). The row lock lasts only for the
+    statement outside a transaction. Returns the first key of the block.
+
+    Raises:
+        model.DoesNotExist: no counter row
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    pk_column = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET {column} = {column} + %s WHERE {pk_column} = %s RETURNING {column}',
+            [count * step, pk],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        raise model.DoesNotExist(f'{model.__name__} {pk} not found')
+    return row[0] - (count - 1) * step
+
+
+def allocate_many(model, pks: list[int], field: str, step: int = 1) -> dict[int, int]:
+    """
+    allocate() for many counter rows in one statement: rows are locked in pk
+    order (no deadlock between overlapping batches). Returns {pk: new value};
+    missing rows are absent.
+    """
+    if not pks:
+        return {}
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    pk_column = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH locked AS (SELECT {pk_column} FROM {table} WHERE {pk_column} = ANY(%s) '
+            f'ORDER BY {pk_column} FOR UPDATE) '
+            f'UPDATE {table} SET {column} = {column} + %s FROM locked '
+            f'WHERE {table}.{pk_column} = locked.{pk_column} RETURNING {table}.{pk_column}, {table}.{column}',
+            [list(pks), step],
+        )
+        return dict(cursor.fetchall())
+
+
+def raise_floor(model, pk: int, field: str, key: int | None) -> None:
+    """Keep the counter ahead of a key written by reorder/reposition."""
+    if key is not None:
+        model.objects.filter(pk=pk, **{f'{field}__lt': key}).update(**{field: key})
+
+
+def key_between(low: int | None, high: int | None, step: int = ORDER_STEP) -> int | None:
+    """
+    Key strictly between the neighbours' keys (None = edge of the list).
+    None when there is no free integer left — the container needs renumbering.
+    """
+    if low is None and high is None:
+        return 0
+    if low is None:
+        return high - step
+    if high is None:
+        return low + step
+    if high - low > 1:
+        return (low + high) // 2
+    return None
+
+
+def reposition(queryset, item_id: int, after_id: int | None = None, before_id: int | None = None) -> int:
+    """
+    Move one row of the container `queryset` between after_id and before_id
+    (None — start/end of the list). Returns the new key.
+
+    Raises:
+        LookupError: item or a neighbour is not in the container
+    """
+    wanted = {pk for pk in (item_id, after_id, before_id) if pk is not None}
+    with transaction.atomic():
+        keys = dict(
+            queryset.select_for_update().filter(pk__in=wanted).order_by().values_list('pk', 'order_index')
+        )
+        if set(keys) != wanted:
+            raise LookupError('Item or neighbour not found in this container')
+
+        key = key_between(keys.get(after_id), keys.get(before_id))
+        if key is not None:
+            queryset.filter(pk=item_id).update(order_index=key)
+            return key
+
+        # Зазор кончился — перенумеровать контейнер с шагом ORDER_STEP
+        ids = list(
+            queryset.exclude(pk=item_id).order_by('order_index', 'created_at', 'pk').values_list('pk', flat=True)
+        )
+        position = ids.index(after_id) + 1 if after_id is not None else (
+            ids.index(before_id) if before_id is not None else len(ids)
+        )
+        ids.insert(position, item_id)
+        apply_order(queryset, ids)
+        return position * ORDER_STEP
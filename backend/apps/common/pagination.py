@@ -0,0 +1,124 @@
+"""
+Keyset (cursor) pagination.
+
+Страница выбирается условием по ключу сортировки последней строки
+предыдущей страницы (WHERE (created_at, id) < (…)), а не OFFSET — цена
+запроса не растёт с номером страницы, вставки не сдвигают выдачу.
+has_more определяется выборкой page_size + 1 строки, без COUNT(*).
+
+Ключ сортировки обязан быть уникальным (последнее поле — pk) и без NULL.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+INVALID_CURSOR = 'Invalid cursor'
+
+
+class KeysetPagination(BasePagination):
+    """
+    Ответ: {"results": [...], "has_more": bool, "next_cursor": str|null,
+    "next": url|null}. Назад клиент ходит по собственному стеку курсоров.
+    """
+    ordering: tuple[str, ...] = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._after(queryset.model, self.decode_cursor(cursor)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if self.has_more else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            'results': data,
+            'has_more': self.has_more,
+            'next_cursor': self.next_cursor,
+            'next': self.get_next_link(),
+        }
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor,
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    # ── cursor ─────────────────────────────────────────────────
+
+    def encode_cursor(self, row) -> str:
+        values = [self._value(row, name.lstrip('-')) for name in self.ordering]
+        raw = json.dumps(values, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError):
+            raise NotFound(INVALID_CURSOR)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(INVALID_CURSOR)
+        return values
+
+    @staticmethod
+    def _value(row, name):
+        value = row[name] if isinstance(row, dict) else getattr(row, name)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def _after(self, model, values) -> Q:
+        """
+        (a, b, c) после (x, y, z) в порядке сортировки:
+        a ⋗ x OR (a = x AND b ⋗ y) OR (a = x AND b = y AND c ⋗ z).
+        Дублирующее a ⋗= x вынесено наружу, чтобы планировщик взял
+        диапазон по индексу, а не отфильтровал всю выборку.
+        """
+        fields = []
+        for name, raw in zip(self.ordering, values):
+            field_name = name.lstrip('-')
+            try:
+                value = model._meta.get_field(field_name).to_python(raw)
+            except DjangoValidationError:
+                raise NotFound(INVALID_CURSOR)
+            fields.append((field_name, 'lt' if name.startswith('-') else 'gt', value))
+
+        branches = []
+        for i, (name, op, value) in enumerate(fields):
+            equal = {prev: v for prev, _, v in fields[:i]}
+            branches.append(Q(**equal, **{f'{name}__{op}': value}))
+
+        lead_name, lead_op, lead_value = fields[0]
+        return Q(**{f'{lead_name}__{lead_op}e': lead_value}) & reduce(or_, branches)
@@ -10,6 +10,7 @@ from apps.ai_providers.models import AIModel
 from apps.users.models import User
 
 from .models import CreditsTransaction
+from .signals import push_credits_changed
 
 
 @dataclass(frozen=True)
@@ -30,6 +31,16 @@ class DebitResult:
     error: str | None
 
 
+@dataclass(frozen=True)
+class BatchDebitResult:
+    """Результат одного списания за пакет генераций."""
+    ok: bool
+    costs: list[Decimal] | None
+    total: Decimal | None
+    balance_after: Decimal
+    error: str | None
+
+
 @dataclass(frozen=True)
 class RefundResult:
     """Результат возврата средств."""
@@ -42,6 +53,12 @@ class BalanceMutationResult:
     balance_after: Decimal
 
 
+def _add_generation_cost(element, amount: Decimal) -> None:
+    """Стоимость генерации на элементе и сводки проекта/группы (elements/usage.py)."""
+    from apps.elements.services import add_generation_cost  # lazy import
+    add_generation_cost(element, amount)
+
+
 class CreditsService:
     """Сервис для работы с кредитами пользователя."""
     
@@ -208,6 +225,8 @@ class CreditsService:
             element=element,
             metadata=transaction_metadata,
         )
+        if element is not None:
+            _add_generation_cost(element, cost)
         
         return DebitResult(
             ok=True,
@@ -216,6 +235,74 @@ class CreditsService:
             error=None
         )
     
+    @transaction.atomic
+    def debit_for_batch(
+        self,
+        user: User,
+        ai_model: AIModel,
+        generation_configs: list[dict],
+        *,
+        metadata: dict | None = None,
+    ) -> BatchDebitResult:
+        """
+        Списать средства за пакет генераций одной операцией.
+
+        Стоимость считается по каждому конфигу, списывается сумма — одна
+        блокировка пользователя. Строка списания — на каждый конфиг
+        (element=None, metadata.operation_key + batch_index), чтобы аналитика
+        видела пакетные генерации как одиночные; к элементам их привязывает
+        attach_batch_debits(). Стоимость отдельных элементов (costs)
+        записывает вызывающий; возвраты — по элементу, как для одиночной
+        генерации.
+
+        Returns:
+            BatchDebitResult с costs в порядке конфигов
+        """
+        user = User.objects.select_for_update().get(pk=user.pk)
+
+        costs = []
+        for config in generation_configs:
+            base_cost = self._calculate_base_cost(ai_model, config)
+            if base_cost is None:
+                return BatchDebitResult(
+                    ok=False, costs=None, total=None, balance_after=user.balance, error=self.ERROR_INVALID_PRICING,
+                )
+            costs.append(self._apply_pricing_percent(base_cost, user.pricing_percent))
+        total = sum(costs, Decimal('0'))
+
+        if user.balance < total:
+            return BatchDebitResult(
+                ok=False, costs=None, total=total, balance_after=user.balance, error=self.ERROR_INSUFFICIENT_FUNDS,
+            )
+
+        user.balance -= total
+        user.save(update_fields=["balance"])
+
+        transaction_metadata = {
+            "ai_model_id": ai_model.id,
+            "ai_model_name": ai_model.name,
+            "batch_size": len(costs),
+            "pricing_percent": user.pricing_percent,
+        }
+        if metadata:
+            transaction_metadata.update(metadata)
+
+        balance_after = user.balance + total
+        debits = []
+        for index, (config, cost) in enumerate(zip(generation_configs, costs)):
+            balance_after -= cost
+            debits.append(CreditsTransaction(
+                user=user,
+                amount=-cost,
+                balance_after=balance_after,
+                reason=CreditsTransaction.REASON_GENERATION_DEBIT,
+                metadata={**transaction_metadata, "generation_config": config, "batch_index": index},
+            ))
+        CreditsTransaction.objects.bulk_create(debits)
+        # bulk_create без post_save — одно WS-уведомление о балансе на пакет
+        push_credits_changed(user.pk, user.balance, -total, CreditsTransaction.REASON_GENERATION_DEBIT)
+        return BatchDebitResult(ok=True, costs=costs, total=total, balance_after=user.balance, error=None)
+
     @transaction.atomic
     def refund_for_generation(
         self,
@@ -280,12 +367,68 @@ class CreditsService:
             element=element,
             metadata=metadata or {}
         )
+        if element is not None:
+            _add_generation_cost(element, -amount)
         
         return RefundResult(
             refunded=True,
             balance_after=user.balance
         )
     
+    @transaction.atomic
+    def attach_debit_to_element(self, user: User, operation_key: str, element) -> bool:
+        """
+        Привязать списание, сделанное до создания элемента (element=None,
+        metadata.operation_key), к элементу и записать стоимость в него.
+
+        Returns:
+            True, если списание найдено и привязано
+        """
+        debit = (
+            CreditsTransaction.objects.select_for_update()
+            .filter(
+                user=user,
+                reason=CreditsTransaction.REASON_GENERATION_DEBIT,
+                element__isnull=True,
+                metadata__operation_key=operation_key,
+            )
+            .first()
+        )
+        if debit is None:
+            return False
+        debit.element = element
+        debit.save(update_fields=["element"])
+        _add_generation_cost(element, -debit.amount)
+        return True
+
+    @transaction.atomic
+    def attach_batch_debits(self, user: User, operation_key: str, elements: list) -> int:
+        """
+        Привязать строки debit_for_batch к элементам пакета (в порядке
+        конфигов). generation_cost элементы получают при создании.
+
+        Returns:
+            Число привязанных списаний
+        """
+        debits = list(
+            CreditsTransaction.objects.select_for_update()
+            .filter(
+                user=user,
+                reason=CreditsTransaction.REASON_GENERATION_DEBIT,
+                element__isnull=True,
+                metadata__operation_key=operation_key,
+            )
+        )
+        by_index = {debit.metadata.get("batch_index"): debit for debit in debits}
+        attached = []
+        for index, element in enumerate(elements):
+            debit = by_index.get(index)
+            if debit is not None:
+                debit.element = element
+                attached.append(debit)
+        CreditsTransaction.objects.bulk_update(attached, ["element"])
+        return len(attached)
+
     def _calculate_base_cost(
         self,
         ai_model: AIModel,
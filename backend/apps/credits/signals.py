@@ -10,23 +10,28 @@ from .models import CreditsTransaction
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_save, sender=CreditsTransaction)
-def notify_credits_changed(sender, instance: CreditsTransaction, created, **kwargs):
-    """Push new balance to the user's WS group on any credits transaction."""
-    if not created:
-        return
+def push_credits_changed(user_id: int, balance_after, amount, reason: str) -> None:
+    """New balance to the user's WS group."""
     try:
         channel_layer = get_channel_layer()
         if channel_layer is None:
             return
         async_to_sync(channel_layer.group_send)(
-            f'user_{instance.user_id}',
+            f'user_{user_id}',
             {
                 'type': 'credits_changed',
-                'balance': str(instance.balance_after),
-                'amount': str(instance.amount),
-                'reason': instance.reason,
+                'balance': str(balance_after),
+                'amount': str(amount),
+                'reason': reason,
             },
         )
     except Exception as e:
         logger.warning('Failed to send credits WS notification: %s', e)
+
+
+@receiver(post_save, sender=CreditsTransaction)
+def notify_credits_changed(sender, instance: CreditsTransaction, created, **kwargs):
+    """Push new balance to the user's WS group on any credits transaction."""
+    if not created:
+        return
+    push_credits_changed(instance.user_id, instance.balance_after, instance.amount, instance.reason)
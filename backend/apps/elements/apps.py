@@ -5,3 +5,6 @@ class ElementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.elements'
     verbose_name = 'Элементы'
+
+    def ready(self):
+        import apps.elements.signals  # noqa: F401
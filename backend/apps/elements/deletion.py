@@ -0,0 +1,152 @@
+"""
+Deleting elements, scenes and projects together with their media.
+
+The request only tombstones (deleted_at on the scene subtree / project) and
+returns; purge_scene_task / purge_project_task then delete the rows in one
+transaction (storage counters recounted once) and hand the S3 keys of every
+variant — file/thumbnail/preview/loop URLs and presigned upload_keys — to
+delete_s3_objects, which removes them with DeleteObjects in 1000-key
+batches, retries the failures and reports progress to the project WebSocket.
+
+Deduplicated objects (storage/dedup.py) lose one reference per element and
+are deleted only with the last one.
+"""
+from __future__ import annotations
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.elements.models import Element
+from apps.elements.usage import deferred_usage
+from apps.storage.services import key_from_url, release_objects
+
+logger = logging.getLogger(__name__)
+
+URL_FIELDS = ('file_url', 'thumbnail_url', 'preview_url', 'loop_url')
+
+
+def release_files(elements) -> list[str]:
+    """
+    Drop the elements' references to stored media. Returns the S3 keys to
+    delete; call in the transaction that deletes the rows.
+    """
+    urls, upload_keys = [], set()
+    for row in elements.values_list(*URL_FIELDS, 'upload_keys'):
+        # Одна ссылка на объект на элемент: без превью thumbnail_url = file_url.
+        urls.extend({url for url in row[:-1] if url})
+        upload_keys.update(key for key in (row[-1] or {}).values() if key)
+    if not urls and not upload_keys:
+        return []
+
+    doomed = set(release_objects(urls))
+    # Ключи объектов, на которые ещё ссылаются другие элементы, не трогаем,
+    # даже если это исходный presigned-ключ этого элемента.
+    kept = {key_from_url(url) for url in set(urls) - doomed}
+    keys = ({key_from_url(url) for url in doomed} | upload_keys) - kept
+    keys.discard(None)
+    return sorted(keys)
+
+
+def schedule_s3_delete(keys: list[str], project_id: int, target_type: str | None = None,
+                       target_id: int | None = None) -> None:
+    """Queue delete_s3_objects after the surrounding transaction commits."""
+    from apps.elements.tasks import delete_s3_objects
+
+    if not keys and target_type is None:
+        return
+    transaction.on_commit(lambda: delete_s3_objects.delay(
+        keys, project_id=project_id, target_type=target_type, target_id=target_id,
+    ))
+
+
+def delete_element(element: Element) -> None:
+    """Delete one element now; its files go to the background batch delete."""
+    with transaction.atomic():
+        keys = release_files(Element.objects.filter(pk=element.pk))
+        element.delete()
+        schedule_s3_delete(keys, element.project_id)
+
+
+# ---------------------------------------------------------------------------
+# Scenes / projects: tombstone now, purge in Celery
+# ---------------------------------------------------------------------------
+
+def tombstone_scene(scene) -> None:
+    """Hide the scene with all subgroups and queue the purge."""
+    from apps.elements.tasks import purge_scene_task
+    from apps.scenes.services import subtree
+    from apps.sharing.services import invalidate_share_index, invalidate_share_payloads  # lazy import
+
+    with transaction.atomic():
+        subtree(scene.id).update(deleted_at=timezone.now())
+        # QuerySet.update() минует сигналы — публичные страницы и индекс ссылок сбрасываем сами
+        invalidate_share_payloads(scene.project_id)
+        invalidate_share_index(scene.project_id)
+        transaction.on_commit(lambda: purge_scene_task.delay(scene.id))
+
+
+def tombstone_project(project) -> None:
+    """Hide the project and queue the purge."""
+    from apps.elements.tasks import purge_project_task
+    from apps.projects.models import Project
+    from apps.sharing.services import invalidate_share_index, invalidate_share_payloads  # lazy import
+
+    with transaction.atomic():
+        Project.objects.filter(pk=project.pk).update(deleted_at=timezone.now())
+        invalidate_share_payloads(project.pk)
+        invalidate_share_index(project.pk)
+        transaction.on_commit(lambda: purge_project_task.delay(project.pk))
+
+
+def purge_scene(scene_id: int) -> int:
+    """Delete the scene subtree with all elements. Returns the number of elements."""
+    from apps.scenes.models import Scene
+    from apps.scenes.services import subtree
+
+    scene = Scene.objects.filter(pk=scene_id).select_related('project').first()
+    if scene is None:
+        return 0
+    elements = Element.objects.filter(scene__ancestor_links__ancestor_id=scene_id)
+    with deferred_usage(scene.project.user_id):
+        keys = release_files(elements)
+        deleted, _ = Element.objects.filter(id__in=list(elements.values_list('id', flat=True))).delete()
+        subtree(scene_id).delete()
+        schedule_s3_delete(keys, scene.project_id, 'scene', scene_id)
+    logger.info("scene purged", extra={"scene_id": scene_id, "elements": deleted, "s3_keys": len(keys)})
+    return deleted
+
+
+def purge_project(project_id: int) -> int:
+    """Delete the project with all scenes and elements. Returns the number of elements."""
+    from apps.projects.models import Project
+
+    project = Project.objects.filter(pk=project_id).first()
+    if project is None:
+        return 0
+    elements = Element.objects.filter(project_id=project_id)
+    with deferred_usage(project.user_id):
+        keys = release_files(elements)
+        deleted, _ = elements.delete()
+        project.delete()
+        schedule_s3_delete(keys, project_id, 'project', project_id)
+    logger.info("project purged", extra={"project_id": project_id, "elements": deleted, "s3_keys": len(keys)})
+    return deleted
+
+
+def purge_stale_tombstones(older_than) -> int:
+    """Safety net for lost purge tasks: purge what stayed tombstoned too long."""
+    from apps.projects.models import Project
+    from apps.scenes.models import Scene
+
+    purged = 0
+    for project_id in Project.objects.filter(deleted_at__lt=older_than).values_list('id', flat=True):
+        purge_project(project_id)
+        purged += 1
+    # Корни удалённых поддеревьев: родитель жив (или его нет).
+    roots = Scene.objects.filter(deleted_at__lt=older_than).exclude(parent__deleted_at__isnull=False)
+    for scene_id in roots.values_list('id', flat=True):
+        purge_scene(scene_id)
+        purged += 1
+    return purged
@@ -2,22 +2,26 @@
 Generation finalization and provider response handling.
 
 Owns: download results, finalize success/failure, normalize provider responses.
+Thumbnails and the COMPLETED transition run on the media queue
+(tasks.render_element_media → complete_generation).
 Called by: elements/tasks.py (polling), elements/views_webhook.py (callback).
 """
 from __future__ import annotations
 
 import json
 import logging
-import os
-import tempfile
 from typing import Any
 from urllib.parse import urlparse
 
-import requests
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
+from apps.ai_providers.services import record_latency
+from apps.common.http import get_session
 from apps.elements.models import Element
-from apps.storage.services import upload_staging_to_s3, generate_thumbnails
+from apps.elements.usage import file_changed
+from apps.storage.services import delete_file_from_s3, stream_to_s3
 from apps.notifications.services import notify_element_status
 
 logger = logging.getLogger(__name__)
@@ -145,52 +149,85 @@ def extract_result_url(payload: dict[str, Any]) -> str:
 
 def finalize_generation_success(element_id: int, source_url: str) -> tuple[bool, str]:
     """
-    Download generated file and atomically persist COMPLETED status.
+    Stream generated file into S3 and hand the element over to the media queue.
+
+    The element stays PROCESSING until render_element_media renders thumbnails
+    and calls complete_generation(), which sends the COMPLETED notification.
 
     Returns:
-        (applied, file_url) where applied=False means another worker already finalized.
+        (applied, file_url) where applied=False means another worker already stored the result.
     """
-    element = Element.objects.select_related("project", "scene").get(id=element_id)
+    from apps.sharing.services import shared_element_updated  # lazy import
 
-    tmp_path = None
-    try:
-        notify_element_status(element, 'PROCESSING', upload_progress=0)
-        file_url, file_size, tmp_path = _download_and_upload_result(
-            source_url=source_url,
-            project_id=element.project_id,
-            scene_id=element.scene_id,
-            on_progress=lambda pct: notify_element_status(
-                element, 'PROCESSING', upload_progress=int(pct * 0.8),
-            ),
+    element = Element.objects.select_related("project", "scene").get(id=element_id)
+    # Провайдер сообщил об успехе сейчас — скачивание в S3 в латентность модели не входит.
+    reported_at = timezone.now()
+
+    notify_element_status(element, 'PROCESSING', upload_progress=0)
+    stored = _stream_result_to_s3(
+        source_url=source_url,
+        element_type=element.element_type,
+        project_id=element.project_id,
+        scene_id=element.scene_id,
+        on_progress=lambda pct: notify_element_status(
+            element, 'PROCESSING', upload_progress=int(pct * 0.8),
+        ),
+    )
+    file_url = stored['file_url']
+
+    with transaction.atomic():
+        updated = Element.objects.filter(
+            id=element_id,
+            status=Element.STATUS_PROCESSING,
+            file_url='',
+        ).update(
+            file_url=file_url,
+            file_size=stored['file_size'],
+            content_hash=stored['content_hash'],
+            error_message='',
+            updated_at=timezone.now(),
         )
+        if updated:
+            file_changed(element_id, old_size=element.file_size, old_hash=element.content_hash)
+            shared_element_updated(element.project_id, element_id)
+    if not updated:
+        # Результат уже сохранил другой воркер — эта копия (ссылка на неё) не нужна.
+        delete_file_from_s3(file_url)
+        return False, file_url
+
+    if element.ai_model_id:
+        try:
+            record_latency(element.ai_model_id, (reported_at - element.created_at).total_seconds())
+        except Exception:
+            logger.exception("latency record failed", extra={"element_id": element_id})
+
+    notify_element_status(element, 'PROCESSING', upload_progress=80)
+    from apps.elements.tasks import render_element_media
+    render_element_media.delay(element_id, file_url)
+    return True, file_url
+
+
+def complete_generation(element_id: int, thumbs: dict) -> bool:
+    """
+    Atomically persist COMPLETED with thumbnails (called from the media queue).
 
-        notify_element_status(element, 'PROCESSING', upload_progress=80)
-        thumbs = generate_thumbnails(
-            tmp_path, element.element_type, element.project_id, element.scene_id,
-        )
-        notify_element_status(element, 'PROCESSING', upload_progress=95)
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                # Temp cleanup is best-effort — periodic cleanup handles stragglers.
-                logger.warning("tmp unlink failed", extra={"tmp_path": tmp_path}, exc_info=True)
-
-    update_payload: dict[str, Any] = {
-        "status": Element.STATUS_COMPLETED,
-        "file_url": file_url,
-        "file_size": file_size,
-        "error_message": "",
-        "thumbnail_url": thumbs.get('thumbnail_url') or file_url,
-        "preview_url": thumbs.get('preview_url', ''),
-        "updated_at": timezone.now(),
-    }
+    Returns False if the element is no longer PROCESSING.
+    """
+    from apps.sharing.services import shared_element_updated  # lazy import
 
+    element = Element.objects.only('project_id', 'file_url').get(id=element_id)
     updated = Element.objects.filter(
         id=element_id,
         status=Element.STATUS_PROCESSING,
-    ).update(**update_payload)
+    ).update(
+        status=Element.STATUS_COMPLETED,
+        thumbnail_url=thumbs.get('thumbnail_url') or element.file_url,
+        preview_url=thumbs.get('preview_url', ''),
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        return False
+    shared_element_updated(element.project_id, element_id)
 
     # Create notification
     try:
@@ -223,11 +260,13 @@ def finalize_generation_success(element_id: int, source_url: str) -> tuple[bool,
             extra={"element_id": element_id},
         )
 
-    return updated > 0, file_url
+    return True
 
 
 def finalize_generation_failure(element_id: int, error_message: str) -> bool:
     """Atomically persist FAILED status if item is PENDING or PROCESSING."""
+    from apps.sharing.services import shared_element_updated  # lazy import
+
     updated = Element.objects.filter(
         id=element_id,
         status__in=(Element.STATUS_PENDING, Element.STATUS_PROCESSING),
@@ -236,6 +275,10 @@ def finalize_generation_failure(element_id: int, error_message: str) -> bool:
         error_message=error_message[:4000],
         updated_at=timezone.now(),
     )
+    if updated:
+        project_id = Element.objects.filter(id=element_id).values_list('project_id', flat=True).first()
+        if project_id:
+            shared_element_updated(project_id, element_id)
 
     try:
         from apps.notifications.services import create_notification
@@ -259,30 +302,30 @@ def finalize_generation_failure(element_id: int, error_message: str) -> bool:
     return updated > 0
 
 
-def _download_and_upload_result(source_url: str, project_id: int, scene_id: int, on_progress=None) -> tuple[str, int, str]:
+def _stream_result_to_s3(
+    source_url: str, element_type: str, project_id: int, scene_id: int | None, on_progress=None,
+) -> dict:
     """
-    Stream file from provider to temp file and upload to S3.
+    Stream file from provider straight into S3 (thumbnails — on the media queue).
 
-    Returns (file_url, file_size, tmp_path).
-    Caller is responsible for deleting tmp_path after use.
+    Returns {'file_url', 'file_size', ...} as stream_to_s3.
     """
     parsed_path = urlparse(source_url).path.lower()
-    suffix = ".mp4" if parsed_path.endswith(".mp4") else ".jpg"
-
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
-        tmp_path = tmp_file.name
-        with requests.get(source_url, timeout=120, stream=True) as response:
-            response.raise_for_status()
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    tmp_file.write(chunk)
-
-    file_size = os.path.getsize(tmp_path)
-
-    file_url = upload_staging_to_s3(
-        staging_path=tmp_path,
-        project_id=project_id,
-        scene_id=scene_id,
-        on_progress=on_progress,
-    )
-    return file_url, file_size, tmp_path
+    ext = ".mp4" if parsed_path.endswith(".mp4") else ".jpg"
+
+    with get_session(source_url).get(source_url, timeout=120, stream=True) as response:
+        response.raise_for_status()
+        try:
+            total_size = int(response.headers.get('Content-Length') or 0) or None
+        except ValueError:
+            total_size = None
+        return stream_to_s3(
+            response.iter_content(chunk_size=settings.STORAGE_STREAM_CHUNK_SIZE),
+            ext=ext,
+            element_type=element_type,
+            project_id=project_id,
+            scene_id=scene_id,
+            total_size=total_size,
+            on_progress=on_progress,
+            thumbnails=False,
+        )
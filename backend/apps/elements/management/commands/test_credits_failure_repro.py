@@ -1,5 +1,5 @@
 """
-Воспроизведение ошибки Credits insufficient: mock requests.post, запуск генерации, проверка, откат.
+Воспроизведение ошибки Credits insufficient: mock PooledSession.post, запуск генерации, проверка, откат.
 """
 from unittest.mock import patch, MagicMock
 
@@ -93,7 +93,7 @@ class Command(BaseCommand):
 
             self.stdout.write(f"Element #{element.id} создан, запуск start_generation (mock)...")
             with (
-                patch("apps.elements.tasks.requests.post", side_effect=_mock_post_credits_error),
+                patch("apps.common.http.PooledSession.post", side_effect=_mock_post_credits_error),
                 patch("apps.elements.tasks.validate_model_admin_config"),
             ):
                 start_generation.apply(args=[element.id])
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:00
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_in_flight(apps, schema_editor):
+    # In-flight generations were polled by per-element retry tasks —
+    # hand them over to the batched poller.
+    Element = apps.get_model('elements', 'Element')
+    Element.objects.filter(status='PROCESSING').exclude(external_task_id='').update(
+        next_poll_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elements', '0012_simplify_approval_statuses'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='element',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Когда батч-поллер опросит провайдера. Пусто = не опрашивать', null=True, verbose_name='Следующая проверка статуса'),
+        ),
+        migrations.RunPython(schedule_in_flight, migrations.RunPython.noop),
+    ]
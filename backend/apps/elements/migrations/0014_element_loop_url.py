@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elements', '0013_element_next_poll_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='element',
+            name='loop_url',
+            field=models.URLField(blank=True, default='', help_text='Короткий лёгкий луп видео для проигрывания при наведении', max_length=500, verbose_name='URL hover-лупа'),
+        ),
+    ]
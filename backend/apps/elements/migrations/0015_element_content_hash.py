@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elements', '0014_element_loop_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='element',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', help_text='Ключ дедупликации в хранилище; пусто — файл загружен до дедупликации', max_length=64, verbose_name='SHA-256 файла'),
+        ),
+    ]
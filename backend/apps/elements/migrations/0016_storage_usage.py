@@ -0,0 +1,96 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def backfill_usage(apps, schema_editor):
+    """Начальные значения счётчиков — те же суммы, что считались на лету."""
+    Element = apps.get_model('elements', 'Element')
+    elements = Element.objects.order_by()
+
+    for model_name, field in (('ProjectStorageUsage', 'project_id'), ('SceneStorageUsage', 'scene_id')):
+        model = apps.get_model('elements', model_name)
+        rows = elements.exclude(**{f'{field}__isnull': True}).values(field).annotate(
+            size=Sum('file_size'), count=Count('id'),
+        )
+        model.objects.bulk_create([
+            model(**{field: row[field], 'bytes': row['size'] or 0, 'elements_count': row['count']})
+            for row in rows
+        ], batch_size=1000)
+
+    # Пользователь: файлы с одинаковым content_hash — один объект в S3.
+    totals = {
+        row['project__user_id']: [0, row['count']]
+        for row in elements.values('project__user_id').annotate(count=Count('id'))
+    }
+    for row in elements.filter(content_hash='').values('project__user_id').annotate(size=Sum('file_size')):
+        totals[row['project__user_id']][0] += row['size'] or 0
+    shared = elements.exclude(content_hash='').values('project__user_id', 'content_hash').annotate(size=Max('file_size'))
+    for row in shared:
+        totals[row['project__user_id']][0] += row['size'] or 0
+    UserStorageUsage = apps.get_model('elements', 'UserStorageUsage')
+    UserStorageUsage.objects.bulk_create([
+        UserStorageUsage(user_id=user_id, bytes=size, elements_count=count)
+        for user_id, (size, count) in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_providers', '0014_generationlatencybucket'),
+        ('elements', '0015_element_content_hash'),
+        ('projects', '0002_initial'),
+        ('scenes', '0005_fix_parent_cascade_db_constraint'),
+        ('users', '0007_drop_userquota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStorageUsage',
+            fields=[
+                ('bytes', models.BigIntegerField(default=0, verbose_name='Занято (байт)')),
+                ('elements_count', models.IntegerField(default=0, verbose_name='Элементов')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='storage_usage', serialize=False, to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Место проекта',
+                'verbose_name_plural': 'Место проектов',
+            },
+        ),
+        migrations.CreateModel(
+            name='SceneStorageUsage',
+            fields=[
+                ('bytes', models.BigIntegerField(default=0, verbose_name='Занято (байт)')),
+                ('elements_count', models.IntegerField(default=0, verbose_name='Элементов')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+                ('scene', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='storage_usage', serialize=False, to='scenes.scene')),
+            ],
+            options={
+                'verbose_name': 'Место группы',
+                'verbose_name_plural': 'Место групп',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserStorageUsage',
+            fields=[
+                ('bytes', models.BigIntegerField(default=0, verbose_name='Занято (байт)')),
+                ('elements_count', models.IntegerField(default=0, verbose_name='Элементов')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='storage_usage', serialize=False, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Место пользователя',
+                'verbose_name_plural': 'Место пользователей',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='element',
+            index=models.Index(condition=models.Q(('content_hash', ''), _negated=True), fields=['content_hash'], name='element_content_hash_idx'),
+        ),
+        migrations.RunPython(backfill_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:31
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Таблица большая — индексы строятся без блокировки записи.
+    atomic = False
+
+    dependencies = [
+        ('ai_providers', '0014_generationlatencybucket'),
+        ('elements', '0016_storage_usage'),
+        ('projects', '0002_initial'),
+        ('scenes', '0005_fix_parent_cascade_db_constraint'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='element',
+            index=models.Index(fields=['scene', 'order_index', 'created_at'], name='element_scene_order_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='element',
+            index=models.Index(condition=models.Q(('scene__isnull', True)), fields=['project', 'order_index', 'created_at'], name='element_root_order_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='element',
+            index=models.Index(fields=['project', 'status', 'created_at'], name='element_project_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='element',
+            index=models.Index(fields=['project', '-created_at'], name='element_project_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='element',
+            index=models.Index(fields=['project', 'source_type', 'created_at'], name='element_project_source_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='element',
+            index=models.Index(condition=models.Q(('file_size__isnull', False)), fields=['project', 'file_size'], name='element_project_file_size_idx'),
+        ),
+        # Одиночные индексы FK покрыты составными выше — удаляются последними.
+        migrations.AlterField(
+            model_name='element',
+            name='project',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='elements', to='projects.project', verbose_name='Проект'),
+        ),
+        migrations.AlterField(
+            model_name='element',
+            name='scene',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='elements', to='scenes.scene', verbose_name='Группа'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:46
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+GENERATION_REASONS = ('generation_debit', 'generation_refund', 'refund_provider_error', 'refund_pricing_failure')
+
+
+def backfill_generation_cost(apps, schema_editor):
+    """Стоимость элемента — сумма его списаний и возвратов; сводки — суммы по элементам."""
+    Element = apps.get_model('elements', 'Element')
+    CreditsTransaction = apps.get_model('credits', 'CreditsTransaction')
+
+    costs = (
+        CreditsTransaction.objects.filter(element__isnull=False, reason__in=GENERATION_REASONS)
+        .order_by().values('element_id').annotate(total=Sum('amount'))
+    )
+    batch = [Element(id=row['element_id'], generation_cost=-row['total']) for row in costs if row['total']]
+    Element.objects.bulk_update(batch, ['generation_cost'], batch_size=1000)
+
+    elements = Element.objects.order_by().exclude(generation_cost=0)
+    for model_name, field, key in (
+        ('UserStorageUsage', 'user_id', 'project__user_id'),
+        ('ProjectStorageUsage', 'project_id', 'project_id'),
+        ('SceneStorageUsage', 'scene_id', 'scene_id'),
+    ):
+        model = apps.get_model('elements', model_name)
+        for row in elements.exclude(**{f'{key}__isnull': True}).values(key).annotate(spent=Sum('generation_cost')):
+            if not model.objects.filter(**{field: row[key]}).update(spent=F('spent') + row['spent']):
+                model.objects.create(**{field: row[key], 'spent': row['spent'] or Decimal('0')})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credits', '0006_add_prompt_enhancement_reason'),
+        ('elements', '0017_element_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='element',
+            name='generation_cost',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Списано минус возвращено; ведёт CreditsService (usage.add_generation_cost)', max_digits=12, verbose_name='Стоимость генерации'),
+        ),
+        migrations.AddField(
+            model_name='projectstorageusage',
+            name='spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Потрачено на генерации'),
+        ),
+        migrations.AddField(
+            model_name='scenestorageusage',
+            name='spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Потрачено на генерации'),
+        ),
+        migrations.AddField(
+            model_name='userstorageusage',
+            name='spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Потрачено на генерации'),
+        ),
+        migrations.RunPython(backfill_generation_cost, migrations.RunPython.noop),
+    ]
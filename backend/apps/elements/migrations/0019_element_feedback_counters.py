@@ -0,0 +1,68 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:06
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_feedback_counters(apps, schema_editor):
+    """Счётчики отзывов — из строк реакций, решений и комментариев (как sharing/counters.rebuild)."""
+    Element = apps.get_model('elements', 'Element')
+    Comment = apps.get_model('sharing', 'Comment')
+    ElementReaction = apps.get_model('sharing', 'ElementReaction')
+    ElementReview = apps.get_model('sharing', 'ElementReview')
+
+    def count(model, **filters):
+        rows = model.objects.filter(element=OuterRef('pk'), **filters).order_by().values('element')
+        return Coalesce(Subquery(rows.annotate(n=Count('pk')).values('n')), Value(0), output_field=IntegerField())
+
+    Element.objects.update(
+        like_count=count(ElementReaction, value='like'),
+        dislike_count=count(ElementReaction, value='dislike'),
+        comment_count=count(Comment, is_system=False),
+        approved_count=count(ElementReview, action='approved'),
+        changes_requested_count=count(ElementReview, action='changes_requested'),
+        rejected_count=count(ElementReview, action='rejected'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elements', '0018_generation_cost'),
+        ('sharing', '0010_share_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='element',
+            name='approved_count',
+            field=models.IntegerField(default=0, verbose_name='Согласовано'),
+        ),
+        migrations.AddField(
+            model_name='element',
+            name='changes_requested_count',
+            field=models.IntegerField(default=0, verbose_name='На доработку'),
+        ),
+        migrations.AddField(
+            model_name='element',
+            name='comment_count',
+            field=models.IntegerField(default=0, help_text='Без системных, включая ответы', verbose_name='Комментарии'),
+        ),
+        migrations.AddField(
+            model_name='element',
+            name='dislike_count',
+            field=models.IntegerField(default=0, verbose_name='Дизлайки'),
+        ),
+        migrations.AddField(
+            model_name='element',
+            name='like_count',
+            field=models.IntegerField(default=0, verbose_name='Лайки'),
+        ),
+        migrations.AddField(
+            model_name='element',
+            name='rejected_count',
+            field=models.IntegerField(default=0, verbose_name='Отклонено'),
+        ),
+        migrations.RunPython(backfill_feedback_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
 
 
 class Element(models.Model):
@@ -50,7 +52,8 @@ class Element(models.Model):
         'projects.Project',
         on_delete=models.CASCADE,
         related_name='elements',
-        verbose_name='Проект'
+        verbose_name='Проект',
+        db_index=False,  # ведущая колонка составных индексов в Meta.indexes
     )
     scene = models.ForeignKey(
         'scenes.Scene',
@@ -58,7 +61,8 @@ class Element(models.Model):
         null=True,
         blank=True,
         related_name='elements',
-        verbose_name='Группа'
+        verbose_name='Группа',
+        db_index=False,  # element_scene_order_idx
     )
     element_type = models.CharField(
         max_length=10,
@@ -81,6 +85,20 @@ class Element(models.Model):
         verbose_name='URL превью'
     )
     preview_url = models.URLField(max_length=500, blank=True, default='')
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name='SHA-256 файла',
+        help_text='Ключ дедупликации в хранилище; пусто — файл загружен до дедупликации'
+    )
+    loop_url = models.URLField(
+        max_length=500,
+        blank=True,
+        default='',
+        verbose_name='URL hover-лупа',
+        help_text='Короткий лёгкий луп видео для проигрывания при наведении'
+    )
     is_favorite = models.BooleanField(
         default=False,
         verbose_name='Избранное'
@@ -140,11 +158,34 @@ class Element(models.Model):
         help_text='Task ID от Kie.ai или другого провайдера',
         db_index=True
     )
+    next_poll_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Следующая проверка статуса',
+        help_text='Когда батч-поллер опросит провайдера. Пусто = не опрашивать'
+    )
     file_size = models.BigIntegerField(
         null=True,
         blank=True,
         verbose_name='Размер файла (байт)',
     )
+    generation_cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Стоимость генерации',
+        help_text='Списано минус возвращено; ведёт CreditsService (usage.add_generation_cost)',
+    )
+    # Отзывы ревьюеров — счётчики ведёт sharing/counters.py (F()), не save()
+    like_count = models.IntegerField(default=0, verbose_name='Лайки')
+    dislike_count = models.IntegerField(default=0, verbose_name='Дизлайки')
+    comment_count = models.IntegerField(
+        default=0, verbose_name='Комментарии', help_text='Без системных, включая ответы',
+    )
+    approved_count = models.IntegerField(default=0, verbose_name='Согласовано')
+    changes_requested_count = models.IntegerField(default=0, verbose_name='На доработку')
+    rejected_count = models.IntegerField(default=0, verbose_name='Отклонено')
     upload_keys = models.JSONField(null=True, blank=True, help_text='S3 keys for presigned upload: {original, small, medium}')
     approval_status = models.CharField(
         max_length=20,
@@ -170,7 +211,108 @@ class Element(models.Model):
         verbose_name = 'Элемент'
         verbose_name_plural = 'Элементы'
         ordering = ['order_index', 'created_at']
+        indexes = [
+            # Лента группы: ?scene=X, ORDER BY order_index, created_at.
+            models.Index(fields=['scene', 'order_index', 'created_at'], name='element_scene_order_idx'),
+            # Корень проекта: ?project=X&scene__isnull=true и подсчёт order_index
+            # в orchestration.create_generation/create_upload.
+            models.Index(
+                fields=['project', 'order_index', 'created_at'], name='element_root_order_idx',
+                condition=Q(scene__isnull=True),
+            ),
+            # download_meta (status=COMPLETED), история кабинета с фильтром статуса.
+            models.Index(fields=['project', 'status', 'created_at'], name='element_project_status_idx'),
+            # История кабинета без фильтров: ORDER BY -created_at по проектам пользователя.
+            models.Index(fields=['project', '-created_at'], name='element_project_created_idx'),
+            # Аналитика кабинета: source_type=GENERATED за период.
+            models.Index(
+                fields=['project', 'source_type', 'created_at'], name='element_project_source_idx',
+            ),
+            # Суммы file_size (stats, сверка счётчиков) — index-only scan.
+            models.Index(
+                fields=['project', 'file_size'], name='element_project_file_size_idx',
+                condition=Q(file_size__isnull=False),
+            ),
+            # Проверка «файл уже учтён» в счётчике места пользователя (usage.py).
+            models.Index(
+                fields=['content_hash'], name='element_content_hash_idx', condition=~Q(content_hash=''),
+            ),
+        ]
+
+    # Меняются только через F(): generation_cost — usage.add_generation_cost,
+    # счётчики отзывов — sharing/counters.py
+    F_MANAGED_FIELDS = (
+        'generation_cost', 'like_count', 'dislike_count', 'comment_count',
+        'approved_count', 'changes_requested_count', 'rejected_count',
+    )
+
+    def save(self, *args, **kwargs):
+        # Полный save() устаревшего экземпляра не должен затирать F()-поля.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.F_MANAGED_FIELDS
+            ]
+        # Счётчики места (signals.py → usage.py) меняются в одной транзакции с элементом.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         group_name = self.scene.name if self.scene else "Root"
         return f"{self.element_type} - {group_name} - {self.id}"
+
+
+class StorageUsage(models.Model):
+    """
+    Счётчики: занятое место, число элементов и потраченные на генерации кредиты.
+
+    Меняются в той же транзакции, что и элементы (elements/usage.py), поэтому
+    проверка лимитов и списки читают одну строку вместо SUM(file_size) по всей
+    библиотеке. Расхождения чинит задача reconcile_storage_usage.
+    """
+
+    bytes = models.BigIntegerField(default=0, verbose_name='Занято (байт)')
+    elements_count = models.IntegerField(default=0, verbose_name='Элементов')
+    spent = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name='Потрачено на генерации',
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Обновлён')
+
+    class Meta:
+        abstract = True
+
+
+class UserStorageUsage(StorageUsage):
+    """Место пользователя: общие (дедуплицированные) файлы считаются один раз."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='storage_usage',
+    )
+
+    class Meta:
+        verbose_name = 'Место пользователя'
+        verbose_name_plural = 'Место пользователей'
+
+
+class ProjectStorageUsage(StorageUsage):
+    """Место проекта: сумма file_size его элементов."""
+
+    project = models.OneToOneField(
+        'projects.Project', on_delete=models.CASCADE, primary_key=True, related_name='storage_usage',
+    )
+
+    class Meta:
+        verbose_name = 'Место проекта'
+        verbose_name_plural = 'Место проектов'
+
+
+class SceneStorageUsage(StorageUsage):
+    """Место группы — только её собственные элементы, без подгрупп."""
+
+    scene = models.OneToOneField(
+        'scenes.Scene', on_delete=models.CASCADE, primary_key=True, related_name='storage_usage',
+    )
+
+    class Meta:
+        verbose_name = 'Место группы'
+        verbose_name_plural = 'Место групп'
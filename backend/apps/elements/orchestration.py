@@ -13,12 +13,14 @@ from django.db import transaction
 from rest_framework import status as http_status
 
 from apps.ai_providers.models import AIModel
+from apps.common.ordering import ORDER_STEP
 from apps.credits.models import CreditsTransaction
 from apps.credits.services import CreditsService
-from apps.scenes.models import Scene
 from apps.storage.services import validate_file_type, detect_element_type, save_to_staging
 from .models import Element
-from .serializers import ElementSerializer
+from .positions import allocate_order_index
+from .usage import record_created
+from .serializers import GENERATION_BATCH_MAX, ElementSerializer
 
 
 def create_generation(project, scene, prompt, ai_model_id, generation_config, user) -> Tuple[dict, int]:
@@ -49,19 +51,7 @@ def create_generation(project, scene, prompt, ai_model_id, generation_config, us
     input_urls = generation_config.get('input_urls')
     source_type = Element.SOURCE_GENERATED
 
-    # --- Prompt enhancement ---
-    enhance_requested = generation_config.pop("enhance_prompt", False)
-    if enhance_requested:
-        try:
-            from apps.ai_services.services.prompt_enhance import enhance_prompt as _enhance
-            result = _enhance(prompt, user)
-            if result.was_enhanced:
-                generation_config["_enhanced_prompt"] = result.prompt
-                generation_config["_prompt_enhanced"] = True
-                generation_config["_enhance_cost"] = str(result.cost)
-        except Exception:
-            import logging
-            logging.getLogger(__name__).exception("Prompt enhancement failed, using original")
+    _apply_prompt_enhancement(prompt, generation_config, user)
 
     try:
         operation_key = uuid4().hex
@@ -92,15 +82,10 @@ def create_generation(project, scene, prompt, ai_model_id, generation_config, us
             'original_filename': '',
         }
 
+        # Ключ в конце группы — счётчик контейнера, до транзакции (elements/positions.py)
+        element_data['order_index'] = allocate_order_index(project.id, scene.id if scene else None)
+
         with transaction.atomic():
-            if scene:
-                locked_scene = Scene.objects.select_for_update().get(pk=scene.pk)
-                current_elements_count = locked_scene.elements.count()
-            else:
-                current_elements_count = Element.objects.filter(
-                    project=project, scene__isnull=True
-                ).count()
-            element_data['order_index'] = current_elements_count
             serializer = ElementSerializer(data=element_data)
             serializer.is_valid(raise_exception=True)
             element = serializer.save()
@@ -113,12 +98,7 @@ def create_generation(project, scene, prompt, ai_model_id, generation_config, us
                 }
                 element.save(update_fields=['generation_config'])
 
-            CreditsTransaction.objects.filter(
-                user=user,
-                reason=CreditsTransaction.REASON_GENERATION_DEBIT,
-                element__isnull=True,
-                metadata__operation_key=operation_key,
-            ).update(element=element)
+            credits_service.attach_debit_to_element(user, operation_key, element)
 
         from .tasks import start_generation
         start_generation.delay(element.id)
@@ -143,6 +123,170 @@ def create_generation(project, scene, prompt, ai_model_id, generation_config, us
         )
 
 
+def _apply_prompt_enhancement(prompt, generation_config, user) -> None:
+    """Prompt enhancement (enhance_prompt в конфиге) — результат пишется в generation_config."""
+    enhance_requested = generation_config.pop("enhance_prompt", False)
+    if enhance_requested:
+        try:
+            from apps.ai_services.services.prompt_enhance import enhance_prompt as _enhance
+            result = _enhance(prompt, user)
+            if result.was_enhanced:
+                generation_config["_enhanced_prompt"] = result.prompt
+                generation_config["_prompt_enhanced"] = True
+                generation_config["_enhance_cost"] = str(result.cost)
+        except Exception:
+            import logging
+            logging.getLogger(__name__).exception("Prompt enhancement failed, using original")
+
+
+def create_generation_batch(project, scene, items, ai_model_id, generation_config, user) -> Tuple[dict, int]:
+    """
+    Create N elements and start their generations in one request.
+
+    Items are validated with ElementSerializer before anything is charged;
+    enhance_prompt runs only after the balance covers the whole batch together
+    with the enhancement calls.
+    One debit for the whole batch (CreditsService.debit_for_batch: one lock,
+    a debit row per item, linked to its element after bulk_create), one
+    bulk_create with a contiguous block of order keys, start_generation for
+    every element as one Celery group. Provider failures are refunded per
+    element from generation_config['_debit_amount'], as for a single generation.
+
+    items: [{prompt, generation_config?}, ...] — generation_config of an item
+    is merged over the shared one.
+    Returns: tuple (data_dict, http_status_code)
+    """
+    if not items:
+        return {'error': 'At least one prompt is required'}, http_status.HTTP_400_BAD_REQUEST
+    if len(items) > GENERATION_BATCH_MAX:
+        return {'error': f'At most {GENERATION_BATCH_MAX} prompts per batch'}, http_status.HTTP_400_BAD_REQUEST
+    if any(not item.get('prompt') for item in items):
+        return {'error': 'Prompt is required'}, http_status.HTTP_400_BAD_REQUEST
+
+    if not ai_model_id:
+        return {'error': 'AI model ID is required'}, http_status.HTTP_400_BAD_REQUEST
+
+    try:
+        ai_model = AIModel.objects.get(id=ai_model_id, is_active=True)
+    except AIModel.DoesNotExist:
+        return {'error': 'AI model not found or inactive'}, http_status.HTTP_400_BAD_REQUEST
+
+    from apps.subscriptions.services import SubscriptionService
+    if not SubscriptionService.check_storage(user):
+        return {'error': 'Хранилище заполнено. Перейдите на более высокий тариф для увеличения объёма.'}, http_status.HTTP_403_FORBIDDEN
+
+    # Каждый элемент проходит ту же валидацию, что и в create_generation — до любых
+    # списаний, включая платный enhance_prompt
+    scene_id = scene.id if scene else None
+    configs, validated, enhance = [], [], []
+    for index, item in enumerate(items):
+        config = {**(generation_config or {}), **(item.get('generation_config') or {})}
+        enhance.append(bool(config.pop('enhance_prompt', False)))
+        serializer = ElementSerializer(data={
+            'project': project.id,
+            'scene': scene_id,
+            'element_type': ai_model.model_type,
+            'prompt_text': item['prompt'],
+            'ai_model': ai_model.id,
+            'generation_config': config,
+            'status': Element.STATUS_PENDING,
+            'source_type': Element.SOURCE_GENERATED,
+            'original_filename': '',
+        })
+        if not serializer.is_valid():
+            return {'error': f'Invalid item {index}', 'details': serializer.errors}, http_status.HTTP_400_BAD_REQUEST
+        configs.append(config)
+        validated.append(serializer.validated_data)
+
+    credits_service = CreditsService()
+    if any(enhance):
+        # Улучшение списывается по одному вызову — сначала убеждаемся, что хватит
+        # на весь пакет вместе с генерацией, иначе ни одного списания
+        from apps.ai_services.services.prompt_enhance import enhancement_cost  # lazy import
+        estimates = [credits_service.estimate_generation(user, ai_model, config) for config in configs]
+        if any(estimate.cost is None for estimate in estimates):
+            return {'error': CreditsService.ERROR_INVALID_PRICING}, http_status.HTTP_400_BAD_REQUEST
+        total = sum((estimate.cost for estimate in estimates), Decimal('0'))
+        total += enhancement_cost(user) * sum(enhance)
+        user.refresh_from_db(fields=['balance'])
+        if user.balance < total:
+            return {'error': CreditsService.ERROR_INSUFFICIENT_FUNDS}, http_status.HTTP_400_BAD_REQUEST
+        for item, config, data, requested in zip(items, configs, validated, enhance):
+            if requested:
+                config['enhance_prompt'] = True
+                _apply_prompt_enhancement(item['prompt'], config, user)
+                data['generation_config'] = config
+
+    operation_key = uuid4().hex
+    debit_result = None
+    created = False
+    try:
+        debit_result = credits_service.debit_for_batch(
+            user=user,
+            ai_model=ai_model,
+            generation_configs=configs,
+            metadata={"operation_key": operation_key},
+        )
+        if not debit_result.ok:
+            return (
+                {'error': debit_result.error or 'Не удалось списать средства для генерации'},
+                http_status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Непрерывный блок ключей в конце группы — один UPDATE счётчика (elements/positions.py)
+        first_key = allocate_order_index(project.id, scene_id, count=len(items))
+
+        elements = []
+        for index, (data, cost) in enumerate(zip(validated, debit_result.costs)):
+            config = data['generation_config']
+            if cost:
+                config = {**config, '_debit_amount': str(cost), '_debit_transaction': True}
+            elements.append(Element(
+                **{**data, 'generation_config': config},
+                order_index=first_key + index * ORDER_STEP,
+                generation_cost=cost,
+            ))
+
+        with transaction.atomic():
+            Element.objects.bulk_create(elements)
+            record_created(elements, user.id)
+            credits_service.attach_batch_debits(user, operation_key, elements)
+        created = True
+
+        from celery import group
+        from .tasks import start_generation
+        group(start_generation.s(element.id) for element in elements).apply_async()
+
+        return {
+            'elements': ElementSerializer(elements, many=True).data,
+            'total_cost': str(debit_result.total),
+        }, http_status.HTTP_201_CREATED
+
+    except Exception as e:
+        if debit_result is not None and debit_result.ok and debit_result.total:
+            # Элементы уже созданы — возврат по каждому, чтобы снять и их стоимость;
+            # идемпотентность — по элементу, operation_key у них общий
+            if created:
+                metadata = {"source": "generation_setup_failure", "batch_operation_key": operation_key}
+                refunds = zip(elements, debit_result.costs)
+            else:
+                metadata = {"source": "generation_setup_failure", "operation_key": operation_key}
+                refunds = [(None, debit_result.total)]
+            for element, amount in refunds:
+                if amount:
+                    credits_service.refund_for_generation(
+                        user=user,
+                        amount=amount,
+                        element=element,
+                        reason=CreditsTransaction.REASON_GENERATION_REFUND,
+                        metadata=metadata,
+                    )
+        return (
+            {'error': f'Failed to start generation: {str(e)}'},
+            http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 def create_upload(project, scene, file, prompt_text='', is_favorite=False, ai_model_id=None) -> Tuple[dict, int]:
     """
     Save file to staging and create Element with PROCESSING status.
@@ -174,7 +318,6 @@ def create_upload(project, scene, file, prompt_text='', is_favorite=False, ai_mo
             'project': project.id,
             'scene': scene.id if scene else None,
             'element_type': element_type,
-            'order_index': 0,
             'prompt_text': prompt_text,
             'is_favorite': is_favorite,
             'status': Element.STATUS_PROCESSING,
@@ -185,15 +328,10 @@ def create_upload(project, scene, file, prompt_text='', is_favorite=False, ai_mo
         if ai_model_id:
             element_data['ai_model'] = ai_model_id
 
+        # Ключ в конце группы — счётчик контейнера, до транзакции (elements/positions.py)
+        element_data['order_index'] = allocate_order_index(project.id, scene.id if scene else None)
+
         with transaction.atomic():
-            if scene:
-                locked_scene = Scene.objects.select_for_update().get(pk=scene.pk)
-                current_elements_count = locked_scene.elements.count()
-            else:
-                current_elements_count = Element.objects.filter(
-                    project=project, scene__isnull=True
-                ).count()
-            element_data['order_index'] = current_elements_count
             serializer = ElementSerializer(data=element_data)
             serializer.is_valid(raise_exception=True)
             element = serializer.save()
@@ -0,0 +1,215 @@
+"""
+Batched provider status polling.
+
+One beat tick leases every due PROCESSING element (next_poll_at <= now),
+groups them by provider and queries statuses concurrently with bounded
+parallelism. Broker traffic is one message per provider per tick, regardless
+of how many generations are in flight.
+
+Checks are spaced adaptively: with enough history for the AIModel
+(ai_providers/latency.py) the poller aims at latency quantiles of that model
+and backs off exponentially once a generation runs past p95. Without history
+it falls back to the fixed GENERATION_POLL_* intervals.
+
+Owns: due-element leasing, concurrent status requests, rescheduling.
+Called by: elements/tasks.py (poll_generation_statuses, poll_provider_statuses).
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.ai_providers.services import LatencyProfile, load_latency_profiles
+from apps.common.http import get_session
+from apps.elements.generation import is_public_callback_url, normalize_provider_response
+from apps.elements.models import Element
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATUS_ENDPOINT = '/api/v1/jobs/recordInfo'
+
+# Моменты проверки по гистограмме модели. С callback опрос — только страховка,
+# поэтому первая проверка не раньше p95.
+POLL_QUANTILES = (0.5, 0.75, 0.9, 0.95)
+CALLBACK_POLL_QUANTILES = (0.95,)
+
+
+def is_callback_mode() -> bool:
+    """True when providers can deliver results to our webhook (polling is a safety net)."""
+    return is_public_callback_url(settings.BACKEND_BASE_URL)
+
+
+def get_poll_interval() -> int:
+    """Seconds between status checks: sparse with callback, aggressive without."""
+    if is_callback_mode():
+        return settings.GENERATION_POLL_CALLBACK_INTERVAL
+    return settings.GENERATION_POLL_INTERVAL
+
+
+def get_first_poll_delay() -> int:
+    """Seconds from submission to the first status check."""
+    if is_callback_mode():
+        return settings.GENERATION_POLL_CALLBACK_FIRST_DELAY
+    return settings.GENERATION_POLL_INTERVAL
+
+
+def next_poll_delay(profile: LatencyProfile | None, elapsed: float, first: bool = False) -> int:
+    """
+    Seconds until the next status check of a generation running `elapsed` seconds.
+
+    Aims at the next latency quantile of the model not reached yet; past the
+    last one waits proportionally to the overrun (exponential backoff), capped
+    by GENERATION_POLL_MAX_INTERVAL. Never shorter than GENERATION_POLL_INTERVAL.
+    """
+    callback = is_callback_mode()
+    if profile is None:
+        return get_first_poll_delay() if first else get_poll_interval()
+
+    floor = settings.GENERATION_POLL_INTERVAL
+    quantiles = CALLBACK_POLL_QUANTILES if callback else POLL_QUANTILES
+    for q in quantiles:
+        checkpoint = profile.quantile(q)
+        if checkpoint > elapsed:
+            return max(floor, int(checkpoint - elapsed + 0.5))
+
+    ceiling = settings.GENERATION_POLL_MAX_INTERVAL
+    if callback:
+        ceiling = max(ceiling, settings.GENERATION_POLL_CALLBACK_INTERVAL)
+    overrun = elapsed - profile.quantile(quantiles[-1])
+    delay = int(overrun * settings.GENERATION_POLL_BACKOFF_FACTOR)
+    return min(ceiling, max(floor, delay))
+
+
+def reschedule_adaptive(elements: list[Element], now=None) -> None:
+    """Per-element next_poll_at from the latency profiles of their models."""
+    if not elements:
+        return
+    now = now or timezone.now()
+    profiles = load_latency_profiles(element.ai_model_id for element in elements)
+
+    by_delay: dict[int, list[int]] = {}
+    for element in elements:
+        elapsed = (now - element.created_at).total_seconds()
+        delay = next_poll_delay(profiles.get(element.ai_model_id), elapsed)
+        by_delay.setdefault(delay, []).append(element.id)
+    for delay, element_ids in by_delay.items():
+        reschedule(element_ids, delay)
+
+
+def first_poll_delay_for(element: Element, now=None) -> int:
+    """Seconds from submission to the first status check of an element."""
+    now = now or timezone.now()
+    profile = None
+    if element.ai_model_id:
+        profile = load_latency_profiles([element.ai_model_id]).get(element.ai_model_id)
+    return next_poll_delay(profile, (now - element.created_at).total_seconds(), first=True)
+
+
+def lease_due_elements(now=None) -> dict[int, list[int]]:
+    """
+    Claim due elements for one tick and group their ids by provider.
+
+    Leased rows get next_poll_at pushed by GENERATION_POLL_LEASE, so an
+    overlapping tick (or a crashed poll task) never double-polls them.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            Element.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(
+                status=Element.STATUS_PROCESSING,
+                next_poll_at__lte=now,
+                ai_model__isnull=False,
+            )
+            .exclude(external_task_id='')
+            .order_by('next_poll_at')
+            .values_list('id', 'ai_model__provider_id')[:settings.GENERATION_POLL_BATCH_SIZE]
+        )
+        if not rows:
+            return {}
+        Element.objects.filter(id__in=[element_id for element_id, _ in rows]).update(
+            next_poll_at=now + timedelta(seconds=settings.GENERATION_POLL_LEASE),
+        )
+
+    by_provider: dict[int, list[int]] = {}
+    for element_id, provider_id in rows:
+        by_provider.setdefault(provider_id, []).append(element_id)
+    return by_provider
+
+
+def reschedule(element_ids: list[int], delay: int) -> None:
+    """Push next status check for still-processing elements."""
+    if not element_ids:
+        return
+    Element.objects.filter(
+        id__in=element_ids,
+        status=Element.STATUS_PROCESSING,
+    ).update(next_poll_at=timezone.now() + timedelta(seconds=delay))
+
+
+def is_poll_deadline_exceeded(element: Element, now=None) -> bool:
+    """True when the provider has been running longer than GENERATION_POLL_TIMEOUT."""
+    now = now or timezone.now()
+    return element.created_at + timedelta(seconds=settings.GENERATION_POLL_TIMEOUT) <= now
+
+
+def fetch_generation_status(element: Element) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    GET the provider status endpoint for one element.
+
+    Expects element.ai_model and its provider to be loaded.
+    Returns (normalized, raw_payload). Raises requests.RequestException on transport errors.
+    """
+    ai_model = element.ai_model
+    provider = ai_model.provider
+
+    status_endpoint = ai_model.status_check_endpoint or DEFAULT_STATUS_ENDPOINT
+    check_url = f"{provider.base_url.rstrip('/')}/{status_endpoint.lstrip('/')}"
+
+    headers = {}
+    if provider.api_key:
+        headers['Authorization'] = f'Bearer {provider.api_key}'
+
+    response = get_session(provider.base_url).get(
+        check_url,
+        params={'taskId': element.external_task_id},
+        headers=headers,
+    )
+    response.raise_for_status()
+    result = response.json()
+
+    normalized = normalize_provider_response(result, ai_model.response_mapping or {})
+    if normalized.get('mapping_error'):
+        logger.error(
+            "Element #%s: %s. Raw: %s",
+            element.id, normalized['mapping_error'], str(result)[:300],
+        )
+    return normalized, result
+
+
+def fetch_generation_statuses(elements: list[Element]) -> list[tuple[Element, Any]]:
+    """
+    Query statuses of many elements concurrently (GENERATION_POLL_CONCURRENCY threads).
+
+    Only HTTP runs in worker threads — no ORM access there.
+    Returns [(element, (normalized, raw) | Exception)] in input order.
+    """
+    if not elements:
+        return []
+
+    def _safe_fetch(element: Element):
+        try:
+            return fetch_generation_status(element)
+        except Exception as exc:  # noqa: BLE001 — caller decides per element
+            return exc
+
+    workers = max(1, min(settings.GENERATION_POLL_CONCURRENCY, len(elements)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gen-poll') as pool:
+        results = list(pool.map(_safe_fetch, elements))
+    return list(zip(elements, results))
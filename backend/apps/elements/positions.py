@@ -0,0 +1,52 @@
+"""
+order_index of elements: one allocator for every creation path.
+
+Контейнер элемента — группа (Scene.element_order_seq) или корень проекта
+(Project.root_element_order_seq). Счётчик хранит последний выданный ключ;
+новый ключ берётся одним UPDATE … RETURNING (common/ordering.py::allocate)
+вместо COUNT(*) по группе под select_for_update группы. Reorder, reposition
+и перенос элементов подтягивают счётчик, чтобы новые элементы оставались
+в конце.
+"""
+from __future__ import annotations
+
+from django.db.models import Max
+
+from apps.common.ordering import ORDER_STEP, allocate, apply_keys, raise_floor
+from apps.elements.models import Element
+
+
+def _counter(project_id: int, scene_id: int | None):
+    if scene_id is not None:
+        from apps.scenes.models import Scene
+        return Scene, scene_id, 'element_order_seq'
+    from apps.projects.models import Project
+    return Project, project_id, 'root_element_order_seq'
+
+
+def allocate_order_index(project_id: int, scene_id: int | None, count: int = 1) -> int:
+    """
+    Next order_index at the end of the container; `count` reserves a block
+    (keys first, first + ORDER_STEP, …). Call before the transaction that
+    creates the elements so the counter row is not locked until its commit.
+    """
+    model, pk, field = _counter(project_id, scene_id)
+    return allocate(model, pk, field, count)
+
+
+def sync_counters(elements) -> None:
+    """After keys were written by reorder/reposition: counters stay ahead of the max key."""
+    rows = elements.order_by().values('project_id', 'scene_id').annotate(last=Max('order_index'))
+    for row in rows:
+        raise_floor(*_counter(row['project_id'], row['scene_id']), row['last'])
+
+
+def append_elements(element_ids: list[int], scene_id: int | None) -> None:
+    """Moved elements go to the end of the target container, keeping their relative order."""
+    by_project: dict[int, list[int]] = {}
+    rows = Element.objects.filter(id__in=element_ids).order_by('order_index', 'created_at', 'id')
+    for pk, project_id in rows.values_list('id', 'project_id'):
+        by_project.setdefault(project_id, []).append(pk)
+    for project_id, ids in by_project.items():
+        first = allocate_order_index(project_id, scene_id, len(ids))
+        apply_keys(Element.objects.all(), {pk: first + i * ORDER_STEP for i, pk in enumerate(ids)})
@@ -15,10 +15,11 @@ class ElementSerializer(serializers.ModelSerializer):
     file_size = serializers.IntegerField(read_only=True, allow_null=True)
     generation_cost = serializers.SerializerMethodField()
     review_summary = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
     file_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
     preview_url = serializers.SerializerMethodField()
+    loop_url = serializers.SerializerMethodField()
 
     def get_file_url(self, obj) -> str:
         return build_element_url(obj, 'file', self.context.get('request'))
@@ -29,6 +30,9 @@ class ElementSerializer(serializers.ModelSerializer):
     def get_preview_url(self, obj) -> str:
         return build_element_url(obj, 'preview', self.context.get('request'))
 
+    def get_loop_url(self, obj) -> str:
+        return build_element_url(obj, 'loop', self.context.get('request'))
+
     class Meta:
         model = Element
         fields = [
@@ -60,6 +64,7 @@ class ElementSerializer(serializers.ModelSerializer):
             'original_filename',
             'review_summary',
             'preview_url',
+            'loop_url',
             'created_at',
             'updated_at',
             'comment_count',
@@ -93,7 +98,7 @@ class ElementSerializer(serializers.ModelSerializer):
         return obj.get_source_type_display()
 
     def get_generation_cost(self, obj) -> str | None:
-        val = getattr(obj, '_generation_cost', None)
+        val = obj.generation_cost
         return str(val) if val else None
 
     def get_review_summary(self, obj):
@@ -105,12 +110,6 @@ class ElementSerializer(serializers.ModelSerializer):
         worst = min(reviews, key=lambda r: priority.get(r.action, 99))
         return {'action': worst.action, 'author_name': worst.author_name}
 
-    def get_comment_count(self, obj):
-        """Count of comments on this element (excluding system comments)."""
-        if hasattr(obj, '_comment_count'):
-            return obj._comment_count
-        return obj.comments.filter(is_system=False).count()
-
 
 class ReorderSerializer(serializers.Serializer):
     """Сериализатор для изменения порядка элементов."""
@@ -118,3 +117,24 @@ class ReorderSerializer(serializers.Serializer):
         child=serializers.IntegerField(),
         help_text='Список ID элементов в новом порядке'
     )
+
+
+class RepositionSerializer(serializers.Serializer):
+    """Перемещение одного элемента между соседями (null — начало/конец списка)."""
+    after_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+    before_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+
+GENERATION_BATCH_MAX = 50
+
+
+class GenerationBatchItemSerializer(serializers.Serializer):
+    prompt = serializers.CharField()
+    generation_config = serializers.DictField(required=False, default=dict)
+
+
+class GenerationBatchSerializer(serializers.Serializer):
+    """Пакет генераций одной моделью: общий generation_config + промпты."""
+    ai_model_id = serializers.IntegerField()
+    generation_config = serializers.DictField(required=False, default=dict)
+    items = GenerationBatchItemSerializer(many=True, min_length=1, max_length=GENERATION_BATCH_MAX)
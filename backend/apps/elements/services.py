@@ -4,13 +4,29 @@ Orchestration (create_generation, create_upload) lives in elements/orchestration
 """
 from typing import Optional, List
 
+from django.db import transaction
+
 from apps.ai_providers.services import (  # noqa: F401 — re-exported for backward compat
     substitute_variables,
     collect_unresolved_placeholders,
     build_generation_context,
 )
+from apps.common.ordering import apply_order, reposition
 from apps.scenes.models import Scene
+from . import deletion
+from .deletion import (  # noqa: F401 — удаление групп и проектов для других модулей
+    purge_project,
+    purge_scene,
+    tombstone_project,
+    tombstone_scene,
+)
 from .models import Element
+from .positions import allocate_order_index, sync_counters  # noqa: F401 — order_index новых элементов
+from .usage import (  # noqa: F401 — счётчики места для других модулей
+    add_generation_cost,
+    deferred_usage,
+    get_user_usage,
+)
 
 
 def create_element(
@@ -38,6 +54,7 @@ def create_element(
     element = Element.objects.create(
         scene=scene,
         project=scene.project,
+        order_index=allocate_order_index(scene.project_id, scene.id),
         element_type=element_type,
         file_url=file_url,
         thumbnail_url=thumbnail_url,
@@ -97,12 +114,12 @@ def toggle_favorite(element: Element) -> Element:
 
 def delete_element(element: Element) -> None:
     """
-    Удаление элемента.
+    Удаление элемента. Файлы S3 удаляются в фоне (elements/deletion.py).
     
     Args:
         element: Объект элемента для удаления
     """
-    element.delete()
+    deletion.delete_element(element)
 
 
 def get_scene_elements(scene: Scene, element_type: Optional[str] = None) -> List[Element]:
@@ -142,16 +159,42 @@ def get_favorite_elements(scene: Scene) -> List[Element]:
 
 def reorder_elements(element_ids: List[int]) -> None:
     """
-    Изменение порядка элементов.
+    Изменение порядка элементов — один UPDATE … CASE (common/ordering.py).
 
     Args:
         element_ids: Список ID элементов в новом порядке
     """
-    for index, element_id in enumerate(element_ids):
-        Element.objects.filter(id=element_id).update(order_index=index)
+    from apps.sharing.services import invalidate_share_payloads  # lazy import
+
+    elements = Element.objects.filter(id__in=element_ids)
+    with transaction.atomic():
+        apply_order(Element.objects.all(), element_ids)
+        sync_counters(elements)
+        invalidate_share_payloads(*elements.values_list('project_id', flat=True).distinct())
+
+
+def reposition_element(element: Element, after_id: Optional[int] = None, before_id: Optional[int] = None) -> int:
+    """
+    Перемещение одного элемента между соседями в его группе (или корне проекта).
+    Меняется одна строка, пока между ключами соседей есть зазор.
+
+    Returns:
+        Новый order_index
+
+    Raises:
+        LookupError: сосед не найден в той же группе
+    """
+    from apps.sharing.services import invalidate_share_payloads  # lazy import
+
+    siblings = Element.objects.filter(project_id=element.project_id, scene_id=element.scene_id)
+    with transaction.atomic():
+        key = reposition(siblings, element.id, after_id=after_id, before_id=before_id)
+        sync_counters(siblings)
+        invalidate_share_payloads(element.project_id)
+    return key
 
 
 
 # Re-export orchestration functions for backward compatibility.
 # New code should import from apps.elements.orchestration directly.
-from apps.elements.orchestration import create_generation, create_upload  # noqa: F401
+from apps.elements.orchestration import create_generation, create_generation_batch, create_upload  # noqa: F401
@@ -0,0 +1,28 @@
+"""Element changes → storage usage ledger (elements/usage.py)."""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from apps.elements import usage
+from apps.elements.models import Element
+
+
+@receiver(post_init, sender=Element)
+def remember_usage_state(sender, instance, **kwargs):
+    instance._usage_state = usage.ElementState.of(instance)
+
+
+@receiver(post_save, sender=Element)
+def track_element_save(sender, instance, created, **kwargs):
+    new = usage.ElementState.of(instance)
+    old = None if created else getattr(instance, '_usage_state', None)
+    if new is not None and (created or old is not None):
+        usage.record(instance.id, old, new)
+    # Не все поля загружены (.only()) — расхождение починит reconcile_storage_usage.
+    instance._usage_state = new
+
+
+@receiver(post_delete, sender=Element)
+def track_element_delete(sender, instance, **kwargs):
+    old = usage.ElementState.of(instance)
+    if old is not None:
+        usage.record(instance.id, old, None)
@@ -2,28 +2,54 @@
 Celery tasks для работы с элементами.
 """
 from celery import shared_task
-from celery.exceptions import Retry
+from celery.exceptions import MaxRetriesExceededError, Retry
+from botocore.exceptions import ConnectionError as BotoConnectionError, HTTPClientError
 import time
 import requests
 import logging
 from django.conf import settings
+from django.db import transaction
 from .models import Element
 from apps.ai_providers.services import substitute_variables, collect_unresolved_placeholders, build_generation_context
 import os
+from datetime import timedelta
 from decimal import Decimal
 
-from apps.storage.services import upload_staging_to_s3, generate_thumbnails
+from django.utils import timezone
+
+from apps.storage.services import (
+    abort_staging_upload,
+    generate_preview_loop,
+    delete_file_from_s3,
+    delete_object,
+    delete_objects,
+    hash_s3_object,
+    register_object,
+    release_object,
+    render_thumbnails,
+    store_staging_file,
+)
+from apps.elements.usage import file_changed
 from apps.elements.generation import (
+    complete_generation,
     finalize_generation_failure,
     finalize_generation_success,
     is_public_callback_url,
-    normalize_provider_response,
+)
+from apps.elements.polling import (
+    fetch_generation_status,
+    fetch_generation_statuses,
+    first_poll_delay_for,
+    is_poll_deadline_exceeded,
+    lease_due_elements,
+    reschedule_adaptive,
 )
 from apps.credits.models import CreditsTransaction
 from apps.credits.services import CreditsService
 from apps.ai_providers.validators import validate_model_admin_config
+from apps.common.http import get_session
 
-from apps.notifications.services import notify_element_status, create_notification
+from apps.notifications.services import notify_element_status, notify_deletion_progress, create_notification
 
 logger = logging.getLogger(__name__)
 
@@ -125,12 +151,11 @@ def start_generation(self, element_id: int) -> dict:
         
         logger.info("Отправка запроса на генерацию Element #%s URL=%s", element_id, full_url)
         
-        # Отправляем запрос
-        response = requests.post(
+        # Отправляем запрос (пул соединений провайдера, таймаут — из HTTP_* настроек)
+        response = get_session(provider.base_url).post(
             full_url,
             json=request_body,
             headers=headers,
-            timeout=30
         )
         
         response.raise_for_status()
@@ -154,30 +179,15 @@ def start_generation(self, element_id: int) -> dict:
         if not task_id:
             raise ValueError(f"Task ID не найден в ответе: {result}")
         
-        # Обновляем элемент
+        # Обновляем элемент. Статус дальше опрашивает батч-поллер
+        # (poll_generation_statuses): часто без callback, редкая страховка с ним.
         element.external_task_id = task_id
         element.status = Element.STATUS_PROCESSING
+        element.next_poll_at = timezone.now() + timedelta(seconds=first_poll_delay_for(element))
         element.save()
         
         logger.info("Element #%s обновлен: task_id=%s, status=PROCESSING", element_id, task_id)
         
-        # Polling: aggressive without callback, safety-net with callback
-        has_callback = bool(callback_url)
-        if has_callback:
-            # Callback will deliver result. One safety-net poll after 2 min.
-            check_generation_status.apply_async(
-                args=[element_id],
-                kwargs={'has_callback': True},
-                countdown=120,
-            )
-        else:
-            # No callback (e.g. localhost). Poll every 10s as before.
-            check_generation_status.apply_async(
-                args=[element_id],
-                kwargs={'has_callback': False},
-                countdown=10,
-            )
-        
         return {
             'element_id': element_id,
             'task_id': task_id,
@@ -207,269 +217,540 @@ def start_generation(self, element_id: int) -> dict:
         raise
 
 
-@shared_task(bind=True, max_retries=60)  # Default for no-callback mode; overridden to 10 when has_callback=True
-def check_generation_status(self, element_id: int, has_callback: bool = False) -> dict:
+@shared_task(ignore_result=True)
+def poll_generation_statuses() -> dict:
     """
-    Проверка статуса генерации через polling (GET /recordInfo).
+    Beat tick: lease due PROCESSING elements and fan out one poll task per provider.
 
-    With callback (production): sparse safety-net — 60s intervals, max 10 retries.
-    Without callback (localhost): aggressive — 10s intervals, max 60 retries.
+    Broker traffic per tick = number of providers with due elements,
+    not number of in-flight generations.
+    """
+    by_provider = lease_due_elements()
+    for provider_id, element_ids in by_provider.items():
+        poll_provider_statuses.delay(provider_id, element_ids)
+    return {'providers': len(by_provider), 'elements': sum(len(ids) for ids in by_provider.values())}
 
-    Args:
-        element_id: ID элемента
-        has_callback: True if webhook callback is configured (reduces polling frequency)
 
-    Returns:
-        Статус генерации
+@shared_task(ignore_result=True)
+def poll_provider_statuses(provider_id: int, element_ids: list[int]) -> dict:
+    """
+    Check statuses of a leased batch of one provider's elements concurrently
+    and hand terminal results to finalization.
+    """
+    elements = list(
+        Element.objects.select_related('ai_model', 'ai_model__provider').filter(
+            id__in=element_ids,
+            status=Element.STATUS_PROCESSING,
+            ai_model__provider_id=provider_id,
+        )
+    )
+
+    counters = {'completed': 0, 'failed': 0, 'processing': 0, 'errors': 0}
+    still_processing: list[Element] = []
+    for element, outcome in fetch_generation_statuses(elements):
+        if isinstance(outcome, requests.RequestException):
+            logger.warning("Ошибка сети при проверке статуса Element #%s: %s", element.id, outcome)
+            counters['errors'] += 1
+            still_processing.append(element)
+            continue
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            normalized, result = outcome
+            state = _apply_generation_state(element, normalized, result)
+        except Exception as e:
+            logger.exception("Ошибка при проверке статуса Element #%s: %s", element.id, e)
+            _fail_generation(element.id, str(e))
+            counters['errors'] += 1
+            continue
+        counters[state] += 1
+        if state == 'processing':
+            still_processing.append(element)
+
+    reschedule_adaptive(still_processing)
+    return counters
+
+
+@shared_task(bind=True, max_retries=3)
+def finalize_generation(self, element_id: int, source_url: str) -> dict:
+    """Скачать результат провайдера в S3 и передать элемент в очередь media."""
+    try:
+        # COMPLETED и уведомление — после превью, в render_element_media.
+        applied, s3_url = finalize_generation_success(element_id=element_id, source_url=source_url)
+        return {'element_id': element_id, 'status': 'stored', 'file_url': s3_url, 'applied': applied}
+    except Element.DoesNotExist:
+        logger.warning("element gone before finalize", extra={"element_id": element_id})
+        return {'element_id': element_id, 'status': 'skipped'}
+    except Exception as e:
+        logger.exception("Ошибка финализации Element #%s: %s", element_id, e)
+        if isinstance(e, requests.RequestException) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=30)
+        _fail_generation(element_id, str(e))
+        raise
+
+
+@shared_task
+def check_generation_status(element_id: int, has_callback: bool = False) -> dict:
+    """
+    Разовая проверка статуса генерации (GET /recordInfo).
+
+    Регулярный опрос делает батч-поллер (poll_generation_statuses); задача
+    оставлена для ручного запуска и сообщений, поставленных до его появления.
+    Если генерация ещё идёт — элемент возвращается в расписание поллера.
     """
     try:
         element = Element.objects.select_related(
             'ai_model',
             'ai_model__provider'
         ).get(id=element_id)
+    except Element.DoesNotExist:
+        return {'element_id': element_id, 'status': 'missing', 'skipped': True}
 
-        if element.status in (Element.STATUS_COMPLETED, Element.STATUS_FAILED):
-            return {'element_id': element_id, 'status': element.status, 'skipped': True}
-
-        retry_count = self.request.retries or 0
-        if retry_count == 0:
-            mode = "callback-safety-net" if has_callback else "polling"
-            logger.info(
-                "check_generation_status Element #%s: mode=%s, interval=%ss, max_retries=%s",
-                element_id, mode, 60 if has_callback else 10, 10 if has_callback else 60,
-            )
+    if element.status in (Element.STATUS_COMPLETED, Element.STATUS_FAILED):
+        return {'element_id': element_id, 'status': element.status, 'skipped': True}
 
+    try:
         if not element.external_task_id:
             raise ValueError("External task_id не найден")
-        
-        provider = element.ai_model.provider
-        response_mapping = element.ai_model.response_mapping or {}
-
-        # URL для проверки статуса — из модели или дефолт
-        status_endpoint = element.ai_model.status_check_endpoint
-        if not status_endpoint:
-            status_endpoint = '/api/v1/jobs/recordInfo'
-        check_url = f"{provider.base_url.rstrip('/')}/{status_endpoint.lstrip('/')}"
-
-        headers = {}
-        if provider.api_key:
-            headers['Authorization'] = f'Bearer {provider.api_key}'
+        normalized, result = fetch_generation_status(element)
+        state = _apply_generation_state(element, normalized, result)
+    except requests.RequestException as e:
+        logger.warning("Ошибка сети при проверке статуса Element #%s: %s", element_id, e)
+        state = 'processing'
+    except Exception as e:
+        logger.exception("Ошибка при проверке статуса Element #%s: %s", element_id, e)
+        _fail_generation(element_id, str(e))
+        raise
 
-        # Запрос статуса
-        response = requests.get(
-            check_url,
-            params={'taskId': element.external_task_id},
-            headers=headers,
-            timeout=30
-        )
+    if state == 'processing':
+        reschedule_adaptive([element])
+    return {'element_id': element_id, 'status': state}
 
-        response.raise_for_status()
-        result = response.json()
 
-        normalized = normalize_provider_response(result, response_mapping)
-        state = normalized['state']
+def _apply_generation_state(element: Element, normalized: dict, result: dict) -> str:
+    """
+    Применить нормализованный ответ провайдера к элементу.
 
-        if normalized.get('mapping_error'):
-            logger.error(
-                "Element #%s: %s. Raw: %s",
-                element_id, normalized['mapping_error'], str(result)[:300],
+    success → снять с расписания и поставить finalize_generation;
+    failed → refund + FAILED; processing → FAILED, если вышел дедлайн опроса.
+    Returns: 'completed' | 'failed' | 'processing'.
+    """
+    element_id = element.id
+    state = normalized['state']
+    logger.info("Статус генерации Element #%s: state=%s", element_id, state)
+
+    if state == 'success':
+        source_url = normalized.get('result_url')
+        if not source_url:
+            raise ValueError("Генерация завершена, но result_url пустой")
+        claimed = Element.objects.filter(
+            id=element_id,
+            status=Element.STATUS_PROCESSING,
+            next_poll_at__isnull=False,
+        ).update(next_poll_at=None)
+        if claimed:
+            finalize_generation.delay(element_id, source_url)
+        return 'completed'
+
+    if state == 'failed':
+        fail_msg = normalized.get('error') or 'Unknown error'
+        try:
+            element = Element.objects.select_related('project').get(id=element_id)
+            _refund_for_failure(element, reason=fail_msg)
+        except Element.DoesNotExist:
+            logger.warning(
+                "element gone before refund on failed state",
+                extra={"element_id": element_id},
             )
+        _fail_generation(element_id, fail_msg)
+        logger.warning("Генерация failed для Element #%s: %s", element_id, fail_msg)
+        return 'failed'
+
+    if is_poll_deadline_exceeded(element):
+        logger.warning(
+            "Element #%s: дедлайн опроса истёк, state=%s. Raw response: %s",
+            element_id, state, str(result)[:500],
+        )
+        _fail_generation(element_id, "Превышено время ожидания результата от провайдера")
+        return 'failed'
 
-        logger.info("Статус генерации Element #%s: state=%s", element_id, state)
-
-        if state == 'success':
-            source_url = normalized.get('result_url')
-            if not source_url:
-                raise ValueError("Генерация завершена, но result_url пустой")
-
-            applied, s3_url = finalize_generation_success(element_id=element_id, source_url=source_url)
-            if applied:
-                updated_element = Element.objects.get(id=element_id)
-                notify_element_status(updated_element, 'COMPLETED', file_url=s3_url, preview_url=updated_element.preview_url)
-
-            return {
-                'element_id': element_id,
-                'status': 'completed',
-                'file_url': s3_url,
-                'applied': applied,
-            }
-
-        elif state == 'failed':
-            fail_msg = normalized.get('error') or 'Unknown error'
-
-            try:
-                element = Element.objects.select_related('project').get(id=element_id)
-                _refund_for_failure(element, reason=fail_msg)
-            except Element.DoesNotExist:
-                logger.warning(
-                    "element gone before refund on failed state",
-                    extra={"element_id": element_id},
-                )
-
-            applied = finalize_generation_failure(element_id=element_id, error_message=fail_msg)
-            if applied:
-                updated_element = Element.objects.get(id=element_id)
-                notify_element_status(updated_element, 'FAILED', error_message=fail_msg)
-            logger.warning("Генерация failed для Element #%s: %s", element_id, fail_msg)
-
-            return {
-                'element_id': element_id,
-                'status': 'failed',
-                'error': fail_msg,
-                'applied': applied,
-            }
+    logger.debug(
+        "Генерация в процессе Element #%s: state=%s, raw_data_keys=%s",
+        element_id, state, list((result.get('data') or {}).keys()),
+    )
+    return 'processing'
 
-        else:
-            # Еще в процессе (pending, processing, etc.)
-            retry_count = self.request.retries or 0
-
-            # Первые 3 раза и потом каждые 10 — логируем raw ответ для дебага
-            if retry_count < 3 or retry_count % 10 == 0:
-                logger.info(
-                    "Генерация в процессе Element #%s: state=%s, retry=%d, raw_data_keys=%s",
-                    element_id, state, retry_count,
-                    list((result.get('data') or {}).keys()),
-                )
-
-            # Если после 10 попыток state всё ещё не распознан —
-            # скорее всего маппинг кривой (только в polling-режиме)
-            if retry_count == 10 and not has_callback:
-                logger.warning(
-                    "Element #%s: 10 попыток, state=%s. Возможно кривой response_mapping. "
-                    "Raw response: %s",
-                    element_id, state, str(result)[:500],
-                )
-
-            retry_cd = 60 if has_callback else 10
-            retry_max = 10 if has_callback else 60
-            raise self.retry(countdown=retry_cd, max_retries=retry_max)
-        
-    except Retry:
-        raise
-    except Exception as e:
-        logger.exception("Ошибка при проверке статуса Element #%s: %s", element_id, e)
-        
-        # Retry при сетевых ошибках
-        if isinstance(e, (requests.RequestException, requests.Timeout)):
-            retry_cd = 60 if has_callback else 10
-            retry_max = 10 if has_callback else 60
-            raise self.retry(exc=e, countdown=retry_cd, max_retries=retry_max)
-        
-        # Обновляем статус элемента при критической ошибке
+
+def _fail_generation(element_id: int, error_message: str) -> bool:
+    """FAILED + WebSocket-уведомление, если элемент ещё не финализирован. True — переведён."""
+    applied = finalize_generation_failure(element_id=element_id, error_message=error_message)
+    if applied:
         try:
-            applied = finalize_generation_failure(element_id=element_id, error_message=str(e))
-            if applied:
-                element = Element.objects.get(id=element_id)
-                notify_element_status(element, 'FAILED', error_message=str(e))
+            element = Element.objects.get(id=element_id)
         except Element.DoesNotExist:
             logger.warning(
-                "element gone during critical failure handling",
+                "element gone during failure handling",
                 extra={"element_id": element_id},
             )
+            return applied
+        notify_element_status(element, 'FAILED', error_message=error_message)
+    return applied
 
-        raise
+
+def _fail_media_processing(element_id: int, error_message: str) -> None:
+    """
+    Превью так и не отрендерены (ретраи media исчерпаны или задача потеряна):
+    FAILED + уведомление; генерация — с возвратом списания, только если
+    переход применён (элемент не успел стать COMPLETED).
+    """
+    if not _fail_generation(element_id, error_message):
+        return
+    element = Element.objects.select_related('project__user').filter(id=element_id).first()
+    if element is not None and element.source_type == Element.SOURCE_GENERATED:
+        _refund_for_failure(element, reason=error_message)
 
 
 @shared_task(bind=True, max_retries=3)
 def process_uploaded_file(self, element_id: int, staging_path: str) -> dict:
     """
-    FIFO-задача: загрузка файла из staging в S3 + генерация thumbnail.
+    FIFO-задача: загрузка файла из staging в S3.
     Вызывается из upload view вместо синхронной загрузки в S3.
+    Превью и перевод в COMPLETED — в очереди media (render_element_media),
+    staging-файл удаляет она же.
     """
+    retrying = False
+    handed_off = False
     try:
         element = Element.objects.select_related('project', 'scene').get(id=element_id)
 
-        # Step 1: Upload original to S3 (bulk of time — real progress via boto3 callback)
-        notify_element_status(element, 'PROCESSING', upload_progress=0)
-        file_url = upload_staging_to_s3(
-            staging_path,
-            project_id=element.project_id,
-            scene_id=element.scene_id,
-            on_progress=lambda pct: notify_element_status(
-                element, 'PROCESSING', upload_progress=int(pct * 0.8),  # 0-80%
-            ),
-        )
-
-        file_size = os.path.getsize(staging_path) if os.path.exists(staging_path) else None
-
-        element.file_url = file_url
-        element.file_size = file_size
-
-        # Step 2: Generate thumbnails
-        notify_element_status(element, 'PROCESSING', upload_progress=80)
-        thumbs = generate_thumbnails(staging_path, element.element_type, element.project_id, element.scene_id)
-        element.thumbnail_url = thumbs.get('thumbnail_url') or file_url
-        element.preview_url = thumbs.get('preview_url') or ''
-        notify_element_status(element, 'PROCESSING', upload_progress=95)
-
-        # Step 3: Save and complete
-        element.status = Element.STATUS_COMPLETED
-        element.save(update_fields=['file_url', 'file_size', 'thumbnail_url', 'preview_url', 'status', 'updated_at'])
-
-        notify_element_status(element, 'COMPLETED', file_url=file_url)
-
-        try:
-            create_notification(
-                user=element.project.user,
-                type='upload_completed',
-                project=element.project,
-                title='Файл загружен',
-                message=element.original_filename or 'Загрузка завершена',
-                element=element,
+        if element.file_url and element.content_hash:
+            # Ретрай после успешного сохранения: ссылка на StoredObject уже взята,
+            # второй store_staging_file дал бы лишний ref_count
+            file_url = element.file_url
+        else:
+            # Upload original to S3 (bulk of time — real progress via boto3 callback)
+            notify_element_status(element, 'PROCESSING', upload_progress=0)
+            stored = store_staging_file(
+                staging_path,
+                project_id=element.project_id,
+                scene_id=element.scene_id,
+                on_progress=lambda pct: notify_element_status(
+                    element, 'PROCESSING', upload_progress=int(pct * 0.8),  # 0-80%
+                ),
+                element_type=element.element_type,
             )
-        except Exception as e:
-            logger.warning('Failed to create upload notification: %s', e)
 
-        # Onboarding: mark first upload
-        try:
-            from apps.onboarding.services import OnboardingService
-            OnboardingService().try_complete(element.project.user, 'element.upload_success')
-        except Exception:
-            logger.exception(
-                "onboarding trigger failed for element.upload_success",
-                extra={"element_id": element_id},
-            )
+            file_url = stored['file_url']
+            element.file_url = file_url
+            element.file_size = stored['file_size']
+            element.content_hash = stored['content_hash']
+            element.save(update_fields=['file_url', 'file_size', 'content_hash', 'updated_at'])
+        notify_element_status(element, 'PROCESSING', upload_progress=80)
 
-        return {'element_id': element_id, 'status': 'completed', 'file_url': file_url}
+        render_element_media.delay(element_id, staging_path)
+        handed_off = True
+        return {'element_id': element_id, 'status': 'uploaded', 'file_url': file_url}
 
     except Retry:
         raise
     except Exception as e:
         logger.exception("Ошибка обработки загруженного файла Element #%s: %s", element_id, e)
+
+        # Retry only transient I/O errors; skip permanent S3 errors
+        # (UserSuspended, AccessDenied, etc.)
+        err_str = str(e)
+        permanent_s3 = any(code in err_str for code in (
+            'UserSuspended', 'AccessDenied', 'InvalidAccessKeyId',
+            'SignatureDoesNotMatch', 'AccountProblem',
+        ))
+        transient = isinstance(e, (IOError, OSError, BotoConnectionError, HTTPClientError))
+        if transient and not permanent_s3 and self.request.retries < self.max_retries:
+            # Staging-файл и незавершённый multipart остаются: ретрай дозагрузит недостающие part.
+            retrying = True
+            raise self.retry(exc=e, countdown=30)
+
         try:
             element = Element.objects.get(id=element_id)
             element.status = Element.STATUS_FAILED
             element.error_message = str(e)
             element.save(update_fields=['status', 'error_message', 'updated_at'])
             notify_element_status(element, 'FAILED', error_message=str(e))
+            abort_staging_upload(staging_path, element.project_id, element.scene_id)
         except Element.DoesNotExist:
             logger.warning(
                 "element gone during upload failure handling",
                 extra={"element_id": element_id},
             )
+        raise
+    finally:
+        if not retrying and not handed_off:
+            _remove_staging_file(element_id, staging_path)
 
-        # Retry only transient I/O errors; skip permanent S3 errors
-        # (UserSuspended, AccessDenied, etc.)
-        err_str = str(e)
-        permanent_s3 = any(code in err_str for code in (
-            'UserSuspended', 'AccessDenied', 'InvalidAccessKeyId',
-            'SignatureDoesNotMatch', 'AccountProblem',
-        ))
-        if isinstance(e, (IOError, OSError)) and not permanent_s3:
-            raise self.retry(exc=e, countdown=30)
+
+@shared_task(bind=True, max_retries=2)
+def render_element_media(self, element_id: int, source: str) -> dict:
+    """
+    Очередь media (CPU): превью через Pillow/ffmpeg и перевод элемента в COMPLETED.
+
+    source — staging-путь загрузки или URL файла в S3. Если staging-файла нет
+    на этом воркере (media в отдельном контейнере), превью строятся по file_url.
+    COMPLETED-уведомление уходит отсюда — после превью, одно на элемент.
+    """
+    staging_path = None if source.startswith(('http://', 'https://')) else source
+    keep_staging = False
+    try:
+        try:
+            element = Element.objects.select_related('project', 'scene').get(id=element_id)
+        except Element.DoesNotExist:
+            return {'element_id': element_id, 'status': 'missing', 'skipped': True}
+        if element.status != Element.STATUS_PROCESSING or not element.file_url:
+            return {'element_id': element_id, 'status': element.status, 'skipped': True}
+
+        notify_element_status(element, 'PROCESSING', upload_progress=85)
+        if staging_path and not os.path.exists(staging_path):
+            source = element.file_url
+        thumbs = render_thumbnails(source, element.element_type, element.project_id, element.scene_id)
+
+        if element.source_type == Element.SOURCE_UPLOADED:
+            applied = _complete_upload(element, thumbs)
+        else:
+            applied = complete_generation(element_id, thumbs)
+        if applied:
+            element.refresh_from_db()
+            notify_element_status(element, 'COMPLETED', file_url=element.file_url, preview_url=element.preview_url)
+            if element.element_type == Element.ELEMENT_TYPE_VIDEO:
+                # После COMPLETED: превью уже видно, луп догружается (staging ещё на диске).
+                _attach_preview_loop(element, source)
+        return {'element_id': element_id, 'status': 'completed', 'applied': applied}
+    except Exception as e:
+        # Превью уже «никогда не падают» — сюда попадают ошибки БД/брокера.
+        logger.exception("Ошибка media-обработки Element #%s: %s", element_id, e)
+        if self.request.retries < self.max_retries:
+            keep_staging = True  # staging нужен ретраю
+            raise self.retry(exc=e, countdown=15)
+        # Ретраев больше не будет — иначе элемент навсегда останется PROCESSING
+        try:
+            _fail_media_processing(element_id, f"Не удалось обработать файл: {e}")
+        except Exception:
+            logger.exception("media failure handling failed", extra={"element_id": element_id})
         raise
     finally:
+        if staging_path and not keep_staging:
+            _remove_staging_file(element_id, staging_path)
+
+
+@shared_task
+def render_preview_loop(element_id: int) -> dict:
+    """
+    Очередь media: hover-луп для видео, загруженного в S3 напрямую (presigned),
+    — такие элементы не проходят через render_element_media. Источник — file_url.
+    """
+    element = Element.objects.filter(id=element_id, element_type=Element.ELEMENT_TYPE_VIDEO).first()
+    if element is None or element.loop_url or not element.file_url:
+        return {'element_id': element_id, 'skipped': True}
+    return {'element_id': element_id, 'loop_url': _attach_preview_loop(element, element.file_url)}
+
+
+@shared_task(bind=True, max_retries=3)
+def index_presigned_upload(self, element_id: int) -> dict:
+    """
+    Дедупликация presigned-загрузки: браузер уже положил оригинал в S3 под
+    новым ключом. SHA-256 считается потоковым GET; если такой файл уже
+    хранится, элемент переводится на него, а новая копия удаляется.
+    """
+    from apps.sharing.services import shared_element_updated  # lazy import
+
+    element = Element.objects.filter(
+        id=element_id, status=Element.STATUS_COMPLETED, content_hash='',
+    ).first()
+    key = (element.upload_keys or {}).get('original') if element else None
+    if not key or not element.file_url:
+        return {'element_id': element_id, 'skipped': True}
+
+    try:
+        content_hash = hash_s3_object(key)
+    except Exception as e:
+        raise self.retry(exc=e, countdown=30)
+
+    file_url = register_object(content_hash, element.file_url, element.file_size or 0)
+    with transaction.atomic():
+        updated = Element.objects.filter(id=element_id, file_url=element.file_url).update(
+            file_url=file_url, content_hash=content_hash,
+        )
+        if updated:
+            file_changed(element_id, old_size=element.file_size)
+            shared_element_updated(element.project_id, element_id)
+    if not updated:
+        # Элемент удалили, пока считался хеш, — взятую ссылку отдаём обратно.
+        delete_file_from_s3(file_url)
+        return {'element_id': element_id, 'skipped': True}
+    if file_url != element.file_url:
+        delete_object(key)
+    return {'element_id': element_id, 'deduplicated': file_url != element.file_url}
+
+
+@shared_task(soft_time_limit=1800)
+def reconcile_storage_usage() -> dict:
+    """
+    Периодическая сверка счётчиков места с Element (elements/usage.py).
+    Страховка для путей, которые счётчики не видят: raw SQL, массовые
+    действия в админке, частично загруженные экземпляры.
+    """
+    from apps.elements import usage
+
+    repaired = usage.reconcile_storage_usage()
+    logger.info("storage usage reconciled", extra={"repaired_rows": repaired})
+    return {'repaired_rows': repaired}
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def purge_scene_task(self, scene_id: int) -> dict:
+    """Удаление помеченной группы с поддеревом и элементами (elements/deletion.py)."""
+    from apps.elements import deletion
+
+    try:
+        deleted = deletion.purge_scene(scene_id)
+    except Exception as e:
+        raise self.retry(exc=e)
+    return {'scene_id': scene_id, 'elements': deleted}
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def purge_project_task(self, project_id: int) -> dict:
+    """Удаление помеченного проекта со всеми группами и элементами."""
+    from apps.elements import deletion
+
+    try:
+        deleted = deletion.purge_project(project_id)
+    except Exception as e:
+        raise self.retry(exc=e)
+    return {'project_id': project_id, 'elements': deleted}
+
+
+@shared_task(ignore_result=True)
+def purge_stale_tombstones() -> dict:
+    """Страховка: дочищает то, что осталось помеченным (потерянная задача)."""
+    from apps.elements import deletion
+
+    purged = deletion.purge_stale_tombstones(timezone.now() - timedelta(minutes=30))
+    return {'purged': purged}
+
+
+@shared_task(ignore_result=True)
+def fail_stale_media_processing() -> dict:
+    """
+    Страховка для очереди media: файл уже в S3, элемент PROCESSING и не
+    менялся дольше MEDIA_PROCESSING_TIMEOUT — задача превью потеряна.
+    Опрос провайдера такие элементы уже не видит (next_poll_at = None).
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.MEDIA_PROCESSING_TIMEOUT)
+    stale = list(
+        Element.objects.filter(
+            status=Element.STATUS_PROCESSING, updated_at__lt=cutoff,
+        ).exclude(file_url='').values_list('id', flat=True)[:500]
+    )
+    for element_id in stale:
+        _fail_media_processing(element_id, "Превышено время обработки файла")
+    if stale:
+        logger.warning("stale media processing failed", extra={"elements": len(stale)})
+    return {'failed': len(stale)}
+
+
+@shared_task(bind=True, max_retries=5)
+def delete_s3_objects(self, keys: list[str], project_id: int | None = None,
+                      target_type: str | None = None, target_id: int | None = None,
+                      total: int | None = None) -> dict:
+    """
+    Пакетное удаление объектов S3 (DeleteObjects по 1000 ключей).
+    На повтор уходят только неудалённые ключи; total сохраняется, чтобы
+    прогресс в WebSocket не откатывался назад.
+    """
+    total = len(keys) if total is None else total
+    done_before = total - len(keys)
+
+    def report(deleted: int) -> None:
+        if target_type is not None:
+            notify_deletion_progress(project_id, target_type, target_id, done_before + deleted, total)
+
+    failed = delete_objects(keys, on_batch=report)
+    if not keys:
+        report(0)
+    if failed:
+        logger.warning("s3 batch delete incomplete", extra={"failed": len(failed), "total": total})
         try:
-            if staging_path and os.path.exists(staging_path):
-                os.unlink(staging_path)
-        except OSError:
-            # Staging cleanup is best-effort — periodic cleanup job handles stragglers.
-            logger.warning(
-                "staging unlink failed",
-                extra={"staging_path": staging_path, "element_id": element_id},
-                exc_info=True,
+            raise self.retry(
+                args=(failed,),
+                kwargs={'project_id': project_id, 'target_type': target_type,
+                        'target_id': target_id, 'total': total},
+                countdown=30 * 2 ** self.request.retries,
             )
+        except MaxRetriesExceededError:
+            logger.error("s3 batch delete gave up", extra={"keys": failed[:20], "failed": len(failed)})
+    return {'deleted': total - len(failed), 'failed': len(failed)}
+
+
+def _attach_preview_loop(element: Element, source: str) -> str:
+    """Рендер hover-лупа и запись loop_url (если ещё пусто)."""
+    from apps.sharing.services import shared_element_updated  # lazy import
+
+    loop_url = generate_preview_loop(source, element.project_id, element.scene_id)
+    if loop_url and Element.objects.filter(id=element.id, loop_url='').update(loop_url=loop_url):
+        shared_element_updated(element.project_id, element.id)
+    return loop_url
+
+
+def _complete_upload(element: Element, thumbs: dict) -> bool:
+    """PROCESSING → COMPLETED для загрузки + уведомление и онбординг."""
+    from apps.sharing.services import shared_element_updated  # lazy import
+
+    updated = Element.objects.filter(
+        id=element.id,
+        status=Element.STATUS_PROCESSING,
+    ).update(
+        status=Element.STATUS_COMPLETED,
+        thumbnail_url=thumbs.get('thumbnail_url') or element.file_url,
+        preview_url=thumbs.get('preview_url') or '',
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        return False
+    shared_element_updated(element.project_id, element.id)
 
+    try:
+        create_notification(
+            user=element.project.user,
+            type='upload_completed',
+            project=element.project,
+            title='Файл загружен',
+            message=element.original_filename or 'Загрузка завершена',
+            element=element,
+        )
+    except Exception as e:
+        logger.warning('Failed to create upload notification: %s', e)
+
+    # Onboarding: mark first upload
+    try:
+        from apps.onboarding.services import OnboardingService
+        OnboardingService().try_complete(element.project.user, 'element.upload_success')
+    except Exception:
+        logger.exception(
+            "onboarding trigger failed for element.upload_success",
+            extra={"element_id": element.id},
+        )
+    return True
+
+
+def _remove_staging_file(element_id: int, staging_path: str) -> None:
+    try:
+        if staging_path and os.path.exists(staging_path):
+            os.unlink(staging_path)
+    except OSError:
+        # Staging cleanup is best-effort — periodic cleanup job handles stragglers.
+        logger.warning(
+            "staging unlink failed",
+            extra={"staging_path": staging_path, "element_id": element_id},
+            exc_info=True,
+        )
 
 
 def _refund_for_failure(element: Element, reason: str = "provider_error") -> None:
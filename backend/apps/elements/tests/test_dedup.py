@@ -0,0 +1,140 @@
+import os
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.elements.deletion import release_files
+from apps.elements.models import Element
+from apps.elements.tasks import index_presigned_upload, process_uploaded_file
+from apps.projects.models import Project
+from apps.storage.dedup import hash_bytes, register_object
+from apps.storage.models import StoredObject
+from apps.storage.services import delete_file_from_s3, generate_thumbnails, store_staging_file
+from apps.storage.thumbnails import _store_contents
+from apps.subscriptions.services import SubscriptionService
+
+User = get_user_model()
+
+
+@override_settings(AWS_S3_CUSTOM_DOMAIN='cdn.example.com', AWS_STORAGE_BUCKET_NAME='bucket')
+class ContentDedupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='dedup', password='test')
+        self.project = Project.objects.create(name='P1', user=self.user)
+
+    def _staging_file(self, content: bytes) -> str:
+        tmp = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
+        tmp.write(content)
+        tmp.close()
+        self.addCleanup(os.unlink, tmp.name)
+        return tmp.name
+
+    @patch('apps.storage.s3.default_storage')
+    @patch('apps.storage.transfer.upload_file')
+    def test_reupload_shares_object_until_last_reference(self, mock_upload, mock_storage):
+        first = store_staging_file(self._staging_file(b'same bytes'), self.project.id, None)
+        second = store_staging_file(self._staging_file(b'same bytes'), self.project.id, 7)
+
+        mock_upload.assert_called_once()
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(second['file_url'], first['file_url'])
+        self.assertEqual(second['content_hash'], hash_bytes(b'same bytes'))
+        self.assertEqual(StoredObject.objects.get().ref_count, 2)
+
+        mock_storage.location = ''
+        mock_storage.exists.return_value = True
+        self.assertTrue(delete_file_from_s3(first['file_url']))
+        mock_storage.delete.assert_not_called()
+
+        delete_file_from_s3(second['file_url'])
+        mock_storage.delete.assert_called_once()
+        self.assertFalse(StoredObject.objects.exists())
+
+    @patch('apps.elements.tasks.notify_element_status')
+    @patch('apps.elements.tasks.render_element_media.delay', side_effect=[OSError('broker down'), None])
+    @patch('apps.storage.transfer.upload_file')
+    def test_upload_retry_after_store_takes_one_reference(self, mock_upload, mock_render, _notify):
+        element = Element.objects.create(
+            project=self.project, element_type='IMAGE', status=Element.STATUS_PROCESSING,
+            source_type=Element.SOURCE_UPLOADED,
+        )
+        staging_path = self._staging_file(b'retry bytes')
+
+        result = process_uploaded_file.apply(args=(element.id, staging_path))
+
+        self.assertTrue(result.successful())
+        self.assertEqual(mock_render.call_count, 2)
+        mock_upload.assert_called_once()
+        self.assertEqual(StoredObject.objects.get().ref_count, 1)
+
+    @patch('apps.storage.s3.default_storage')
+    def test_unindexed_file_is_deleted_right_away(self, mock_storage):
+        mock_storage.location = ''
+        mock_storage.exists.return_value = True
+        delete_file_from_s3('https://cdn.example.com/projects/1/scenes/None/legacy.jpg')
+        mock_storage.delete.assert_called_once_with('projects/1/scenes/None/legacy.jpg')
+
+    @patch('apps.storage.thumbnails.default_storage')
+    def test_identical_thumbnails_are_stored_once(self, mock_storage):
+        mock_storage.save.side_effect = lambda key, content: key
+        mock_storage.url.side_effect = lambda key: f'https://cdn.example.com/{key}'
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), color='red').save(buffer, 'PNG')
+
+        first = generate_thumbnails(BytesIO(buffer.getvalue()), 'IMAGE', self.project.id, 1)
+        second = generate_thumbnails(BytesIO(buffer.getvalue()), 'IMAGE', self.project.id, 2)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_storage.save.call_count, 2)  # small + medium, once
+        self.assertEqual(
+            sorted(StoredObject.objects.values_list('ref_count', flat=True)), [2, 2],
+        )
+
+    @patch('apps.storage.thumbnails.default_storage')
+    def test_byte_identical_variants_take_one_reference(self, mock_storage):
+        mock_storage.save.side_effect = lambda key, content: key
+        mock_storage.url.side_effect = lambda key: f'https://cdn.example.com/{key}'
+
+        urls = _store_contents({'small': (b'same', 'p/1_small.jpg'), 'medium': (b'same', 'p/1_medium.jpg')})
+
+        self.assertEqual(urls['small'], urls['medium'])
+        mock_storage.save.assert_called_once()
+        self.assertEqual(StoredObject.objects.get().ref_count, 1)
+        # release_files — одна ссылка на URL элемента: объект уходит вместе с элементом
+        element = Element.objects.create(
+            project=self.project, element_type='IMAGE', thumbnail_url=urls['small'], preview_url=urls['medium'],
+        )
+        self.assertEqual(release_files(Element.objects.filter(pk=element.pk)), ['p/1_small.jpg'])
+        self.assertFalse(StoredObject.objects.exists())
+
+    @patch('apps.elements.tasks.delete_object')
+    @patch('apps.elements.tasks.hash_s3_object', return_value='b' * 64)
+    def test_presigned_upload_is_pointed_to_existing_object(self, _hash, mock_delete):
+        register_object('b' * 64, 'https://cdn.example.com/projects/1/old.png', 10)
+        element = Element.objects.create(
+            project=self.project,
+            element_type='IMAGE',
+            status=Element.STATUS_COMPLETED,
+            file_url='https://cdn.example.com/projects/1/root/new.png',
+            file_size=10,
+            upload_keys={'original': 'projects/1/root/new.png'},
+        )
+
+        index_presigned_upload(element.id)
+
+        element.refresh_from_db()
+        self.assertEqual(element.file_url, 'https://cdn.example.com/projects/1/old.png')
+        self.assertEqual(element.content_hash, 'b' * 64)
+        mock_delete.assert_called_once_with('projects/1/root/new.png')
+        self.assertEqual(StoredObject.objects.get().ref_count, 2)
+
+    def test_storage_usage_counts_shared_files_once(self):
+        for content_hash, size in (('c' * 64, 100), ('c' * 64, 100), ('', 7)):
+            Element.objects.create(
+                project=self.project, element_type='IMAGE', content_hash=content_hash, file_size=size,
+            )
+        self.assertEqual(SubscriptionService.storage_used(self.user), 107)
@@ -0,0 +1,137 @@
+"""Background deletion: tombstones, purge, batched S3 DeleteObjects with retries."""
+from unittest.mock import MagicMock, call, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.elements.deletion import purge_project, purge_scene, release_files
+from apps.elements.models import Element
+from apps.elements.tasks import delete_s3_objects
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+from apps.storage.dedup import register_object
+from apps.storage.services import delete_objects
+
+User = get_user_model()
+CDN = 'https://cdn.example.com/'
+
+
+@override_settings(AWS_S3_CUSTOM_DOMAIN='cdn.example.com', AWS_STORAGE_BUCKET_NAME='bucket')
+class PurgeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='purge', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.scene = Scene.objects.create(project=self.project, name='S')
+        self.child = Scene.objects.create(project=self.project, name='C', parent=self.scene)
+
+    def element(self, scene, name, **kwargs):
+        return Element.objects.create(
+            project=self.project, scene=scene, element_type='IMAGE',
+            file_url=f'{CDN}{name}.jpg', thumbnail_url=f'{CDN}{name}_sm.jpg', **kwargs,
+        )
+
+    def test_collects_every_variant_and_keeps_shared_objects(self):
+        shared = register_object('a' * 64, f'{CDN}shared.jpg', 10)
+        register_object('a' * 64, f'{CDN}shared_copy.jpg', 10)
+        self.element(self.child, 'own', preview_url=f'{CDN}own_md.jpg', loop_url=f'{CDN}own_loop.mp4',
+                     upload_keys={'original': 'uploads/own.jpg'})
+        Element.objects.create(project=self.project, scene=self.child, element_type='IMAGE',
+                               file_url=shared, thumbnail_url=shared,
+                               upload_keys={'original': 'uploads/shared.jpg'})
+        # Второй держатель общего объекта живёт в другой группе
+        keeper = Element.objects.create(project=self.project, element_type='IMAGE', file_url=shared)
+
+        keys = release_files(Element.objects.filter(scene=self.child))
+
+        self.assertEqual(keys, sorted([
+            'own.jpg', 'own_sm.jpg', 'own_md.jpg', 'own_loop.mp4', 'uploads/own.jpg', 'uploads/shared.jpg',
+        ]))
+        self.assertEqual(release_files(Element.objects.filter(pk=keeper.pk)), ['shared.jpg'])
+
+    @patch('apps.elements.tasks.delete_s3_objects.delay')
+    def test_purge_scene_removes_subtree_and_queues_keys(self, delete_delay):
+        self.element(self.child, 'deep')
+        self.element(None, 'root')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_scene(self.scene.id), 1)
+
+        self.assertFalse(Scene.objects.exists())
+        self.assertEqual(Element.objects.count(), 1)
+        delete_delay.assert_called_once_with(
+            ['deep.jpg', 'deep_sm.jpg'], project_id=self.project.id, target_type='scene', target_id=self.scene.id,
+        )
+
+    @patch('apps.elements.tasks.delete_s3_objects.delay')
+    def test_purge_project(self, delete_delay):
+        self.element(self.child, 'deep')
+        self.element(None, 'root')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_project(self.project.id), 2)
+
+        self.assertFalse(Project.objects.exists())
+        self.assertEqual(len(delete_delay.call_args.args[0]), 4)
+
+
+@override_settings(AWS_STORAGE_BUCKET_NAME='bucket')
+class TombstonedTargetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tomb', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.element = Element.objects.create(project=self.project, element_type='IMAGE')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def move(self, scene):
+        return self.client.post('/api/elements/move/', {
+            'element_ids': [self.element.id], 'target_scene': scene.id,
+        }, format='json')
+
+    def test_move_into_tombstoned_scene_or_project_is_rejected(self):
+        gone = Scene.objects.create(project=self.project, name='Gone', deleted_at=timezone.now())
+        self.assertEqual(self.move(gone).status_code, 404)
+
+        other = Project.objects.create(user=self.user, name='Deleted', deleted_at=timezone.now())
+        self.assertEqual(self.move(Scene.objects.create(project=other, name='S')).status_code, 404)
+        self.element.refresh_from_db()
+        self.assertIsNone(self.element.scene_id)
+
+
+class DeleteObjectsTests(TestCase):
+    @patch('apps.storage.presigned._get_s3_client')
+    def test_batches_of_thousand(self, get_client):
+        client = get_client.return_value
+        client.delete_objects.side_effect = [
+            {},
+            {'Errors': [{'Key': 'k1500', 'Code': 'InternalError'}, {'Key': 'k1501', 'Code': 'NoSuchKey'}]},
+            Exception('network'),
+        ]
+        keys = [f'k{i}' for i in range(2500)]
+        progress = MagicMock()
+
+        failed = delete_objects(keys, on_batch=progress)
+
+        self.assertEqual(client.delete_objects.call_count, 3)
+        self.assertEqual(len(client.delete_objects.call_args_list[0].kwargs['Delete']['Objects']), 1000)
+        self.assertEqual(failed, ['k1500'] + keys[2000:])
+        self.assertEqual(progress.call_args_list, [call(1000), call(1999)])
+
+    @patch('apps.elements.tasks.notify_deletion_progress')
+    @patch('apps.elements.tasks.delete_objects')
+    def test_task_retries_only_failed_keys(self, mock_delete, notify):
+        def fake_delete(keys, on_batch):
+            failed = keys[-1:] if mock_delete.call_count == 1 else []
+            on_batch(len(keys) - len(failed))
+            return failed
+
+        mock_delete.side_effect = fake_delete
+        result = delete_s3_objects.apply(
+            args=(['a', 'b', 'c'],), kwargs={'project_id': 1, 'target_type': 'scene', 'target_id': 5},
+        ).get()
+
+        self.assertEqual(mock_delete.call_args_list[1].args[0], ['c'])
+        self.assertEqual(result, {'deleted': 3, 'failed': 0})
+        self.assertEqual(notify.call_args_list, [call(1, 'scene', 5, 2, 3), call(1, 'scene', 5, 3, 3)])
@@ -101,6 +101,20 @@ class DownloadMetaTests(TestCase):
         self.assertIn(self.el2.id, ids)
         self.assertNotIn(self.el_root.id, ids)
 
+    def test_tombstoned_scenes_and_projects_are_skipped(self):
+        Scene.objects.filter(pk=self.child.pk).update(deleted_at=timezone.now())
+        resp = self.client.get(f'/api/elements/download-meta/?project_id={self.project.id}')
+        self.assertNotIn(self.el2.id, [e['id'] for e in resp.data['elements']])
+        self.assertNotIn(self.child.id, [g['id'] for g in resp.data['groups']])
+        resp = self.client.get(f'/api/elements/download-meta/?scene_id={self.group.id}')
+        self.assertEqual([e['id'] for e in resp.data['elements']], [self.el1.id])
+        self.assertEqual([g['id'] for g in resp.data['groups']], [self.group.id])
+
+        Project.objects.filter(pk=self.project.pk).update(deleted_at=timezone.now())
+        for query in (f'project_id={self.project.id}', f'scene_id={self.group.id}'):
+            resp = self.client.get(f'/api/elements/download-meta/?{query}')
+            self.assertEqual((resp.data['elements'], resp.data['groups']), ([], []))
+
     def test_element_fields_present(self):
         resp = self.client.get(f'/api/elements/download-meta/?project_id={self.project.id}')
         el = next(e for e in resp.data['elements'] if e['id'] == self.el1.id)
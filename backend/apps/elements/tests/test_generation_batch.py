@@ -0,0 +1,196 @@
+"""Batch generation: one debit with per-element rows, one bulk_create with contiguous keys, one Celery group."""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.ai_providers.models import AIModel, AIProvider
+from apps.ai_services.models import AIService, LLMProvider
+from apps.common.ordering import ORDER_STEP
+from apps.credits.models import CreditsTransaction
+from apps.elements.models import Element, SceneStorageUsage, UserStorageUsage
+from apps.elements.orchestration import create_generation_batch
+from apps.elements.tasks import _refund_for_failure
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+
+User = get_user_model()
+
+
+@patch('apps.subscriptions.services.SubscriptionService.check_storage', return_value=True)
+@patch('celery.group')
+class GenerationBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='batch', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.scene = Scene.objects.create(project=self.project, name='S')
+        # После онбординговых бонусов за проект и группу
+        User.objects.filter(pk=self.user.pk).update(balance=Decimal('100.00'))
+        provider = AIProvider.objects.create(name='Prov', base_url='https://api.test-provider.com', api_key='k')
+        self.ai_model = AIModel.objects.create(
+            provider=provider,
+            name='Model',
+            model_type=AIModel.MODEL_TYPE_IMAGE,
+            api_endpoint='/v1/generate',
+            request_schema={'prompt': '{{prompt}}'},
+            pricing_schema={'fixed_cost': '5.00'},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def generate(self, url, prompts):
+        return self.client.post(url, {
+            'ai_model_id': self.ai_model.id,
+            'items': [{'prompt': prompt} for prompt in prompts],
+        }, format='json')
+
+    def test_one_debit_contiguous_keys_one_group(self, group, _storage):
+        Element.objects.create(project=self.project, scene=self.scene, element_type='IMAGE', order_index=0)
+
+        response = self.generate(f'/api/scenes/{self.scene.id}/generate-batch/', ['a', 'b', 'c'])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Decimal(response.data['total_cost']), Decimal('15.00'))
+
+        created = list(Element.objects.filter(prompt_text__in=['a', 'b', 'c']).order_by('order_index'))
+        # Строка списания на элемент — аналитика и last_generation_cost видят пакет
+        debits = CreditsTransaction.objects.filter(
+            user=self.user, reason=CreditsTransaction.REASON_GENERATION_DEBIT,
+        ).order_by('balance_after')
+        self.assertEqual(
+            [(d.element_id, d.amount, d.balance_after) for d in debits],
+            [
+                (created[2].id, Decimal('-5.00'), Decimal('85.00')),
+                (created[1].id, Decimal('-5.00'), Decimal('90.00')),
+                (created[0].id, Decimal('-5.00'), Decimal('95.00')),
+            ],
+        )
+        stats = self.client.get(f'/api/projects/{self.project.id}/stats/').data
+        self.assertEqual(Decimal(stats['last_generation_cost']), Decimal('5.00'))
+        self.assertEqual(stats['last_generation_model'], 'Model')
+
+        self.assertEqual([e.prompt_text for e in created], ['a', 'b', 'c'])
+        keys = [e.order_index for e in created]
+        self.assertEqual(keys, [keys[0] + i * ORDER_STEP for i in range(3)])
+        self.assertGreater(keys[0], 0)
+        self.assertTrue(all(e.generation_cost == Decimal('5.00') for e in created))
+
+        self.assertEqual(len(list(group.call_args.args[0])), 3)
+        group.return_value.apply_async.assert_called_once_with()
+
+        usage = SceneStorageUsage.objects.get(scene=self.scene)
+        self.assertEqual((usage.elements_count, usage.spent), (4, Decimal('15.00')))
+        self.assertEqual(UserStorageUsage.objects.get(user=self.user).spent, Decimal('15.00'))
+
+    def test_insufficient_funds_creates_nothing(self, group, _storage):
+        response = self.generate(f'/api/projects/{self.project.id}/generate-batch/', ['x'] * 21)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Element.objects.exists())
+        group.assert_not_called()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('100.00'))
+
+    def test_provider_failure_refunds_only_that_element(self, group, _storage):
+        response = self.generate(f'/api/projects/{self.project.id}/generate-batch/', ['a', 'b'])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        failed = Element.objects.get(id=response.data['elements'][0]['id'])
+
+        _refund_for_failure(failed)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('95.00'))
+        failed.refresh_from_db()
+        self.assertEqual(failed.generation_cost, Decimal('0'))
+        self.assertEqual(Element.objects.get(id=response.data['elements'][1]['id']).generation_cost, Decimal('5.00'))
+
+    def test_batch_size_is_capped(self, group, _storage):
+        response = self.generate(f'/api/scenes/{self.scene.id}/generate-batch/', ['x'] * 51)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_item_is_rejected_before_debit(self, group, _storage):
+        data, code = create_generation_batch(
+            self.project, self.scene, [{'prompt': 'ok'}, {'prompt': 'nul\x00byte'}],
+            self.ai_model.id, {}, self.user,
+        )
+
+        self.assertEqual(code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('prompt_text', data['details'])
+        self.assertFalse(Element.objects.exists())
+        self.assertFalse(CreditsTransaction.objects.filter(reason=CreditsTransaction.REASON_GENERATION_DEBIT).exists())
+        group.assert_not_called()
+
+
+@patch('apps.subscriptions.services.SubscriptionService.has_feature', return_value=True)
+@patch('apps.subscriptions.services.SubscriptionService.check_storage', return_value=True)
+@patch('apps.ai_services.services.prompt_enhance._call_llm', return_value='{"enhanced_prompt": "better"}')
+@patch('celery.group')
+class GenerationBatchEnhanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='batch-enhance', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        User.objects.filter(pk=self.user.pk).update(balance=Decimal('20.00'))
+        provider = AIProvider.objects.create(name='Prov', base_url='https://api.test-provider.com', api_key='k')
+        self.ai_model = AIModel.objects.create(
+            provider=provider,
+            name='Model',
+            model_type=AIModel.MODEL_TYPE_IMAGE,
+            api_endpoint='/v1/generate',
+            request_schema={'prompt': '{{prompt}}'},
+            pricing_schema={'fixed_cost': '5.00'},
+        )
+        AIService.objects.filter(is_active=True).update(is_active=False)
+        AIService.objects.create(
+            service_type=AIService.PROMPT_ENHANCE,
+            name='Enhancer',
+            provider=LLMProvider.objects.create(
+                name='LLM', provider_type=LLMProvider.OPENAI_COMPATIBLE,
+                api_base_url='https://api.example.com', api_key='sk',
+            ),
+            model_name='gpt-4o-mini',
+            system_prompt='Enhance.',
+            cost_per_call=Decimal('1.00'),
+            is_active=True,
+        )
+
+    def batch(self, prompts):
+        return create_generation_batch(
+            self.project, None, [{'prompt': prompt} for prompt in prompts],
+            self.ai_model.id, {'enhance_prompt': True}, self.user,
+        )
+
+    def assert_nothing_charged(self, llm):
+        llm.assert_not_called()
+        self.assertFalse(CreditsTransaction.objects.filter(user=self.user, amount__lt=0).exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('20.00'))
+        self.assertFalse(Element.objects.exists())
+
+    def test_invalid_later_item_charges_nothing(self, group, llm, *_):
+        data, code = self.batch(['ok', 'ok', 'nul\x00byte'])
+
+        self.assertEqual(code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(data['error'], 'Invalid item 2')
+        self.assert_nothing_charged(llm)
+        group.assert_not_called()
+
+    def test_balance_must_cover_enhancement_and_generation(self, group, llm, *_):
+        # 4 × 5.00 генерация = 20.00 хватает, но не вместе с 4 × 1.00 за улучшение
+        data, code = self.batch(['a', 'b', 'c', 'd'])
+
+        self.assertEqual(code, status.HTTP_400_BAD_REQUEST)
+        self.assert_nothing_charged(llm)
+
+    def test_enhancement_reaches_created_elements(self, group, llm, *_):
+        data, code = self.batch(['a', 'b'])
+
+        self.assertEqual(code, status.HTTP_201_CREATED, data)
+        self.assertEqual(llm.call_count, 2)
+        for element in Element.objects.all():
+            self.assertEqual(element.generation_config['_enhanced_prompt'], 'better')
+            self.assertNotIn('enhance_prompt', element.generation_config)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('8.00'))
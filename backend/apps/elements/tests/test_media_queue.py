@@ -0,0 +1,155 @@
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.credits.models import CreditsTransaction
+from apps.elements.models import Element
+from apps.elements.tasks import (
+    fail_stale_media_processing, process_uploaded_file, render_element_media, render_preview_loop,
+)
+from apps.projects.models import Project
+
+User = get_user_model()
+
+THUMBS = {'thumbnail_url': 'https://cdn/sm.jpg', 'preview_url': 'https://cdn/md.jpg'}
+
+
+class MediaQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='media', password='test')
+        self.project = Project.objects.create(name='P1', user=self.user)
+        tmp = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
+        tmp.write(b'jpeg')
+        tmp.close()
+        self.staging_path = tmp.name
+        self.addCleanup(lambda: os.path.exists(self.staging_path) and os.unlink(self.staging_path))
+
+    def _element(self, **kwargs):
+        kwargs.setdefault('element_type', 'IMAGE')
+        return Element.objects.create(project=self.project, status=Element.STATUS_PROCESSING, **kwargs)
+
+    def test_render_task_is_routed_to_media_queue(self):
+        self.assertEqual(
+            settings.CELERY_TASK_ROUTES[render_element_media.name], {'queue': 'media'},
+        )
+
+    @patch('apps.elements.tasks.render_element_media.delay')
+    @patch('apps.elements.tasks.store_staging_file', return_value={
+        'file_url': 'https://cdn/file.jpg', 'file_size': 4, 'content_hash': 'a' * 64, 'deduplicated': False,
+    })
+    def test_upload_hands_thumbnails_to_media_queue(self, _upload, mock_render):
+        element = self._element(source_type=Element.SOURCE_UPLOADED)
+
+        process_uploaded_file(element.id, self.staging_path)
+
+        mock_render.assert_called_once_with(element.id, self.staging_path)
+        element.refresh_from_db()
+        # Not COMPLETED until thumbnails are rendered; staging kept for the media task.
+        self.assertEqual(element.status, Element.STATUS_PROCESSING)
+        self.assertEqual(element.file_url, 'https://cdn/file.jpg')
+        self.assertTrue(os.path.exists(self.staging_path))
+
+    @patch('apps.elements.tasks.notify_element_status')
+    @patch('apps.elements.tasks.render_thumbnails', return_value=THUMBS)
+    def test_media_task_completes_upload_once(self, mock_render, mock_notify):
+        element = self._element(source_type=Element.SOURCE_UPLOADED, file_url='https://cdn/file.jpg')
+
+        render_element_media(element.id, self.staging_path)
+
+        mock_render.assert_called_once_with(self.staging_path, 'IMAGE', self.project.id, None)
+        element.refresh_from_db()
+        self.assertEqual(element.status, Element.STATUS_COMPLETED)
+        self.assertEqual(element.thumbnail_url, THUMBS['thumbnail_url'])
+        self.assertEqual(element.preview_url, THUMBS['preview_url'])
+        self.assertFalse(os.path.exists(self.staging_path))
+        completed = [c for c in mock_notify.call_args_list if c.args[1] == 'COMPLETED']
+        self.assertEqual(len(completed), 1)
+
+        # Redelivered message: element is already COMPLETED, nothing is sent again.
+        mock_notify.reset_mock()
+        render_element_media(element.id, self.staging_path)
+        mock_notify.assert_not_called()
+
+    @patch('apps.elements.tasks.generate_preview_loop', return_value='https://cdn/result_loop.mp4')
+    @patch('apps.elements.tasks.notify_element_status')
+    @patch('apps.elements.tasks.render_thumbnails', return_value={'thumbnail_url': '', 'preview_url': ''})
+    def test_generation_falls_back_to_s3_file(self, mock_render, _notify, mock_loop):
+        element = self._element(file_url='https://cdn/result.mp4', element_type='VIDEO')
+
+        render_element_media(element.id, '/app/tmp_uploads/gone.mp4')
+
+        mock_render.assert_called_once_with('https://cdn/result.mp4', 'VIDEO', self.project.id, None)
+        mock_loop.assert_called_once_with('https://cdn/result.mp4', self.project.id, None)
+        element.refresh_from_db()
+        self.assertEqual(element.status, Element.STATUS_COMPLETED)
+        self.assertEqual(element.thumbnail_url, 'https://cdn/result.mp4')
+        self.assertEqual(element.loop_url, 'https://cdn/result_loop.mp4')
+
+    @patch('apps.elements.tasks.generate_preview_loop')
+    def test_presigned_video_gets_loop_from_file_url(self, mock_loop):
+        mock_loop.return_value = 'https://cdn/up_loop.mp4'
+        element = self._element(file_url='https://cdn/up.mp4', element_type='VIDEO')
+
+        render_preview_loop(element.id)
+        render_preview_loop(element.id)  # already has a loop — skipped
+
+        mock_loop.assert_called_once_with('https://cdn/up.mp4', self.project.id, None)
+        element.refresh_from_db()
+        self.assertEqual(element.loop_url, 'https://cdn/up_loop.mp4')
+
+    @patch('apps.elements.tasks.notify_element_status')
+    @patch('apps.elements.tasks.render_thumbnails', side_effect=RuntimeError('db down'))
+    def test_exhausted_retries_fail_and_refund_generation(self, _render, mock_notify):
+        element = self._element(
+            source_type=Element.SOURCE_GENERATED, file_url='https://cdn/result.jpg',
+            generation_config={'_debit_amount': '5.00'},
+        )
+
+        result = render_element_media.apply(
+            args=(element.id, self.staging_path), retries=render_element_media.max_retries,
+        )
+
+        self.assertTrue(result.failed())
+        element.refresh_from_db()
+        self.assertEqual(element.status, Element.STATUS_FAILED)
+        self.assertFalse(os.path.exists(self.staging_path))
+        refunds = CreditsTransaction.objects.filter(
+            user=self.user, reason=CreditsTransaction.REASON_REFUND_PROVIDER_ERROR,
+        )
+        self.assertEqual(refunds.count(), 1)
+        self.assertEqual(refunds.get().amount, Decimal('5.00'))
+        self.assertIn('FAILED', [c.args[1] for c in mock_notify.call_args_list])
+
+    @patch('apps.elements.tasks.notify_element_status')
+    def test_sweeper_fails_stale_processing_with_file(self, mock_notify):
+        stale = self._element(
+            source_type=Element.SOURCE_GENERATED, file_url='https://cdn/stale.jpg',
+            generation_config={'_debit_amount': '3.00'},
+        )
+        fresh = self._element(source_type=Element.SOURCE_UPLOADED, file_url='https://cdn/fresh.jpg')
+        polling = self._element(source_type=Element.SOURCE_GENERATED)
+        old = timezone.now() - timedelta(seconds=settings.MEDIA_PROCESSING_TIMEOUT + 60)
+        Element.objects.filter(id__in=[stale.id, polling.id]).update(updated_at=old)
+
+        self.assertEqual(fail_stale_media_processing(), {'failed': 1})
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        polling.refresh_from_db()
+        self.assertEqual(stale.status, Element.STATUS_FAILED)
+        # Ещё в очереди media / ещё у провайдера — не трогаем
+        self.assertEqual(fresh.status, Element.STATUS_PROCESSING)
+        self.assertEqual(polling.status, Element.STATUS_PROCESSING)
+        self.assertEqual(
+            CreditsTransaction.objects.filter(
+                user=self.user, reason=CreditsTransaction.REASON_REFUND_PROVIDER_ERROR,
+            ).count(),
+            1,
+        )
@@ -0,0 +1,144 @@
+"""Bulk reorder (one UPDATE … CASE), sparse-key reposition, order_index allocator."""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.common.ordering import ORDER_STEP, key_between
+from apps.elements.models import Element
+from apps.elements.services import allocate_order_index, reorder_elements, reposition_element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+
+User = get_user_model()
+
+
+def _updates(ctx, model=Element):
+    table = f'UPDATE "{model._meta.db_table}"'
+    return [q for q in ctx.captured_queries if q['sql'].startswith(table)]
+
+
+class OrderingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='order', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.scene = Scene.objects.create(project=self.project, name='S')
+        self.elements = Element.objects.bulk_create([
+            Element(project=self.project, scene=self.scene, element_type='IMAGE', order_index=i)
+            for i in range(50)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def order(self):
+        return list(Element.objects.filter(scene=self.scene).order_by('order_index', 'created_at', 'id')
+                    .values_list('id', flat=True))
+
+    def test_full_reorder_is_one_statement(self):
+        ids = [e.id for e in reversed(self.elements)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/elements/reorder/', {'element_ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(_updates(ctx)), 1)
+        self.assertEqual(self.order(), ids)
+        self.assertEqual(Element.objects.get(id=ids[1]).order_index, ORDER_STEP)
+
+    def test_reposition_touches_one_row_while_gap_lasts(self):
+        reorder_elements([e.id for e in self.elements])
+        first, second, last = self.elements[0], self.elements[1], self.elements[-1]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                f'/api/elements/{last.id}/reposition/', {'after_id': first.id, 'before_id': second.id}, format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['order_index'], ORDER_STEP // 2)
+        self.assertEqual(len(_updates(ctx)), 1)
+        self.assertEqual(self.order()[:3], [first.id, last.id, second.id])
+
+    def test_exhausted_gap_renumbers_container(self):
+        # Плотные ключи 0, 1, 2, … — зазора нет
+        first, second, moved = self.elements[0], self.elements[1], self.elements[10]
+        key = reposition_element(moved, after_id=first.id, before_id=second.id)
+
+        self.assertEqual(key, ORDER_STEP)
+        self.assertEqual(self.order()[:3], [first.id, moved.id, second.id])
+        self.assertEqual(Element.objects.get(id=second.id).order_index, 2 * ORDER_STEP)
+
+    def test_edges_and_foreign_neighbour(self):
+        self.assertEqual(key_between(None, None), 0)
+        self.assertEqual(key_between(None, 0), -ORDER_STEP)
+        self.assertEqual(key_between(5, None), 5 + ORDER_STEP)
+        self.assertIsNone(key_between(5, 6))
+
+        other = Element.objects.create(project=self.project, element_type='IMAGE')
+        response = self.client.post(
+            f'/api/elements/{self.elements[0].id}/reposition/', {'after_id': other.id}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_scene_reposition_and_mixed_grid(self):
+        a = Scene.objects.create(project=self.project, name='A', order_index=ORDER_STEP)
+        response = self.client.post(f'/api/scenes/{a.id}/reposition/', {'before_id': self.scene.id}, format='json')
+        self.assertEqual(response.data['order_index'], -ORDER_STEP)
+
+        root = Element.objects.create(project=self.project, element_type='IMAGE')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(f'/api/projects/{self.project.id}/reorder-items/', {'item_order': [
+                {'type': 'group', 'id': self.scene.id},
+                {'type': 'element', 'id': root.id},
+                {'type': 'group', 'id': a.id},
+            ]}, format='json')
+        self.assertEqual(len(_updates(ctx)), 1)
+        self.assertEqual(len(_updates(ctx, Scene)), 1)
+        self.assertEqual(Element.objects.get(id=root.id).order_index, ORDER_STEP)
+        self.assertEqual(Scene.objects.get(id=a.id).order_index, 2 * ORDER_STEP)
+
+
+class OrderIndexAllocatorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alloc', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.scene = Scene.objects.create(project=self.project, name='S')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def presign(self, url):
+        with patch('apps.storage.services.generate_upload_presigned_urls', return_value={'upload_keys': {}}):
+            response = self.client.post(url, {'filename': 'a.jpg', 'file_size': 10}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return Element.objects.get(id=response.data['element_id'])
+
+    def test_keys_come_from_counter_without_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.presign(f'/api/scenes/{self.scene.id}/presign/')
+            second = self.presign(f'/api/scenes/{self.scene.id}/presign/')
+        self.assertFalse([
+            q for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT COUNT(*)') and 'FROM "elements_element"' in q['sql']
+        ])
+        self.assertEqual(second.order_index - first.order_index, ORDER_STEP)
+
+        root = self.presign(f'/api/projects/{self.project.id}/presign/')
+        self.assertEqual(root.order_index, ORDER_STEP)
+        self.assertEqual(allocate_order_index(self.project.id, None, count=3), 2 * ORDER_STEP)
+        self.assertEqual(Project.objects.get(id=self.project.id).root_element_order_seq, 4 * ORDER_STEP)
+
+    def test_reorder_and_move_keep_new_elements_last(self):
+        elements = Element.objects.bulk_create([
+            Element(project=self.project, scene=self.scene, element_type='IMAGE') for _ in range(3)
+        ])
+        reorder_elements([e.id for e in elements])
+        self.assertEqual(Scene.objects.get(id=self.scene.id).element_order_seq, 2 * ORDER_STEP)
+
+        other = Scene.objects.create(project=self.project, name='O')
+        existing = Element.objects.create(project=self.project, scene=other, element_type='IMAGE',
+                                          order_index=allocate_order_index(self.project.id, other.id))
+        self.client.post('/api/elements/move/', {'element_ids': [elements[1].id, elements[0].id],
+                                                 'target_scene': other.id}, format='json')
+        order = list(Element.objects.filter(scene=other).order_by('order_index').values_list('id', flat=True))
+        self.assertEqual(order, [existing.id, elements[0].id, elements[1].id])
@@ -0,0 +1,100 @@
+"""Keyset pagination: element feed, cabinet history/transactions, notifications."""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.credits.models import CreditsTransaction
+from apps.elements.models import Element
+from apps.notifications.models import Notification
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='x')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.scene = Scene.objects.create(project=self.project, name='S')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params=None, key='id'):
+        """Пройти все страницы по next_cursor, вернуть ключи в порядке выдачи."""
+        seen, params = [], dict(params or {})
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row[key] for row in response.data['results'])
+            if not response.data['has_more']:
+                self.assertIsNone(response.data['next_cursor'])
+                return seen
+            params['cursor'] = response.data['next_cursor']
+
+    def test_element_feed_walks_ties_without_gaps(self):
+        # Пары с одинаковым order_index и created_at — различает только id
+        now = timezone.now()
+        elements = Element.objects.bulk_create([
+            Element(project=self.project, scene=self.scene, element_type='IMAGE', order_index=i // 2)
+            for i in range(7)
+        ])
+        Element.objects.update(created_at=now)
+        expected = sorted((e.order_index, e.id) for e in elements)
+
+        seen = self.walk(reverse('element-list'), {'scene': self.scene.id, 'page_size': 2})
+        self.assertEqual(seen, [pk for _, pk in expected])
+
+    def test_element_feed_unpaginated_without_params(self):
+        Element.objects.create(project=self.project, scene=self.scene, element_type='IMAGE')
+        response = self.client.get(reverse('element-list'), {'scene': self.scene.id})
+        self.assertIsInstance(response.data, list)
+
+    def test_history_newest_first_without_count(self):
+        now = timezone.now()
+        Element.objects.bulk_create([
+            Element(project=self.project, element_type='IMAGE', source_type=Element.SOURCE_UPLOADED)
+            for _ in range(5)
+        ])
+        Element.objects.update(created_at=now)
+        expected = list(Element.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.walk('/api/cabinet/history/', {'page_size': 2})
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(*)' in q['sql']])
+        self.assertEqual(self.walk('/api/cabinet/history/', {'page_size': 2}), expected)
+
+    def test_transactions(self):
+        CreditsTransaction.objects.bulk_create([
+            CreditsTransaction(
+                user=self.user, amount=Decimal('1'), balance_after=Decimal(i),
+                reason=CreditsTransaction.REASON_ADMIN_TOPUP,
+            )
+            for i in range(3)
+        ])
+        seen = self.walk('/api/cabinet/transactions/', {'page_size': 1, 'reason': 'admin_topup'})
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len(set(seen)), 3)
+
+    def test_notifications(self):
+        Notification.objects.bulk_create([
+            Notification(user=self.user, type='generation_completed', title=f'N{i}')
+            for i in range(25)
+        ])
+        first = self.client.get('/api/notifications/').data
+        self.assertEqual(len(first['results']), 20)
+        self.assertTrue(first['has_more'])
+        seen = self.walk('/api/notifications/')
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', 'WyJ4Il0', 'WyJ4IiwxXQ'):
+            response = self.client.get('/api/cabinet/history/', {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
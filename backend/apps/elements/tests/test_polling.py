@@ -0,0 +1,161 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import requests
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.ai_providers.services import LatencyProfile, load_latency_profiles, record_latency
+from apps.ai_providers.models import AIModel, AIProvider
+from apps.elements.models import Element
+from apps.elements.polling import lease_due_elements, next_poll_delay
+from apps.elements.tasks import poll_provider_statuses
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+@override_settings(BACKEND_BASE_URL='http://localhost:8000')
+class BatchedPollingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='poller', password='test')
+        self.project = Project.objects.create(name='P1', user=self.user)
+        self.provider = AIProvider.objects.create(
+            name='Kie', base_url='https://api.test-provider.com', api_key='k',
+        )
+        self.ai_model = AIModel.objects.create(
+            provider=self.provider,
+            name='Model',
+            model_type=AIModel.MODEL_TYPE_IMAGE,
+            api_endpoint='/v1/generate',
+            request_schema={'prompt': '{{prompt}}'},
+            pricing_schema={'fixed_cost': '5.00'},
+        )
+
+    def _element(self, task_id, next_poll_at=None, **kwargs):
+        return Element.objects.create(
+            project=self.project,
+            element_type='IMAGE',
+            ai_model=self.ai_model,
+            status=kwargs.pop('status', Element.STATUS_PROCESSING),
+            external_task_id=task_id,
+            next_poll_at=next_poll_at or timezone.now() - timedelta(seconds=1),
+            **kwargs,
+        )
+
+    def test_lease_groups_due_elements_by_provider(self):
+        due = self._element('t1')
+        self._element('t2', next_poll_at=timezone.now() + timedelta(minutes=5))
+        self._element('t3', status=Element.STATUS_COMPLETED)
+
+        leased = lease_due_elements()
+
+        self.assertEqual(leased, {self.provider.id: [due.id]})
+        due.refresh_from_db()
+        self.assertGreater(due.next_poll_at, timezone.now())
+        # Leased rows are not handed out again by an overlapping tick.
+        self.assertEqual(lease_due_elements(), {})
+
+    @patch('apps.elements.tasks.finalize_generation.delay')
+    @patch('apps.elements.tasks.fetch_generation_statuses')
+    def test_terminal_results_are_dispatched(self, mock_fetch, mock_finalize):
+        done = self._element('t1')
+        failed = self._element('t2')
+        running = self._element('t3')
+        flaky = self._element('t4')
+        mock_fetch.side_effect = lambda elements: [
+            (elements[0], ({'state': 'success', 'result_url': 'https://cdn/x.jpg'}, {})),
+            (elements[1], ({'state': 'failed', 'error': 'nsfw'}, {})),
+            (elements[2], ({'state': 'processing'}, {})),
+            (elements[3], requests.ConnectionError('boom')),
+        ]
+
+        counters = poll_provider_statuses(
+            self.provider.id, [done.id, failed.id, running.id, flaky.id],
+        )
+
+        self.assertEqual(counters, {'completed': 1, 'failed': 1, 'processing': 1, 'errors': 1})
+        mock_finalize.assert_called_once_with(done.id, 'https://cdn/x.jpg')
+        done.refresh_from_db()
+        self.assertIsNone(done.next_poll_at)
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, Element.STATUS_FAILED)
+        for element in (running, flaky):
+            element.refresh_from_db()
+            self.assertEqual(element.status, Element.STATUS_PROCESSING)
+            self.assertGreater(element.next_poll_at, timezone.now())
+
+    @patch('apps.elements.tasks.fetch_generation_statuses')
+    def test_processing_past_deadline_fails(self, mock_fetch):
+        element = self._element('t1')
+        Element.objects.filter(id=element.id).update(created_at=timezone.now() - timedelta(hours=1))
+        mock_fetch.side_effect = lambda elements: [(elements[0], ({'state': 'processing'}, {}))]
+
+        poll_provider_statuses(self.provider.id, [element.id])
+
+        element.refresh_from_db()
+        self.assertEqual(element.status, Element.STATUS_FAILED)
+
+
+@override_settings(
+    BACKEND_BASE_URL='http://localhost:8000',
+    GENERATION_POLL_INTERVAL=5,
+    GENERATION_POLL_MAX_INTERVAL=120,
+    GENERATION_POLL_BACKOFF_FACTOR=1.0,
+    GENERATION_LATENCY_MIN_SAMPLES=10,
+)
+class AdaptivePollingTests(TestCase):
+    # 10 generations between 45 and 60 seconds.
+    profile = LatencyProfile(buckets=((60, 10),))
+
+    def test_without_history_falls_back_to_fixed_interval(self):
+        self.assertEqual(next_poll_delay(None, 0, first=True), 5)
+        self.assertEqual(next_poll_delay(None, 30), 5)
+
+    def test_first_check_aims_at_median(self):
+        self.assertEqual(self.profile.quantile(0.5), 52.5)
+        self.assertEqual(next_poll_delay(self.profile, 2, first=True), 51)
+
+    def test_quantile_interpolates_within_own_bucket(self):
+        # Empty buckets between 15 and 45 are not stored — p95 still lies in 45–60.
+        profile = LatencyProfile(buckets=((15, 9), (60, 1)))
+        self.assertEqual(profile.quantile(0.5), 10 + 5 * 5 / 9)
+        self.assertEqual(profile.quantile(0.95), 52.5)
+
+    def test_checkpoints_follow_quantiles(self):
+        # Past p50 (52.5s) → p75 (56.25s).
+        with self.settings(GENERATION_POLL_INTERVAL=1):
+            self.assertEqual(next_poll_delay(self.profile, 53), 3)
+        # Close to a checkpoint → no faster than GENERATION_POLL_INTERVAL.
+        self.assertEqual(next_poll_delay(self.profile, 56), 5)
+
+    def test_backoff_past_p95(self):
+        p95 = self.profile.quantile(0.95)
+        self.assertEqual(next_poll_delay(self.profile, p95 + 1), 5)
+        self.assertEqual(next_poll_delay(self.profile, p95 + 40), 40)
+        self.assertEqual(next_poll_delay(self.profile, p95 + 600), 120)
+
+    @override_settings(BACKEND_BASE_URL='https://api.example.com', GENERATION_POLL_CALLBACK_INTERVAL=60)
+    def test_callback_mode_waits_for_p95(self):
+        self.assertEqual(next_poll_delay(self.profile, 0, first=True), 59)
+
+    def test_record_latency_builds_profile(self):
+        provider = AIProvider.objects.create(name='Kie', base_url='https://api.test-provider.com')
+        ai_model = AIModel.objects.create(
+            provider=provider, name='Model', model_type=AIModel.MODEL_TYPE_IMAGE,
+            api_endpoint='/v1/generate', request_schema={}, pricing_schema={},
+        )
+        for seconds in [12] * 9:
+            record_latency(ai_model.id, seconds)
+        # Below GENERATION_LATENCY_MIN_SAMPLES the model has no profile yet.
+        self.assertEqual(load_latency_profiles([ai_model.id]), {})
+
+        record_latency(ai_model.id, 50)
+        profile = load_latency_profiles([ai_model.id])[ai_model.id]
+        self.assertEqual(profile.buckets, ((15, 9), (60, 1)))
+
+        with self.settings(GENERATION_LATENCY_MAX_SAMPLES=10):
+            record_latency(ai_model.id, 12)
+        profile = load_latency_profiles([ai_model.id]).get(ai_model.id)
+        self.assertIsNone(profile)  # halved: 5 + 0 samples, under minimum
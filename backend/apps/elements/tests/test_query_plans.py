@@ -0,0 +1,130 @@
+"""
+Query-plan regression suite: hot Element queries must stay on indexes.
+
+Seeds a library large enough for the planner to prefer indexes, runs
+EXPLAIN (FORMAT JSON) and fails on a sequential scan of the element table.
+"""
+import json
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.cabinet.services import get_history_queryset
+from apps.cabinet.views import CabinetPagination
+from apps.elements.models import Element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+
+User = get_user_model()
+
+USERS = 200
+PROJECTS_PER_USER = 2
+SCENES_PER_PROJECT = 4
+ELEMENTS_PER_PROJECT = 100
+STATUSES = [Element.STATUS_COMPLETED] * 8 + [Element.STATUS_FAILED, Element.STATUS_PROCESSING]
+
+
+def _seq_scans(node: dict, table: str) -> list[dict]:
+    found = [node] if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') == table else []
+    for child in node.get('Plans', []):
+        found.extend(_seq_scans(child, table))
+    return found
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are PostgreSQL-specific')
+class ElementQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        users = User.objects.bulk_create([User(username=f'plan{i}') for i in range(USERS)])
+        projects = Project.objects.bulk_create([
+            Project(user=user, name=f'P{i}') for user in users for i in range(PROJECTS_PER_USER)
+        ])
+        scenes = Scene.objects.bulk_create([
+            Scene(project=project, name=f'G{i}', order_index=i)
+            for project in projects for i in range(SCENES_PER_PROJECT)
+        ])
+        scenes_by_project = {}
+        for scene in scenes:
+            scenes_by_project.setdefault(scene.project_id, []).append(scene)
+
+        elements = []
+        for project in projects:
+            groups = [None] + scenes_by_project[project.id]
+            for i in range(ELEMENTS_PER_PROJECT):
+                elements.append(Element(
+                    project=project,
+                    scene=groups[i % len(groups)],
+                    element_type='IMAGE',
+                    status=STATUSES[i % len(STATUSES)],
+                    source_type=Element.SOURCE_GENERATED if i % 3 else Element.SOURCE_UPLOADED,
+                    file_size=1024 if i % 4 else None,
+                    order_index=i,
+                ))
+        Element.objects.bulk_create(elements, batch_size=2000)
+        Element.objects.update(created_at=now - timedelta(days=30))
+
+        with connection.cursor() as cursor:
+            for model in (User, Project, Scene, Element):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        cls.user = users[0]
+        cls.project = projects[0]
+        cls.scene = scenes_by_project[cls.project.id][0]
+
+    def assertIndexed(self, queryset):
+        plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+        scans = _seq_scans(plan, Element._meta.db_table)
+        self.assertFalse(scans, f'Seq Scan on elements:\n{json.dumps(plan, indent=2)}')
+
+    def test_scene_feed(self):
+        self.assertIndexed(
+            Element.objects.filter(project__user=self.user, scene_id=self.scene.id)
+            .order_by('order_index', 'created_at')
+        )
+
+    def test_project_root_feed_and_order_count(self):
+        self.assertIndexed(
+            Element.objects.filter(project__user=self.user, project_id=self.project.id, scene__isnull=True)
+            .order_by('order_index', 'created_at')
+        )
+        self.assertIndexed(Element.objects.filter(project=self.project, scene__isnull=True).values('id'))
+
+    def test_download_meta(self):
+        self.assertIndexed(
+            Element.objects.filter(
+                project_id=self.project.id, project__user=self.user, status=Element.STATUS_COMPLETED,
+            ).values('id', 'file_url', 'scene_id')
+        )
+
+    def test_cabinet_history(self):
+        self.assertIndexed(get_history_queryset(self.user))
+        self.assertIndexed(get_history_queryset(self.user, status=Element.STATUS_FAILED))
+
+    def test_cabinet_history_keyset_page(self):
+        paginator = CabinetPagination()
+        qs = get_history_queryset(self.user).order_by(*paginator.ordering)
+        last = qs.values('created_at', 'id')[10]
+        page = qs.filter(paginator._after(Element, paginator.decode_cursor(paginator.encode_cursor(last))))
+        self.assertIndexed(page[:21])
+
+    def test_cabinet_analytics_period(self):
+        now = timezone.now()
+        self.assertIndexed(
+            Element.objects.filter(
+                project__user=self.user,
+                source_type=Element.SOURCE_GENERATED,
+                created_at__gte=now - timedelta(days=60),
+                created_at__lte=now,
+                status=Element.STATUS_COMPLETED,
+            ).values('id')
+        )
+
+    def test_project_file_size_sum(self):
+        self.assertIndexed(
+            Element.objects.filter(project=self.project, file_size__isnull=False).values('file_size')
+        )
@@ -0,0 +1,113 @@
+import struct
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.storage.streaming import stream_to_s3
+from apps.storage.thumbnails import _mp4_is_faststart
+
+
+def _box(box_type: bytes, payload: bytes = b'') -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def _s3_client(received: dict):
+    """boto3 client mock whose upload_fileobj drains the stream like s3transfer."""
+    def upload_fileobj(fileobj, bucket, key, ExtraArgs=None, Config=None):
+        parts = []
+        while True:
+            part = fileobj.read(Config.multipart_chunksize)
+            if not part:
+                break
+            parts.append(part)
+        received.update(key=key, body=b''.join(parts), extra=ExtraArgs)
+
+    client = MagicMock()
+    client.upload_fileobj.side_effect = upload_fileobj
+    return client
+
+
+@override_settings(
+    AWS_STORAGE_BUCKET_NAME='bucket',
+    AWS_S3_CUSTOM_DOMAIN='cdn.example.com',
+    STORAGE_STREAM_CHUNK_SIZE=4,
+    STORAGE_TRANSFER={
+        'IMAGE': {'part_size': 16, 'concurrency': 2},
+        'VIDEO': {'part_size': 16, 'concurrency': 2},
+    },
+    AWS_S3_OBJECT_PARAMETERS={},
+)
+class StreamToS3Tests(TestCase):
+    def test_mp4_faststart_detection(self):
+        ftyp = _box(b'ftyp', b'isom0000')
+        self.assertTrue(_mp4_is_faststart(ftyp + _box(b'moov')))
+        self.assertFalse(_mp4_is_faststart(ftyp + _box(b'mdat', b'x' * 10)))
+        self.assertIsNone(_mp4_is_faststart(ftyp[:6]))
+
+    @patch('apps.storage.thumbnails.default_storage')
+    @patch('apps.storage.streaming._get_s3_client')
+    def test_image_is_uploaded_and_thumbnailed_in_one_pass(self, mock_client, mock_storage):
+        received = {}
+        mock_client.return_value = _s3_client(received)
+        mock_storage.save.side_effect = lambda key, content: key
+        mock_storage.url.side_effect = lambda key: f'https://cdn.example.com/{key}'
+
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 600), color='red').save(buffer, 'JPEG')
+        body = buffer.getvalue()
+        chunks = [body[i:i + 1000] for i in range(0, len(body), 1000)]
+        progress = []
+
+        result = stream_to_s3(
+            iter(chunks), ext='.jpg', element_type='IMAGE', project_id=1, scene_id=2,
+            total_size=len(body), on_progress=progress.append,
+        )
+
+        self.assertEqual(received['body'], body)
+        self.assertEqual(received['extra'], {'ContentType': 'image/jpeg'})
+        self.assertTrue(received['key'].startswith('projects/1/scenes/2/'))
+        self.assertEqual(result['file_url'], f"https://cdn.example.com/{received['key']}")
+        self.assertEqual(result['file_size'], len(body))
+        self.assertIn('_small.jpg', result['thumbnail_url'])
+        self.assertIn('_medium.jpg', result['preview_url'])
+        self.assertTrue(progress)
+        self.assertEqual(progress, sorted(progress))
+
+    @patch('apps.storage.thumbnails.generate_thumbnails')
+    @patch('apps.storage.streaming._get_s3_client')
+    def test_non_faststart_video_spills_for_ffmpeg(self, mock_client, mock_generate):
+        received = {}
+        mock_client.return_value = _s3_client(received)
+        spilled = {}
+
+        def fake_generate(path, element_type, project_id, scene_id):
+            with open(path, 'rb') as f:
+                spilled['body'] = f.read()
+            return {'thumbnail_url': 'sm', 'preview_url': 'md'}
+
+        mock_generate.side_effect = fake_generate
+        body = _box(b'ftyp', b'isom0000') + _box(b'mdat', b'v' * 40) + _box(b'moov')
+
+        result = stream_to_s3(
+            iter([body[:10], body[10:]]), ext='.mp4', element_type='VIDEO', project_id=1, scene_id=None,
+        )
+
+        self.assertEqual(received['body'], body)
+        self.assertEqual(spilled['body'], body)
+        self.assertEqual((result['thumbnail_url'], result['preview_url']), ('sm', 'md'))
+
+    @patch('apps.storage.streaming._get_s3_client')
+    def test_source_error_aborts_upload(self, mock_client):
+        received = {}
+        mock_client.return_value = _s3_client(received)
+
+        def broken_stream():
+            yield b'a' * 40
+            raise ConnectionError('provider reset')
+
+        with self.assertRaises(ConnectionError):
+            stream_to_s3(broken_stream(), ext='.jpg', element_type='IMAGE', project_id=1, scene_id=1)
+        # upload_fileobj saw the error instead of EOF — no truncated object.
+        self.assertNotIn('body', received)
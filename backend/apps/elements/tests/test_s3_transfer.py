@@ -0,0 +1,100 @@
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.storage.transfer import MIN_PART_SIZE, get_transfer_config, upload_file
+
+PART = MIN_PART_SIZE
+
+
+@override_settings(
+    AWS_STORAGE_BUCKET_NAME='bucket',
+    AWS_S3_OBJECT_PARAMETERS={'CacheControl': 'max-age=86400'},
+    STORAGE_TRANSFER={
+        'IMAGE': {'part_size': PART, 'concurrency': 2},
+        'VIDEO': {'part_size': 2 * PART, 'concurrency': 4},
+    },
+)
+class TransferEngineTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
+        tmp.write(b'a' * PART + b'b' * PART + b'c' * 10)
+        tmp.close()
+        self.path = tmp.name
+        self.addCleanup(os.unlink, self.path)
+
+    def _client(self, pending_parts=None):
+        client = MagicMock()
+        if pending_parts is None:
+            client.list_multipart_uploads.return_value = {}
+        else:
+            client.list_multipart_uploads.return_value = {'Uploads': [{'Key': 'k', 'UploadId': 'old'}]}
+            client.list_parts.return_value = {'Parts': pending_parts, 'IsTruncated': False}
+        client.create_multipart_upload.return_value = {'UploadId': 'new'}
+        client.upload_part.side_effect = lambda **kw: {'ETag': f"etag-{kw['PartNumber']}"}
+        return client
+
+    def test_config_per_element_type(self):
+        self.assertEqual(get_transfer_config('VIDEO').multipart_chunksize, 2 * PART)
+        self.assertEqual(get_transfer_config('VIDEO').max_concurrency, 4)
+        self.assertEqual(get_transfer_config('IMAGE').multipart_chunksize, PART)
+
+    @patch('apps.storage.transfer._get_s3_client')
+    def test_multipart_upload_in_parallel_parts(self, mock_client):
+        client = mock_client.return_value = self._client()
+        seen = []
+
+        stats = upload_file(self.path, 'k', 'video/mp4', 'IMAGE', on_bytes=seen.append)
+
+        client.create_multipart_upload.assert_called_once_with(
+            Bucket='bucket', Key='k', ContentType='video/mp4', CacheControl='max-age=86400',
+        )
+        self.assertEqual(
+            sorted(call.kwargs['PartNumber'] for call in client.upload_part.call_args_list), [1, 2, 3],
+        )
+        parts = client.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+        self.assertEqual([p['ETag'] for p in parts], ['etag-1', 'etag-2', 'etag-3'])
+        self.assertEqual(sum(seen), 2 * PART + 10)
+        self.assertEqual((stats.parts, stats.resumed_parts, stats.bytes), (3, 0, 2 * PART + 10))
+
+    @patch('apps.storage.transfer._get_s3_client')
+    def test_retry_resumes_pending_upload(self, mock_client):
+        client = mock_client.return_value = self._client(
+            pending_parts=[{'PartNumber': 1, 'ETag': 'etag-old-1', 'Size': PART}],
+        )
+
+        stats = upload_file(self.path, 'k', 'video/mp4', 'IMAGE')
+
+        client.create_multipart_upload.assert_not_called()
+        self.assertEqual(
+            sorted(call.kwargs['PartNumber'] for call in client.upload_part.call_args_list), [2, 3],
+        )
+        parts = client.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+        self.assertEqual(parts[0], {'PartNumber': 1, 'ETag': 'etag-old-1'})
+        self.assertEqual(client.complete_multipart_upload.call_args.kwargs['UploadId'], 'old')
+        self.assertEqual(stats.resumed_parts, 1)
+
+    @patch('apps.storage.transfer._get_s3_client')
+    def test_pending_upload_with_other_part_size_restarts(self, mock_client):
+        client = mock_client.return_value = self._client(
+            pending_parts=[{'PartNumber': 1, 'ETag': 'etag-old-1', 'Size': 2 * PART}],
+        )
+
+        upload_file(self.path, 'k', 'video/mp4', 'IMAGE')
+
+        client.abort_multipart_upload.assert_called_once_with(Bucket='bucket', Key='k', UploadId='old')
+        self.assertEqual(client.complete_multipart_upload.call_args.kwargs['UploadId'], 'new')
+
+    @patch('apps.storage.transfer._get_s3_client')
+    def test_small_file_single_put(self, mock_client):
+        client = mock_client.return_value = self._client()
+        with open(self.path, 'wb') as f:
+            f.write(b'x' * 100)
+
+        stats = upload_file(self.path, 'k', 'video/mp4', 'VIDEO')
+
+        client.put_object.assert_called_once()
+        client.create_multipart_upload.assert_not_called()
+        self.assertEqual(stats.parts, 1)
@@ -0,0 +1,167 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.credits.models import CreditsTransaction
+from apps.credits.services import CreditsService
+from apps.elements.models import Element, ProjectStorageUsage, SceneStorageUsage, UserStorageUsage
+from apps.elements.usage import file_changed, move_elements, reconcile_storage_usage
+from apps.projects.models import Project
+from apps.projects.services import delete_project
+from apps.scenes.models import Scene
+from apps.subscriptions.services import SubscriptionService
+
+User = get_user_model()
+
+
+class StorageUsageLedgerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='usage', password='test')
+        self.project = Project.objects.create(name='P1', user=self.user)
+        self.scene = Scene.objects.create(name='G1', project=self.project)
+        self.child = Scene.objects.create(name='G2', project=self.project, parent=self.scene)
+
+    def _element(self, scene=None, **kwargs):
+        return Element.objects.create(project=self.project, scene=scene, element_type='IMAGE', **kwargs)
+
+    def _usage(self, model, **key):
+        row = model.objects.filter(**key).first()
+        return (row.bytes, row.elements_count) if row else (0, 0)
+
+    def test_create_save_and_delete_keep_counters_in_step(self):
+        element = self._element(scene=self.scene)
+        self._element(scene=self.scene, file_size=50)
+        self.assertEqual(self._usage(SceneStorageUsage, scene=self.scene), (50, 2))
+
+        element.file_size = 100
+        element.content_hash = 'a' * 64
+        element.save(update_fields=['file_size', 'content_hash'])
+        self.assertEqual(self._usage(ProjectStorageUsage, project=self.project), (150, 2))
+        self.assertEqual(self._usage(UserStorageUsage, user=self.user), (150, 2))
+
+        element.delete()
+        self.assertEqual(self._usage(SceneStorageUsage, scene=self.scene), (50, 1))
+        self.assertEqual(SubscriptionService.storage_used(self.user), 50)
+
+    def test_shared_content_is_counted_once_per_user(self):
+        first = self._element(file_size=100, content_hash='c' * 64)
+        self._element(file_size=100, content_hash='c' * 64)
+        self.assertEqual(self._usage(UserStorageUsage, user=self.user), (100, 2))
+        self.assertEqual(self._usage(ProjectStorageUsage, project=self.project), (200, 2))
+
+        first.delete()
+        self.assertEqual(self._usage(UserStorageUsage, user=self.user), (100, 1))
+
+    def test_queryset_update_paths(self):
+        element = self._element(scene=self.scene)
+        Element.objects.filter(id=element.id).update(file_size=70, content_hash='d' * 64)
+        file_changed(element.id, old_size=None)
+        self.assertEqual(self._usage(UserStorageUsage, user=self.user), (70, 1))
+
+        moved = move_elements(Element.objects.filter(id=element.id), self.child.id)
+        self.assertEqual(moved, 1)
+        self.assertEqual(self._usage(SceneStorageUsage, scene=self.scene), (0, 0))
+        self.assertEqual(self._usage(SceneStorageUsage, scene=self.child), (70, 1))
+        self.assertEqual(self._usage(ProjectStorageUsage, project=self.project), (70, 1))
+
+    def test_project_delete_recounts_owner_once(self):
+        other = Project.objects.create(name='P2', user=self.user)
+        Element.objects.create(project=other, element_type='IMAGE', file_size=5)
+        self._element(scene=self.child, file_size=10)
+
+        delete_project(self.project)
+
+        self.assertEqual(self._usage(UserStorageUsage, user=self.user), (5, 1))
+        self.assertFalse(ProjectStorageUsage.objects.filter(project_id=self.project.id).exists())
+
+    def test_reconcile_repairs_drift(self):
+        self._element(scene=self.scene, file_size=10)
+        UserStorageUsage.objects.filter(user=self.user).update(bytes=999)
+        SceneStorageUsage.objects.filter(scene=self.scene).delete()
+
+        self.assertEqual(reconcile_storage_usage(), 2)
+        self.assertEqual(self._usage(UserStorageUsage, user=self.user), (10, 1))
+        self.assertEqual(self._usage(SceneStorageUsage, scene=self.scene), (10, 1))
+        self.assertEqual(reconcile_storage_usage(), 0)
+
+    def test_listings_read_counters(self):
+        self._element(scene=self.scene, file_size=10)
+        self._element(scene=self.child, file_size=20)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        project = client.get(f'/api/projects/{self.project.id}/').json()
+        self.assertEqual((project['storage_bytes'], project['element_count']), (30, 2))
+
+        scenes = {s['id']: s for s in client.get('/api/scenes/', {'project': self.project.id}).json()}
+        self.assertEqual(scenes[self.scene.id]['storage_bytes'], 30)  # включая подгруппу
+        self.assertEqual(scenes[self.scene.id]['elements_count'], 1)
+
+
+class GenerationCostTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='spender', password='test')
+        self.project = Project.objects.create(name='P1', user=self.user)
+        self.scene = Scene.objects.create(name='G1', project=self.project)
+        self.child = Scene.objects.create(name='G2', project=self.project, parent=self.scene)
+        self.element = Element.objects.create(project=self.project, scene=self.child, element_type='IMAGE')
+
+    def _spent(self, model, **key):
+        return model.objects.filter(**key).values_list('spent', flat=True).first()
+
+    def _debit(self, amount, element=None, operation_key='op'):
+        CreditsTransaction.objects.create(
+            user=self.user, amount=-amount, balance_after=Decimal('0'),
+            reason=CreditsTransaction.REASON_GENERATION_DEBIT,
+            metadata={'operation_key': operation_key},
+        )
+        return CreditsService().attach_debit_to_element(self.user, operation_key, element or self.element)
+
+    def test_debit_and_refund_update_element_and_rollups(self):
+        self.assertTrue(self._debit(Decimal('12.50')))
+        self.assertEqual(self.element.generation_cost, Decimal('12.50'))
+        self.assertEqual(self._spent(SceneStorageUsage, scene=self.child), Decimal('12.50'))
+        self.assertEqual(self._spent(ProjectStorageUsage, project=self.project), Decimal('12.50'))
+        self.assertEqual(self._spent(UserStorageUsage, user=self.user), Decimal('12.50'))
+
+        stale = Element.objects.get(id=self.element.id)
+        CreditsService().refund_for_generation(
+            self.user, Decimal('12.50'), element=self.element,
+            reason=CreditsTransaction.REASON_REFUND_PROVIDER_ERROR,
+        )
+        self.assertEqual(self._spent(ProjectStorageUsage, project=self.project), Decimal('0'))
+
+        # Полный save() устаревшего экземпляра не возвращает списанную стоимость.
+        stale.prompt_text = 'edited'
+        stale.save()
+        self.element.refresh_from_db()
+        self.assertEqual(self.element.generation_cost, Decimal('0'))
+        self.assertEqual(reconcile_storage_usage(), 0)
+
+    def test_move_delete_and_listings(self):
+        self._debit(Decimal('7'))
+        move_elements(Element.objects.filter(id=self.element.id), self.scene.id)
+        self.assertEqual(self._spent(SceneStorageUsage, scene=self.child), Decimal('0'))
+        self.assertEqual(self._spent(SceneStorageUsage, scene=self.scene), Decimal('7'))
+
+        sibling = Element.objects.create(project=self.project, scene=self.child, element_type='IMAGE')
+        self._debit(Decimal('3'), element=sibling, operation_key='op2')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(Decimal(client.get(f'/api/projects/{self.project.id}/').json()['total_spent']), Decimal('10'))
+        scenes = {s['id']: s for s in client.get('/api/scenes/', {'project': self.project.id}).json()}
+        self.assertEqual(Decimal(scenes[self.scene.id]['total_spent']), Decimal('10'))  # включая подгруппу
+        elements = client.get('/api/elements/', {'scene': self.scene.id}).json()
+        self.assertEqual([e['generation_cost'] for e in elements], ['7.00'])
+
+        self.element.delete()
+        self.assertEqual(self._spent(ProjectStorageUsage, project=self.project), Decimal('3'))
+        self.assertEqual(self._spent(UserStorageUsage, user=self.user), Decimal('3'))
+
+    def test_reconcile_repairs_spent(self):
+        self._debit(Decimal('5'))
+        ProjectStorageUsage.objects.filter(project=self.project).update(spent=0)
+        self.assertEqual(reconcile_storage_usage(), 1)
+        self.assertEqual(self._spent(ProjectStorageUsage, project=self.project), Decimal('5'))
@@ -709,9 +709,13 @@ class BatchUploadTest(TestCase):
         )
 
     @patch('apps.notifications.services.notify_element_status')
+    @patch('apps.elements.tasks.index_presigned_upload.delay')
+    @patch('apps.elements.tasks.render_preview_loop.delay')
     @patch('apps.elements.views_upload.head_s3_object')
     @patch('apps.common.presigned._get_s3_client')
-    def test_five_elements_upload_complete_cycle(self, mock_get_client, mock_head, mock_notify):
+    def test_five_elements_upload_complete_cycle(
+        self, mock_get_client, mock_head, mock_loop, mock_index, mock_notify,
+    ):
         """Create 5 elements in UPLOADING status rapidly, complete them all."""
         mock_client = MagicMock()
         mock_client.generate_presigned_url.return_value = 'https://presigned.url'
@@ -750,11 +754,12 @@ class BatchUploadTest(TestCase):
 
         # Complete final phase for all
         for eid in element_ids:
-            response = self.client.post(
-                f'/api/elements/{eid}/complete/',
-                {'phase': 'final'},
-                format='json',
-            )
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    f'/api/elements/{eid}/complete/',
+                    {'phase': 'final'},
+                    format='json',
+                )
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Verify no elements left in UPLOADING
@@ -768,6 +773,9 @@ class BatchUploadTest(TestCase):
             id__in=element_ids, status=Element.STATUS_COMPLETED,
         ).count()
         self.assertEqual(completed_count, 5)
+        # Every original is indexed for dedup, only the video gets a hover loop
+        self.assertEqual(mock_index.call_count, 5)
+        mock_loop.assert_called_once_with(element_ids[3])
 
     @patch('apps.notifications.services.notify_element_status')
     @patch('apps.elements.views_upload.head_s3_object')
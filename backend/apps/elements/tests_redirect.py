@@ -4,6 +4,7 @@ This endpoint hides raw S3 URLs behind a short, branded redirect:
   GET /elements/123/           -> 302 -> element.file_url      (original)
   GET /elements/123/thumb/     -> 302 -> element.thumbnail_url (256px)
   GET /elements/123/preview/   -> 302 -> element.preview_url   (800px)
+  GET /elements/123/loop/      -> 302 -> element.loop_url      (hover loop)
 
 The view is anonymous — element IDs are already publicly exposed via share links
 and the same permission model as /api/sharing/public/<token>/ elements.
@@ -117,6 +118,24 @@ class ElementRedirectPreviewTest(ElementRedirectBaseMixin, TestCase):
         self.assertEqual(response.status_code, 410)
 
 
+class ElementRedirectLoopTest(ElementRedirectBaseMixin, TestCase):
+    def test_loop_variant_redirects_to_loop_url(self):
+        element = Element.objects.create(
+            project=self.project,
+            scene=self.scene,
+            element_type='VIDEO',
+            file_url='https://bucket.example.com/v.mp4',
+            loop_url='https://bucket.example.com/v_loop.mp4',
+        )
+        response = self.client.get(f'/elements/{element.id}/loop/')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], element.loop_url)
+
+    def test_image_without_loop_returns_410(self):
+        response = self.client.get(f'/elements/{self.element.id}/loop/')
+        self.assertEqual(response.status_code, 410)
+
+
 class ElementRedirectHelperTest(ElementRedirectBaseMixin, TestCase):
     """Tests for the `build_element_url` helper used by serializers."""
 
@@ -4,16 +4,23 @@ Tests for thumbnail_utils — server-side thumbnail generation.
 All S3 interactions are mocked. No real network calls.
 """
 import os
+import shutil
+import sys
 import tempfile
+import time
 from io import BytesIO
 from unittest.mock import patch, MagicMock, call
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from PIL import Image
 
 from apps.storage.thumbnails import (
+    _decode_for_thumbnail,
     _resize_to_fit,
+    generate_preview_loop,
     generate_thumbnails,
+    get_thumbnail_format,
+    open_thumbnail_sink,
     SMALL_SIZE,
     MEDIUM_SIZE,
     SMALL_QUALITY,
@@ -98,7 +105,7 @@ class GenerateThumbnailsImageTest(TestCase):
         if os.path.exists(self.temp_path):
             os.unlink(self.temp_path)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_returns_both_urls(self, mock_storage):
         """Should return both thumbnail_url and preview_url."""
         mock_storage.save.return_value = 'saved/path.jpg'
@@ -111,7 +118,7 @@ class GenerateThumbnailsImageTest(TestCase):
         self.assertTrue(len(result['thumbnail_url']) > 0)
         self.assertTrue(len(result['preview_url']) > 0)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_saves_two_variants(self, mock_storage):
         """Should call default_storage.save twice (small + medium)."""
         mock_storage.save.return_value = 'saved/path.jpg'
@@ -121,7 +128,7 @@ class GenerateThumbnailsImageTest(TestCase):
 
         self.assertEqual(mock_storage.save.call_count, 2)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_saved_images_have_correct_dimensions(self, mock_storage):
         """Intercept save calls to verify dimensions of saved thumbnails."""
         saved_images = []
@@ -138,18 +145,20 @@ class GenerateThumbnailsImageTest(TestCase):
         generate_thumbnails(self.temp_path, 'IMAGE', project_id=42, scene_id=7)
 
         self.assertEqual(len(saved_images), 2)
+        # Variants upload concurrently — identify them by key suffix, not order.
+        by_variant = {img['key'].rsplit('_', 1)[1].split('.')[0]: img for img in saved_images}
 
-        # First save is small (256px max side for 1920x1080 -> 256x144)
-        small = saved_images[0]
+        # Small: 256px max side for 1920x1080 -> 256x144
+        small = by_variant['small']
         self.assertEqual(small['size'][0], 256)
         self.assertEqual(small['size'][1], int(1080 * 256 / 1920))
 
-        # Second save is medium (800px max side for 1920x1080 -> 800x450)
-        medium = saved_images[1]
+        # Medium: 800px max side for 1920x1080 -> 800x450
+        medium = by_variant['medium']
         self.assertEqual(medium['size'][0], 800)
         self.assertEqual(medium['size'][1], int(1080 * 800 / 1920))
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_s3_key_contains_scene_id(self, mock_storage):
         """S3 key should contain projects/{id}/scenes/{scene_id}/."""
         mock_storage.save.return_value = 'saved/path.jpg'
@@ -161,7 +170,7 @@ class GenerateThumbnailsImageTest(TestCase):
             key = call_args[0][0]
             self.assertIn('projects/42/scenes/7/', key)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_small_image_preserved(self, mock_storage):
         """Small source image (100x80) should not be upscaled."""
         small_path = _create_test_image(100, 80)
@@ -186,69 +195,138 @@ class GenerateThumbnailsImageTest(TestCase):
             os.unlink(small_path)
 
 
-class GenerateThumbnailsVideoTest(TestCase):
-    """Tests for generate_thumbnails with element_type=VIDEO."""
-
-    @patch('apps.common.thumbnail_utils.default_storage')
-    @patch('apps.common.thumbnail_utils.subprocess.run')
-    def test_returns_both_urls(self, mock_subprocess, mock_storage):
-        """VIDEO type should extract frame via ffmpeg and return both URLs."""
-        # Create a fake video temp path (doesn't matter, ffmpeg is mocked)
-        video_tmp = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-        video_tmp.close()
-
-        # ffmpeg mock: when subprocess.run is called, create a fake JPEG at the output path
-        def fake_ffmpeg(cmd, **kwargs):
-            # The output path is the last argument in the ffmpeg command
-            output_path = cmd[-1]
-            img = Image.new('RGB', (1920, 1080), color='blue')
-            img.save(output_path, 'JPEG')
-            return MagicMock(returncode=0)
+# Stand-in for ffmpeg (not installed in the test environment): honours the
+# output pipes of _ffmpeg_frame_args and logs its argv, one line per run.
+FAKE_FFMPEG = """#!{python}
+import os, sys, time
+args = sys.argv[1:]
+with open(os.environ['FAKE_FFMPEG_LOG'], 'a') as log:
+    log.write(repr(args) + '\\n')
+if os.environ.get('FAKE_FFMPEG_HANG'):
+    time.sleep(30)
+if args[args.index('-i') + 1] == 'pipe:0':
+    sys.stdin.buffer.read()
+if '-filter_complex' not in args:  # preview loop
+    sys.stdout.buffer.write(b'loop-bytes')
+    sys.exit(0)
+
+def ppm(w, h):
+    return b'P6\\n%d %d\\n255\\n' % (w, h) + bytes([0, 0, 255]) * (w * h)
+
+outputs = [a for a in args if a.startswith('pipe:') and a != 'pipe:0']
+sys.stdout.buffer.write(ppm(800, 450))
+sys.stdout.flush()
+with os.fdopen(int(outputs[1][5:]), 'wb') as small:
+    small.write(ppm(256, 144))
+"""
 
-        mock_subprocess.side_effect = fake_ffmpeg
-        mock_storage.save.return_value = 'saved/video_thumb.jpg'
-        mock_storage.url.return_value = 'https://cdn.example.com/video_thumb.jpg'
 
-        try:
-            result = generate_thumbnails(video_tmp.name, 'VIDEO', project_id=10, scene_id=3)
+class GenerateThumbnailsVideoTest(TestCase):
+    """Tests for generate_thumbnails with element_type=VIDEO."""
 
-            self.assertIn('thumbnail_url', result)
-            self.assertIn('preview_url', result)
-            self.assertTrue(len(result['thumbnail_url']) > 0)
-            self.assertTrue(len(result['preview_url']) > 0)
-        finally:
-            if os.path.exists(video_tmp.name):
-                os.unlink(video_tmp.name)
+    def setUp(self):
+        bin_dir = tempfile.mkdtemp()
+        script = os.path.join(bin_dir, 'ffmpeg')
+        with open(script, 'w') as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(script, 0o755)
+        self.log_path = os.path.join(bin_dir, 'calls.log')
+        env = patch.dict(os.environ, {
+            'PATH': bin_dir + os.pathsep + os.environ.get('PATH', ''),
+            'FAKE_FFMPEG_LOG': self.log_path,
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(shutil.rmtree, bin_dir)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
-    @patch('apps.common.thumbnail_utils.subprocess.run')
-    def test_calls_ffmpeg_with_correct_args(self, mock_subprocess, mock_storage):
-        """Should call ffmpeg with -vframes 1 to extract a single frame."""
         video_tmp = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
         video_tmp.close()
+        self.video_path = video_tmp.name
+        self.addCleanup(os.unlink, self.video_path)
 
-        def fake_ffmpeg(cmd, **kwargs):
-            output_path = cmd[-1]
-            img = Image.new('RGB', (640, 480), color='green')
-            img.save(output_path, 'JPEG')
-            return MagicMock(returncode=0)
+        storage = patch('apps.storage.thumbnails.default_storage')
+        self.mock_storage = storage.start()
+        self.addCleanup(storage.stop)
+        self.saved = {}
 
-        mock_subprocess.side_effect = fake_ffmpeg
-        mock_storage.save.return_value = 'saved/thumb.jpg'
-        mock_storage.url.return_value = 'https://cdn.example.com/thumb.jpg'
+        def capture_save(key, content_file):
+            data = content_file.read()
+            self.saved[key] = data if '_loop' in key else Image.open(BytesIO(data)).size
+            return key
 
+        self.mock_storage.save.side_effect = capture_save
+        self.mock_storage.url.side_effect = lambda key: f'https://cdn.example.com/{key}'
+
+    def _calls(self):
+        with open(self.log_path) as f:
+            return [eval(line) for line in f]
+
+    def test_both_sizes_from_one_ffmpeg_run(self):
+        """Single ffmpeg process, frames read from pipes, medium is scaled too."""
+        result = generate_thumbnails(self.video_path, 'VIDEO', project_id=10, scene_id=3)
+
+        self.assertIn('_small.jpg', result['thumbnail_url'])
+        self.assertIn('_medium.jpg', result['preview_url'])
+        self.assertEqual(sorted(self.saved.values()), [(256, 144), (800, 450)])
+
+        calls = self._calls()
+        self.assertEqual(len(calls), 1)
+        cmd = calls[0]
+        self.assertIn(self.video_path, cmd)
+        self.assertIn('-filter_complex', cmd)
+        self.assertIn('pipe:1', cmd)
+        self.assertEqual(cmd[cmd.index('-ss') + 1], '1')
+
+    @override_settings(VIDEO_POSTER_KEYFRAMES=5)
+    def test_poster_picked_from_keyframes(self):
+        generate_thumbnails(self.video_path, 'VIDEO', project_id=10, scene_id=3)
+
+        cmd = self._calls()[0]
+        self.assertEqual(cmd[cmd.index('-skip_frame') + 1], 'nokey')
+        self.assertNotIn('-ss', cmd)
+        self.assertIn('thumbnail=5,', cmd[cmd.index('-filter_complex') + 1])
+
+    @patch('apps.storage.thumbnails.FFMPEG_TIMEOUT', 0.5)
+    def test_hung_ffmpeg_is_killed(self):
+        with patch.dict(os.environ, {'FAKE_FFMPEG_HANG': '1'}):
+            started = time.monotonic()
+            result = generate_thumbnails(self.video_path, 'VIDEO', project_id=10, scene_id=3)
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(result, {'thumbnail_url': '', 'preview_url': ''})
+        self.mock_storage.save.assert_not_called()
+
+    def test_preview_loop(self):
+        url = generate_preview_loop(self.video_path, project_id=10, scene_id=None)
+
+        self.assertTrue(url.endswith('_loop.mp4'))
+        self.assertIn('projects/10/root/', url)
+        cmd = self._calls()[0]
+        self.assertEqual(cmd[cmd.index('-t') + 1], '3')
+        self.assertLess(cmd.index('-t'), cmd.index('-i'))
+        self.assertIn('-an', cmd)
+        self.assertIn('empty_moov', cmd[cmd.index('-movflags') + 1])
+
+    @override_settings(VIDEO_LOOP_SECONDS=0)
+    def test_preview_loop_disabled(self):
+        self.assertEqual(generate_preview_loop(self.video_path, project_id=10, scene_id=None), '')
+        self.assertFalse(os.path.exists(self.log_path))
+
+    def test_faststart_stream_is_piped_to_ffmpeg(self):
+        """Stream sink feeds ffmpeg stdin, no spill file and no frame file."""
+        moov_first = b'\x00\x00\x00\x10ftypisom0000' + b'\x00\x00\x00\x08moov'
+        sink = open_thumbnail_sink('VIDEO', project_id=10, scene_id=None)
         try:
-            generate_thumbnails(video_tmp.name, 'VIDEO', project_id=10, scene_id=3)
-
-            mock_subprocess.assert_called_once()
-            cmd = mock_subprocess.call_args[0][0]
-            self.assertEqual(cmd[0], 'ffmpeg')
-            self.assertIn('-vframes', cmd)
-            self.assertIn('1', cmd)
-            self.assertIn(video_tmp.name, cmd)
+            sink.write(moov_first)
+            sink.write(b'v' * 1000)
+            result = sink.finish()
         finally:
-            if os.path.exists(video_tmp.name):
-                os.unlink(video_tmp.name)
+            sink.close()
+
+        self.assertTrue(result['thumbnail_url'])
+        cmd = self._calls()[0]
+        self.assertEqual(cmd[cmd.index('-i') + 1], 'pipe:0')
+        self.assertEqual(sorted(self.saved.values()), [(256, 144), (800, 450)])
 
 
 class GenerateThumbnailsErrorHandlingTest(TestCase):
@@ -282,7 +360,7 @@ class GenerateThumbnailsErrorHandlingTest(TestCase):
         finally:
             os.unlink(tmp)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_s3_save_failure_returns_empties(self, mock_storage):
         """If S3 save raises, should return empty URLs."""
         mock_storage.save.side_effect = Exception('S3 connection failed')
@@ -300,7 +378,7 @@ class GenerateThumbnailsErrorHandlingTest(TestCase):
 class GenerateThumbnailsSceneIdNullTest(TestCase):
     """Tests for generate_thumbnails with scene_id=None (root level)."""
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_root_level_key_prefix(self, mock_storage):
         """scene_id=None -> S3 key should be projects/{id}/root/ not projects/{id}/scenes/None/."""
         mock_storage.save.return_value = 'saved/path.jpg'
@@ -317,7 +395,7 @@ class GenerateThumbnailsSceneIdNullTest(TestCase):
         finally:
             os.unlink(tmp)
 
-    @patch('apps.common.thumbnail_utils.default_storage')
+    @patch('apps.storage.thumbnails.default_storage')
     def test_root_level_returns_urls(self, mock_storage):
         """Root-level thumbnails should still return valid URLs."""
         mock_storage.save.return_value = 'projects/42/root/abc_small.jpg'
@@ -330,3 +408,66 @@ class GenerateThumbnailsSceneIdNullTest(TestCase):
             self.assertTrue(result['preview_url'].startswith('https://'))
         finally:
             os.unlink(tmp)
+
+
+class ThumbnailRendererTest(TestCase):
+    """Single-decode renderer: draft/reduce decoding and output format."""
+
+    def test_jpeg_is_decoded_in_draft_mode(self):
+        """4K JPEG is decoded at reduced DCT scale, still covering MEDIUM_SIZE."""
+        tmp = _create_test_image(3840, 2160)
+        try:
+            with Image.open(tmp) as img:
+                decoded = _decode_for_thumbnail(img, MEDIUM_SIZE)
+            self.assertEqual(decoded.size, (1920, 1080))
+            self.assertEqual(decoded.mode, 'RGB')
+        finally:
+            os.unlink(tmp)
+
+    def test_png_is_reduced_before_resize(self):
+        buffer = BytesIO()
+        Image.new('RGBA', (4000, 2000)).save(buffer, 'PNG')
+        buffer.seek(0)
+        with Image.open(buffer) as img:
+            decoded = _decode_for_thumbnail(img, MEDIUM_SIZE)
+        self.assertEqual(decoded.size, (2000, 1000))
+        self.assertEqual(decoded.mode, 'RGB')
+
+    def test_palette_png_is_converted_before_reduce(self):
+        """reduce() rejects P mode and would average palette indices in PA."""
+        buffer = BytesIO()
+        Image.new('RGB', (4000, 3000), 'red').convert('P', palette=Image.Palette.ADAPTIVE).save(buffer, 'PNG')
+        buffer.seek(0)
+        with Image.open(buffer) as img:
+            self.assertEqual(img.mode, 'P')
+            decoded = _decode_for_thumbnail(img, MEDIUM_SIZE)
+        self.assertEqual(decoded.size, (2000, 1500))
+        self.assertEqual(decoded.mode, 'RGB')
+        self.assertEqual(decoded.getpixel((0, 0)), (255, 0, 0))
+
+    @override_settings(THUMBNAIL_FORMAT='webp')
+    @patch('apps.storage.thumbnails.default_storage')
+    def test_webp_output(self, mock_storage):
+        saved = []
+
+        def capture_save(key, content_file):
+            saved.append((key, Image.open(BytesIO(content_file.read())).format))
+            return key
+
+        mock_storage.save.side_effect = capture_save
+        mock_storage.url.side_effect = lambda key: f'https://cdn.example.com/{key}'
+
+        tmp = _create_test_image(1200, 800)
+        try:
+            generate_thumbnails(tmp, 'IMAGE', project_id=1, scene_id=1)
+        finally:
+            os.unlink(tmp)
+
+        self.assertEqual(len(saved), 2)
+        for key, fmt in saved:
+            self.assertTrue(key.endswith('.webp'))
+            self.assertEqual(fmt, 'WEBP')
+
+    @override_settings(THUMBNAIL_FORMAT='nope')
+    def test_unknown_format_falls_back_to_jpeg(self):
+        self.assertEqual(get_thumbnail_format(), 'JPEG')
@@ -8,7 +8,7 @@ from __future__ import annotations
 from typing import Literal, Optional
 
 
-Variant = Literal['file', 'thumb', 'preview']
+Variant = Literal['file', 'thumb', 'preview', 'loop']
 
 
 def _source_url(element, variant: Variant) -> str:
@@ -19,6 +19,8 @@ def _source_url(element, variant: Variant) -> str:
         return element.thumbnail_url or ''
     if variant == 'preview':
         return element.preview_url or ''
+    if variant == 'loop':
+        return element.loop_url or ''
     return ''
 
 
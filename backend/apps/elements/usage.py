@@ -0,0 +1,328 @@
+"""
+Storage usage ledger: bytes, element counts and generation spend per user,
+project and scene.
+
+Counters are changed in the same transaction as the element:
+- Element.save()/delete() — signals (elements/signals.py);
+- QuerySet.update() paths — explicit file_changed() / move_elements();
+- bulk_create of new elements — record_created();
+- debits/refunds — CreditsService → add_generation_cost().
+
+Per-user bytes count content-deduplicated files once (same content_hash →
+one S3 object), like the storage limit always did. Project and scene bytes
+are plain sums of file_size; spent is the sum of Element.generation_cost
+(debit minus refunds). A scene counter covers only its own elements,
+subgroups are summed at read time.
+
+Every change locks the user's counter row (after the element rows), so dedup
+checks of one user are serialized and recount_user() can rebuild counters without racing them.
+"""
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from apps.elements.models import Element, ProjectStorageUsage, SceneStorageUsage, UserStorageUsage
+
+logger = logging.getLogger(__name__)
+
+# Bulk deletes (project/scene with all elements): per-element updates are
+# skipped, deferred_usage() recounts the owner once at the end.
+_deferred: ContextVar[bool] = ContextVar('storage_usage_deferred', default=False)
+
+
+class ElementState(NamedTuple):
+    """The part of an element the ledger depends on."""
+
+    project_id: int
+    scene_id: int | None
+    file_size: int | None
+    content_hash: str
+    generation_cost: Decimal = Decimal('0')
+
+    @classmethod
+    def of(cls, element) -> 'ElementState | None':
+        """Snapshot without touching deferred fields (None if any is not loaded)."""
+        values = element.__dict__
+        try:
+            return cls(
+                values['project_id'], values['scene_id'], values['file_size'], values['content_hash'],
+                values['generation_cost'] or Decimal('0'),
+            )
+        except KeyError:
+            return None
+
+
+def _owner_id(project_id: int) -> int | None:
+    from apps.projects.models import Project  # lazy import
+    return Project.objects.filter(pk=project_id).values_list('user_id', flat=True).first()
+
+
+def _lock_user(user_id: int, create: bool = True) -> bool:
+    """Lock the user's counter row until the transaction ends. False if there is none."""
+    rows = UserStorageUsage.objects.select_for_update().filter(user_id=user_id)
+    if list(rows.values_list('pk', flat=True)):
+        return True
+    if not create:
+        return False
+    UserStorageUsage.objects.bulk_create([UserStorageUsage(user_id=user_id)], ignore_conflicts=True)
+    return bool(list(rows.values_list('pk', flat=True)))
+
+
+def _user_bytes(user_id: int, element_id: int, state: ElementState) -> int:
+    """What the element adds to the user's total: shared content is already counted."""
+    if not state.file_size:
+        return 0
+    if state.content_hash and Element.objects.filter(
+        project__user_id=user_id, content_hash=state.content_hash,
+    ).exclude(id=element_id).exists():
+        return 0
+    return state.file_size
+
+
+def _bump(model, field: str, pk, size: int, count: int, spent: Decimal = Decimal('0')) -> None:
+    """
+    Add deltas to a counter row with F(). The row is created on first use;
+    a missing row is not created for a removal (the owner may be going away
+    in the same cascade).
+    """
+    if pk is None or (not size and not count and not spent):
+        return
+    changes = {
+        'bytes': F('bytes') + size,
+        'elements_count': F('elements_count') + count,
+        'spent': F('spent') + spent,
+        'updated_at': timezone.now(),
+    }
+    rows = model.objects.filter(**{field: pk})
+    if not rows.update(**changes) and (size > 0 or count > 0 or spent > 0):
+        model.objects.bulk_create([model(**{field: pk})], ignore_conflicts=True)
+        rows.update(**changes)
+
+
+def record(element_id: int, old: ElementState | None, new: ElementState | None, user_id: int | None = None) -> None:
+    """
+    Apply an element transition to all counters.
+
+    old=None — element created, new=None — deleted.
+    """
+    if _deferred.get() or old == new:
+        return
+    user_id = user_id or _owner_id((new or old).project_id)
+    if user_id is None:
+        return
+
+    with transaction.atomic():
+        has_user_row = _lock_user(user_id, create=new is not None)
+        deltas: dict[tuple, list] = {}
+        user_size, user_spent = 0, Decimal('0')
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            user_size += sign * _user_bytes(user_id, element_id, state)
+            user_spent += sign * state.generation_cost
+            size = sign * (state.file_size or 0)
+            for key in ((ProjectStorageUsage, 'project_id', state.project_id),
+                        (SceneStorageUsage, 'scene_id', state.scene_id)):
+                delta = deltas.setdefault(key, [0, 0, Decimal('0')])
+                delta[0] += size
+                delta[1] += sign
+                delta[2] += sign * state.generation_cost
+
+        if has_user_row:
+            _bump(UserStorageUsage, 'user_id', user_id, user_size, (new is not None) - (old is not None), user_spent)
+        for (model, field, pk), (size, count, spent) in deltas.items():
+            _bump(model, field, pk, size, count, spent)
+
+
+def record_created(elements: list, user_id: int) -> None:
+    """
+    Elements inserted with bulk_create (no signals): one pass over the counters
+    instead of record() per element. Call inside the creating transaction.
+    """
+    if _deferred.get() or not elements:
+        return
+    deltas: dict[tuple, list] = {}
+    user_size, user_spent = 0, Decimal('0')
+    for element in elements:
+        state = ElementState.of(element)
+        user_size += _user_bytes(user_id, element.id, state)
+        user_spent += state.generation_cost
+        for key in ((ProjectStorageUsage, 'project_id', state.project_id),
+                    (SceneStorageUsage, 'scene_id', state.scene_id)):
+            delta = deltas.setdefault(key, [0, 0, Decimal('0')])
+            delta[0] += state.file_size or 0
+            delta[1] += 1
+            delta[2] += state.generation_cost
+
+    with transaction.atomic():
+        _lock_user(user_id)
+        _bump(UserStorageUsage, 'user_id', user_id, user_size, len(elements), user_spent)
+        for (model, field, pk), (size, count, spent) in deltas.items():
+            _bump(model, field, pk, size, count, spent)
+    for element in elements:
+        element._usage_state = ElementState.of(element)
+
+
+def file_changed(element_id: int, old_size: int | None, old_hash: str = '') -> None:
+    """file_size/content_hash were set with QuerySet.update() — call inside the same transaction."""
+    row = Element.objects.filter(id=element_id).values(
+        'project_id', 'scene_id', 'file_size', 'content_hash', 'generation_cost', 'project__user_id',
+    ).first()
+    if row is None:
+        return
+    new = ElementState(
+        row['project_id'], row['scene_id'], row['file_size'], row['content_hash'], row['generation_cost'],
+    )
+    record(element_id, new._replace(file_size=old_size, content_hash=old_hash), new, row['project__user_id'])
+
+
+def move_elements(elements, scene_id: int | None) -> int:
+    """
+    Move elements to another scene (None — project root) keeping scene counters
+    in step. Project and user totals do not change.
+    """
+    with transaction.atomic():
+        # Element rows first, then the owner's counter row — the same order as save().
+        ids = list(elements.exclude(scene_id=scene_id).select_for_update(of=('self',)).values_list('id', flat=True))
+        if not ids:
+            return 0
+        moving = Element.objects.filter(id__in=ids)
+        groups = list(
+            moving.order_by().values('scene_id', 'project__user_id')
+            .annotate(size=Sum('file_size'), count=Count('id'), spent=Sum('generation_cost'))
+        )
+        for user_id in {row['project__user_id'] for row in groups}:
+            _lock_user(user_id)
+        moving.update(scene_id=scene_id)
+        for row in groups:
+            size, spent = row['size'] or 0, row['spent'] or Decimal('0')
+            _bump(SceneStorageUsage, 'scene_id', row['scene_id'], -size, -row['count'], -spent)
+            _bump(SceneStorageUsage, 'scene_id', scene_id, size, row['count'], spent)
+    return len(ids)
+
+
+def add_generation_cost(element, delta: Decimal) -> None:
+    """
+    Debit (delta > 0) or refund (delta < 0) for a generation: Element.generation_cost
+    and the user/project/scene spent counters. Call inside the credits transaction.
+    """
+    if not delta or _deferred.get():
+        return
+    with transaction.atomic():
+        # Element row first, then the owner's counter row — the same order as save().
+        Element.objects.filter(id=element.id).update(generation_cost=F('generation_cost') + delta)
+        row = Element.objects.filter(id=element.id).values(
+            'project_id', 'scene_id', 'generation_cost', 'project__user_id',
+        ).first()
+        if row is None:
+            return
+        if _lock_user(row['project__user_id']):
+            _bump(UserStorageUsage, 'user_id', row['project__user_id'], 0, 0, delta)
+        _bump(ProjectStorageUsage, 'project_id', row['project_id'], 0, 0, delta)
+        _bump(SceneStorageUsage, 'scene_id', row['scene_id'], 0, 0, delta)
+
+    # Экземпляр вызывающего — в актуальное состояние, иначе следующий
+    # save() учтёт старую стоимость как изменение.
+    element.generation_cost = row['generation_cost']
+    element._usage_state = ElementState.of(element)
+
+
+@contextmanager
+def deferred_usage(user_id: int):
+    """Delete many elements at once and recount the owner's counters afterwards."""
+    token = _deferred.set(True)
+    try:
+        with transaction.atomic():
+            yield
+            recount_user(user_id)
+    finally:
+        _deferred.reset(token)
+
+
+def get_user_usage(user_id: int) -> tuple[int, int]:
+    """(bytes, elements_count) of the user — one row read."""
+    row = UserStorageUsage.objects.filter(user_id=user_id).values_list('bytes', 'elements_count').first()
+    return row or (0, 0)
+
+
+def count_user_bytes(elements) -> int:
+    """Deduplicated size of an Element queryset (the per-user counter from scratch)."""
+    legacy = elements.filter(content_hash='').aggregate(total=Sum('file_size'))['total'] or 0
+    unique = (
+        elements.exclude(content_hash='')
+        .order_by()
+        .values('content_hash')
+        .annotate(size=Max('file_size'))
+        .values_list('size', flat=True)
+    )
+    return legacy + sum(size or 0 for size in unique)
+
+
+def recount_user(user_id: int) -> int:
+    """Rebuild the user's counters from Element. Returns the number of rows that drifted."""
+    from apps.projects.models import Project  # lazy import
+    from apps.scenes.models import Scene  # lazy import
+
+    elements = Element.objects.filter(project__user_id=user_id)
+    with transaction.atomic():
+        _lock_user(user_id)
+        totals = elements.aggregate(count=Count('id'), spent=Sum('generation_cost'))
+        expected = [
+            (UserStorageUsage, 'user_id', {
+                user_id: (count_user_bytes(elements), totals['count'], totals['spent'] or Decimal('0')),
+            }),
+            (ProjectStorageUsage, 'project_id', _grouped(
+                elements, 'project_id', Project.objects.filter(user_id=user_id),
+            )),
+            (SceneStorageUsage, 'scene_id', _grouped(
+                elements.exclude(scene__isnull=True), 'scene_id', Scene.objects.filter(project__user_id=user_id),
+            )),
+        ]
+        return sum(_sync(model, field, values) for model, field, values in expected)
+
+
+def _grouped(elements, field: str, owners) -> dict:
+    totals = {
+        row[field]: (row['size'] or 0, row['count'], row['spent'] or Decimal('0'))
+        for row in elements.order_by().values(field).annotate(
+            size=Sum('file_size'), count=Count('id'), spent=Sum('generation_cost'),
+        )
+    }
+    return {pk: totals.get(pk, (0, 0, Decimal('0'))) for pk in owners.values_list('pk', flat=True)}
+
+
+def _sync(model, field: str, expected: dict) -> int:
+    """Write expected (bytes, count, spent) per pk where the stored row differs."""
+    rows = {getattr(row, field): row for row in model.objects.filter(**{f'{field}__in': list(expected)})}
+    drifted, missing = [], []
+    for pk, (size, count, spent) in expected.items():
+        row = rows.get(pk)
+        if row is None:
+            missing.append(model(**{field: pk, 'bytes': size, 'elements_count': count, 'spent': spent}))
+        elif (row.bytes, row.elements_count, row.spent) != (size, count, spent):
+            row.bytes, row.elements_count, row.spent, row.updated_at = size, count, spent, timezone.now()
+            drifted.append(row)
+    model.objects.bulk_create(missing, ignore_conflicts=True)
+    model.objects.bulk_update(drifted, ['bytes', 'elements_count', 'spent', 'updated_at'])
+    return len(drifted) + sum(1 for row in missing if row.bytes or row.elements_count or row.spent)
+
+
+def reconcile_storage_usage() -> int:
+    """Recount every user that owns projects. Returns the total number of repaired rows."""
+    from apps.projects.models import Project  # lazy import
+
+    repaired = 0
+    for user_id in Project.objects.order_by().values_list('user_id', flat=True).distinct().iterator():
+        drifted = recount_user(user_id)
+        if drifted:
+            logger.warning("storage usage drift repaired", extra={"user_id": user_id, "rows": drifted})
+        repaired += drifted
+    return repaired
@@ -2,19 +2,19 @@ import logging
 import requests
 
 from django.http import StreamingHttpResponse
-from django.db.models import Count, Q, Sum, Subquery, OuterRef, DecimalField
-from django.db.models.functions import Abs
-from collections import deque
+from django.db.models import Q
 
 from rest_framework import viewsets, permissions, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes
 from .models import Element
-from .serializers import ElementSerializer, ReorderSerializer
-from .services import reorder_elements
-from apps.storage.services import delete_file_from_s3
-from apps.credits.models import CreditsTransaction
+from .serializers import ElementSerializer, ReorderSerializer, RepositionSerializer
+from .services import delete_element, reorder_elements, reposition_element
+from .positions import append_elements
+from .usage import move_elements
+from apps.common.http import get_session
+from apps.common.pagination import KeysetPagination
 from apps.subscriptions.permissions import feature_required
 
 logger = logging.getLogger(__name__)
@@ -27,11 +27,29 @@ class IsSceneProjectOwner(permissions.BasePermission):
         return obj.project.user == request.user
 
 
+class ElementPagination(KeysetPagination):
+    """
+    Порядок ленты — как у непагинированного списка (order_index, created_at)
+    плюс id для уникальности; совпадает с element_scene_order_idx.
+    Включается только явным ?cursor= / ?page_size= — старые клиенты
+    получают сцену целиком.
+    """
+    ordering = ('order_index', 'created_at', 'id')
+    page_size = 50
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
 class ElementViewSet(viewsets.ModelViewSet):
     """
     ViewSet для CRUD операций с элементами.
     
-    list: Получить список элементов пользователя (с фильтрацией)
+    list: Получить список элементов пользователя (с фильтрацией; ?cursor= — постранично)
     create: Создать новый элемент
     retrieve: Получить детали элемента
     update: Обновить элемент (PUT)
@@ -40,6 +58,7 @@ class ElementViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ElementSerializer
     permission_classes = [IsAuthenticated, IsSceneProjectOwner]
+    pagination_class = ElementPagination
     
     def perform_destroy(self, instance):
         """Удаление элемента с очисткой файлов из S3 и headliner."""
@@ -50,23 +69,17 @@ class ElementViewSet(viewsets.ModelViewSet):
             instance.scene.headliner = None
             instance.scene.save(update_fields=['headliner', 'updated_at'])
 
-        # Удаляем основной файл из S3
-        if instance.file_url:
-            result = delete_file_from_s3(instance.file_url)
-            logger.info(f"Deleted main file for element {instance.id}: success={result}")
-
-        # Удаляем превью из S3
-        if instance.thumbnail_url:
-            result = delete_file_from_s3(instance.thumbnail_url)
-            logger.info(f"Deleted thumbnail for element {instance.id}: success={result}")
-
-        instance.delete()
+        # Файлы всех вариантов удаляются в фоне одним DeleteObjects (elements/deletion.py)
+        delete_element(instance)
         logger.info(f"Element {instance.id} deleted successfully")
     
     def get_queryset(self):
         """Возвращает только элементы проектов текущего пользователя с фильтрацией."""
+        # Помеченные на удаление проекты и группы (elements/deletion.py) не показываем
         queryset = Element.objects.filter(
-            project__user=self.request.user
+            Q(scene__isnull=True) | Q(scene__deleted_at__isnull=True),
+            project__user=self.request.user,
+            project__deleted_at__isnull=True,
         ).select_related('project', 'scene', 'ai_model').prefetch_related('reviews')
 
         # Фильтрация по scene через query params
@@ -91,19 +104,8 @@ class ElementViewSet(viewsets.ModelViewSet):
         if is_favorite is not None:
             queryset = queryset.filter(is_favorite=is_favorite.lower() == 'true')
 
-        queryset = queryset.annotate(
-            _generation_cost=Subquery(
-                CreditsTransaction.objects.filter(
-                    element=OuterRef('pk'),
-                    reason=CreditsTransaction.REASON_GENERATION_DEBIT,
-                ).values('element').annotate(
-                    cost=Abs(Sum('amount'))
-                ).values('cost')[:1],
-                output_field=DecimalField()
-            ),
-            _comment_count=Count('comments', filter=Q(comments__is_system=False)),
-        )
-
+        # Стоимость генерации — колонка generation_cost (ведёт CreditsService),
+        # число комментариев — comment_count (sharing/counters.py).
         return queryset.order_by('order_index', 'created_at')
     
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
@@ -137,6 +139,29 @@ class ElementViewSet(viewsets.ModelViewSet):
         reorder_elements(element_ids)
         return Response({'status': 'ok'})
 
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def reposition(self, request, pk=None):
+        """
+        Переместить один элемент между соседями.
+
+        POST /api/elements/{id}/reposition/
+
+        Принимает:
+        - after_id: ID элемента перед новым местом (null — в начало)
+        - before_id: ID элемента после нового места (null — в конец)
+        """
+        element = self.get_object()
+        serializer = RepositionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            order_index = reposition_element(element, **serializer.validated_data)
+        except LookupError:
+            return Response(
+                {'error': 'Соседний элемент не найден в этой группе.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'order_index': order_index})
+
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def download(self, request, pk=None):
         """
@@ -151,7 +176,7 @@ class ElementViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            r = requests.get(element.file_url, stream=True, timeout=30)
+            r = get_session(element.file_url).get(element.file_url, stream=True, timeout=30)
             r.raise_for_status()
         except requests.RequestException:
             return Response(
@@ -192,7 +217,12 @@ class ElementViewSet(viewsets.ModelViewSet):
         if target_scene_id is not None:
             from apps.scenes.models import Scene
             try:
-                target_scene = Scene.objects.get(id=target_scene_id, project__user=request.user)
+                target_scene = Scene.objects.get(
+                    id=target_scene_id,
+                    project__user=request.user,
+                    deleted_at__isnull=True,
+                    project__deleted_at__isnull=True,
+                )
             except Scene.DoesNotExist:
                 return Response(
                     {'error': 'Целевая группа не найдена'},
@@ -200,12 +230,22 @@ class ElementViewSet(viewsets.ModelViewSet):
                 )
 
         if element_ids:
-            Element.objects.filter(
-                id__in=element_ids, project__user=request.user
-            ).update(scene_id=target_scene_id)
+            moving = Element.objects.filter(id__in=element_ids, project__user=request.user)
+            moved_ids = list(moving.exclude(scene_id=target_scene_id).values_list('id', flat=True))
+            move_elements(moving, target_scene_id)
+            # В конец целевой группы: ключи от её счётчика (elements/positions.py)
+            append_elements(moved_ids, target_scene_id)
+            if moved_ids:
+                from apps.sharing.services import invalidate_share_index, invalidate_share_payloads
+                project_ids = list(
+                    Element.objects.filter(id__in=moved_ids).values_list('project_id', flat=True).distinct()
+                )
+                invalidate_share_payloads(*project_ids)
+                invalidate_share_index(*project_ids)
 
         if group_ids:
             from apps.scenes.models import Scene
+            from apps.scenes.services import move_scenes
             groups = Scene.objects.filter(id__in=group_ids, project__user=request.user)
             if target_scene and target_scene.parent is not None:
                 return Response(
@@ -219,7 +259,7 @@ class ElementViewSet(viewsets.ModelViewSet):
                         {'error': 'Нельзя переместить группу с подгруппами внутрь другой группы'},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-            groups.update(parent_id=target_scene_id)
+            move_scenes(groups, target_scene_id)
 
         return Response({'status': 'ok'})
 
@@ -244,6 +284,7 @@ def download_meta(request):
     ZIP assembly (batch download).
     """
     from apps.scenes.models import Scene
+    from apps.scenes.services import subtree
 
     project_id = request.query_params.get('project_id')
     scene_id = request.query_params.get('scene_id')
@@ -257,8 +298,10 @@ def download_meta(request):
     if project_id:
         elements = list(
             Element.objects.filter(
+                Q(scene__isnull=True) | Q(scene__deleted_at__isnull=True),
                 project_id=project_id,
                 project__user=request.user,
+                project__deleted_at__isnull=True,
                 status='COMPLETED',
             ).values(*DOWNLOAD_META_ELEMENT_FIELDS)
         )
@@ -266,39 +309,32 @@ def download_meta(request):
             Scene.objects.filter(
                 project_id=project_id,
                 project__user=request.user,
+                project__deleted_at__isnull=True,
+                deleted_at__isnull=True,
             ).values('id', 'name', 'parent_id')
         )
     else:
-        # scene_id provided — BFS to collect all descendant scenes
+        # scene_id provided — the scene and all descendants (closure table)
         try:
-            scene = Scene.objects.get(id=scene_id, project__user=request.user)
+            scene = Scene.objects.get(
+                id=scene_id,
+                project__user=request.user,
+                deleted_at__isnull=True,
+                project__deleted_at__isnull=True,
+            )
         except Scene.DoesNotExist:
             return Response({'elements': [], 'groups': []})
 
-        all_scenes = list(
-            Scene.objects.filter(project=scene.project).values_list('id', 'parent_id')
-        )
-        children_map = {}
-        for sid, pid in all_scenes:
-            children_map.setdefault(pid, []).append(sid)
-
-        # BFS from target scene
-        scene_ids = []
-        queue = deque([scene.id])
-        while queue:
-            current = queue.popleft()
-            scene_ids.append(current)
-            queue.extend(children_map.get(current, []))
-
         elements = list(
             Element.objects.filter(
-                scene_id__in=scene_ids,
+                scene__ancestor_links__ancestor_id=scene.id,
+                scene__deleted_at__isnull=True,
                 project__user=request.user,
                 status='COMPLETED',
             ).values(*DOWNLOAD_META_ELEMENT_FIELDS)
         )
         groups = list(
-            Scene.objects.filter(id__in=scene_ids).values('id', 'name', 'parent_id')
+            subtree(scene.id).filter(deleted_at__isnull=True).values('id', 'name', 'parent_id')
         )
 
     # Onboarding: engaging with batch download counts as discovery.
@@ -4,6 +4,7 @@
   GET  /elements/<id>/file/      -> 302 file_url
   GET  /elements/<id>/thumb/     -> 302 thumbnail_url  (256px)
   GET  /elements/<id>/preview/   -> 302 preview_url    (800px)
+  GET  /elements/<id>/loop/      -> 302 loop_url       (hover loop, VIDEO only)
 
 Responses:
   302  happy path
@@ -26,7 +27,7 @@ from .models import Element
 from .url_helpers import _source_url
 
 
-_VALID_VARIANTS = {'file', 'thumb', 'preview'}
+_VALID_VARIANTS = {'file', 'thumb', 'preview', 'loop'}
 
 
 @require_http_methods(['GET', 'HEAD'])
@@ -36,7 +37,7 @@ def element_redirect(request, element_id: int, variant: str = 'file') -> HttpRes
 
     try:
         element = Element.objects.only(
-            'id', 'file_url', 'thumbnail_url', 'preview_url'
+            'id', 'file_url', 'thumbnail_url', 'preview_url', 'loop_url'
         ).get(pk=element_id)
     except Element.DoesNotExist:
         return HttpResponseNotFound()
@@ -1,4 +1,5 @@
 import logging
+from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -56,6 +57,20 @@ def upload_complete(request, element_id):
             file_url=element.file_url,
             preview_url=element.preview_url,
         )
+        transaction.on_commit(lambda: _enqueue_post_upload(element.id, element.element_type))
         return Response(ElementSerializer(element).data)
 
     return Response({'error': 'Invalid phase'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _enqueue_post_upload(element_id: int, element_type: str) -> None:
+    """Дедупликация и hover-луп — фоновые улучшения, загрузка уже завершена."""
+    try:
+        from apps.elements.tasks import index_presigned_upload, render_preview_loop
+        index_presigned_upload.delay(element_id)
+        if element_type == Element.ELEMENT_TYPE_VIDEO:
+            render_preview_loop.delay(element_id)
+    except Exception:
+        logger.warning(
+            "post-upload tasks enqueue failed", extra={"element_id": element_id}, exc_info=True,
+        )
@@ -64,10 +64,8 @@ def generation_callback_view(request):
             if not source_url:
                 # Fallback: try standard extraction
                 source_url = extract_result_url(payload)
-            applied, file_url = finalize_generation_success(element.id, source_url)
-            if applied:
-                updated = Element.objects.get(id=element.id)
-                notify_element_status(updated, "COMPLETED", file_url=file_url)
+            # COMPLETED и уведомление — после превью, в очереди media.
+            applied, _file_url = finalize_generation_success(element.id, source_url)
             return Response(
                 {"status": "ok", "result": "completed", "applied": applied},
                 status=status.HTTP_200_OK,
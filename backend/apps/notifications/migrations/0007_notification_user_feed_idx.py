@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elements', '0017_element_hot_path_indexes'),
+        ('notifications', '0006_add_achievement_earned_type'),
+        ('projects', '0002_initial'),
+        ('scenes', '0005_fix_parent_cascade_db_constraint'),
+        ('sharing', '0009_add_shared_link_to_comment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notification_user_feed_idx'),
+        ),
+    ]
@@ -44,6 +44,8 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read', '-created_at']),
+            # Лента без фильтра is_read — keyset по (created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_feed_idx'),
         ]
 
     def __str__(self):
@@ -177,3 +177,26 @@ def notify_review_updated(element, action, author_name):
             )
     except Exception as e:
         logger.warning(f'Failed to send review update: {e}')
+
+
+def notify_deletion_progress(project_id, target_type, target_id, deleted, total):
+    """Broadcast progress of the background S3 cleanup of a deleted scene/project."""
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(
+                f'project_{project_id}',
+                {
+                    'type': 'deletion_progress',
+                    'data': {
+                        'type': 'deletion_progress',
+                        'target_type': target_type,
+                        'target_id': target_id,
+                        'deleted': deleted,
+                        'total': total,
+                        'done': deleted >= total,
+                    },
+                },
+            )
+    except Exception as e:
+        logger.warning(f'Failed to send deletion progress: {e}')
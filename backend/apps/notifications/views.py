@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.pagination import KeysetPagination
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -25,16 +26,9 @@ def notification_list(request):
     if is_read is not None:
         qs = qs.filter(is_read=is_read.lower() == 'true')
 
-    page_size = 20
-    offset = int(request.query_params.get('offset', 0))
-    notifications = qs[offset:offset + page_size]
-    has_more = qs.count() > offset + page_size
-
-    return Response({
-        'results': NotificationSerializer(notifications, many=True).data,
-        'has_more': has_more,
-        'next_offset': offset + page_size if has_more else None,
-    })
+    paginator = KeysetPagination()
+    notifications = paginator.paginate_queryset(qs, request)
+    return paginator.get_paginated_response(NotificationSerializer(notifications, many=True).data)
 
 
 @api_view(['GET'])
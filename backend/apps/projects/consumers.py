@@ -83,6 +83,10 @@ class ProjectConsumer(AsyncJsonWebsocketConsumer):
         """Forward review update to project owner."""
         await self.send_json(event['data'])
 
+    async def deletion_progress(self, event):
+        """Forward S3 cleanup progress of a deleted scene/project."""
+        await self.send_json(event['data'])
+
     # --- Helpers ---
 
     @database_sync_to_async
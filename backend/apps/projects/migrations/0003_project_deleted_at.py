@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, help_text='Удаление поставлено в очередь: проект скрыт, файлы и записи чистит purge_project_task', null=True, verbose_name='Удаляется с'),
+        ),
+    ]
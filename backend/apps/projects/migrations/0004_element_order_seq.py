@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:14
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_seq(apps, schema_editor):
+    """Счётчик = текущий максимальный order_index элементов в корне проекта."""
+    Project = apps.get_model('projects', 'Project')
+    Element = apps.get_model('elements', 'Element')
+    last = Element.objects.filter(project=OuterRef('pk'), scene__isnull=True).order_by().values('project').annotate(
+        last=Max('order_index'),
+    ).values('last')[:1]
+    Project.objects.update(root_element_order_seq=Coalesce(Subquery(last), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_deleted_at'),
+        ('elements', '0018_generation_cost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='root_element_order_seq',
+            field=models.IntegerField(default=0, help_text='Счётчик для новых элементов вне групп (elements/positions.py), без COUNT по корню', verbose_name='Последний order_index элемента в корне'),
+        ),
+        migrations.RunPython(backfill_seq, migrations.RunPython.noop),
+    ]
@@ -57,6 +57,17 @@ class Project(models.Model):
         auto_now=True,
         verbose_name='Дата обновления'
     )
+    root_element_order_seq = models.IntegerField(
+        default=0,
+        verbose_name='Последний order_index элемента в корне',
+        help_text='Счётчик для новых элементов вне групп (elements/positions.py), без COUNT по корню'
+    )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Удаляется с',
+        help_text='Удаление поставлено в очередь: проект скрыт, файлы и записи чистит purge_project_task'
+    )
 
     class Meta:
         verbose_name = 'Проект'
@@ -3,6 +3,9 @@
 """
 from typing import Optional
 from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.common.ordering import ORDER_STEP, apply_keys
 from .models import Project
 
 User = get_user_model()
@@ -45,9 +48,37 @@ def update_project(project: Project, name: Optional[str] = None) -> Project:
 
 def delete_project(project: Project) -> None:
     """
-    Удаление проекта.
+    Удаление проекта со всеми группами, элементами и файлами — сразу, без
+    пометки (HTTP-удаление идёт через tombstone_project и фоновую задачу).
     
     Args:
         project: Объект проекта для удаления
     """
-    project.delete()
+    from apps.elements.services import purge_project
+    purge_project(project.id)
+
+
+def reorder_project_items(project: Project, item_order: list[dict]) -> None:
+    """
+    Порядок смешанной сетки корня проекта (элементы и группы в одном ряду):
+    по одному UPDATE … CASE на модель вместо UPDATE на каждый элемент.
+
+    Args:
+        project: Проект
+        item_order: [{type: "element"|"group", id: int}, ...] в новом порядке
+    """
+    from apps.elements.models import Element
+    from apps.elements.services import sync_counters
+    from apps.scenes.models import Scene
+    from apps.sharing.services import invalidate_share_payloads
+
+    keys = {'element': {}, 'group': {}}
+    for index, item in enumerate(item_order):
+        if item.get('type') in keys:
+            keys[item['type']][item.get('id')] = index * ORDER_STEP
+
+    with transaction.atomic():
+        apply_keys(Element.objects.filter(project=project), keys['element'])
+        sync_counters(Element.objects.filter(project=project, id__in=list(keys['element'])))
+        apply_keys(Scene.objects.filter(project=project), keys['group'])
+        invalidate_share_payloads(project.id)
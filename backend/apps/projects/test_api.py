@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -99,13 +101,17 @@ class ProjectAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], 'Частично обновлен')
     
-    def test_delete_project(self):
+    @patch('apps.elements.tasks.purge_project_task.delay')
+    def test_delete_project(self, purge_delay):
         self.client.force_authenticate(user=self.user1)
         url = reverse('project-detail', kwargs={'pk': self.project1.pk})
-        response = self.client.delete(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(url)
         
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Project.objects.filter(pk=self.project1.pk).exists())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIsNotNone(Project.objects.get(pk=self.project1.pk).deleted_at)
+        purge_delay.assert_called_once_with(self.project1.pk)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
     
     def test_delete_other_user_project(self):
         self.client.force_authenticate(user=self.user1)
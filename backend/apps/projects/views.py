@@ -3,12 +3,15 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Value, DecimalField, BigIntegerField, Subquery, OuterRef
-from django.db.models.functions import Coalesce, Abs
+from django.db.models import F, Prefetch, Sum, Value, DecimalField, BigIntegerField
+from django.db.models.functions import Coalesce
 
 from .models import Project
 from .serializers import ProjectSerializer, ProjectStatsSerializer
-from apps.elements.models import Element
+from apps.elements.serializers import GenerationBatchSerializer
+from apps.elements.services import allocate_order_index, tombstone_project
+from .services import reorder_project_items
+from apps.elements.models import Element, ProjectStorageUsage
 from apps.credits.models import CreditsTransaction
 from apps.scenes.models import Scene
 from apps.common.utils import format_storage
@@ -37,33 +40,14 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Возвращает только проекты текущего пользователя с аннотациями метрик."""
-        spent_subquery = Subquery(
-            CreditsTransaction.objects.filter(
-                element__project=OuterRef('pk'),
-                reason=CreditsTransaction.REASON_GENERATION_DEBIT,
-            ).values('element__project').annotate(
-                total=Abs(Sum('amount'))
-            ).values('total')[:1],
-            output_field=DecimalField()
-        )
-
-        storage_subquery = Subquery(
-            Element.objects.filter(
-                project=OuterRef('pk'),
-                file_size__isnull=False,
-            ).values('project').annotate(
-                total=Sum('file_size')
-            ).values('total')[:1],
-            output_field=BigIntegerField()
-        )
-
         return Project.objects.filter(
-            user=self.request.user
+            user=self.request.user, deleted_at__isnull=True,
         ).annotate(
-            _element_count=Count('elements'),
-            _total_spent=Coalesce(spent_subquery, Value(0), output_field=DecimalField()),
-            _storage_bytes=Coalesce(storage_subquery, Value(0), output_field=BigIntegerField()),
-        ).prefetch_related('scenes')
+            # Счётчики (elements/usage.py) вместо COUNT/SUM по элементам и транзакциям.
+            _element_count=Coalesce(F('storage_usage__elements_count'), Value(0)),
+            _total_spent=Coalesce(F('storage_usage__spent'), Value(0), output_field=DecimalField()),
+            _storage_bytes=Coalesce(F('storage_usage__bytes'), Value(0), output_field=BigIntegerField()),
+        ).prefetch_related(Prefetch('scenes', queryset=Scene.objects.filter(deleted_at__isnull=True)))
 
     def perform_create(self, serializer):
         """При создании автоматически устанавливает текущего пользователя и проверяет лимиты."""
@@ -79,6 +63,14 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         serializer.save(user=user)
 
+    def destroy(self, request, *args, **kwargs):
+        """
+        Проект помечается deleted_at и сразу пропадает из выдачи; записи и
+        файлы S3 удаляет purge_project_task (elements/deletion.py).
+        """
+        tombstone_project(self.get_object())
+        return Response(status=status.HTTP_202_ACCEPTED)
+
     @action(detail=True, methods=['post'], url_path='reorder-items')
     def reorder_items(self, request, pk=None):
         """
@@ -86,17 +78,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Accepts: item_order: [{type: "element", id: 1}, {type: "group", id: 2}, ...]
         """
         project = self.get_object()
-        item_order = request.data.get('item_order', [])
-
-        for index, item in enumerate(item_order):
-            item_type = item.get('type')
-            item_id = item.get('id')
-
-            if item_type == 'element':
-                Element.objects.filter(id=item_id, project=project).update(order_index=index)
-            elif item_type == 'group':
-                Scene.objects.filter(id=item_id, project=project).update(order_index=index)
-
+        reorder_project_items(project, request.data.get('item_order', []))
         return Response({'status': 'ok'})
 
     @action(detail=True, methods=['post'])
@@ -127,10 +109,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
             element_type=element_type,
         )
 
-        # Calculate order_index (append to end, root-level elements only)
-        current_count = Element.objects.filter(
-            project=project, scene__isnull=True,
-        ).count()
+        # order_index — в конец корня проекта (elements/positions.py)
+        order_index = allocate_order_index(project.id, None)
 
         # Create Element in UPLOADING status
         element = Element.objects.create(
@@ -141,7 +121,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
             source_type=Element.SOURCE_UPLOADED,
             upload_keys=result['upload_keys'],
             prompt_text=request.data.get('prompt_text', ''),
-            order_index=current_count,
+            order_index=order_index,
             original_filename=request.data.get('filename', ''),
         )
 
@@ -168,6 +148,27 @@ class ProjectViewSet(viewsets.ModelViewSet):
         )
         return Response(data, status=http_status)
 
+    @action(detail=True, methods=['post'], url_path='generate-batch')
+    def generate_batch(self, request, pk=None):
+        """
+        Запустить пакет AI генераций одной моделью на уровне проекта: одно списание,
+        один bulk_create, задачи — одной Celery group.
+
+        POST /api/projects/{id}/generate-batch/
+        """
+        project = self.get_object()
+        serializer = GenerationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        from apps.elements.services import create_generation_batch
+        data, http_status = create_generation_batch(
+            project=project, scene=None,
+            items=serializer.validated_data['items'],
+            ai_model_id=serializer.validated_data['ai_model_id'],
+            generation_config=serializer.validated_data['generation_config'],
+            user=request.user,
+        )
+        return Response(data, status=http_status)
+
     @action(detail=True, methods=['post'])
     def upload(self, request, pk=None):
         """
@@ -197,11 +198,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """
         project = self.get_object()
 
-        total_spent = CreditsTransaction.objects.filter(
-            element__project=project,
-            reason=CreditsTransaction.REASON_GENERATION_DEBIT,
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        total_spent = abs(total_spent)
+        total_spent = (
+            ProjectStorageUsage.objects.filter(project=project).values_list('spent', flat=True).first() or 0
+        )
 
         elements_count = Element.objects.filter(project=project).count()
 
@@ -5,3 +5,6 @@ class ScenesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.scenes'
     verbose_name = 'Группы'
+
+    def ready(self):
+        import apps.scenes.signals  # noqa: F401
@@ -0,0 +1,88 @@
+"""
+Group hierarchy index (closure table, SceneClosure).
+
+Every scene has a (scene, scene, 0) row plus one row per ancestor, so the
+subtree of a scene — scenes, their elements, rollups over them — is a single
+indexed join at any depth instead of a BFS or a parent__parent chain.
+
+Maintained:
+- Scene created / parent changed via save() — signals (scenes/signals.py);
+- QuerySet.update(parent_id=...) paths — move_scenes();
+- deletes — FK CASCADE.
+"""
+from __future__ import annotations
+
+from django.db import transaction
+
+from apps.scenes.models import Scene, SceneClosure
+
+
+def subtree(scene_id: int):
+    """The scene and all its descendants."""
+    return Scene.objects.filter(ancestor_links__ancestor_id=scene_id)
+
+
+def subtree_ids(scene_id: int) -> list[int]:
+    return list(SceneClosure.objects.filter(ancestor_id=scene_id).values_list('descendant_id', flat=True))
+
+
+def link(scene_id: int, parent_id: int | None) -> None:
+    """Rows for a new leaf scene: itself and the parent's ancestors."""
+    rows = [SceneClosure(ancestor_id=scene_id, descendant_id=scene_id, depth=0)]
+    if parent_id is not None:
+        rows.extend(
+            SceneClosure(ancestor_id=ancestor_id, descendant_id=scene_id, depth=depth + 1)
+            for ancestor_id, depth in SceneClosure.objects.filter(
+                descendant_id=parent_id,
+            ).values_list('ancestor_id', 'depth')
+        )
+    SceneClosure.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def relink(scene_id: int, parent_id: int | None) -> None:
+    """
+    The scene moved under another parent: detach its subtree from the old
+    ancestors and attach it to the new ones. Three queries at any depth.
+    """
+    with transaction.atomic():
+        below = list(SceneClosure.objects.filter(ancestor_id=scene_id).values_list('descendant_id', 'depth'))
+        if not below:
+            # Группа без строк (создана bulk_create) — строим заново.
+            link(scene_id, parent_id)
+            below = [(scene_id, 0)]
+        ids = [descendant_id for descendant_id, _ in below]
+        SceneClosure.objects.filter(descendant_id__in=ids).exclude(ancestor_id__in=ids).delete()
+        if parent_id is None:
+            return
+        above = list(SceneClosure.objects.filter(descendant_id=parent_id).values_list('ancestor_id', 'depth'))
+        SceneClosure.objects.bulk_create([
+            SceneClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + 1 + down)
+            for ancestor_id, up in above
+            for descendant_id, down in below
+        ], ignore_conflicts=True)
+
+
+def move_scenes(scenes, parent_id: int | None) -> int:
+    """Re-parent scenes (None — project root) keeping the closure table in step."""
+    with transaction.atomic():
+        ids = list(scenes.exclude(parent_id=parent_id).select_for_update().values_list('id', flat=True))
+        Scene.objects.filter(id__in=ids).update(parent_id=parent_id)
+        for scene_id in ids:
+            relink(scene_id, parent_id)
+    return len(ids)
+
+
+def rebuild(project_id: int | None = None) -> int:
+    """Recompute closure rows from parent pointers. Returns the number of rows written."""
+    scenes = Scene.objects.all() if project_id is None else Scene.objects.filter(project_id=project_id)
+    parents = dict(scenes.values_list('id', 'parent_id'))
+    rows = []
+    for scene_id in parents:
+        ancestor_id, depth = scene_id, 0
+        while ancestor_id is not None and depth <= len(parents):
+            rows.append(SceneClosure(ancestor_id=ancestor_id, descendant_id=scene_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    with transaction.atomic():
+        SceneClosure.objects.filter(descendant_id__in=list(parents)).delete()
+        SceneClosure.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_closure(apps, schema_editor):
+    """Строки замыкания для существующих групп — по цепочкам parent."""
+    Scene = apps.get_model('scenes', 'Scene')
+    SceneClosure = apps.get_model('scenes', 'SceneClosure')
+    parents = dict(Scene.objects.values_list('id', 'parent_id'))
+    rows = []
+    for scene_id in parents:
+        ancestor_id, depth = scene_id, 0
+        while ancestor_id is not None and depth <= len(parents):
+            rows.append(SceneClosure(ancestor_id=ancestor_id, descendant_id=scene_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    SceneClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scenes', '0005_fix_parent_cascade_db_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SceneClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('ancestor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='scenes.scene')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='scenes.scene')),
+            ],
+            options={
+                'verbose_name': 'Связь групп',
+                'verbose_name_plural': 'Иерархия групп',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sceneclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='scene_closure_unique'),
+        ),
+        migrations.RunPython(backfill_closure, migrations.RunPython.noop),
+    ]
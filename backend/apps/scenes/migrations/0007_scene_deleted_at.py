@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scenes', '0006_scene_closure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scene',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, help_text='Удаление поставлено в очередь: группа с подгруппами скрыта, чистит purge_scene_task', null=True, verbose_name='Удаляется с'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:14
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_seq(apps, schema_editor):
+    """Счётчик = текущий максимальный order_index элементов группы."""
+    Scene = apps.get_model('scenes', 'Scene')
+    Element = apps.get_model('elements', 'Element')
+    last = Element.objects.filter(scene=OuterRef('pk')).order_by().values('scene').annotate(
+        last=Max('order_index'),
+    ).values('last')[:1]
+    Scene.objects.update(element_order_seq=Coalesce(Subquery(last), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scenes', '0007_scene_deleted_at'),
+        ('elements', '0018_generation_cost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scene',
+            name='element_order_seq',
+            field=models.IntegerField(default=0, help_text='Счётчик для новых элементов группы (elements/positions.py), без COUNT по группе', verbose_name='Последний order_index элемента'),
+        ),
+        migrations.RunPython(backfill_seq, migrations.RunPython.noop),
+    ]
@@ -47,6 +47,11 @@ class Scene(models.Model):
         default=0,
         verbose_name='Порядковый номер'
     )
+    element_order_seq = models.IntegerField(
+        default=0,
+        verbose_name='Последний order_index элемента',
+        help_text='Счётчик для новых элементов группы (elements/positions.py), без COUNT по группе'
+    )
     headliner = models.ForeignKey(
         'elements.Element',
         on_delete=models.SET_NULL,
@@ -64,6 +69,12 @@ class Scene(models.Model):
         auto_now=True,
         verbose_name='Дата обновления'
     )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Удаляется с',
+        help_text='Удаление поставлено в очередь: группа с подгруппами скрыта, чистит purge_scene_task'
+    )
 
     class Meta:
         ordering = ['order_index', 'created_at']
@@ -80,3 +91,28 @@ class Scene(models.Model):
 
     def __str__(self) -> str:
         return f'{self.name} (Проект: {self.project.name})'
+
+
+class SceneClosure(models.Model):
+    """
+    Замыкание иерархии групп: строка на каждую пару (предок, потомок),
+    включая саму группу (depth=0). Поддерево любой глубины — один запрос
+    по индексу: Scene.objects.filter(ancestor_links__ancestor_id=X).
+    Ведётся в scenes/hierarchy.py.
+    """
+
+    ancestor = models.ForeignKey(
+        Scene, on_delete=models.CASCADE, related_name='descendant_links', db_index=False,
+    )
+    descendant = models.ForeignKey(
+        Scene, on_delete=models.CASCADE, related_name='ancestor_links',
+    )
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Связь групп'
+        verbose_name_plural = 'Иерархия групп'
+        constraints = [
+            # Также индекс для выборки поддерева по ancestor.
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='scene_closure_unique'),
+        ]
@@ -11,6 +11,7 @@ class SceneSerializer(serializers.ModelSerializer):
     headliner_url = serializers.SerializerMethodField()
     headliner_thumbnail_url = serializers.SerializerMethodField()
     headliner_type = serializers.SerializerMethodField()
+    headliner_loop_url = serializers.SerializerMethodField()
     status_display = serializers.SerializerMethodField()
     parent = serializers.PrimaryKeyRelatedField(
         queryset=Scene.objects.all(),
@@ -42,6 +43,7 @@ class SceneSerializer(serializers.ModelSerializer):
             'headliner_url',
             'headliner_thumbnail_url',
             'headliner_type',
+            'headliner_loop_url',
             'elements_count',
             'total_spent',
             'storage_bytes',
@@ -93,6 +95,12 @@ class SceneSerializer(serializers.ModelSerializer):
         if obj.headliner:
             return obj.headliner.element_type
         return ''
+
+    def get_headliner_loop_url(self, obj: Scene) -> str:
+        """Hover-луп видео-хедлайнера (вместо оригинала); '' — лупа нет."""
+        if obj.headliner:
+            return build_element_url(obj.headliner, 'loop', self.context.get('request'))
+        return ''
     
     def get_status_display(self, obj: Scene) -> str:
         """Получение читаемого статуса."""
@@ -134,3 +142,9 @@ class ReorderSerializer(serializers.Serializer):
         child=serializers.IntegerField(),
         help_text='Список ID групп в новом порядке'
     )
+
+
+class RepositionSerializer(serializers.Serializer):
+    """Перемещение одного группы между соседями (null — начало/конец списка)."""
+    after_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+    before_id = serializers.IntegerField(required=False, allow_null=True, default=None)
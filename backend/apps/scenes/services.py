@@ -2,8 +2,13 @@
 Бизнес-логика для работы с сценами.
 """
 from typing import Optional, List
+
+from django.db import transaction
+
+from apps.common.ordering import apply_order, reposition
 from apps.projects.models import Project
 from .models import Scene
+from .hierarchy import move_scenes, subtree, subtree_ids  # noqa: F401 — иерархия групп для других модулей
 
 
 def create_scene(project: Project, name: str, order_index: int = 0) -> Scene:
@@ -53,23 +58,48 @@ def update_scene(
 
 def reorder_scenes(scene_ids: List[int]) -> None:
     """
-    Изменение порядка сцен.
+    Изменение порядка сцен — один UPDATE … CASE (common/ordering.py).
     
     Args:
         scene_ids: Список ID сцен в новом порядке
     """
-    for index, scene_id in enumerate(scene_ids):
-        Scene.objects.filter(id=scene_id).update(order_index=index)
+    from apps.sharing.services import invalidate_share_payloads  # lazy import
+
+    with transaction.atomic():
+        apply_order(Scene.objects.all(), scene_ids)
+        invalidate_share_payloads(*Scene.objects.filter(id__in=scene_ids).values_list('project_id', flat=True).distinct())
+
+
+def reposition_scene(scene: Scene, after_id: Optional[int] = None, before_id: Optional[int] = None) -> int:
+    """
+    Перемещение одной группы между соседями (тот же родитель).
+
+    Returns:
+        Новый order_index
+
+    Raises:
+        LookupError: сосед не найден среди групп того же уровня
+    """
+    siblings = Scene.objects.filter(
+        project_id=scene.project_id, parent_id=scene.parent_id, deleted_at__isnull=True,
+    )
+    from apps.sharing.services import invalidate_share_payloads  # lazy import
+
+    key = reposition(siblings, scene.id, after_id=after_id, before_id=before_id)
+    invalidate_share_payloads(scene.project_id)
+    return key
 
 
 def delete_scene(scene: Scene) -> None:
     """
-    Удаление сцены.
+    Удаление сцены с подгруппами, элементами и файлами — сразу, без пометки
+    (HTTP-удаление идёт через tombstone_scene и фоновую задачу).
     
     Args:
         scene: Объект сцены для удаления
     """
-    scene.delete()
+    from apps.elements.services import purge_scene
+    purge_scene(scene.id)
 
 
 def get_project_scenes(project: Project) -> List[Scene]:
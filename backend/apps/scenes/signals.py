@@ -0,0 +1,22 @@
+"""Scene create / re-parent → hierarchy index (scenes/hierarchy.py)."""
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from apps.scenes import hierarchy
+from apps.scenes.models import Scene
+
+
+@receiver(post_init, sender=Scene)
+def remember_parent(sender, instance, **kwargs):
+    # Отложенное поле (.only()) не трогаем — без снимка relink не нужен.
+    if 'parent_id' in instance.__dict__:
+        instance._closure_parent_id = instance.parent_id
+
+
+@receiver(post_save, sender=Scene)
+def track_scene_save(sender, instance, created, **kwargs):
+    if created:
+        hierarchy.link(instance.id, instance.parent_id)
+    elif instance.parent_id != instance.__dict__.get('_closure_parent_id', instance.parent_id):
+        hierarchy.relink(instance.id, instance.parent_id)
+    instance._closure_parent_id = instance.parent_id
@@ -159,13 +159,17 @@ class SceneAPITest(APITestCase):
         self.assertEqual(response.data['name'], 'Частично обновлена')
         self.assertEqual(response.data['order_index'], 0)
     
-    def test_delete_scene(self):
+    @patch('apps.elements.tasks.purge_scene_task.delay')
+    def test_delete_scene(self, purge_delay):
         self.client.force_authenticate(user=self.user1)
         url = reverse('scene-detail', kwargs={'pk': self.scene2.pk})
-        response = self.client.delete(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(url)
         
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Scene.objects.filter(pk=self.scene2.pk).exists())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIsNotNone(Scene.objects.get(pk=self.scene2.pk).deleted_at)
+        purge_delay.assert_called_once_with(self.scene2.pk)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
     
     def test_delete_other_user_scene(self):
         self.client.force_authenticate(user=self.user1)
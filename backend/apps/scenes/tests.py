@@ -1,8 +1,10 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from apps.common.ordering import ORDER_STEP
 from apps.projects.models import Project
-from .models import Scene
-from .services import create_scene, update_scene, reorder_scenes, delete_scene, get_project_scenes
+from .hierarchy import rebuild
+from .models import Scene, SceneClosure
+from .services import create_scene, update_scene, reorder_scenes, delete_scene, get_project_scenes, move_scenes, subtree_ids
 
 User = get_user_model()
 
@@ -97,9 +99,10 @@ class SceneServiceTest(TestCase):
         scene2.refresh_from_db()
         scene3.refresh_from_db()
         
+        # Разреженные ключи (common/ordering.py)
         self.assertEqual(scene3.order_index, 0)
-        self.assertEqual(scene1.order_index, 1)
-        self.assertEqual(scene2.order_index, 2)
+        self.assertEqual(scene1.order_index, ORDER_STEP)
+        self.assertEqual(scene2.order_index, 2 * ORDER_STEP)
     
     def test_delete_scene_service(self):
         scene = create_scene(project=self.project, name='Сцена для удаления')
@@ -119,3 +122,61 @@ class SceneServiceTest(TestCase):
         self.assertEqual(scenes[0].order_index, 0)
         self.assertEqual(scenes[1].order_index, 1)
         self.assertEqual(scenes[2].order_index, 2)
+
+
+class SceneHierarchyTest(TestCase):
+    """Замыкание иерархии групп (hierarchy.py)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='tree', password='testpass123')
+        self.project = Project.objects.create(user=self.user, name='P')
+        self.root = Scene.objects.create(project=self.project, name='root')
+        self.child = Scene.objects.create(project=self.project, name='child', parent=self.root)
+        self.grandchild = Scene.objects.create(project=self.project, name='grandchild', parent=self.child)
+        self.other = Scene.objects.create(project=self.project, name='other')
+
+    def _links(self):
+        return set(SceneClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+    def test_create_links_every_ancestor(self):
+        self.assertEqual(set(subtree_ids(self.root.id)), {self.root.id, self.child.id, self.grandchild.id})
+        self.assertIn((self.root.id, self.grandchild.id, 2), self._links())
+
+    def test_reparent_moves_whole_subtree(self):
+        self.child.parent = self.other
+        self.child.save()
+        self.assertEqual(set(subtree_ids(self.root.id)), {self.root.id})
+        self.assertIn((self.other.id, self.grandchild.id, 2), self._links())
+
+        move_scenes(Scene.objects.filter(id=self.child.id), None)
+        self.assertEqual(set(subtree_ids(self.other.id)), {self.other.id})
+        self.assertEqual(set(subtree_ids(self.child.id)), {self.child.id, self.grandchild.id})
+
+        expected = self._links()
+        SceneClosure.objects.all().delete()
+        rebuild()
+        self.assertEqual(self._links(), expected)
+
+    def test_delete_cascades_and_group_elements_cover_all_levels(self):
+        from unittest.mock import patch
+
+        from apps.elements.models import Element
+        from apps.elements.tasks import purge_scene_task
+        from rest_framework.test import APIClient
+
+        deep = Element.objects.create(project=self.project, scene=self.grandchild, element_type='IMAGE')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        ids = [e['id'] for e in client.get(f'/api/sharing/group-elements/{self.root.id}/').json()['elements']]
+        self.assertEqual(ids, [deep.id])
+
+        with patch('apps.elements.tasks.purge_scene_task.delay') as purge_delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(f'/api/scenes/{self.root.id}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Scene.objects.filter(deleted_at__isnull=False).count(), 3)
+        self.assertEqual(client.get('/api/elements/', {'project': self.project.id}).json(), [])
+
+        purge_scene_task(*purge_delay.call_args.args)
+        self.assertFalse(Scene.objects.filter(id=self.grandchild.id).exists())
+        self.assertEqual(SceneClosure.objects.count(), 1)  # only «other»
@@ -1,7 +1,7 @@
 import logging
 
-from django.db.models import Count, Q, Sum, Value, DecimalField, BigIntegerField, Subquery, OuterRef, Prefetch
-from django.db.models.functions import Coalesce, Abs
+from django.db.models import Count, F, Q, Sum, Value, DecimalField, BigIntegerField, Subquery, OuterRef, Prefetch
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, permissions, status
 
 logger = logging.getLogger(__name__)
@@ -9,11 +9,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
-from .models import Scene
-from .serializers import SceneSerializer, ReorderSerializer
-from .services import reorder_scenes
-from apps.credits.models import CreditsTransaction
-from apps.elements.models import Element
+from .models import Scene, SceneClosure
+from .serializers import SceneSerializer, ReorderSerializer, RepositionSerializer
+from .services import reorder_scenes, reposition_scene
+from apps.elements.models import Element, SceneStorageUsage
+from apps.elements.serializers import GenerationBatchSerializer
+from apps.elements.services import allocate_order_index
 from apps.common.utils import format_storage
 
 
@@ -33,7 +34,7 @@ class SceneViewSet(viewsets.ModelViewSet):
     retrieve: Получить детали сцены
     update: Обновить сцену (PUT)
     partial_update: Частично обновить сцену (PATCH)
-    destroy: Удалить сцену (CASCADE: удаляет все элементы и дочерние группы)
+    destroy: Удалить сцену (в фоне: все элементы, дочерние группы и файлы)
     """
     serializer_class = SceneSerializer
     permission_classes = [IsAuthenticated, IsProjectOwner]
@@ -42,92 +43,41 @@ class SceneViewSet(viewsets.ModelViewSet):
         """
         Удаление группы со всем содержимым.
 
-        Явно удаляем элементы и дочерние группы, чтобы CASCADE
-        работал надёжно независимо от DB-level constraint.
-        S3 файлы чистятся перед удалением записей из БД.
+        Группа и подгруппы помечаются deleted_at и сразу пропадают из выдачи;
+        записи и файлы S3 удаляет purge_scene_task (elements/deletion.py),
+        прогресс приходит в WebSocket проекта событием deletion_progress.
         """
-        scene = self.get_object()
-        from apps.elements.models import Element
-        from apps.storage.services import delete_file_from_s3
-
-        # Collect all descendant scene IDs (children, grandchildren, etc.)
-        descendant_ids = []
-        queue = list(scene.children.values_list('id', flat=True))
-        while queue:
-            current_id = queue.pop()
-            descendant_ids.append(current_id)
-            child_ids = list(Scene.objects.filter(parent_id=current_id).values_list('id', flat=True))
-            queue.extend(child_ids)
-
-        # Collect all scene IDs (this scene + descendants)
-        all_scene_ids = [scene.id] + descendant_ids
-
-        # Collect S3 file URLs before deletion
-        elements_to_clean = Element.objects.filter(
-            scene_id__in=all_scene_ids
-        ).values_list('file_url', 'thumbnail_url')
-
-        s3_urls = []
-        for file_url, thumbnail_url in elements_to_clean:
-            if file_url:
-                s3_urls.append(file_url)
-            if thumbnail_url:
-                s3_urls.append(thumbnail_url)
-
-        # Delete elements from DB
-        if descendant_ids:
-            Element.objects.filter(scene_id__in=descendant_ids).delete()
-        Element.objects.filter(scene=scene).delete()
-
-        # Delete descendant scenes
-        if descendant_ids:
-            Scene.objects.filter(id__in=descendant_ids).delete()
-
-        # Delete the scene itself
-        scene.delete()
-
-        # Clean up S3 files (best-effort, after DB commit)
-        for url in s3_urls:
-            try:
-                delete_file_from_s3(url)
-            except Exception:
-                logger.warning("Failed to delete S3 file: %s", url)
-
-        return Response(status=status.HTTP_204_NO_CONTENT)
-    
+        from apps.elements.services import tombstone_scene
+
+        tombstone_scene(self.get_object())
+        return Response(status=status.HTTP_202_ACCEPTED)
+
     def get_queryset(self):
         """Возвращает только сцены проектов текущего пользователя с фильтрацией."""
-        # total_spent и storage с учётом вложенных групп (до 3 уровней)
-        descendant_scenes = Q(element__scene=OuterRef('pk')) | Q(element__scene__parent=OuterRef('pk')) | Q(element__scene__parent__parent=OuterRef('pk')) | Q(element__scene__parent__parent__parent=OuterRef('pk'))
-        spent_subquery = Subquery(
-            CreditsTransaction.objects.filter(
-                descendant_scenes,
-                reason=CreditsTransaction.REASON_GENERATION_DEBIT,
-            ).order_by().values(
-                dummy=Value(1)
-            ).annotate(
-                total=Abs(Sum('amount'))
-            ).values('total')[:1],
-            output_field=DecimalField()
-        )
+        # Место и траты — из счётчиков групп (elements/usage.py): сумма по самой
+        # группе и всем подгруппам через замыкание иерархии (scenes/hierarchy.py).
+        def rollup(field, output_field):
+            return Subquery(
+                SceneClosure.objects.filter(
+                    ancestor=OuterRef('pk'),
+                ).order_by().values(
+                    'ancestor'
+                ).annotate(
+                    total=Sum(f'descendant__storage_usage__{field}')
+                ).values('total')[:1],
+                output_field=output_field
+            )
 
-        descendant_elements = Q(scene=OuterRef('pk')) | Q(scene__parent=OuterRef('pk')) | Q(scene__parent__parent=OuterRef('pk')) | Q(scene__parent__parent__parent=OuterRef('pk'))
-        storage_subquery = Subquery(
-            Element.objects.filter(
-                descendant_elements,
-            ).order_by().values(
-                dummy=Value(1)
-            ).annotate(
-                total=Sum('file_size')
-            ).values('total')[:1],
-            output_field=BigIntegerField()
-        )
+        spent_subquery = rollup('spent', DecimalField())
+        storage_subquery = rollup('bytes', BigIntegerField())
 
         queryset = Scene.objects.filter(
-            project__user=self.request.user
+            project__user=self.request.user,
+            deleted_at__isnull=True,
+            project__deleted_at__isnull=True,
         ).annotate(
-            _children_count=Count('children', distinct=True),
-            _elements_count=Count('elements', distinct=True),
+            _children_count=Count('children', filter=Q(children__deleted_at__isnull=True), distinct=True),
+            _elements_count=Coalesce(F('storage_usage__elements_count'), Value(0)),
             _total_spent=Coalesce(spent_subquery, Value(0), output_field=DecimalField()),
             _storage_bytes=Coalesce(storage_subquery, Value(0), output_field=BigIntegerField()),
         ).select_related('project', 'headliner', 'parent').prefetch_related(
@@ -226,10 +176,8 @@ class SceneViewSet(viewsets.ModelViewSet):
             element_type=element_type,
         )
 
-        # Calculate order_index (append to end)
-        current_count = Element.objects.filter(
-            project=scene.project, scene=scene,
-        ).count()
+        # order_index — в конец группы (elements/positions.py)
+        order_index = allocate_order_index(scene.project_id, scene.id)
 
         # Create Element in UPLOADING status
         element = Element.objects.create(
@@ -240,7 +188,7 @@ class SceneViewSet(viewsets.ModelViewSet):
             source_type=Element.SOURCE_UPLOADED,
             upload_keys=result['upload_keys'],
             prompt_text=request.data.get('prompt_text', ''),
-            order_index=current_count,
+            order_index=order_index,
             original_filename=request.data.get('filename', ''),
         )
 
@@ -267,6 +215,27 @@ class SceneViewSet(viewsets.ModelViewSet):
         )
         return Response(data, status=http_status)
 
+    @action(detail=True, methods=['post'], url_path='generate-batch', permission_classes=[IsAuthenticated, IsProjectOwner])
+    def generate_batch(self, request, pk=None):
+        """
+        Запустить пакет AI генераций одной моделью в группе: одно списание,
+        один bulk_create, задачи — одной Celery group.
+
+        POST /api/scenes/{id}/generate-batch/
+        """
+        scene = self.get_object()
+        serializer = GenerationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        from apps.elements.services import create_generation_batch
+        data, http_status = create_generation_batch(
+            project=scene.project, scene=scene,
+            items=serializer.validated_data['items'],
+            ai_model_id=serializer.validated_data['ai_model_id'],
+            generation_config=serializer.validated_data['generation_config'],
+            user=request.user,
+        )
+        return Response(data, status=http_status)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsProjectOwner])
     def set_headliner(self, request, pk=None):
         """
@@ -329,6 +298,29 @@ class SceneViewSet(viewsets.ModelViewSet):
         reorder_scenes(scene_ids)
         return Response({'status': 'ok'})
 
+    @action(detail=True, methods=['post'])
+    def reposition(self, request, pk=None):
+        """
+        Переместить одну группу между соседями того же уровня.
+
+        POST /api/scenes/{id}/reposition/
+
+        Принимает:
+        - after_id: ID группы перед новым местом (null — в начало)
+        - before_id: ID группы после нового места (null — в конец)
+        """
+        scene = self.get_object()
+        serializer = RepositionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            order_index = reposition_scene(scene, **serializer.validated_data)
+        except LookupError:
+            return Response(
+                {'error': 'Соседняя группа не найдена на этом уровне.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'order_index': order_index})
+
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
         """
@@ -338,11 +330,9 @@ class SceneViewSet(viewsets.ModelViewSet):
         """
         scene = self.get_object()
 
-        total_spent = CreditsTransaction.objects.filter(
-            element__scene=scene,
-            reason=CreditsTransaction.REASON_GENERATION_DEBIT,
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        total_spent = abs(total_spent)
+        total_spent = (
+            SceneStorageUsage.objects.filter(scene=scene).values_list('spent', flat=True).first() or 0
+        )
 
         elements_count = Element.objects.filter(scene=scene).count()
 
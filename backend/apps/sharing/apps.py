@@ -5,3 +5,6 @@ class SharingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.sharing'
     verbose_name = 'Публичные ссылки и комментарии'
+
+    def ready(self):
+        import apps.sharing.signals  # noqa: F401
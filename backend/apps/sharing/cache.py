@@ -0,0 +1,85 @@
+"""
+Cache of the public share payload (public_share_view) per SharedLink.token.
+
+Payload entry — key per token and origin (absolute element URLs depend on
+the host), TTL SHARE_PAYLOAD_CACHE_TTL. Every entry carries the version
+stamp of its project (sharing/stamps.py); a write to anything the payload
+shows (elements, groups, comments, reactions, reviews, the link itself)
+replaces the stamp after commit. The stamp doubles as the ETag of the
+response.
+
+Invalidation: sharing/signals.py (model writes) and invalidate() calls on
+QuerySet.update() paths (reorder, move, mark-all-read).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .stamps import ProjectStamp
+
+logger = logging.getLogger(__name__)
+
+STAMP = ProjectStamp('share')
+
+
+class SharePayload(NamedTuple):
+    project_id: int
+    version: str
+    expires_at: datetime | None  # expires_at ссылки — 410 без похода в БД
+    data: dict
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and timezone.now() > self.expires_at
+
+
+def _key(token, origin: str) -> str:
+    return f'sharing:share:{token}:{origin}'
+
+
+def etag(version: str) -> str:
+    return f'"{version}"'
+
+
+def load(token, origin: str) -> SharePayload | None:
+    """Cached payload if its version stamp is still current, else None."""
+    try:
+        entry = cache.get(_key(token, origin))
+        if entry is None or STAMP.get(entry.project_id) != entry.version:
+            return None
+    except Exception:
+        logger.warning("share payload cache unavailable", exc_info=True)
+        return None
+    return entry
+
+
+def current_version(project_id: int) -> str:
+    """Read before building the payload: a write during the build leaves the entry stale."""
+    try:
+        return STAMP.current(project_id)
+    except Exception:
+        logger.warning("share payload cache unavailable", exc_info=True)
+        return ''
+
+
+def store(token, origin: str, entry: SharePayload) -> None:
+    if not entry.version:
+        return
+    try:
+        cache.set(_key(token, origin), entry, settings.SHARE_PAYLOAD_CACHE_TTL)
+    except Exception:
+        logger.warning("share payload cache unavailable", exc_info=True)
+
+
+def invalidate(project_id: int | None) -> None:
+    """
+    Shared links of the project show changed data. The stamp is replaced
+    after commit: a reader that rebuilds from the old rows stores its entry
+    under the stamp that is about to be dropped.
+    """
+    STAMP.invalidate(project_id)
@@ -0,0 +1,142 @@
+"""
+Per-link change log for reviewer resync (GET public/{token}/changes/?since=)
+and fan-out of share events.
+
+Every event for share_{token} groups is first appended to the log of each
+affected link under the next SharedLink.last_change_seq and carries that
+seq. Counters of all links are taken with one UPDATE … RETURNING
+(common/ordering.py::allocate_many) in the same transaction as the log
+rows, so a later seq is never visible before an earlier one. The groups
+get the event after commit, all in one event-loop pass. Affected links come
+from the cached index (sharing/index.py).
+
+A reviewer that reconnects asks for the changes after the last seq it has
+seen; a seq older than the retained log answers reset — reload the page.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.ordering import allocate_many
+from apps.elements.url_helpers import build_element_url
+from . import index
+from .models import SharedLink, ShareChange
+
+logger = logging.getLogger(__name__)
+
+CHANGES_PAGE_SIZE = 500
+
+
+def publish(links, data: dict) -> None:
+    """Append the event to the log of every link [(id, token)] and send it to their groups after commit."""
+    tokens = dict(links)
+    if not tokens:
+        return
+    with transaction.atomic():
+        seqs = allocate_many(SharedLink, list(tokens), 'last_change_seq')
+        ShareChange.objects.bulk_create([
+            ShareChange(shared_link_id=link_id, seq=seq, event_type=data['type'], data=data)
+            for link_id, seq in seqs.items()
+        ])
+    events = [(f'share_{tokens[link_id]}', {**data, 'seq': seq}) for link_id, seq in seqs.items()]
+    transaction.on_commit(lambda: _send(events))
+
+
+def publish_to_element(project_id: int, element_id: int, data: dict) -> None:
+    publish(index.links_for_element(project_id, element_id), data)
+
+
+def publish_to_scene(project_id: int, scene_id: int, data: dict) -> None:
+    publish(index.links_for_scene(project_id, scene_id), data)
+
+
+async def _group_send_all(channel_layer, events) -> list:
+    return await asyncio.gather(
+        *(channel_layer.group_send(group, {'type': data['type'], 'data': data}) for group, data in events),
+        return_exceptions=True,
+    )
+
+
+def _send(events) -> None:
+    try:
+        from channels.layers import get_channel_layer
+        from asgiref.sync import async_to_sync
+
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+        results = async_to_sync(_group_send_all)(channel_layer, events)
+    except Exception as e:
+        logger.warning(f'Failed to broadcast share events: {e}')
+        return
+    failed = [group for (group, _), result in zip(events, results) if isinstance(result, Exception)]
+    if failed:
+        logger.warning("share event not delivered", extra={"groups": failed})
+
+
+def element_event(element) -> dict:
+    """element_updated: status and variant URLs as the share page shows them."""
+    def url(variant):
+        path = build_element_url(element, variant, None)
+        return f'{settings.BACKEND_BASE_URL}{path}' if path else ''
+
+    return {
+        'type': 'element_updated',
+        'element_id': element.id,
+        'status': element.status,
+        'file_url': url('file'),
+        'thumbnail_url': url('thumb'),
+        'preview_url': url('preview'),
+    }
+
+
+def publish_element(project_id: int, element_id: int) -> None:
+    """Status or files of a shared element changed — call after commit."""
+    from apps.elements.models import Element
+
+    links = index.links_for_element(project_id, element_id)
+    if not links:
+        return
+    element = Element.objects.filter(pk=element_id).first()
+    if element is not None:
+        publish(links, element_event(element))
+
+
+def changes_since(link: SharedLink, since: int) -> dict:
+    """
+    Changes after `since`, oldest first, at most CHANGES_PAGE_SIZE.
+
+    reset=True: `since` is older than the retained log (or ahead of it) —
+    the reviewer has to reload the full payload.
+    """
+    last_seq = link.last_change_seq
+    if since > last_seq:
+        return {'changes': [], 'last_seq': last_seq, 'has_more': False, 'reset': True}
+
+    rows = list(
+        link.changes.filter(seq__gt=since).order_by('seq').values_list('seq', 'data')[:CHANGES_PAGE_SIZE + 1]
+    )
+    if since < last_seq and (not rows or rows[0][0] != since + 1):
+        return {'changes': [], 'last_seq': last_seq, 'has_more': False, 'reset': True}
+
+    has_more = len(rows) > CHANGES_PAGE_SIZE
+    rows = rows[:CHANGES_PAGE_SIZE]
+    return {
+        'changes': [{**data, 'seq': seq} for seq, data in rows],
+        'last_seq': rows[-1][0] if rows else since,
+        'has_more': has_more,
+        'reset': False,
+    }
+
+
+def prune(older_than: timedelta | None = None) -> int:
+    """Drop log rows past retention; reviewers further behind get reset."""
+    older_than = older_than or timedelta(days=settings.SHARE_CHANGE_LOG_RETENTION_DAYS)
+    deleted, _ = ShareChange.objects.filter(created_at__lt=timezone.now() - older_than).delete()
+    return deleted
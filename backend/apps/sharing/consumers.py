@@ -13,7 +13,8 @@ class PublicShareConsumer(AsyncJsonWebsocketConsumer):
     """
     Анонимный consumer для ревьюеров на share page.
     Group: share_{token}
-    Events: new_comment, reaction_updated, review_updated
+    Events: new_comment, reaction_updated, review_updated, element_updated
+    (each carries seq of the link's change log — sharing/changes.py)
     """
 
     async def connect(self):
@@ -51,6 +52,10 @@ class PublicShareConsumer(AsyncJsonWebsocketConsumer):
         """Forward review update to all connected reviewers."""
         await self.send_json(event['data'])
 
+    async def element_updated(self, event):
+        """Forward element status/file change to all connected reviewers."""
+        await self.send_json(event['data'])
+
     # --- Helpers ---
 
     @database_sync_to_async
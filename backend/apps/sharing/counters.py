@@ -0,0 +1,121 @@
+"""
+Feedback counters on Element: like_count, dislike_count, comment_count,
+approved_count, changes_requested_count, rejected_count.
+
+The share page, the feedback inbox and the element list show these columns
+instead of counting ElementReaction / ElementReview / Comment rows. They
+change only with F() updates, in the same transaction as the row:
+- created or changed rows — post_save (sharing/signals.py), the old value
+  of an updated reaction/review comes from its post_init snapshot;
+- QuerySet.delete() paths (reaction removal, review toggle-off, guest
+  duplicates) — delete_feedback(), which locks the rows it decrements.
+
+Deleted elements take their rows along by cascade, nothing to decrement.
+Element.save() never writes the columns (Element.F_MANAGED_FIELDS).
+rebuild() — manage.py rebuild_feedback_counters — recounts from the rows.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.elements.models import Element
+
+from .models import Comment, ElementReaction, ElementReview
+
+logger = logging.getLogger(__name__)
+
+REACTION_COUNTERS = {
+    ElementReaction.Value.LIKE: 'like_count',
+    ElementReaction.Value.DISLIKE: 'dislike_count',
+}
+REVIEW_COUNTERS = {
+    ElementReview.Action.APPROVED: 'approved_count',
+    ElementReview.Action.CHANGES_REQUESTED: 'changes_requested_count',
+    ElementReview.Action.REJECTED: 'rejected_count',
+}
+COUNTED_FIELD = {ElementReaction: 'value', ElementReview: 'action'}
+COUNTERS = {ElementReaction: REACTION_COUNTERS, ElementReview: REVIEW_COUNTERS}
+
+
+def _apply(element_id: int, deltas: Counter) -> None:
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        Element.objects.filter(pk=element_id).update(**changes)
+
+
+def feedback_saved(instance, created: bool, old_value=None) -> None:
+    """Reaction or review row inserted, or its value changed from old_value."""
+    counters = COUNTERS[type(instance)]
+    value = getattr(instance, COUNTED_FIELD[type(instance)])
+    if not created and old_value == value:
+        return
+    deltas = Counter()
+    if value in counters:
+        deltas[counters[value]] += 1
+    if not created and old_value in counters:
+        deltas[counters[old_value]] -= 1
+    _apply(instance.element_id, deltas)
+
+
+def comment_saved(comment, created: bool) -> None:
+    if created and comment.element_id and not comment.is_system:
+        _apply(comment.element_id, Counter(comment_count=1))
+
+
+def delete_feedback(queryset) -> int:
+    """QuerySet.delete() of reactions or reviews with their counters decremented."""
+    model = queryset.model
+    counters, field = COUNTERS[model], COUNTED_FIELD[model]
+    with transaction.atomic():
+        # Строки под блокировкой: параллельное удаление тех же строк их уже не увидит
+        rows = list(queryset.select_for_update().values_list('pk', 'element_id', field))
+        if not rows:
+            return 0
+        model.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+        deltas = defaultdict(Counter)
+        for _, element_id, value in rows:
+            if value in counters:
+                deltas[element_id][counters[value]] -= 1
+        for element_id, element_deltas in deltas.items():
+            _apply(element_id, element_deltas)
+    return len(rows)
+
+
+def reaction_counts(element_id: int) -> tuple[int, int]:
+    """(likes, dislikes) of the element from its counters."""
+    return Element.objects.filter(pk=element_id).values_list('like_count', 'dislike_count').first() or (0, 0)
+
+
+def _count(model, **filters):
+    rows = model.objects.filter(element=OuterRef('pk'), **filters).order_by().values('element')
+    return Coalesce(Subquery(rows.annotate(n=Count('pk')).values('n')), Value(0), output_field=IntegerField())
+
+
+def expected_counters() -> dict:
+    """Counter column → subquery counting its rows, for Element querysets."""
+    expected = {'comment_count': _count(Comment, is_system=False)}
+    expected.update({field: _count(ElementReaction, value=value) for value, field in REACTION_COUNTERS.items()})
+    expected.update({field: _count(ElementReview, action=action) for action, field in REVIEW_COUNTERS.items()})
+    return expected
+
+
+def rebuild(elements=None) -> int:
+    """Recount the counters of `elements` (default: all) from rows. Returns the number of repaired elements."""
+    elements = Element.objects.all() if elements is None else elements
+    expected = expected_counters()
+    drift = Q()
+    for field in expected:
+        drift |= ~Q(**{field: F(f'_expected_{field}')})
+    annotated = elements.order_by().annotate(**{f'_expected_{field}': value for field, value in expected.items()})
+    with transaction.atomic():
+        ids = list(annotated.filter(drift).select_for_update(of=('self',)).values_list('pk', flat=True))
+        # Пересчёт под блокировкой строк: F()-записи этих элементов ждут коммита
+        Element.objects.filter(pk__in=ids).update(**expected)
+    if ids:
+        logger.warning("feedback counters drift repaired", extra={"elements": len(ids)})
+    return len(ids)
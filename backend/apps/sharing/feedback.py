@@ -0,0 +1,193 @@
+"""
+Feedback inbox (ReviewsOverlay): link summaries and comment threads.
+
+link_summaries() — per-link and per-element stats for all-feedback/ and
+project-feedback/ in a fixed number of queries, whatever the number of
+links: element ids of all links in one query, likes/dislikes and review
+counts from the Element counters (sharing/counters.py), thread and unread
+counts as grouped aggregates, the worst-wins review per element with
+DISTINCT ON. No comment bodies — threads are loaded for an expanded link
+only (thread_previews) and paged further with ?cursor= on
+elements/{id}/comments/ and links/{id}/comments/.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+
+from .counters import REVIEW_COUNTERS
+from .models import Comment, ElementReview, SharedLink
+from .serializers import CommentSerializer
+
+THREAD_PREVIEW_SIZE = 3
+
+FEEDBACK_COUNTERS = ('like_count', 'dislike_count', 'comment_count', *REVIEW_COUNTERS.values())
+
+# Худшее решение ревьюера побеждает
+REVIEW_RANK = Case(
+    When(action=ElementReview.Action.REJECTED, then=Value(0)),
+    When(action=ElementReview.Action.CHANGES_REQUESTED, then=Value(1)),
+    When(action=ElementReview.Action.APPROVED, then=Value(2)),
+    default=Value(99),
+    output_field=IntegerField(),
+)
+
+
+def _link_element_ids(link_ids) -> dict[int, list[int]]:
+    element_ids = defaultdict(list)
+    rows = SharedLink.elements.through.objects.filter(sharedlink_id__in=link_ids).values_list(
+        'sharedlink_id', 'element_id',
+    )
+    for link_id, element_id in rows:
+        element_ids[link_id].append(element_id)
+    return element_ids
+
+
+def _unread(user) -> Q:
+    return Q(is_read=False) & ~Q(author_user=user)
+
+
+def link_summaries(links, user) -> list[dict]:
+    """Inbox entries for a queryset of links, newest first."""
+    from apps.elements.models import Element
+    from apps.notifications.models import Notification
+
+    links_list = list(links.select_related('project'))
+    if not links_list:
+        return []
+    link_ids = [link.id for link in links_list]
+    link_element_ids = _link_element_ids(link_ids)
+    all_element_ids = {eid for eids in link_element_ids.values() for eid in eids}
+
+    elements = {
+        el.id: el
+        for el in Element.objects.filter(id__in=all_element_ids).only(
+            'id', 'scene_id', 'original_filename', 'thumbnail_url', 'element_type', *FEEDBACK_COUNTERS,
+        )
+    }
+    worst_reviews = {
+        element_id: {'action': action, 'author_name': author_name}
+        for element_id, action, author_name in ElementReview.objects.filter(element_id__in=all_element_ids)
+        .annotate(rank=REVIEW_RANK)
+        .order_by('element_id', 'rank', 'id')
+        .distinct('element_id')
+        .values_list('element_id', 'action', 'author_name')
+    }
+
+    # Треды — только корневые; непрочитанные — включая ответы
+    comment_counts = defaultdict(lambda: {'threads': 0, 'unread': 0})
+    comment_rows = Comment.objects.filter(
+        Q(element_id__in=all_element_ids) | Q(shared_link_id__in=link_ids), is_system=False,
+    ).values('element_id', 'shared_link_id').annotate(
+        threads=Count('id', filter=Q(parent__isnull=True)),
+        unread=Count('id', filter=_unread(user)),
+    )
+    for row in comment_rows:
+        key = ('element', row['element_id']) if row['element_id'] else ('link', row['shared_link_id'])
+        comment_counts[key] = row
+
+    unread_notifications = dict(
+        Notification.objects.filter(
+            user=user, is_read=False,
+            type__in=[Notification.Type.REACTION_NEW, Notification.Type.REVIEW_NEW],
+            element_id__in=all_element_ids,
+        ).values('element_id').annotate(n=Count('id')).values_list('element_id', 'n')
+    )
+
+    def has_feedback(el):
+        return any(getattr(el, field) for field in FEEDBACK_COUNTERS)
+
+    result = []
+    for link in links_list:
+        eids = link_element_ids.get(link.id, [])
+
+        elements_with_feedback = []
+        for eid in eids:
+            el = elements.get(eid)
+            if el is None or not has_feedback(el):
+                continue
+            comments = comment_counts[('element', eid)]
+            elements_with_feedback.append({
+                'id': el.id,
+                'scene_id': el.scene_id,
+                'original_filename': el.original_filename or '',
+                'thumbnail_url': el.thumbnail_url or '',
+                'element_type': el.element_type,
+                'review_summary': worst_reviews.get(eid),
+                'likes': el.like_count,
+                'dislikes': el.dislike_count,
+                'comment_count': comments['threads'],
+                'unread_count': comments['unread'],
+            })
+
+        stats = {
+            action: sum(1 for eid in eids if eid in elements and getattr(elements[eid], field) > 0)
+            for action, field in REVIEW_COUNTERS.items()
+        }
+        stats['total_elements'] = len(eids)
+
+        general = comment_counts[('link', link.id)]
+        if link.is_expired():
+            unread_count = 0
+        else:
+            unread_count = general['unread'] + sum(
+                comment_counts[('element', eid)]['unread'] + unread_notifications.get(eid, 0) for eid in eids
+            )
+
+        result.append({
+            'id': link.id,
+            'name': link.name,
+            'token': str(link.token),
+            'created_at': link.created_at.isoformat(),
+            'expires_at': link.expires_at.isoformat() if link.expires_at else None,
+            'is_expired': link.is_expired(),
+            'unread_count': unread_count,
+            'stats': stats,
+            'elements': elements_with_feedback,
+            'general_comment_count': general['threads'],
+            'project_id': link.project.id,
+            'project_name': link.project.name,
+        })
+    return result
+
+
+def thread_previews(link: SharedLink, pagination) -> dict:
+    """
+    Latest THREAD_PREVIEW_SIZE threads of every element of the link and of
+    the link itself — one windowed query plus replies. next_cursor continues
+    with `pagination` (KeysetPagination by -created_at, -id) on the thread's
+    comments/ endpoint.
+    """
+    element_ids = SharedLink.elements.through.objects.filter(sharedlink=link).values_list('element_id', flat=True)
+    ordering = [F(name.lstrip('-')).desc() if name.startswith('-') else F(name).asc() for name in pagination.ordering]
+    rows = (
+        Comment.objects.filter(
+            Q(element_id__in=element_ids) | Q(shared_link=link), parent__isnull=True, is_system=False,
+        )
+        .annotate(thread_pos=Window(RowNumber(), partition_by=[F('element_id'), F('shared_link_id')], order_by=ordering))
+        .filter(thread_pos__lte=THREAD_PREVIEW_SIZE + 1)
+        .order_by(*pagination.ordering)
+        .prefetch_related('replies')
+    )
+
+    threads = defaultdict(list)
+    for comment in rows:
+        threads[comment.element_id].append(comment)
+
+    def page(comments):
+        shown = comments[:THREAD_PREVIEW_SIZE]
+        has_more = len(comments) > THREAD_PREVIEW_SIZE
+        return {
+            # В треде — от старых к новым, как в comments/
+            'comments': CommentSerializer(shown[::-1], many=True).data,
+            'has_more': has_more,
+            'next_cursor': pagination.encode_cursor(shown[-1]) if has_more else None,
+        }
+
+    general = threads.pop(None, [])
+    return {
+        'elements': {element_id: page(comments) for element_id, comments in threads.items()},
+        'general': page(general),
+    }
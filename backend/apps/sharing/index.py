@@ -0,0 +1,85 @@
+"""
+Element → links and scene → links of a project, cached.
+
+Fan-out of share events (sharing/changes.py) reads the links that show an
+element or a scene from here instead of joining SharedLink.elements on
+every comment, reaction and review. One entry per project, built with one
+query; a scene maps to every link that shares any of its elements.
+
+Each entry carries the project's stamp it was built under
+(sharing/stamps.py). Structural changes — link elements, link deletion,
+element move or deletion — replace the stamp after commit
+(sharing/signals.py, invalidate() on QuerySet.update() paths).
+"""
+from __future__ import annotations
+
+import logging
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import SharedLink
+from .stamps import ProjectStamp
+
+logger = logging.getLogger(__name__)
+
+STAMP = ProjectStamp('links')
+
+Links = list[tuple[int, str]]  # (SharedLink.id, token)
+
+
+class LinkIndex(NamedTuple):
+    version: str
+    elements: dict[int, Links]
+    scenes: dict[int, Links]
+
+
+def _key(project_id: int) -> str:
+    return f'sharing:links:{project_id}'
+
+
+def _build(project_id: int, version: str) -> LinkIndex:
+    elements: dict[int, Links] = {}
+    scenes: dict[int, dict[int, str]] = {}
+    rows = SharedLink.elements.through.objects.filter(sharedlink__project_id=project_id).values_list(
+        'element_id', 'element__scene_id', 'sharedlink_id', 'sharedlink__token',
+    )
+    for element_id, scene_id, link_id, token in rows:
+        elements.setdefault(element_id, []).append((link_id, str(token)))
+        if scene_id is not None:
+            scenes.setdefault(scene_id, {})[link_id] = str(token)
+    return LinkIndex(version, elements, {pk: list(links.items()) for pk, links in scenes.items()})
+
+
+def for_project(project_id: int) -> LinkIndex:
+    try:
+        found = cache.get_many([_key(project_id), STAMP.key(project_id)])
+        version = STAMP.current(project_id, found.get(STAMP.key(project_id)))
+    except Exception:
+        logger.warning("share link index unavailable", exc_info=True)
+        return _build(project_id, '')
+
+    entry = found.get(_key(project_id))
+    if entry is not None and entry.version == version:
+        return entry
+    # Версия прочитана до запроса: изменение во время сборки оставит запись устаревшей
+    entry = _build(project_id, version)
+    try:
+        cache.set(_key(project_id), entry, settings.SHARE_LINK_INDEX_CACHE_TTL)
+    except Exception:
+        logger.warning("share link index unavailable", exc_info=True)
+    return entry
+
+
+def links_for_element(project_id: int, element_id: int) -> Links:
+    return for_project(project_id).elements.get(element_id, [])
+
+
+def links_for_scene(project_id: int, scene_id: int) -> Links:
+    return for_project(project_id).scenes.get(scene_id, [])
+
+
+def invalidate(project_id: int | None) -> None:
+    """Links of the project changed which elements/scenes they show."""
+    STAMP.invalidate(project_id)
@@ -0,0 +1,20 @@
+"""Recount like/dislike/comment/review counters on Element from their rows."""
+
+from django.core.management.base import BaseCommand
+
+from apps.elements.models import Element
+from apps.sharing.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recount Element feedback counters (likes, dislikes, comments, reviews) from rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only elements of this project')
+
+    def handle(self, *args, **options):
+        elements = Element.objects.all()
+        if options['project']:
+            elements = elements.filter(project_id=options['project'])
+        repaired = rebuild(elements)
+        self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} element(s)'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sharing', '0009_add_shared_link_to_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharedlink',
+            name='last_change_seq',
+            field=models.PositiveBigIntegerField(default=0, help_text='Номер последней записи журнала изменений (ShareChange.seq)', verbose_name='Последнее изменение'),
+        ),
+        migrations.CreateModel(
+            name='ShareChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveBigIntegerField()),
+                ('event_type', models.CharField(max_length=32)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('shared_link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='sharing.sharedlink')),
+            ],
+            options={
+                'ordering': ['shared_link', 'seq'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sharechange',
+            constraint=models.UniqueConstraint(fields=('shared_link', 'seq'), name='share_change_link_seq_uniq'),
+        ),
+    ]
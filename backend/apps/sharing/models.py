@@ -1,6 +1,14 @@
 import uuid
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+
+
+class CountedOnElement:
+    """Счётчики Element (sharing/counters.py, post_save) меняются в одной транзакции со строкой."""
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class SharedLink(models.Model):
@@ -44,6 +52,11 @@ class SharedLink(models.Model):
         verbose_name='Срок действия',
         help_text='Если пусто — без срока действия'
     )
+    last_change_seq = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Последнее изменение',
+        help_text='Номер последней записи журнала изменений (ShareChange.seq)'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
@@ -70,7 +83,7 @@ class SharedLink(models.Model):
         return timezone.now() > self.expires_at
 
 
-class Comment(models.Model):
+class Comment(CountedOnElement, models.Model):
     """Комментарий к группе или элементу (единый тред, поддержка ответов)."""
 
     scene = models.ForeignKey(
@@ -131,7 +144,7 @@ class Comment(models.Model):
                 raise ValidationError('Reply must target the same element/scene/link as parent.')
 
 
-class ElementReaction(models.Model):
+class ElementReaction(CountedOnElement, models.Model):
     class Value(models.TextChoices):
         LIKE = 'like', '👍'
         DISLIKE = 'dislike', '👎'
@@ -151,7 +164,7 @@ class ElementReaction(models.Model):
         return f"{self.value} on element {self.element_id} by {self.session_id}"
 
 
-class ElementReview(models.Model):
+class ElementReview(CountedOnElement, models.Model):
     class Action(models.TextChoices):
         APPROVED = 'approved', 'Согласовано'
         CHANGES_REQUESTED = 'changes_requested', 'На доработку'
@@ -171,3 +184,28 @@ class ElementReview(models.Model):
 
     def __str__(self):
         return f"{self.action} on element {self.element_id} by {self.author_name or self.session_id}"
+
+
+class ShareChange(models.Model):
+    """
+    Журнал изменений публичной ссылки: события share_{token} с номером seq,
+    монотонным внутри ссылки. Ревьюер после переподключения забирает только
+    изменения после последнего увиденного seq (sharing/changes.py).
+    """
+
+    shared_link = models.ForeignKey(
+        'sharing.SharedLink', on_delete=models.CASCADE, related_name='changes'
+    )
+    seq = models.PositiveBigIntegerField()
+    event_type = models.CharField(max_length=32)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['shared_link', 'seq']
+        constraints = [
+            models.UniqueConstraint(fields=['shared_link', 'seq'], name='share_change_link_seq_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.seq} on link {self.shared_link_id}"
@@ -1,7 +1,11 @@
 from datetime import timedelta
 
+from django.db import transaction
 from django.utils import timezone
 
+from . import cache as share_cache
+from . import changes
+from . import index as share_index
 from .models import SharedLink
 
 
@@ -14,3 +18,21 @@ def create_shared_link(project, created_by, element_ids, name='', expires_in_day
     )
     link.elements.set(element_ids)
     return link
+
+
+def invalidate_share_payloads(*project_ids):
+    """Cached share pages of these projects are stale — for QuerySet.update() paths (reorder, move)."""
+    for project_id in set(project_ids):
+        share_cache.invalidate(project_id)
+
+
+def shared_element_updated(project_id, element_id):
+    """Status or files of an element changed via QuerySet.update() — Element.save() goes through signals.py."""
+    share_cache.invalidate(project_id)
+    transaction.on_commit(lambda: changes.publish_element(project_id, element_id))
+
+
+def invalidate_share_index(*project_ids):
+    """Elements of these projects changed scene via QuerySet.update() — scene → links index is stale."""
+    for project_id in set(project_ids):
+        share_index.invalidate(project_id)
@@ -0,0 +1,122 @@
+"""
+Writes to anything the public share page shows → share payload cache (sharing/cache.py);
+status/file changes of elements → change log of their links (sharing/changes.py);
+link elements, link/element deletion, element scene change → link index
+(sharing/index.py); new comments, new or changed reactions/reviews →
+feedback counters on Element (sharing/counters.py).
+
+Comments, reactions and reviews — post_save only: a post_delete receiver
+would turn their cascade deletes into per-row deletes. Cascades are
+covered by the Element/Scene delete; direct deletes call invalidate() and
+counters.delete_feedback().
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from apps.elements.models import Element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+
+from . import cache as share_cache
+from . import changes
+from . import counters
+from . import index as share_index
+from .models import Comment, ElementReaction, ElementReview, SharedLink
+
+
+def _project_of(element_id=None, scene_id=None, link_id=None):
+    if element_id:
+        model, pk = Element, element_id
+    elif scene_id:
+        model, pk = Scene, scene_id
+    else:
+        model, pk = SharedLink, link_id
+    return model.objects.filter(pk=pk).values_list('project_id', flat=True).first()
+
+
+SHARED_FIELDS = ('status', 'file_url', 'thumbnail_url', 'preview_url')
+
+
+def _shared_state(instance):
+    # Только загруженные поля — без запросов за отложенными (.only())
+    return tuple(instance.__dict__.get(field) for field in SHARED_FIELDS)
+
+
+@receiver(post_init, sender=Element)
+def remember_shared_state(sender, instance, **kwargs):
+    instance._shared_state = _shared_state(instance)
+    instance._shared_scene_id = instance.__dict__.get('scene_id')
+
+
+@receiver(post_save, sender=Element)
+def invalidate_on_element_save(sender, instance, created, **kwargs):
+    # Новый элемент ещё не входит ни в одну ссылку
+    if created:
+        return
+    share_cache.invalidate(instance.project_id)
+    if instance.scene_id != getattr(instance, '_shared_scene_id', instance.scene_id):
+        share_index.invalidate(instance.project_id)
+    instance._shared_scene_id = instance.scene_id
+    state = _shared_state(instance)
+    if state != getattr(instance, '_shared_state', state):
+        project_id, element_id = instance.project_id, instance.id
+        transaction.on_commit(lambda: changes.publish_element(project_id, element_id))
+    instance._shared_state = state
+
+
+@receiver(post_delete, sender=Element)
+@receiver(post_delete, sender=SharedLink)
+def invalidate_index_on_delete(sender, instance, **kwargs):
+    share_index.invalidate(instance.project_id)
+
+
+@receiver(post_delete, sender=Element)
+@receiver(post_save, sender=Scene)
+@receiver(post_delete, sender=Scene)
+@receiver(post_save, sender=SharedLink)
+@receiver(post_delete, sender=SharedLink)
+def invalidate_on_project_child(sender, instance, **kwargs):
+    share_cache.invalidate(instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+def invalidate_on_project_save(sender, instance, **kwargs):
+    share_cache.invalidate(instance.id)
+
+
+@receiver(m2m_changed, sender=SharedLink.elements.through)
+def invalidate_on_link_elements(sender, instance, action, reverse, **kwargs):
+    if action.startswith('post_'):
+        # reverse: element.shared_links — проект у самого элемента
+        share_cache.invalidate(instance.project_id)
+        share_index.invalidate(instance.project_id)
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_on_comment(sender, instance, **kwargs):
+    share_cache.invalidate(_project_of(instance.element_id, instance.scene_id, instance.shared_link_id))
+
+
+@receiver(post_save, sender=ElementReaction)
+@receiver(post_save, sender=ElementReview)
+def invalidate_on_feedback(sender, instance, **kwargs):
+    share_cache.invalidate(_project_of(element_id=instance.element_id))
+
+
+@receiver(post_init, sender=ElementReaction)
+@receiver(post_init, sender=ElementReview)
+def remember_counted_value(sender, instance, **kwargs):
+    instance._counted_value = instance.__dict__.get(counters.COUNTED_FIELD[sender])
+
+
+@receiver(post_save, sender=ElementReaction)
+@receiver(post_save, sender=ElementReview)
+def count_feedback(sender, instance, created, **kwargs):
+    counters.feedback_saved(instance, created, getattr(instance, '_counted_value', None))
+    instance._counted_value = getattr(instance, counters.COUNTED_FIELD[sender])
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    counters.comment_saved(instance, created)
@@ -0,0 +1,54 @@
+"""
+Per-project version stamps of cached sharing data (sharing/cache.py,
+sharing/index.py).
+
+Every cached entry carries the stamp of its project it was built under; a
+write replaces the stamp after commit (invalidate()), so stale entries are
+never served and are simply overwritten. Readers take the stamp before
+building: a write during the build leaves the new entry stale, not wrongly
+current. Stamps have no TTL.
+"""
+from __future__ import annotations
+
+import logging
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectStamp:
+    """Stamps of one kind of entry: sharing:<namespace>:version:<project_id>."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    def key(self, project_id: int) -> str:
+        return f'sharing:{self.namespace}:version:{project_id}'
+
+    def get(self, project_id: int) -> str | None:
+        return cache.get(self.key(project_id))
+
+    def current(self, project_id: int, stored: str | None = None) -> str:
+        """Stamp to build under, created if the project has none yet. stored — already read with the entry."""
+        if stored is None:
+            cache.add(self.key(project_id), uuid4().hex, None)
+            stored = cache.get(self.key(project_id))
+        return stored or ''
+
+    def _bump(self, project_id: int) -> None:
+        try:
+            cache.set(self.key(project_id), uuid4().hex, None)
+        except Exception:
+            logger.warning(
+                "sharing stamp bump failed",
+                extra={"stamp": self.namespace, "project_id": project_id},
+                exc_info=True,
+            )
+
+    def invalidate(self, project_id: int | None) -> None:
+        """Entries of the project are stale once the surrounding transaction commits."""
+        if project_id is not None:
+            transaction.on_commit(lambda: self._bump(project_id))
@@ -0,0 +1,16 @@
+import logging
+
+from celery import shared_task
+
+from .changes import prune
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def prune_share_changes() -> int:
+    """Beat: drop change log rows past SHARE_CHANGE_LOG_RETENTION_DAYS."""
+    deleted = prune()
+    if deleted:
+        logger.info("share change log pruned", extra={"deleted": deleted})
+    return deleted
@@ -0,0 +1,105 @@
+"""Per-link change log and GET public/{token}/changes/?since= resync."""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.elements.generation import complete_generation, finalize_generation_failure
+from apps.elements.models import Element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+from apps.sharing.changes import prune
+from apps.sharing.models import ShareChange, SharedLink
+
+User = get_user_model()
+
+
+@override_settings(BACKEND_BASE_URL='https://api.example.com')
+class ShareChangeLogTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='log_owner', password='pass123')
+        self.project = Project.objects.create(user=self.owner, name='Log')
+        self.scene = Scene.objects.create(project=self.project, name='Scene 1')
+        self.element = Element.objects.create(
+            project=self.project, scene=self.scene, element_type='IMAGE', status='PROCESSING',
+        )
+        self.link = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        self.link.elements.add(self.element)
+        self.other = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        self.url = f'/api/sharing/public/{self.link.token}/'
+        self.client = APIClient()
+        # Анонимные throttle-счётчики живут в том же кэше
+        self.addCleanup(cache.clear)
+
+    def changes(self, since):
+        return self.client.get(f'{self.url}changes/', {'since': since}).json()
+
+    def feedback(self):
+        self.client.post(f'{self.url}comments/', {
+            'text': 'Nice', 'author_name': 'Rev', 'session_id': 's1', 'element_id': self.element.id,
+        }, format='json')
+        self.client.post(f'{self.url}reactions/', {
+            'element_id': self.element.id, 'session_id': 's1', 'value': 'like',
+        }, format='json')
+        self.client.post(f'{self.url}review/', {
+            'element_id': self.element.id, 'session_id': 's1', 'action': 'approved', 'author_name': 'Rev',
+        }, format='json')
+
+    def test_returns_only_changes_after_since(self):
+        self.assertEqual(self.client.get(self.url).json()['change_seq'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.feedback()
+
+        full = self.changes(0)
+        self.assertEqual([c['type'] for c in full['changes']], ['new_comment', 'reaction_updated', 'review_updated'])
+        self.assertEqual([c['seq'] for c in full['changes']], [1, 2, 3])
+        self.assertEqual((full['last_seq'], full['reset']), (3, False))
+
+        tail = self.changes(2)
+        self.assertEqual([c['type'] for c in tail['changes']], ['review_updated'])
+        self.assertEqual(self.changes(3)['changes'], [])
+        # Соседняя ссылка того же проекта элемент не показывает
+        self.assertFalse(ShareChange.objects.filter(shared_link=self.other).exists())
+        self.assertEqual(self.client.get(self.url).json()['change_seq'], 3)
+
+    def test_element_status_change_is_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.element.status = 'COMPLETED'
+            self.element.thumbnail_url = 'https://cdn.example.com/t.jpg'
+            self.element.save()
+            self.element.save()  # без изменений — новой записи нет
+
+        [change] = self.changes(0)['changes']
+        self.assertEqual(change['type'], 'element_updated')
+        self.assertEqual(change['status'], 'COMPLETED')
+        self.assertEqual(change['thumbnail_url'], f'https://api.example.com/elements/{self.element.id}/thumb/')
+
+    def test_generation_transitions_are_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            complete_generation(self.element.id, {'thumbnail_url': 'https://cdn.example.com/t.jpg'})
+        other = Element.objects.create(
+            project=self.project, scene=self.scene, element_type='IMAGE', status='PROCESSING',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.elements.add(other)
+        with self.captureOnCommitCallbacks(execute=True):
+            finalize_generation_failure(other.id, 'Provider error')
+
+        changes = self.changes(0)['changes']
+        self.assertEqual(
+            [(c['element_id'], c['status']) for c in changes],
+            [(self.element.id, 'COMPLETED'), (other.id, 'FAILED')],
+        )
+        self.assertEqual(changes[0]['thumbnail_url'], f'https://api.example.com/elements/{self.element.id}/thumb/')
+
+    def test_pruned_or_unknown_seq_asks_for_reset(self):
+        self.feedback()
+        ShareChange.objects.filter(seq=1).update(created_at=ShareChange.objects.get(seq=1).created_at - timedelta(days=30))
+        self.assertEqual(prune(), 1)
+
+        self.assertTrue(self.changes(0)['reset'])
+        self.assertFalse(self.changes(1)['reset'])
+        self.assertTrue(self.changes(10)['reset'])
+        self.assertEqual(self.client.get(f'{self.url}changes/', {'since': 'x'}).status_code, 400)
@@ -0,0 +1,106 @@
+"""Feedback counters on Element: F() updates on write paths and rebuild_feedback_counters."""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.elements.models import Element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+from apps.sharing.models import Comment, ElementReaction, ElementReview, SharedLink
+
+User = get_user_model()
+
+COUNTERS = (
+    'like_count', 'dislike_count', 'comment_count', 'approved_count', 'changes_requested_count', 'rejected_count',
+)
+
+
+class FeedbackCountersTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='counter_owner', password='pass123')
+        self.project = Project.objects.create(user=self.owner, name='Counters')
+        self.scene = Scene.objects.create(project=self.project, name='Scene 1')
+        self.element = Element.objects.create(project=self.project, scene=self.scene, element_type='IMAGE')
+        self.link = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        self.link.elements.add(self.element)
+        self.url = f'/api/sharing/public/{self.link.token}/'
+        self.client = APIClient()
+        # Анонимные throttle-счётчики живут в том же кэше
+        self.addCleanup(cache.clear)
+
+    def counters(self):
+        return Element.objects.filter(pk=self.element.pk).values(*COUNTERS).get()
+
+    def react(self, value, session_id='s1', author_name=''):
+        return self.client.post(f'{self.url}reactions/', {
+            'element_id': self.element.id, 'session_id': session_id, 'value': value, 'author_name': author_name,
+        }, format='json')
+
+    def review(self, action, session_id='s1', author_name='Rev'):
+        return self.client.post(f'{self.url}review/', {
+            'element_id': self.element.id, 'session_id': session_id, 'action': action, 'author_name': author_name,
+        }, format='json')
+
+    def test_reactions_move_between_counters(self):
+        self.assertEqual(self.react('like').json()['likes'], 1)
+        self.react('like', session_id='s2')
+        response = self.react('dislike').json()
+        self.assertEqual((response['likes'], response['dislikes']), (1, 1))
+        self.react(None, session_id='s2')
+        self.assertEqual((self.counters()['like_count'], self.counters()['dislike_count']), (0, 1))
+
+        # Гость вошёл: дубль гостевой сессии удаляется и вычитается
+        self.react('like', session_id='user_1')
+        self.assertEqual((self.counters()['like_count'], self.counters()['dislike_count']), (1, 0))
+
+    def test_reviews_move_between_counters(self):
+        self.review('approved')
+        self.review('rejected', session_id='s2', author_name='Other')
+        self.review('changes_requested')
+        counts = self.counters()
+        self.assertEqual(
+            (counts['approved_count'], counts['changes_requested_count'], counts['rejected_count']), (0, 1, 1),
+        )
+        self.review('rejected', session_id='s2', author_name='Other')  # повтор — снять решение
+        self.assertEqual(self.counters()['rejected_count'], 0)
+
+    def test_comments_counted_without_system(self):
+        response = self.client.post(f'{self.url}comments/', {
+            'text': 'Hi', 'author_name': 'Rev', 'session_id': 's1', 'element_id': self.element.id,
+        }, format='json')
+        self.client.post(f'{self.url}comments/', {
+            'text': 'Re', 'author_name': 'Rev', 'session_id': 's1', 'element_id': self.element.id,
+            'parent_id': response.json()['id'],
+        }, format='json')
+        Comment.objects.create(element=self.element, author_name='System', text='Auto', is_system=True)
+        self.assertEqual(self.counters()['comment_count'], 2)
+
+        self.client.force_authenticate(self.owner)
+        [listed] = self.client.get('/api/elements/', {'scene': self.scene.id}).json()
+        self.assertEqual(listed['comment_count'], 2)
+
+    def test_stale_save_keeps_counters(self):
+        stale = Element.objects.get(pk=self.element.pk)
+        ElementReaction.objects.create(element=self.element, session_id='s1', value='like')
+        stale.original_filename = 'renamed.png'
+        stale.save()
+        self.assertEqual(self.counters()['like_count'], 1)
+
+    def test_rebuild_repairs_drift(self):
+        ElementReaction.objects.create(element=self.element, session_id='s1', value='like')
+        ElementReview.objects.create(element=self.element, session_id='s1', action='approved')
+        Element.objects.filter(pk=self.element.pk).update(like_count=7, approved_count=0, comment_count=-1)
+
+        out = StringIO()
+        call_command('rebuild_feedback_counters', project=self.project.id, stdout=out)
+        self.assertIn('Repaired 1', out.getvalue())
+        self.assertEqual(self.counters(), {
+            'like_count': 1, 'dislike_count': 0, 'comment_count': 0,
+            'approved_count': 1, 'changes_requested_count': 0, 'rejected_count': 0,
+        })
+        call_command('rebuild_feedback_counters', stdout=out)
+        self.assertIn('Repaired 0', out.getvalue())
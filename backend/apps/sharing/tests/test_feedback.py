@@ -0,0 +1,113 @@
+"""Feedback inbox: grouped link summaries and paged comment threads."""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.elements.deletion import tombstone_project
+from apps.elements.models import Element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+from apps.sharing.models import Comment, ElementReaction, ElementReview, SharedLink
+
+User = get_user_model()
+
+
+class FeedbackInboxTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='inbox_owner', password='pass123')
+        self.project = Project.objects.create(user=self.owner, name='Inbox')
+        self.scene = Scene.objects.create(project=self.project, name='Scene 1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def add_link(self, with_feedback=True):
+        element = Element.objects.create(project=self.project, scene=self.scene, element_type='IMAGE')
+        link = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        link.elements.add(element)
+        if with_feedback:
+            Comment.objects.create(element=element, author_name='G', session_id='s1', text='Hi')
+            ElementReaction.objects.create(element=element, session_id='s1', value='like')
+            ElementReview.objects.create(element=element, session_id='s1', action='approved')
+        return link, element
+
+    def feedback_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/sharing/all-feedback/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_links(self):
+        for _ in range(2):
+            self.add_link()
+        baseline = self.feedback_queries()
+        for _ in range(4):
+            self.add_link()
+        self.assertEqual(self.feedback_queries(), baseline)
+
+    def test_element_stats_and_worst_review(self):
+        link, element = self.add_link(with_feedback=False)
+        self.add_link(with_feedback=False)
+        ElementReaction.objects.create(element=element, session_id='a', value='like')
+        ElementReaction.objects.create(element=element, session_id='b', value='dislike')
+        ElementReview.objects.create(element=element, session_id='a', author_name='A', action='approved')
+        ElementReview.objects.create(element=element, session_id='b', author_name='B', action='changes_requested')
+        Comment.objects.create(element=element, author_name='G', session_id='a', text='One')
+        Comment.objects.create(element=element, author_name='Me', author_user=self.owner, text='Mine')
+
+        data = self.client.get(f'/api/sharing/project-feedback/{self.project.id}/').data
+        entry = next(l for l in data['links'] if l['id'] == link.id)
+        [el] = entry['elements']
+        self.assertEqual((el['likes'], el['dislikes']), (1, 1))
+        self.assertEqual(el['review_summary'], {'action': 'changes_requested', 'author_name': 'B'})
+        self.assertEqual((el['comment_count'], el['unread_count']), (2, 1))
+        self.assertNotIn('comments', el)
+        self.assertEqual(entry['stats'], {
+            'approved': 1, 'changes_requested': 1, 'rejected': 0, 'total_elements': 1,
+        })
+        self.assertEqual(entry['unread_count'], 1)
+
+    def test_thread_preview_pages_into_comments_endpoint(self):
+        link, element = self.add_link(with_feedback=False)
+        comments = [
+            Comment.objects.create(element=element, author_name='G', session_id='s1', text=f'c{i}')
+            for i in range(5)
+        ]
+        Comment.objects.create(element=element, parent=comments[-1], author_name='G', session_id='s1', text='re')
+        Comment.objects.create(shared_link=link, author_name='G', session_id='s1', text='general')
+
+        threads = self.client.get(f'/api/sharing/links/{link.id}/threads/').json()
+        preview = threads['elements'][str(element.id)]
+        self.assertEqual([c['text'] for c in preview['comments']], ['c2', 'c3', 'c4'])
+        self.assertEqual(len(preview['comments'][-1]['replies']), 1)
+        self.assertTrue(preview['has_more'])
+        self.assertEqual([c['text'] for c in threads['general']['comments']], ['general'])
+        self.assertFalse(threads['general']['has_more'])
+
+        older = self.client.get(
+            f'/api/sharing/elements/{element.id}/comments/', {'cursor': preview['next_cursor']},
+        ).json()
+        self.assertEqual([c['text'] for c in older['results']], ['c1', 'c0'])
+        self.assertFalse(older['has_more'])
+        # Без ?cursor= — тред целиком, как раньше
+        self.assertEqual(len(self.client.get(f'/api/sharing/elements/{element.id}/comments/').json()), 5)
+
+    def test_threads_of_foreign_link_are_hidden(self):
+        link, _ = self.add_link()
+        other = User.objects.create_user(username='inbox_other', password='pass123')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(f'/api/sharing/links/{link.id}/threads/').status_code, 404)
+
+    @patch('apps.elements.tasks.purge_project_task.delay')
+    def test_tombstoned_project_leaves_inbox(self, _purge):
+        link, _ = self.add_link()
+        self.assertEqual(len(self.client.get('/api/sharing/all-feedback/').json()['links']), 1)
+
+        tombstone_project(self.project)
+
+        self.assertEqual(self.client.get('/api/sharing/all-feedback/').json()['links'], [])
+        self.assertEqual(self.client.get(f'/api/sharing/links/{link.id}/threads/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/sharing/links/{link.id}/comments/').status_code, 404)
@@ -0,0 +1,75 @@
+"""Cached element → links / scene → links index and batched share event fan-out."""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.elements.models import Element
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+from apps.sharing import index
+from apps.sharing.changes import publish_to_element
+from apps.sharing.models import ShareChange, SharedLink
+
+User = get_user_model()
+
+
+class ShareLinkIndexTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='index_owner', password='pass123')
+        self.project = Project.objects.create(user=self.owner, name='Index')
+        self.scene = Scene.objects.create(project=self.project, name='Scene 1')
+        self.first, self.second = [
+            Element.objects.create(project=self.project, scene=self.scene, element_type='IMAGE', order_index=i)
+            for i in range(2)
+        ]
+        self.link = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        self.link.elements.add(self.second)
+        self.other = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        self.client = APIClient()
+        # Анонимные throttle-счётчики живут в том же кэше
+        self.addCleanup(cache.clear)
+
+    def test_repeated_lookups_skip_database(self):
+        entry = (self.link.id, str(self.link.token))
+        self.assertEqual(index.links_for_element(self.project.id, self.second.id), [entry])
+        with self.assertNumQueries(0):
+            self.assertEqual(index.links_for_element(self.project.id, self.second.id), [entry])
+            self.assertEqual(index.links_for_element(self.project.id, self.first.id), [])
+            self.assertEqual(index.links_for_scene(self.project.id, self.scene.id), [entry])
+
+    def test_link_elements_change_invalidates(self):
+        self.assertEqual(index.links_for_element(self.project.id, self.first.id), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.elements.add(self.first)
+        self.assertEqual(
+            index.links_for_element(self.project.id, self.first.id), [(self.other.id, str(self.other.token))],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.shared_links.remove(self.link)
+        self.assertEqual(index.links_for_element(self.project.id, self.second.id), [])
+
+    def test_scene_comment_reaches_link_without_first_element(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/sharing/public/{self.link.token}/comments/', {
+                'text': 'Scene', 'author_name': 'Rev', 'session_id': 's1', 'scene_id': self.scene.id,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(ShareChange.objects.values_list('shared_link_id', 'event_type')),
+            [(self.link.id, 'new_comment')],
+        )
+
+    def test_one_publish_logs_every_link(self):
+        self.other.elements.add(self.second)
+        self.link.last_change_seq = 4
+        self.link.save(update_fields=['last_change_seq'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_to_element(self.project.id, self.second.id, {'type': 'reaction_updated', 'likes': 1})
+
+        self.assertEqual(
+            sorted(ShareChange.objects.values_list('shared_link_id', 'seq')),
+            sorted([(self.link.id, 5), (self.other.id, 1)]),
+        )
@@ -0,0 +1,109 @@
+"""Cached public share payload: version stamp, ETag/If-None-Match, event-driven invalidation."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.elements.deletion import tombstone_project, tombstone_scene
+from apps.elements.generation import complete_generation
+from apps.elements.models import Element
+from apps.elements.services import reorder_elements
+from apps.projects.models import Project
+from apps.scenes.models import Scene
+from apps.sharing.models import ElementReaction, SharedLink
+
+User = get_user_model()
+
+
+class SharePayloadCacheTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='cache_owner', password='pass123')
+        self.project = Project.objects.create(user=self.owner, name='Cached')
+        self.scene = Scene.objects.create(project=self.project, name='Scene 1')
+        self.elements = [
+            Element.objects.create(project=self.project, scene=self.scene, element_type='IMAGE', order_index=i)
+            for i in range(2)
+        ]
+        self.link = SharedLink.objects.create(project=self.project, created_by=self.owner)
+        self.link.elements.set(self.elements)
+        self.url = f'/api/sharing/public/{self.link.token}/'
+        self.client = APIClient()
+        # Анонимные throttle-счётчики живут в том же кэше
+        self.addCleanup(cache.clear)
+
+    def load(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def test_repeated_load_skips_database_and_honours_etag(self):
+        first = self.load()
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with self.assertNumQueries(0):
+            second = self.load()
+            not_modified = self.load(if_none_match=etag)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_comment_and_reaction_writes_bump_version(self):
+        etag = self.load()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{self.url}comments/', {
+                'text': 'Nice', 'author_name': 'Rev', 'session_id': 's1', 'element_id': self.elements[0].id,
+            }, format='json')
+        response = self.load(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['scenes'][0]['elements'][0]['comment_count'], 1)
+
+        ElementReaction.objects.create(element=self.elements[0], session_id='s1', value='like')
+        etag = self.load()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{self.url}reactions/', {
+                'element_id': self.elements[0].id, 'session_id': 's1', 'value': None,
+            }, format='json')
+        self.assertEqual(self.load(if_none_match=etag).json()['scenes'][0]['elements'][0]['likes'], 0)
+
+    def test_element_reorder_and_link_expiry_invalidate(self):
+        self.load()
+        with self.captureOnCommitCallbacks(execute=True):
+            reorder_elements([self.elements[1].id, self.elements[0].id])
+        ids = [e['id'] for e in self.load().json()['scenes'][0]['elements']]
+        self.assertEqual(ids, [self.elements[1].id, self.elements[0].id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.expires_at = timezone.now() - timedelta(minutes=1)
+            self.link.save()
+        self.assertEqual(self.load().status_code, 410)
+
+    def test_generation_completed_by_queryset_update_invalidates(self):
+        Element.objects.filter(pk=self.elements[0].pk).update(status=Element.STATUS_PROCESSING)
+        self.assertEqual(self.load().json()['scenes'][0]['elements'][0]['thumbnail_url'], '')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            complete_generation(self.elements[0].id, {'thumbnail_url': 'https://cdn.example.com/t.jpg'})
+        thumbnail_url = self.load().json()['scenes'][0]['elements'][0]['thumbnail_url']
+        self.assertTrue(thumbnail_url.endswith(f'/elements/{self.elements[0].id}/thumb/'))
+
+    @patch('apps.elements.tasks.purge_scene_task.delay')
+    @patch('apps.elements.tasks.purge_project_task.delay')
+    def test_tombstoned_scene_and_project_leave_cached_page(self, _purge_project, _purge_scene):
+        other = Scene.objects.create(project=self.project, name='Scene 2')
+        self.link.elements.add(
+            Element.objects.create(project=self.project, scene=other, element_type='IMAGE', order_index=0),
+        )
+        self.assertEqual(len(self.load().json()['scenes']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_scene(other)
+        self.assertEqual([s['id'] for s in self.load().json()['scenes']], [self.scene.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tombstone_project(self.project)
+        self.assertEqual(self.load().status_code, 404)
+        self.assertEqual(self.client.get(f'{self.url}changes/').status_code, 404)
@@ -807,12 +807,14 @@ class ProjectFeedbackTest(SharingViewTestBase):
         self.assertGreaterEqual(len(link_data['elements']), 1)
 
     def test_includes_general_comments(self):
-        """Returns general comments for each link."""
+        """Counts general comments per link; bodies come from links/{id}/threads/."""
         self.client.force_authenticate(self.owner)
         Comment.objects.create(shared_link=self.link, author_name='G', session_id='x', text='General')
         response = self.client.get(f'/api/sharing/project-feedback/{self.project.id}/')
         link_data = response.data['links'][0]
-        self.assertEqual(len(link_data['general_comments']), 1)
+        self.assertEqual(link_data['general_comment_count'], 1)
+        threads = self.client.get(f'/api/sharing/links/{self.link.id}/threads/').data
+        self.assertEqual(len(threads['general']['comments']), 1)
 
     def test_unread_count(self):
         """Unread count should reflect unread comments."""
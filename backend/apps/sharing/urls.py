@@ -8,6 +8,7 @@ router.register(r'links', views.SharedLinkViewSet, basename='shared-link')
 urlpatterns = [
     path('', include(router.urls)),
     path('public/<uuid:token>/', views.public_share_view),
+    path('public/<uuid:token>/changes/', views.public_changes_view, name='public-changes'),
     path('public/<uuid:token>/comments/', views.public_comment_view),
     path('public/<uuid:token>/reactions/', views.public_reaction_view),
     path('public/<uuid:token>/review/', views.public_review_action, name='public-review'),
@@ -16,6 +17,7 @@ urlpatterns = [
     path('elements/<int:element_id>/reviews/', views.element_reviews_view),
     path('scenes/<int:scene_id>/comments/', views.scene_comments_view),
     path('links/<int:link_id>/comments/', views.link_comments_view, name='link-comments'),
+    path('links/<int:link_id>/threads/', views.link_threads_view, name='link-threads'),
     path('comments/<int:comment_id>/read/', views.mark_comment_read),
     path('comments/read-all/', views.mark_all_comments_read),
     path('all-feedback/', views.all_feedback_view, name='all-feedback'),
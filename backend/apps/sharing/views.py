@@ -1,7 +1,7 @@
 import logging
 
 from django.core.exceptions import ValidationError
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.utils.html import strip_tags
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
@@ -10,7 +10,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 
+from apps.common.pagination import KeysetPagination
 from apps.elements.url_helpers import build_element_url
+from . import cache as share_cache
+from . import counters
+from . import feedback
+from .changes import changes_since, publish, publish_to_element, publish_to_scene
 from .models import Comment, ElementReaction, ElementReview, SharedLink
 from .permissions import IsProjectOwner
 from .serializers import (
@@ -25,27 +30,67 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
-def _broadcast_to_share_groups(element_id, event_type, data):
-    """Broadcast event to all share_{token} groups that include this element."""
+def _broadcast_to_share_groups(project_id, element_id, data):
+    """Log the event for every share link with this element and send it to their share_{token} groups."""
     try:
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
+        publish_to_element(project_id, element_id, data)
+    except Exception as e:
+        logger.warning(f'Failed to broadcast {data["type"]}: {e}')
 
-        channel_layer = get_channel_layer()
-        if not channel_layer:
-            return
 
-        tokens = list(SharedLink.objects.filter(
-            elements__id=element_id
-        ).values_list('token', flat=True))
+def _broadcast_to_link(link, data):
+    """Event of the link itself (general comments) → its log and share_{token} group."""
+    try:
+        publish([(link.id, str(link.token))], data)
+    except Exception as e:
+        logger.warning(f'Failed to broadcast {data["type"]}: {e}')
 
-        for token in tokens:
-            async_to_sync(channel_layer.group_send)(
-                f'share_{token}',
-                {'type': event_type, 'data': data}
-            )
+
+def _broadcast_scene_comment(project_id, scene_id, data):
+    """Scene comment → share groups of links that show any element of the scene."""
+    try:
+        publish_to_scene(project_id, scene_id, data)
     except Exception as e:
-        logger.warning(f'Failed to broadcast {event_type}: {e}')
+        logger.warning(f'Failed to broadcast {data["type"]}: {e}')
+
+
+class CommentThreadPagination(KeysetPagination):
+    """
+    Тред от новых к старым; next_cursor — к более старым комментариям.
+    Включается только явным ?cursor= / ?page_size= — без них тред целиком.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 10
+    max_page_size = 50
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+def _comments_response(request, comments):
+    paginator = CommentThreadPagination()
+    page = paginator.paginate_queryset(comments, request)
+    if page is None:
+        return Response(CommentSerializer(comments, many=True).data)
+    return paginator.get_paginated_response(CommentSerializer(page, many=True).data)
+
+
+def _comment_event(comment, **extra):
+    return {
+        'type': 'new_comment',
+        'comment_id': comment.id,
+        'element_id': comment.element_id,
+        'scene_id': comment.scene_id,
+        'parent_id': comment.parent_id,
+        'author_name': comment.author_name,
+        'text': comment.text[:200],
+        'created_at': comment.created_at.isoformat(),
+        'session_id': comment.session_id,
+        **extra,
+    }
 
 
 class AuthCommentThrottle(UserRateThrottle):
@@ -90,15 +135,46 @@ class PublicReadThrottle(AnonRateThrottle):
 @permission_classes([AllowAny])
 @throttle_classes([PublicReadThrottle])
 def public_share_view(request, token):
-    """GET /api/sharing/public/{token}/ — reviewer loads shared content."""
-    link = get_object_or_404(SharedLink, token=token)
-    if link.is_expired():
-        return Response(
-            {'detail': 'Срок ссылки истёк.'},
-            status=status.HTTP_410_GONE,
+    """
+    GET /api/sharing/public/{token}/ — reviewer loads shared content.
+
+    Payload is served from the cache (sharing/cache.py) while its version
+    stamp is current; the stamp is the ETag, If-None-Match → 304.
+    """
+    origin = f'{request.scheme}://{request.get_host()}'
+    entry = share_cache.load(token, origin)
+    if entry is None or entry.is_expired():
+        link = get_object_or_404(
+            SharedLink.objects.select_related('project'), token=token, project__deleted_at__isnull=True,
+        )
+        if link.is_expired():
+            return Response(
+                {'detail': 'Срок ссылки истёк.'},
+                status=status.HTTP_410_GONE,
+            )
+        version = share_cache.current_version(link.project_id)
+        # seq до сборки: изменение во время сборки придёт ещё раз через /changes/
+        change_seq = link.last_change_seq
+        entry = share_cache.SharePayload(
+            project_id=link.project_id,
+            version=version,
+            expires_at=link.expires_at,
+            data={**_build_share_payload(link, request), 'change_seq': change_seq},
         )
+        share_cache.store(token, origin, entry)
 
-    shared_elements = link.elements.select_related('scene').prefetch_related('reactions', 'reviews').all()
+    etag = share_cache.etag(entry.version)
+    if entry.version and etag in request.headers.get('If-None-Match', ''):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return Response(entry.data, headers={'ETag': etag} if entry.version else None)
+
+
+def _build_share_payload(link, request) -> dict:
+    """Everything the share page shows: elements by group, reactions, reviews, comment threads."""
+    # Удалённые группы (tombstone до purge) не показываем
+    shared_elements = link.elements.filter(
+        Q(scene__isnull=True) | Q(scene__deleted_at__isnull=True),
+    ).select_related('scene').prefetch_related('reactions', 'reviews')
 
     # Prefetch all element comments in one query to avoid N+1
     element_ids = list(shared_elements.values_list('id', flat=True))
@@ -122,34 +198,20 @@ def public_share_view(request, token):
     scenes_map = {}
     ungrouped = []
 
-    # Pre-compute comment counts (including replies) and reaction counts
-    element_comment_counts = {}
-    for eid in element_ids:
-        top_level = comments_by_element.get(eid, [])
-        total = sum(1 + len(c.replies.all()) for c in top_level) if top_level else 0
-        element_comment_counts[eid] = total
-
-    element_reaction_counts = {}
+    # Счётчики — колонки Element (sharing/counters.py); строки реакций и
+    # решений нужны только самой странице — чьи они
     for el in shared_elements:
-        reactions = list(el.reactions.all())
-        element_reaction_counts[el.id] = {
-            'likes': sum(1 for r in reactions if r.value == 'like'),
-            'dislikes': sum(1 for r in reactions if r.value == 'dislike'),
-        }
-
-    for el in shared_elements:
-        rc = element_reaction_counts.get(el.id, {'likes': 0, 'dislikes': 0})
         el_data = {
             'id': el.id,
             'element_type': el.element_type,
             'file_url': build_element_url(el, 'file', request),
             'thumbnail_url': build_element_url(el, 'thumb', request),
             'preview_url': build_element_url(el, 'preview', request),
-            'comment_count': element_comment_counts.get(el.id, 0),
+            'comment_count': el.comment_count,
             'source_type': el.source_type,
             'original_filename': getattr(el, 'original_filename', ''),
-            'likes': rc['likes'],
-            'dislikes': rc['dislikes'],
+            'likes': el.like_count,
+            'dislikes': el.dislike_count,
             'reactions': [
                 {'session_id': r.session_id, 'author_name': r.author_name, 'value': r.value}
                 for r in el.reactions.all()
@@ -184,7 +246,7 @@ def public_share_view(request, token):
     ).prefetch_related('replies').order_by('created_at')
 
     total_elements = len(ungrouped) + sum(len(s['elements']) for s in scenes)
-    return Response({
+    return {
         'name': link.project.name,
         'link_name': link.name or '',
         'created_at': link.created_at.isoformat(),
@@ -194,7 +256,32 @@ def public_share_view(request, token):
         'ungrouped_elements': ungrouped,
         'display_preferences': link.display_preferences,
         'general_comments': CommentSerializer(general_comments, many=True).data,
-    })
+    }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([PublicReadThrottle])
+def public_changes_view(request, token):
+    """
+    GET /api/sharing/public/{token}/changes/?since=<seq> — reviewer resync.
+
+    Only the events after `since` (change_seq of the page or seq of the last
+    WS event). reset=true — the log no longer covers `since`, reload the page.
+    """
+    link = get_object_or_404(SharedLink, token=token, project__deleted_at__isnull=True)
+    if link.is_expired():
+        return Response(
+            {'detail': 'Срок ссылки истёк.'},
+            status=status.HTTP_410_GONE,
+        )
+    try:
+        since = int(request.query_params.get('since', 0))
+    except (TypeError, ValueError):
+        return Response({'detail': 'since must be an integer.'}, status=400)
+    if since < 0:
+        return Response({'detail': 'since must be an integer.'}, status=400)
+    return Response(changes_since(link, since))
 
 
 @api_view(['POST'])
@@ -202,7 +289,7 @@ def public_share_view(request, token):
 @throttle_classes([PublicCommentThrottle])
 def public_comment_view(request, token):
     """POST /api/sharing/public/{token}/comments/ — reviewer leaves a comment."""
-    link = get_object_or_404(SharedLink, token=token)
+    link = get_object_or_404(SharedLink, token=token, project__deleted_at__isnull=True)
     if link.is_expired():
         return Response(
             {'detail': 'Срок ссылки истёк.'},
@@ -265,21 +352,7 @@ def public_comment_view(request, token):
         comment.save()
 
         # Broadcast to share group
-        _broadcast_to_share_groups(
-            comment.element_id,
-            'new_comment',
-            {
-                'type': 'new_comment',
-                'comment_id': comment.id,
-                'element_id': comment.element_id,
-                'scene_id': comment.scene_id,
-                'parent_id': comment.parent_id,
-                'author_name': comment.author_name,
-                'text': comment.text[:200],
-                'created_at': comment.created_at.isoformat(),
-                'session_id': comment.session_id,
-            }
-        )
+        _broadcast_to_share_groups(link.project_id, comment.element_id, _comment_event(comment))
     elif data.get('scene_id'):
         # Validate scene has at least one shared element
         from apps.elements.models import Element
@@ -310,26 +383,7 @@ def public_comment_view(request, token):
 
         # Broadcast scene comment to share groups
         try:
-            from apps.elements.models import Element
-            scene_element_ids = list(Element.objects.filter(
-                scene_id=data['scene_id']
-            ).values_list('id', flat=True)[:1])
-            if scene_element_ids:
-                _broadcast_to_share_groups(
-                    scene_element_ids[0],
-                    'new_comment',
-                    {
-                        'type': 'new_comment',
-                        'comment_id': comment.id,
-                        'element_id': None,
-                        'scene_id': comment.scene_id,
-                        'parent_id': comment.parent_id,
-                        'author_name': comment.author_name,
-                        'text': comment.text[:200],
-                        'created_at': comment.created_at.isoformat(),
-                        'session_id': comment.session_id,
-                    }
-                )
+            _broadcast_scene_comment(link.project_id, comment.scene_id, _comment_event(comment))
         except Exception as e:
             logger.warning(f'Failed to broadcast scene comment: {e}')
 
@@ -353,28 +407,7 @@ def public_comment_view(request, token):
         comment.save()
 
         # Broadcast to share group
-        try:
-            from channels.layers import get_channel_layer
-            from asgiref.sync import async_to_sync
-            channel_layer = get_channel_layer()
-            if channel_layer:
-                async_to_sync(channel_layer.group_send)(
-                    f'share_{link.token}',
-                    {'type': 'new_comment', 'data': {
-                        'type': 'new_comment',
-                        'comment_id': comment.id,
-                        'element_id': None,
-                        'scene_id': None,
-                        'shared_link_id': link.id,
-                        'parent_id': comment.parent_id,
-                        'author_name': comment.author_name,
-                        'text': comment.text[:200],
-                        'created_at': comment.created_at.isoformat(),
-                        'session_id': comment.session_id,
-                    }}
-                )
-        except Exception as e:
-            logger.warning(f'Failed to broadcast general comment: {e}')
+        _broadcast_to_link(link, _comment_event(comment, shared_link_id=link.id))
 
     # Send notifications
     try:
@@ -391,7 +424,7 @@ def public_comment_view(request, token):
 @throttle_classes([PublicCommentThrottle])
 def public_review_action(request, token):
     """POST /api/sharing/public/{token}/review/ — reviewer submits review decision."""
-    link = get_object_or_404(SharedLink, token=token)
+    link = get_object_or_404(SharedLink, token=token, project__deleted_at__isnull=True)
     if link.is_expired():
         return Response({'detail': 'Срок ссылки истёк.'}, status=status.HTTP_410_GONE)
 
@@ -420,9 +453,10 @@ def public_review_action(request, token):
     ).first()
 
     if existing and existing.action == action:
-        existing.delete()
+        counters.delete_feedback(ElementReview.objects.filter(pk=existing.pk))
+        share_cache.invalidate(link.project_id)
 
-        _broadcast_to_share_groups(element_id, 'review_updated', {
+        _broadcast_to_share_groups(link.project_id, element_id, {
             'type': 'review_updated',
             'element_id': element_id,
             'session_id': session_id,
@@ -442,9 +476,9 @@ def public_review_action(request, token):
 
     # Clean up guest session duplicate if user is now authenticated
     if session_id.startswith('user_'):
-        ElementReview.objects.filter(
+        counters.delete_feedback(ElementReview.objects.filter(
             element_id=element_id, author_name=author_name,
-        ).exclude(session_id=session_id).delete()
+        ).exclude(session_id=session_id))
 
     # update_or_create — one review per reviewer per element
     review, _ = ElementReview.objects.update_or_create(
@@ -476,7 +510,7 @@ def public_review_action(request, token):
     except Exception as e:
         logger.warning(f'Failed to send review notification: {e}')
 
-    _broadcast_to_share_groups(element_id, 'review_updated', {
+    _broadcast_to_share_groups(link.project_id, element_id, {
         'type': 'review_updated',
         'element_id': element_id,
         'session_id': session_id,
@@ -502,7 +536,7 @@ def public_review_action(request, token):
 @throttle_classes([PublicCommentThrottle])
 def public_reaction_view(request, token):
     """POST /api/sharing/public/{token}/reactions/ — reviewer reacts to element."""
-    link = get_object_or_404(SharedLink, token=token)
+    link = get_object_or_404(SharedLink, token=token, project__deleted_at__isnull=True)
     if link.is_expired():
         return Response({'detail': 'Срок ссылки истёк.'}, status=status.HTTP_410_GONE)
 
@@ -524,15 +558,14 @@ def public_reaction_view(request, token):
 
     if not value:
         # Remove reaction
-        ElementReaction.objects.filter(element_id=element_id, session_id=session_id).delete()
+        counters.delete_feedback(ElementReaction.objects.filter(element_id=element_id, session_id=session_id))
+        share_cache.invalidate(link.project_id)
         # Return actual counts after removal
-        likes = ElementReaction.objects.filter(element_id=element_id, value='like').count()
-        dislikes = ElementReaction.objects.filter(element_id=element_id, value='dislike').count()
+        likes, dislikes = counters.reaction_counts(element_id)
 
         # Broadcast to share group
         _broadcast_to_share_groups(
-            element_id,
-            'reaction_updated',
+            link.project_id, element_id,
             {
                 'type': 'reaction_updated',
                 'element_id': element_id,
@@ -559,9 +592,9 @@ def public_reaction_view(request, token):
 
     # Clean up guest session duplicate if user is now authenticated
     if session_id.startswith('user_'):
-        ElementReaction.objects.filter(
+        counters.delete_feedback(ElementReaction.objects.filter(
             element_id=element_id, author_name=author_name,
-        ).exclude(session_id=session_id).delete()
+        ).exclude(session_id=session_id))
 
     reaction, created = ElementReaction.objects.update_or_create(
         element_id=element_id,
@@ -590,13 +623,11 @@ def public_reaction_view(request, token):
             logger.warning(f'Failed to send reaction notification: {e}')
 
     # Return actual counts — the source of truth, no optimistic drift
-    likes = ElementReaction.objects.filter(element_id=element_id, value='like').count()
-    dislikes = ElementReaction.objects.filter(element_id=element_id, value='dislike').count()
+    likes, dislikes = counters.reaction_counts(element_id)
 
     # Broadcast to share group
     _broadcast_to_share_groups(
-        element_id,
-        'reaction_updated',
+        link.project_id, element_id,
         {
             'type': 'reaction_updated',
             'element_id': element_id,
@@ -629,7 +660,7 @@ def element_comments_view(request, element_id):
 
     if request.method == 'GET':
         comments = element.comments.filter(parent__isnull=True, is_system=False).prefetch_related('replies')
-        return Response(CommentSerializer(comments, many=True).data)
+        return _comments_response(request, comments)
 
     serializer = CreateCommentAuthSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -645,6 +676,7 @@ def element_comments_view(request, element_id):
     )
     comment.full_clean()
     comment.save()
+    _broadcast_to_share_groups(element.project_id, element.id, _comment_event(comment))
     return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
 
 
@@ -674,6 +706,10 @@ def scene_comments_view(request, scene_id):
     )
     comment.full_clean()
     comment.save()
+    try:
+        _broadcast_scene_comment(scene.project_id, scene.id, _comment_event(comment))
+    except Exception as e:
+        logger.warning(f'Failed to broadcast scene comment: {e}')
     return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
 
 
@@ -682,13 +718,13 @@ def scene_comments_view(request, scene_id):
 @throttle_classes([AuthCommentThrottle])
 def link_comments_view(request, link_id):
     """GET/POST /api/sharing/links/{id}/comments/ — general comments on shared link."""
-    link = get_object_or_404(SharedLink, id=link_id, created_by=request.user)
+    link = get_object_or_404(SharedLink, id=link_id, created_by=request.user, project__deleted_at__isnull=True)
 
     if request.method == 'GET':
         comments = Comment.objects.filter(
             shared_link=link, parent__isnull=True, is_system=False
         ).prefetch_related('replies').order_by('created_at')
-        return Response(CommentSerializer(comments, many=True).data)
+        return _comments_response(request, comments)
 
     serializer = CreateCommentAuthSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -704,6 +740,7 @@ def link_comments_view(request, link_id):
     )
     comment.full_clean()
     comment.save()
+    _broadcast_to_link(link, _comment_event(comment, shared_link_id=link.id))
     return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
 
 
@@ -747,29 +784,14 @@ def project_element_ids(request, project_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def group_element_ids(request, scene_id):
-    """GET /api/sharing/group-elements/{scene_id}/ — element IDs in scene + children."""
+    """GET /api/sharing/group-elements/{scene_id}/ — element IDs in scene + all subgroups."""
     from apps.scenes.models import Scene
     from apps.elements.models import Element
     scene = get_object_or_404(Scene, id=scene_id, project__user=request.user)
 
-    # Single query: all scenes in this project, then BFS in Python
-    all_scenes = list(
-        Scene.objects.filter(project=scene.project).values_list('id', 'parent_id')
-    )
-    children_map = {}
-    for sid, pid in all_scenes:
-        children_map.setdefault(pid, []).append(sid)
-
-    # BFS from target scene
-    scene_ids = []
-    queue = [scene.id]
-    while queue:
-        current = queue.pop(0)
-        scene_ids.append(current)
-        queue.extend(children_map.get(current, []))
-
+    # Поддерево любой глубины — join по замыканию иерархии (scenes/hierarchy.py)
     elements = list(
-        Element.objects.filter(scene_id__in=scene_ids)
+        Element.objects.filter(scene__ancestor_links__ancestor_id=scene.id)
         .exclude(status='FAILED')
         .values('id', 'element_type', 'is_favorite', 'source_type')
     )
@@ -780,7 +802,9 @@ def group_element_ids(request, scene_id):
 @permission_classes([IsAuthenticated])
 def all_feedback_view(request):
     """GET /api/sharing/all-feedback/ — all feedback across all user's projects."""
-    links = SharedLink.objects.filter(project__user=request.user).select_related('project').order_by('-created_at')
+    links = SharedLink.objects.filter(
+        project__user=request.user, project__deleted_at__isnull=True,
+    ).select_related('project').order_by('-created_at')
     return _build_feedback_response(request, links)
 
 
@@ -791,170 +815,21 @@ def project_feedback_view(request, project_id):
     from apps.projects.models import Project
     project = get_object_or_404(Project, id=project_id, user=request.user)
 
-    links = SharedLink.objects.filter(project=project).order_by('-created_at')
+    links = SharedLink.objects.filter(project=project, project__deleted_at__isnull=True).order_by('-created_at')
     return _build_feedback_response(request, links)
 
 
 def _build_feedback_response(request, links):
     """Shared logic for building feedback response from a queryset of links."""
-    from apps.notifications.models import Notification
-    from collections import defaultdict
-
-    links_list = list(links)
-    if not links_list:
-        return Response({'links': []})
-
-    # Collect all element IDs across all links (bulk)
-    link_element_ids = {}
-    all_element_ids = set()
-    for link in links_list:
-        eids = set(link.elements.values_list('id', flat=True))
-        link_element_ids[link.id] = eids
-        all_element_ids.update(eids)
-
-    # Bulk fetch elements with prefetch
-    from apps.elements.models import Element
-    elements_qs = Element.objects.filter(id__in=all_element_ids).select_related('scene').prefetch_related('reactions', 'reviews')
-    elements_map = {el.id: el for el in elements_qs}
-
-    # Bulk fetch all comments for all elements
-    all_comments = Comment.objects.filter(
-        element_id__in=all_element_ids, parent__isnull=True, is_system=False
-    ).prefetch_related('replies').order_by('created_at')
-    comments_by_element = defaultdict(list)
-    for c in all_comments:
-        comments_by_element[c.element_id].append(c)
-
-    # Bulk fetch general comments for all links
-    link_ids = [l.id for l in links_list]
-    all_general_comments = Comment.objects.filter(
-        shared_link_id__in=link_ids, parent__isnull=True, is_system=False
-    ).prefetch_related('replies').order_by('created_at')
-    general_comments_by_link = defaultdict(list)
-    for c in all_general_comments:
-        general_comments_by_link[c.shared_link_id].append(c)
-
-    # Bulk fetch all reviews for stats
-    all_reviews = ElementReview.objects.filter(element_id__in=all_element_ids)
-    reviews_by_element = defaultdict(list)
-    for r in all_reviews:
-        reviews_by_element[r.element_id].append(r)
-
-    # Bulk unread counts: comments
-    unread_comments_qs = Comment.objects.filter(
-        Q(element_id__in=all_element_ids) | Q(shared_link_id__in=link_ids),
-        is_read=False, is_system=False,
-    ).exclude(author_user=request.user).values_list('element_id', 'shared_link_id')
-    unread_by_element = defaultdict(int)
-    unread_by_link_direct = defaultdict(int)
-    for el_id, sl_id in unread_comments_qs:
-        if el_id:
-            unread_by_element[el_id] += 1
-        if sl_id:
-            unread_by_link_direct[sl_id] += 1
-
-    # Bulk unread notifications (reaction_new, review_new)
-    unread_notif_qs = Notification.objects.filter(
-        user=request.user, is_read=False,
-        type__in=['reaction_new', 'review_new'],
-        element_id__in=all_element_ids,
-    ).values_list('element_id', flat=True)
-    unread_notif_by_element = defaultdict(int)
-    for el_id in unread_notif_qs:
-        unread_notif_by_element[el_id] += 1
-
-    # Build response
-    result = []
-    for link in links_list:
-        eids = link_element_ids[link.id]
-
-        # Elements with feedback
-        elements_with_feedback = []
-        for eid in eids:
-            el = elements_map.get(eid)
-            if not el:
-                continue
-
-            el_comments = comments_by_element.get(eid, [])
-            el_reviews = reviews_by_element.get(eid, [])
-            reactions = list(el.reactions.all())
-            likes = sum(1 for r in reactions if r.value == 'like')
-            dislikes = sum(1 for r in reactions if r.value == 'dislike')
-
-            has_feedback = len(el_comments) > 0 or likes > 0 or dislikes > 0 or len(el_reviews) > 0
-            if not has_feedback:
-                continue
-
-            # Review summary (worst-wins)
-            review_summary = None
-            if el_reviews:
-                priority = {'rejected': 0, 'changes_requested': 1, 'approved': 2}
-                worst = min(el_reviews, key=lambda r: priority.get(r.action, 99))
-                review_summary = {'action': worst.action, 'author_name': worst.author_name}
-
-            elements_with_feedback.append({
-                'id': el.id,
-                'scene_id': el.scene_id,
-                'original_filename': el.original_filename or '',
-                'thumbnail_url': el.thumbnail_url or '',
-                'element_type': el.element_type,
-                'review_summary': review_summary,
-                'reviews': [
-                    {'session_id': r.session_id, 'author_name': r.author_name, 'action': r.action}
-                    for r in el_reviews
-                ],
-                'likes': likes,
-                'dislikes': dislikes,
-                'comments': CommentSerializer(el_comments, many=True).data,
-            })
-
-        # Stats from pre-fetched reviews
-        stats_approved = set()
-        stats_changes = set()
-        stats_rejected = set()
-        for eid in eids:
-            for r in reviews_by_element.get(eid, []):
-                if r.action == 'approved':
-                    stats_approved.add(eid)
-                elif r.action == 'changes_requested':
-                    stats_changes.add(eid)
-                elif r.action == 'rejected':
-                    stats_rejected.add(eid)
-
-        stats = {
-            'approved': len(stats_approved),
-            'changes_requested': len(stats_changes),
-            'rejected': len(stats_rejected),
-            'total_elements': len(eids),
-        }
+    return Response({'links': feedback.link_summaries(links, request.user)})
 
-        # Unread count
-        if link.is_expired():
-            unread_count = 0
-        else:
-            uc = unread_by_link_direct.get(link.id, 0)
-            for eid in eids:
-                uc += unread_by_element.get(eid, 0) + unread_notif_by_element.get(eid, 0)
-            unread_count = uc
-
-        link_data = {
-            'id': link.id,
-            'name': link.name,
-            'token': str(link.token),
-            'created_at': link.created_at.isoformat(),
-            'expires_at': link.expires_at.isoformat() if link.expires_at else None,
-            'is_expired': link.is_expired(),
-            'unread_count': unread_count,
-            'stats': stats,
-            'elements': elements_with_feedback,
-            'general_comments': CommentSerializer(general_comments_by_link.get(link.id, []), many=True).data,
-        }
-        if hasattr(link, 'project') and link.project:
-            link_data['project_id'] = link.project.id
-            link_data['project_name'] = link.project.name
-        result.append(link_data)
 
-    return Response({'links': result})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def link_threads_view(request, link_id):
+    """GET /api/sharing/links/{id}/threads/ — latest comment threads of an expanded link."""
+    link = get_object_or_404(SharedLink, id=link_id, project__user=request.user, project__deleted_at__isnull=True)
+    return Response(feedback.thread_previews(link, CommentThreadPagination()))
 
 
 @api_view(['PATCH'])
@@ -992,6 +867,7 @@ def mark_all_comments_read(request):
         Q(element__project=project) | Q(scene__project=project) | Q(shared_link__project=project),
         is_read=False,
     ).update(is_read=True)
+    share_cache.invalidate(project.id)
 
     try:
         from apps.notifications.models import Notification
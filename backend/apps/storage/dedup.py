@@ -0,0 +1,113 @@
+"""
+Content-addressed deduplication of stored media.
+
+Every stored object is indexed by the SHA-256 of its content (StoredObject).
+Writers hash before (or while) storing: a hit takes a reference to the
+existing object instead of writing a copy. delete_file_from_s3 releases one
+reference and removes the object only when the last one is gone.
+
+Public interface — import from apps.storage.services instead.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from apps.storage.models import StoredObject
+from apps.storage.presigned import _get_s3_client
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a local file, read in STORAGE_STREAM_CHUNK_SIZE chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(settings.STORAGE_STREAM_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_s3_object(key: str) -> str:
+    """SHA-256 of an object already in the bucket (streamed GET, flat memory)."""
+    digest = hashlib.sha256()
+    body = _get_s3_client().get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)['Body']
+    for chunk in body.iter_chunks(chunk_size=settings.STORAGE_STREAM_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def acquire_object(sha256: str) -> str | None:
+    """Take a reference to the stored object with this content. Its URL, or None."""
+    with transaction.atomic():
+        obj = StoredObject.objects.select_for_update().filter(sha256=sha256).first()
+        if obj is None:
+            return None
+        StoredObject.objects.filter(pk=obj.pk).update(ref_count=F('ref_count') + 1)
+    logger.info("dedup hit", extra={"sha256": sha256, "file_url": obj.url})
+    return obj.url
+
+
+def register_object(sha256: str, url: str, size: int) -> str:
+    """
+    Index a freshly stored object with one reference. If the same content
+    was indexed meanwhile (concurrent upload), a reference to that object is
+    taken instead and its URL returned — the caller's copy is then redundant.
+    """
+    with transaction.atomic():
+        obj, created = StoredObject.objects.select_for_update().get_or_create(
+            sha256=sha256, defaults={'url': url, 'size': size},
+        )
+        if not created:
+            StoredObject.objects.filter(pk=obj.pk).update(ref_count=F('ref_count') + 1)
+    return obj.url
+
+
+def release_object(url: str) -> bool:
+    """
+    Drop one reference. True if the object has to be deleted from S3 now:
+    it was the last reference, or the object is not indexed at all.
+    """
+    with transaction.atomic():
+        obj = StoredObject.objects.select_for_update().filter(url=url).first()
+        if obj is None:
+            return True
+        if obj.ref_count > 1:
+            StoredObject.objects.filter(pk=obj.pk).update(ref_count=F('ref_count') - 1)
+            return False
+        obj.delete()
+    return True
+
+
+def release_objects(urls: list[str]) -> list[str]:
+    """
+    release_object() for many references at once (a URL may repeat — one
+    reference per occurrence). Returns the URLs whose objects have to be
+    deleted from S3 now.
+    """
+    wanted: dict[str, int] = {}
+    for url in urls:
+        wanted[url] = wanted.get(url, 0) + 1
+
+    doomed = []
+    with transaction.atomic():
+        indexed = {
+            obj.url: obj
+            for obj in StoredObject.objects.select_for_update().filter(url__in=list(wanted)).order_by('pk')
+        }
+        for url, count in wanted.items():
+            obj = indexed.get(url)
+            if obj is None:
+                doomed.append(url)
+            elif obj.ref_count > count:
+                StoredObject.objects.filter(pk=obj.pk).update(ref_count=F('ref_count') - count)
+            else:
+                obj.delete()
+                doomed.append(url)
+    return doomed
@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class StoredObject(models.Model):
+    """
+    Индекс контентной дедупликации: SHA-256 содержимого → объект в S3.
+
+    ref_count — сколько ссылок (file_url/thumbnail_url/loop_url элементов)
+    указывает на объект. Объект удаляется из S3, когда уходит последняя.
+    Объекты, которых нет в индексе (загружены до дедупликации), удаляются
+    как раньше — сразу.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    url = models.URLField(max_length=500, db_index=True, verbose_name='Публичный URL')
+    size = models.BigIntegerField(default=0, verbose_name='Размер (байт)')
+    ref_count = models.PositiveIntegerField(default=1, verbose_name='Число ссылок')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создан')
+
+    class Meta:
+        verbose_name = 'Объект хранилища'
+        verbose_name_plural = 'Объекты хранилища'
+
+    def __str__(self):
+        return f"{self.sha256[:12]}… ×{self.ref_count}"
@@ -4,6 +4,7 @@ S3 storage operations: upload, delete, staging, file validation.
 Public interface — import from apps.storage.services instead.
 """
 import os
+import threading
 import uuid
 import logging
 from urllib.parse import urlparse
@@ -57,13 +58,22 @@ def delete_file_from_s3(file_url: str) -> bool:
     """
     Удалить файл из S3 по URL.
 
+    Дедуплицированный объект (см. dedup.py) общий для нескольких ссылок:
+    снимается одна ссылка, сам объект удаляется вместе с последней.
+
     Args:
         file_url: URL файла на S3
 
     Returns:
-        True если успешно удалено, False иначе
+        True если успешно удалено (или снята ссылка), False иначе
     """
+    from apps.storage.dedup import release_object
+
     try:
+        if not release_object(file_url):
+            logger.info("S3 object still referenced, kept", extra={"file_url": file_url})
+            return True
+
         parsed = urlparse(file_url)
         path = parsed.path.lstrip('/')
 
@@ -104,46 +114,153 @@ def save_to_staging(file: UploadedFile) -> str:
     return staging_path
 
 
-def upload_staging_to_s3(staging_path: str, project_id: int, scene_id: int, on_progress=None) -> str:
+def upload_staging_to_s3(
+    staging_path: str, project_id: int, scene_id: int, on_progress=None, element_type: str | None = None,
+) -> str:
+    """Загрузить файл из staging в S3 (см. store_staging_file). Возвращает публичный URL."""
+    return store_staging_file(
+        staging_path, project_id, scene_id, on_progress=on_progress, element_type=element_type,
+    )['file_url']
+
+
+def store_staging_file(
+    staging_path: str, project_id: int, scene_id: int, on_progress=None, element_type: str | None = None,
+) -> dict:
     """
-    Загрузить файл из staging-директории в S3.
+    Сохранить файл из staging-директории в S3 с дедупликацией по содержимому:
+    если такой файл уже хранится, загрузка пропускается и берётся ссылка на него.
+
     on_progress(percent: int) — optional callback, 0-100.
-    Возвращает публичный S3 URL.
+    Part size и число потоков — по типу элемента (по расширению, если не передан).
+    Ключ стабилен между ретраями Celery, прерванный multipart дозагружается.
+    Returns: {'file_url', 'file_size', 'content_hash', 'deduplicated'}
     """
-    from apps.storage.presigned import _get_s3_client, get_public_url
-    from django.conf import settings
+    from apps.storage.dedup import acquire_object, hash_file, register_object
+
+    file_size = os.path.getsize(staging_path)
+    content_hash = hash_file(staging_path)
+    file_url = acquire_object(content_hash)
+    if file_url:
+        if on_progress:
+            on_progress(100)
+        return {'file_url': file_url, 'file_size': file_size, 'content_hash': content_hash, 'deduplicated': True}
+
+    uploaded_url = _upload_staging(staging_path, project_id, scene_id, on_progress, element_type)
+    file_url = register_object(content_hash, uploaded_url, file_size)
+    if file_url != uploaded_url:
+        # Тот же файл сохранили параллельно — оставляем одну копию.
+        delete_object(_staging_key(staging_path, project_id, scene_id))
+    return {
+        'file_url': file_url,
+        'file_size': file_size,
+        'content_hash': content_hash,
+        'deduplicated': file_url != uploaded_url,
+    }
+
+
+def _upload_staging(staging_path, project_id, scene_id, on_progress, element_type) -> str:
+    from apps.storage.presigned import EXTENSION_TO_CONTENT_TYPE, get_public_url
+    from apps.storage.transfer import upload_file
 
     filename = os.path.basename(staging_path)
-    s3_key = f"projects/{project_id}/scenes/{scene_id}/{filename}"
+    s3_key = _staging_key(staging_path, project_id, scene_id)
     file_size = os.path.getsize(staging_path)
 
     ext = os.path.splitext(filename)[1].lower()
-    content_types = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.mp4': 'video/mp4'}
-    content_type = content_types.get(ext, 'application/octet-stream')
+    content_type = EXTENSION_TO_CONTENT_TYPE.get(ext, 'application/octet-stream')
 
+    on_bytes = None
     if on_progress and file_size > 0:
         uploaded = 0
         last_reported = -1
+        lock = threading.Lock()
 
-        def progress_callback(bytes_transferred):
+        def on_bytes(bytes_transferred):
             nonlocal uploaded, last_reported
-            uploaded += bytes_transferred
-            pct = min(100, int(uploaded * 100 / file_size))
-            if pct >= last_reported + 10:
+            with lock:
+                uploaded += bytes_transferred
+                pct = min(100, int(uploaded * 100 / file_size))
+                if pct < last_reported + 10:
+                    return
                 last_reported = pct
-                on_progress(pct)
-
-        client = _get_s3_client()
-        client.upload_file(
-            staging_path,
-            settings.AWS_STORAGE_BUCKET_NAME,
-            s3_key,
-            ExtraArgs={'ContentType': content_type},
-            Callback=progress_callback,
-        )
-        return get_public_url(s3_key)
-    else:
-        from django.core.files import File
-        with open(staging_path, 'rb') as f:
-            default_storage.save(s3_key, File(f))
-        return default_storage.url(s3_key)
+            on_progress(pct)
+
+    upload_file(
+        staging_path,
+        s3_key,
+        content_type,
+        element_type or detect_element_type(filename),
+        on_bytes=on_bytes,
+    )
+    return get_public_url(s3_key)
+
+
+def delete_object(key: str) -> None:
+    """Удалить объект по ключу бакета, в обход индекса дедупликации (best-effort)."""
+    from django.conf import settings
+    from apps.storage.presigned import _get_s3_client
+
+    try:
+        _get_s3_client().delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+    except Exception:
+        logger.warning("S3 delete failed", extra={"s3_key": key}, exc_info=True)
+
+
+# DeleteObjects принимает не больше 1000 ключей за запрос.
+DELETE_BATCH_SIZE = 1000
+
+
+def key_from_url(url: str) -> str | None:
+    """Ключ бакета по публичному URL (get_public_url); None — файл не в нашем бакете."""
+    from django.conf import settings
+
+    parsed = urlparse(url or '')
+    if parsed.netloc != settings.AWS_S3_CUSTOM_DOMAIN:
+        return None
+    return parsed.path.lstrip('/') or None
+
+
+def delete_objects(keys: list[str], on_batch=None) -> list[str]:
+    """
+    Удалить объекты пачками DeleteObjects (до 1000 ключей, без HEAD на каждый),
+    в обход индекса дедупликации — ссылки снимает вызывающий (release_objects).
+
+    on_batch(deleted_so_far) вызывается после каждой пачки.
+    Returns:
+        Ключи, которые удалить не удалось (для повтора)
+    """
+    from django.conf import settings
+    from apps.storage.presigned import _get_s3_client
+
+    client = _get_s3_client()
+    failed, deleted = [], 0
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start:start + DELETE_BATCH_SIZE]
+        try:
+            response = client.delete_objects(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True},
+            )
+        except Exception:
+            logger.warning("S3 batch delete failed", extra={"keys": len(batch)}, exc_info=True)
+            failed.extend(batch)
+            continue
+        errors = [error['Key'] for error in response.get('Errors', []) if error.get('Code') != 'NoSuchKey']
+        if errors:
+            logger.warning("S3 batch delete partially failed", extra={"failed": len(errors), "keys": len(batch)})
+        failed.extend(errors)
+        deleted += len(batch) - len(errors)
+        if on_batch is not None:
+            on_batch(deleted)
+    return failed
+
+
+def abort_staging_upload(staging_path: str, project_id: int, scene_id: int) -> None:
+    """Сбросить незавершённый multipart staging-файла (ретраев больше не будет)."""
+    from apps.storage.transfer import abort_pending_upload
+
+    abort_pending_upload(_staging_key(staging_path, project_id, scene_id))
+
+
+def _staging_key(staging_path: str, project_id: int, scene_id: int) -> str:
+    return f"projects/{project_id}/scenes/{scene_id}/{os.path.basename(staging_path)}"
@@ -2,7 +2,8 @@
 Storage module — public interface.
 
 All external modules should import from here, not from internal files.
-Owns: S3 operations, presigned URLs, thumbnails, file validation, staging.
+Owns: S3 operations, presigned URLs, thumbnails, file validation, staging,
+content deduplication.
 """
 
 # S3 operations
@@ -13,6 +14,11 @@ from apps.storage.s3 import (
     delete_file_from_s3,
     save_to_staging,
     upload_staging_to_s3,
+    store_staging_file,
+    abort_staging_upload,
+    delete_object,
+    delete_objects,
+    key_from_url,
     ELEMENT_TYPE_IMAGE,
     ELEMENT_TYPE_VIDEO,
 )
@@ -24,11 +30,31 @@ from apps.storage.presigned import (
     get_public_url,
 )
 
+# Content deduplication (SHA-256 → S3 object, reference counts)
+from apps.storage.dedup import (
+    hash_s3_object,
+    register_object,
+    release_object,
+    release_objects,
+)
+
+# Transfer engine
+from apps.storage.transfer import (
+    get_transfer_config,
+)
+
 # Thumbnails
 from apps.storage.thumbnails import (
+    generate_preview_loop,
     generate_thumbnails,
 )
 
+# Streaming upload (download → S3 + thumbnails in one pass)
+from apps.storage.streaming import (
+    render_thumbnails,
+    stream_to_s3,
+)
+
 __all__ = [
     # S3
     'get_file_extension',
@@ -37,12 +63,28 @@ __all__ = [
     'delete_file_from_s3',
     'save_to_staging',
     'upload_staging_to_s3',
+    'store_staging_file',
+    'abort_staging_upload',
+    'delete_object',
+    'delete_objects',
+    'key_from_url',
     'ELEMENT_TYPE_IMAGE',
     'ELEMENT_TYPE_VIDEO',
     # Presigned
     'generate_upload_presigned_urls',
     'head_s3_object',
     'get_public_url',
+    # Dedup
+    'hash_s3_object',
+    'register_object',
+    'release_object',
+    'release_objects',
+    # Transfer
+    'get_transfer_config',
     # Thumbnails
     'generate_thumbnails',
+    'generate_preview_loop',
+    # Streaming
+    'render_thumbnails',
+    'stream_to_s3',
 ]
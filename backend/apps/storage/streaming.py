@@ -0,0 +1,207 @@
+"""
+Streaming upload of a remote file to S3.
+
+The source stream is read once: every chunk goes into an S3 multipart upload
+(through a bounded in-memory pipe, so memory stays flat) and, as a tee, into
+a thumbnail sink. No staging file on disk unless ffmpeg needs a seekable
+input (see thumbnails._VideoSink). SHA-256 is computed on the same pass:
+if the content is already stored, the new copy is dropped (see dedup.py).
+
+Public interface — import from apps.storage.services instead.
+"""
+import hashlib
+import logging
+import os
+import queue
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from django.conf import settings
+
+from apps.common.http import get_session
+from apps.storage.dedup import register_object
+from apps.storage.presigned import EXTENSION_TO_CONTENT_TYPE, _get_s3_client, get_public_url
+from apps.storage.s3 import delete_object
+from apps.storage.thumbnails import generate_thumbnails, open_thumbnail_sink
+from apps.storage.transfer import UploadStats, get_transfer_config, object_params
+
+logger = logging.getLogger(__name__)
+
+_EOF = object()
+
+
+class ChunkPipe:
+    """
+    File-like reader over chunks pushed from another thread.
+
+    Bounded queue: the producer (HTTP download) blocks while the consumer
+    (S3 upload) is behind. `fail()` aborts a pending read, so s3transfer
+    aborts the multipart upload instead of completing a truncated object.
+    """
+
+    def __init__(self, max_chunks: int):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = bytearray()
+        self._eof = False
+
+    def put(self, chunk, is_alive) -> None:
+        """Push a chunk; raise if the consumer died (is_alive() is False)."""
+        while True:
+            try:
+                self._queue.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                if not is_alive():
+                    raise RuntimeError("S3 upload stopped consuming the stream")
+
+    def close(self, is_alive) -> None:
+        self.put(_EOF, is_alive)
+
+    def fail(self, exc: BaseException) -> None:
+        # Consumer may be blocked on a full queue — drop data, deliver the error.
+        while True:
+            try:
+                self._queue.put_nowait(exc)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            item = self._queue.get()
+            if item is _EOF:
+                self._eof = True
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                self._buffer.extend(item)
+        if size < 0 or size > len(self._buffer):
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def build_object_key(project_id: int, scene_id: int | None, ext: str) -> str:
+    """Key for a generated file, same layout as upload_staging_to_s3."""
+    return f"projects/{project_id}/scenes/{scene_id}/{uuid.uuid4().hex}{ext}"
+
+
+def stream_to_s3(
+    chunks: Iterable[bytes],
+    ext: str,
+    element_type: str,
+    project_id: int,
+    scene_id: int | None,
+    total_size: int | None = None,
+    on_progress=None,
+    thumbnails: bool = True,
+) -> dict:
+    """
+    Upload a chunk stream to S3 and render thumbnails from the same pass.
+
+    on_progress(percent: int) — optional, 0-100, only when total_size is known.
+    thumbnails=False — upload only (thumbnails are rendered on the media queue);
+    thumbnail_url/preview_url are '' then.
+    Returns: {'file_url', 'file_size', 'content_hash', 'thumbnail_url', 'preview_url'};
+    file_url is the already stored copy if the content is a duplicate.
+    Raises whatever the source stream or the upload raised; the multipart
+    upload is aborted in that case.
+    """
+    key = build_object_key(project_id, scene_id, ext)
+    content_type = EXTENSION_TO_CONTENT_TYPE.get(ext, 'application/octet-stream')
+    config = get_transfer_config(element_type)
+    # Pipe holds about two parts: reader and uploader work in parallel.
+    pipe = ChunkPipe(
+        max_chunks=max(2, 2 * config.multipart_chunksize // settings.STORAGE_STREAM_CHUNK_SIZE),
+    )
+    sink = open_thumbnail_sink(element_type if thumbnails else None, project_id, scene_id)
+
+    client = _get_s3_client()
+    digest = hashlib.sha256()
+    file_size = 0
+    last_reported = -1
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='s3-stream') as pool:
+            upload = pool.submit(
+                client.upload_fileobj,
+                pipe,
+                settings.AWS_STORAGE_BUCKET_NAME,
+                key,
+                ExtraArgs=object_params(content_type),
+                Config=config,
+            )
+            upload_alive = lambda: not upload.done()  # noqa: E731
+            try:
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    pipe.put(chunk, upload_alive)
+                    sink.write(chunk)
+                    digest.update(chunk)
+                    file_size += len(chunk)
+                    if on_progress and total_size:
+                        pct = min(100, int(file_size * 100 / total_size))
+                        if pct >= last_reported + 10:
+                            last_reported = pct
+                            on_progress(pct)
+                pipe.close(upload_alive)
+            except BaseException as exc:
+                pipe.fail(exc)
+                upload_error = upload.exception()
+                if upload_error is not None and upload_error is not exc:
+                    # Upload died first — it is the root cause, not the stalled pipe.
+                    raise upload_error from exc
+                raise
+
+            # Thumbnails render in this thread (the dedup index needs its DB connection)
+            # while the last parts are still uploading.
+            thumbs = sink.finish()
+            upload.result()
+    finally:
+        sink.close()
+
+    UploadStats(key=key, bytes=file_size, seconds=time.monotonic() - started).log(element_type)
+    uploaded_url = get_public_url(key)
+    content_hash = digest.hexdigest()
+    file_url = register_object(content_hash, uploaded_url, file_size)
+    if file_url != uploaded_url:
+        # Already stored (same provider result, re-generation with the same seed…).
+        delete_object(key)
+    return {
+        'file_url': file_url,
+        'file_size': file_size,
+        'content_hash': content_hash,
+        'thumbnail_url': thumbs.get('thumbnail_url', ''),
+        'preview_url': thumbs.get('preview_url', ''),
+    }
+
+
+def render_thumbnails(source: str, element_type: str, project_id: int, scene_id: int | None) -> dict:
+    """
+    Thumbnails from a local file or, if it is not on this machine, from a URL
+    (streamed through the same sinks, so fast-start video needs no temp file).
+    Returns {'thumbnail_url', 'preview_url'}; never raises.
+    """
+    if os.path.exists(source):
+        return generate_thumbnails(source, element_type, project_id, scene_id)
+
+    sink = open_thumbnail_sink(element_type, project_id, scene_id)
+    try:
+        with get_session(source).get(source, timeout=120, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=settings.STORAGE_STREAM_CHUNK_SIZE):
+                if chunk:
+                    sink.write(chunk)
+        return sink.finish()
+    except Exception as e:
+        logger.exception("Thumbnail source download failed: %s", e)
+        return {'thumbnail_url': '', 'preview_url': ''}
+    finally:
+        sink.close()
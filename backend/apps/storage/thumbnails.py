@@ -1,6 +1,7 @@
 """
 Server-side thumbnail generation for AI-generated elements.
-Used only in generation flow (server already has temp file).
+Used only in generation flow: from a local file (generate_thumbnails) or
+from the download stream itself (open_thumbnail_sink).
 Upload flow uses client-side Canvas resize.
 
 Public interface — import from apps.storage.services instead.
@@ -9,14 +10,21 @@ import logging
 import os
 import subprocess
 import tempfile
-from typing import Optional
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Optional
 import io
+import struct
 import uuid
 
 from PIL import Image
+from django.conf import settings
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 
+from apps.storage.dedup import acquire_object, hash_bytes, register_object
+
 logger = logging.getLogger(__name__)
 
 SMALL_SIZE = 256
@@ -24,15 +32,40 @@ MEDIUM_SIZE = 800
 SMALL_QUALITY = 80
 MEDIUM_QUALITY = 85
 
+# THUMBNAIL_FORMAT → расширение ключа. AVIF доступен, только если Pillow
+# собран с ним (или установлен плагин), иначе откатываемся на JPEG.
+THUMBNAIL_EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp', 'AVIF': '.avif'}
+
+# Режимы, которые Image.reduce() усредняет корректно; палитровые (P, PA),
+# 1-битные и I;16 сначала переводятся в RGB
+REDUCIBLE_MODES = frozenset({'L', 'LA', 'I', 'F', 'RGB', 'RGBA', 'RGBX', 'CMYK', 'YCbCr'})
+
+# Hover-луп: кадр ≤ LOOP_SIZE, LOOP_FPS, без звука. Вывод в stdout, поэтому
+# MP4 — fragmented (moov не дописать в конец непозиционируемого pipe).
+LOOP_SIZE = 360
+LOOP_FPS = 12
+LOOP_ENCODERS = {
+    'mp4': ('.mp4', [
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '32', '-pix_fmt', 'yuv420p',
+        '-movflags', 'frag_keyframe+empty_moov+default_base_moof', '-f', 'mp4',
+    ]),
+    'webp': ('.webp', ['-c:v', 'libwebp', '-quality', '60', '-loop', '0', '-f', 'webp']),
+}
+
+FFMPEG_TIMEOUT = 60  # seconds without progress, then ffmpeg is killed
+# Сколько начала MP4 держим в памяти, пока ищем moov: дальше — spill-файл.
+MP4_SNIFF_LIMIT = 1024 * 1024
+
 
 def generate_thumbnails(
-    temp_path: str,
+    temp_path: str | IO[bytes],
     element_type: str,
     project_id: int,
     scene_id: int | None,
 ) -> dict:
     """
-    Generate small + medium thumbnails from a local temp file.
+    Generate small + medium thumbnails from a local temp file
+    (or an in-memory file object for images).
     Returns: {'thumbnail_url': str, 'preview_url': str}
     Both may be '' on failure (never raises).
     """
@@ -48,60 +81,482 @@ def generate_thumbnails(
 
 
 def _generate_image_thumbnails(
-    image_path: str, project_id: int, scene_id: int | None,
+    image_path: str | IO[bytes], project_id: int, scene_id: int | None,
 ) -> dict:
-    """Resize image to small + medium using Pillow."""
-    img = Image.open(image_path)
-    img = img.convert('RGB')
+    """
+    Decode once, at the lowest resolution that still covers MEDIUM_SIZE:
+    JPEG via draft() (DCT scaling in libjpeg), other formats via reduce().
+    Small is a cascade resize of medium; both variants upload concurrently.
+    """
+    with Image.open(image_path) as img:
+        medium = _resize_to_fit(_decode_for_thumbnail(img, MEDIUM_SIZE), MEDIUM_SIZE)
+    small = _resize_to_fit(medium, SMALL_SIZE)
+
+    urls = _save_variants(
+        [('small', small, SMALL_QUALITY), ('medium', medium, MEDIUM_QUALITY)],
+        project_id, scene_id,
+    )
+    return {'thumbnail_url': urls['small'] or '', 'preview_url': urls['medium'] or ''}
+
+
+def _decode_for_thumbnail(img: Image.Image, target: int) -> Image.Image:
+    """RGB image with longest side >= target (unless the source is smaller)."""
+    if img.format == 'JPEG':
+        # libjpeg decodes straight at 1/2, 1/4 or 1/8 scale, never below target.
+        img.draft('RGB', (target, target))
+    else:
+        # Integer box reduction down to ~2x target keeps LANCZOS quality
+        # while the final resize works on a much smaller image.
+        factor = max(img.size) // (target * 2)
+        if factor >= 2:
+            if img.mode not in REDUCIBLE_MODES:
+                img = img.convert('RGB')
+            img = img.reduce(factor)
+    return img.convert('RGB')
+
+
+def _save_variants(
+    variants: list[tuple[str, Image.Image, int]], project_id: int, scene_id: int | None,
+) -> dict[str, Optional[str]]:
+    """Encode variants concurrently, store them deduplicated. Returns {variant: url | None}."""
+    with ThreadPoolExecutor(max_workers=len(variants), thread_name_prefix='thumb') as pool:
+        encoded = {
+            variant: pool.submit(_encode_thumbnail, img, quality)
+            for variant, img, quality in variants
+        }
+    return _store_contents({
+        variant: (content, _thumbnail_key(project_id, scene_id, variant, ext))
+        for variant, (content, ext) in ((v, f.result()) for v, f in encoded.items())
+    })
+
 
-    result = {}
-    for variant, size, quality in [
-        ('small', SMALL_SIZE, SMALL_QUALITY),
-        ('medium', MEDIUM_SIZE, MEDIUM_QUALITY),
-    ]:
-        resized = _resize_to_fit(img, size)
-        url = _save_thumbnail_to_s3(resized, quality, project_id, scene_id, variant)
-        key = 'thumbnail_url' if variant == 'small' else 'preview_url'
-        result[key] = url or ''
+def _store_contents(items: dict[str, tuple[bytes, str]]) -> dict[str, Optional[str]]:
+    """
+    Store {name: (content, key)} with content dedup (see dedup.py): content
+    that is already stored only gets a new reference, new content is uploaded
+    concurrently. Index updates stay in the calling thread (DB connection).
+    Identical variants share one object and one reference — release_files()
+    drops one reference per distinct URL of an element.
+    Returns {name: url | None}; None — upload failed.
+    """
+    names_by_hash: dict[str, list[str]] = {}
+    first_item = {}
+    for name, (content, key) in items.items():
+        content_hash = hash_bytes(content)
+        names_by_hash.setdefault(content_hash, []).append(name)
+        first_item.setdefault(content_hash, (content, key))
+
+    hash_urls: dict[str, Optional[str]] = {}
+    pending = {}
+    for content_hash, (content, key) in first_item.items():
+        hash_urls[content_hash] = acquire_object(content_hash)
+        if hash_urls[content_hash] is None:
+            pending[content_hash] = (content, key)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix='thumb') as pool:
+            uploads = {
+                content_hash: pool.submit(_upload_content, content, key)
+                for content_hash, (content, key) in pending.items()
+            }
+        for content_hash, future in uploads.items():
+            saved = future.result()
+            if saved is None:
+                continue
+            saved_name, url = saved
+            hash_urls[content_hash] = register_object(content_hash, url, len(pending[content_hash][0]))
+            if hash_urls[content_hash] != url:
+                # Same content stored concurrently — keep one copy.
+                default_storage.delete(saved_name)
 
-    return result
+    return {
+        name: hash_urls[content_hash]
+        for content_hash, names in names_by_hash.items()
+        for name in names
+    }
+
+
+def _upload_content(content: bytes, key: str) -> Optional[tuple[str, str]]:
+    """(saved name, public URL), None on failure."""
+    try:
+        saved = default_storage.save(key, ContentFile(content))
+        return saved, default_storage.url(saved)
+    except Exception as e:
+        logger.exception("Failed to upload thumbnail to S3: %s", e)
+        return None
+
+
+def _encode_thumbnail(img: Image.Image, quality: int) -> tuple[bytes, str]:
+    """Encode in THUMBNAIL_FORMAT. Returns (content, extension)."""
+    fmt = get_thumbnail_format()
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue(), THUMBNAIL_EXTENSIONS[fmt]
+
+
+def _thumbnail_key(project_id: int, scene_id: int | None, suffix: str, ext: str) -> str:
+    prefix = f"projects/{project_id}/scenes/{scene_id}" if scene_id else f"projects/{project_id}/root"
+    return f"{prefix}/{uuid.uuid4().hex}_{suffix}{ext}"
+
+
+def get_thumbnail_format() -> str:
+    """Configured THUMBNAIL_FORMAT if this Pillow can encode it, else JPEG."""
+    fmt = settings.THUMBNAIL_FORMAT.upper()
+    if fmt not in THUMBNAIL_EXTENSIONS:
+        logger.warning("Unknown THUMBNAIL_FORMAT=%s, using JPEG", fmt)
+        return 'JPEG'
+    Image.init()
+    if fmt not in Image.SAVE:
+        logger.warning("Pillow cannot encode %s thumbnails, using JPEG", fmt)
+        return 'JPEG'
+    return fmt
 
 
 def _generate_video_thumbnails(
     video_path: str, project_id: int, scene_id: int | None,
 ) -> dict:
-    """Extract frame via ffmpeg, then resize small. Medium = native frame."""
-    frame_fd = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-    frame_path = frame_fd.name
-    frame_fd.close()
+    """Poster frame at both sizes from a single ffmpeg run (see _FrameExtractor)."""
+    extractor = None
     try:
-        subprocess.run(
-            [
-                'ffmpeg', '-ss', '1', '-i', video_path,
-                '-vframes', '1', '-q:v', '2', '-f', 'image2', '-y', frame_path,
-            ],
-            check=True, capture_output=True,
+        extractor = _FrameExtractor(video_path)
+        medium, small = extractor.frames()
+        return _save_frames(medium, small, project_id, scene_id)
+    except Exception as e:
+        logger.exception("Video thumbnail generation failed: %s", e)
+        return {'thumbnail_url': '', 'preview_url': ''}
+    finally:
+        if extractor is not None:
+            extractor.close()
+
+
+def generate_preview_loop(source: str, project_id: int, scene_id: int | None) -> str:
+    """
+    Short low-bitrate loop from the start of a video, for hover playback in
+    grids instead of the original. source — local path or URL (ffmpeg reads
+    HTTP with range requests, so only the first seconds are downloaded).
+    Returns the public URL, '' if disabled or on failure (never raises).
+    """
+    seconds = settings.VIDEO_LOOP_SECONDS
+    if seconds <= 0:
+        return ''
+    fmt = settings.VIDEO_LOOP_FORMAT.lower()
+    if fmt not in LOOP_ENCODERS:
+        logger.warning("Unknown VIDEO_LOOP_FORMAT=%s, using mp4", fmt)
+        fmt = 'mp4'
+    ext, encoder = LOOP_ENCODERS[fmt]
+    cmd = [
+        'ffmpeg', '-v', 'error', '-t', str(seconds), '-i', source, '-an',
+        '-vf', f'fps={LOOP_FPS},{_fit_filter(LOOP_SIZE)}:force_divisible_by=2',
+        *encoder, 'pipe:1',
+    ]
+    try:
+        result = subprocess.run(
+            cmd, stdin=subprocess.DEVNULL, capture_output=True, timeout=FFMPEG_TIMEOUT, check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        logger.error(
+            "Preview loop generation failed: ffmpeg exited with %s: %s",
+            e.returncode, e.stderr.decode(errors='replace')[-500:],
         )
+        return ''
+    except Exception as e:
+        logger.exception("Preview loop generation failed: %s", e)
+        return ''
+    if not result.stdout:
+        return ''
+    return _upload_bytes_to_s3(result.stdout, project_id, scene_id, 'loop', ext) or ''
 
-        with open(frame_path, 'rb') as f:
-            medium_content = f.read()
-        medium_url = _upload_bytes_to_s3(medium_content, project_id, scene_id, 'md')
 
-        img = Image.open(frame_path)
-        img = img.convert('RGB')
-        small_img = _resize_to_fit(img, SMALL_SIZE)
-        small_url = _save_thumbnail_to_s3(small_img, SMALL_QUALITY, project_id, scene_id, 'small')
+def _save_frames(medium: Image.Image, small: Image.Image, project_id: int, scene_id: int | None) -> dict:
+    urls = _save_variants(
+        [('small', small, SMALL_QUALITY), ('medium', medium, MEDIUM_QUALITY)],
+        project_id, scene_id,
+    )
+    return {'thumbnail_url': urls['small'] or '', 'preview_url': urls['medium'] or ''}
 
-        return {
-            'thumbnail_url': small_url or '',
-            'preview_url': medium_url or '',
-        }
-    except Exception as e:
-        logger.exception("Video thumbnail generation failed: %s", e)
+
+def _fit_filter(max_side: int) -> str:
+    """ffmpeg scale with _resize_to_fit semantics: longest side = max_side, no upscale."""
+    return (
+        f"scale=w='min({max_side},iw)':h='min({max_side},ih)'"
+        f":force_original_aspect_ratio=decrease:flags=lanczos"
+    )
+
+
+def _ffmpeg_frame_args(source: str, small_fd: int) -> list[str]:
+    """
+    Medium → stdout, small (cascaded from medium) → pipe:small_fd, both PPM.
+    VIDEO_POSTER_KEYFRAMES > 1: decode keyframes only and let the thumbnail
+    filter pick the most representative of the first N; otherwise frame at 1s.
+    """
+    keyframes = settings.VIDEO_POSTER_KEYFRAMES
+    if keyframes > 1:
+        seek, pick = ['-skip_frame', 'nokey'], f'thumbnail={keyframes},'
+    else:
+        seek, pick = ['-ss', '1'], ''
+    graph = (
+        f"[0:v:0]{pick}{_fit_filter(MEDIUM_SIZE)},split[md][rest];"
+        f"[rest]{_fit_filter(SMALL_SIZE)}[sm]"
+    )
+    output = ['-frames:v', '1', '-c:v', 'ppm', '-f', 'image2pipe']
+    return [
+        'ffmpeg', '-v', 'error', *seek, '-i', source, '-filter_complex', graph,
+        '-map', '[md]', *output, 'pipe:1',
+        '-map', '[sm]', *output, f'pipe:{small_fd}',
+    ]
+
+
+class _FrameExtractor:
+    """
+    One ffmpeg process, no intermediate files: the scale filter graph writes
+    the poster frame at both sizes into pipes, Pillow reads them from memory.
+
+    source — local path, or 'pipe:0' to feed the video through feed().
+    Hard limit: ffmpeg is killed once it makes no progress for FFMPEG_TIMEOUT
+    (no chunk accepted while feeding, no exit after the input ended).
+    """
+
+    def __init__(self, source: str):
+        self._timeout = FFMPEG_TIMEOUT
+        self._deadline = time.monotonic() + self._timeout
+        self.timed_out = False
+
+        small_read, small_write = os.pipe()
+        try:
+            self._proc = subprocess.Popen(
+                _ffmpeg_frame_args(source, small_write),
+                stdin=subprocess.PIPE if source == 'pipe:0' else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(small_write,),
+            )
+        except BaseException:
+            os.close(small_read)
+            raise
+        finally:
+            os.close(small_write)
+        self._small = os.fdopen(small_read, 'rb')
+
+        # ffmpeg blocks on any full pipe — all outputs are drained concurrently.
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ffmpeg')
+        self._outputs = [
+            self._pool.submit(stream.read)
+            for stream in (self._proc.stdout, self._small, self._proc.stderr)
+        ]
+        self._pool.submit(self._watchdog)
+
+    def _watchdog(self) -> None:
+        while True:
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                self.timed_out = True
+                self._proc.kill()
+                return
+            try:
+                self._proc.wait(timeout=remaining)
+                return
+            except subprocess.TimeoutExpired:
+                continue  # deadline may have moved while feeding
+
+    def feed(self, chunk: bytes) -> None:
+        stdin = self._proc.stdin
+        if stdin.closed:
+            return
+        try:
+            stdin.write(chunk)
+            self._deadline = time.monotonic() + self._timeout
+        except (BrokenPipeError, ValueError):
+            # ffmpeg got its frame and exited — the rest of the stream is not needed.
+            stdin.close()
+
+    def frames(self) -> tuple[Image.Image, Image.Image]:
+        """(medium, small). Raises RuntimeError if ffmpeg failed or timed out."""
+        stdin = self._proc.stdin
+        if stdin is not None and not stdin.closed:
+            self._deadline = time.monotonic() + self._timeout
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = self._proc.wait()  # bounded by the watchdog
+        medium, small, stderr = (future.result() for future in self._outputs)
+        if self.timed_out:
+            raise RuntimeError(f"ffmpeg killed after {self._timeout}s without progress")
+        if returncode != 0 or not medium or not small:
+            raise RuntimeError(
+                f"ffmpeg exited with {returncode}: {stderr.decode(errors='replace')[-500:]}"
+            )
+        return _open_ppm(medium), _open_ppm(small)
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        self._pool.shutdown(wait=True)
+        for stream in (self._proc.stdin, self._proc.stdout, self._proc.stderr, self._small):
+            if stream is not None and not stream.closed:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+
+def _open_ppm(data: bytes) -> Image.Image:
+    with Image.open(io.BytesIO(data)) as img:
+        return img.convert('RGB')
+
+
+# ---------------------------------------------------------------------------
+# Streaming sinks: thumbnails from the download stream, without a temp file
+# ---------------------------------------------------------------------------
+
+class ThumbnailSink(ABC):
+    """
+    Receives the file as a sequence of chunks (tee of the S3 upload stream)
+    and renders thumbnails once the stream ends.
+
+    write() never raises — a broken sink only means empty thumbnails.
+    finish() returns {'thumbnail_url', 'preview_url'}; close() frees resources.
+    """
+
+    def __init__(self, project_id: int, scene_id: int | None):
+        self.project_id = project_id
+        self.scene_id = scene_id
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None:
+        """Feed the next chunk of the file."""
+
+    @abstractmethod
+    def finish(self) -> dict:
+        """Render after the last chunk: {'thumbnail_url', 'preview_url'}."""
+
+    def close(self) -> None:
+        pass
+
+
+class _NullSink(ThumbnailSink):
+    def write(self, chunk: bytes) -> None:
+        pass
+
+    def finish(self) -> dict:
         return {'thumbnail_url': '', 'preview_url': ''}
-    finally:
-        if os.path.exists(frame_path):
-            os.unlink(frame_path)
+
+
+class _ImageSink(ThumbnailSink):
+    """Images are small enough to be kept in memory and decoded from there."""
+
+    def __init__(self, project_id, scene_id):
+        super().__init__(project_id, scene_id)
+        self._buffer = io.BytesIO()
+
+    def write(self, chunk: bytes) -> None:
+        self._buffer.write(chunk)
+
+    def finish(self) -> dict:
+        self._buffer.seek(0)
+        return generate_thumbnails(self._buffer, 'IMAGE', self.project_id, self.scene_id)
+
+    def close(self) -> None:
+        self._buffer.close()
+
+
+class _VideoSink(ThumbnailSink):
+    """
+    Fast-start MP4 (moov before mdat) is piped straight into ffmpeg stdin while
+    downloading. Otherwise ffmpeg needs a seekable input, so the stream is
+    spilled to a temp file and the frame is extracted from it at the end.
+    """
+
+    def __init__(self, project_id, scene_id):
+        super().__init__(project_id, scene_id)
+        self._head = bytearray()
+        self._mode = None  # None (sniffing) | 'pipe' | 'spill' | 'broken'
+        self._extractor = None
+        self._spill = None
+
+    def write(self, chunk: bytes) -> None:
+        try:
+            if self._mode is None:
+                self._head.extend(chunk)
+                faststart = _mp4_is_faststart(bytes(self._head))
+                if faststart is None and len(self._head) < MP4_SNIFF_LIMIT:
+                    return
+                self._start('pipe' if faststart else 'spill', bytes(self._head))
+                self._head = bytearray()
+            elif self._mode == 'pipe':
+                self._extractor.feed(chunk)
+            elif self._mode == 'spill':
+                self._spill.write(chunk)
+        except Exception:
+            logger.exception("Video thumbnail sink failed, thumbnails will be empty")
+            self._mode = 'broken'
+
+    def _start(self, mode: str, head: bytes) -> None:
+        self._mode = mode
+        if mode == 'spill':
+            self._spill = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
+            self._spill.write(head)
+            return
+        self._extractor = _FrameExtractor('pipe:0')
+        self._extractor.feed(head)
+
+    def finish(self) -> dict:
+        if self._mode is None and self._head:
+            # Whole file shorter than the sniff window.
+            self._start('spill', bytes(self._head))
+        if self._mode == 'spill':
+            self._spill.close()
+            return generate_thumbnails(self._spill.name, 'VIDEO', self.project_id, self.scene_id)
+        if self._mode != 'pipe':
+            return {'thumbnail_url': '', 'preview_url': ''}
+
+        try:
+            medium, small = self._extractor.frames()
+            return _save_frames(medium, small, self.project_id, self.scene_id)
+        except Exception as e:
+            logger.exception("Video thumbnail generation failed: %s", e)
+            return {'thumbnail_url': '', 'preview_url': ''}
+
+    def close(self) -> None:
+        if self._extractor is not None:
+            self._extractor.close()
+        if self._spill is not None and os.path.exists(self._spill.name):
+            try:
+                os.unlink(self._spill.name)
+            except OSError:
+                logger.warning("tmp unlink failed", extra={"tmp_path": self._spill.name}, exc_info=True)
+
+
+def open_thumbnail_sink(element_type: str | None, project_id: int, scene_id: int | None) -> ThumbnailSink:
+    """Sink for the element type; unknown types produce no thumbnails."""
+    if element_type == 'IMAGE':
+        return _ImageSink(project_id, scene_id)
+    if element_type == 'VIDEO':
+        return _VideoSink(project_id, scene_id)
+    return _NullSink(project_id, scene_id)
+
+
+def _mp4_is_faststart(head: bytes) -> bool | None:
+    """
+    Walk top-level MP4 boxes: True if moov comes before mdat, False if mdat
+    comes first (or the data is not MP4), None if more bytes are needed.
+    """
+    offset = 0
+    while offset + 8 <= len(head):
+        size, box_type = struct.unpack('>I4s', head[offset:offset + 8])
+        if box_type == b'moov':
+            return True
+        if box_type == b'mdat':
+            return False
+        if size == 1:
+            if offset + 16 > len(head):
+                return None
+            size = struct.unpack('>Q', head[offset + 8:offset + 16])[0]
+        if size < 8:
+            return False
+        offset += size
+    return None
 
 
 def _resize_to_fit(img: Image.Image, max_side: int) -> Image.Image:
@@ -121,32 +576,13 @@ def _resize_to_fit(img: Image.Image, max_side: int) -> Image.Image:
 def _save_thumbnail_to_s3(
     img: Image.Image, quality: int, project_id: int, scene_id: int | None, suffix: str,
 ) -> Optional[str]:
-    """Save Pillow image to S3, return public URL."""
-    buffer = io.BytesIO()
-    img.save(buffer, format='JPEG', quality=quality)
-    buffer.seek(0)
-
-    prefix = f"projects/{project_id}/scenes/{scene_id}" if scene_id else f"projects/{project_id}/root"
-    key = f"{prefix}/{uuid.uuid4().hex}_{suffix}.jpg"
-
-    try:
-        saved = default_storage.save(key, ContentFile(buffer.read()))
-        return default_storage.url(saved)
-    except Exception as e:
-        logger.exception("Failed to upload thumbnail to S3: %s", e)
-        return None
+    """Save Pillow image to S3 in THUMBNAIL_FORMAT (deduplicated), return public URL."""
+    content, ext = _encode_thumbnail(img, quality)
+    return _store_contents({suffix: (content, _thumbnail_key(project_id, scene_id, suffix, ext))})[suffix]
 
 
 def _upload_bytes_to_s3(
-    content: bytes, project_id: int, scene_id: int | None, suffix: str,
+    content: bytes, project_id: int, scene_id: int | None, suffix: str, ext: str = '.jpg',
 ) -> Optional[str]:
-    """Upload raw bytes to S3, return public URL."""
-    prefix = f"projects/{project_id}/scenes/{scene_id}" if scene_id else f"projects/{project_id}/root"
-    key = f"{prefix}/{uuid.uuid4().hex}_{suffix}.jpg"
-
-    try:
-        saved = default_storage.save(key, ContentFile(content))
-        return default_storage.url(saved)
-    except Exception as e:
-        logger.exception("Failed to upload bytes to S3: %s", e)
-        return None
+    """Upload raw bytes to S3 (deduplicated), return public URL."""
+    return _store_contents({suffix: (content, _thumbnail_key(project_id, scene_id, suffix, ext))})[suffix]
@@ -0,0 +1,186 @@
+"""
+S3 transfer engine: part size / concurrency per element type, resumable
+multipart uploads of local files, per-upload throughput metrics.
+
+A multipart upload of a local file is keyed by its S3 key, which is stable
+across Celery retries (staging file name). On retry the engine finds the
+pending upload, keeps parts S3 already has and sends only the missing ones.
+
+Public interface — import from apps.storage.services instead.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+
+from apps.storage.presigned import _get_s3_client
+
+logger = logging.getLogger(__name__)
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for every part except the last
+
+
+@dataclass
+class UploadStats:
+    """Per-upload metrics, also emitted as a structured log record."""
+
+    key: str
+    bytes: int
+    seconds: float
+    parts: int = 1
+    resumed_parts: int = 0
+
+    @property
+    def throughput_mbps(self) -> float:
+        return self.bytes * 8 / 1_000_000 / self.seconds if self.seconds > 0 else 0.0
+
+    def log(self, element_type: str) -> None:
+        logger.info(
+            "s3 upload finished",
+            extra={
+                "s3_key": self.key,
+                "element_type": element_type,
+                "upload_bytes": self.bytes,
+                "upload_seconds": round(self.seconds, 3),
+                "upload_mbps": round(self.throughput_mbps, 2),
+                "upload_parts": self.parts,
+                "upload_resumed_parts": self.resumed_parts,
+            },
+        )
+
+
+def get_transfer_config(element_type: str) -> TransferConfig:
+    """TransferConfig tuned for the element type (STORAGE_TRANSFER[element_type])."""
+    options = settings.STORAGE_TRANSFER.get(element_type) or settings.STORAGE_TRANSFER['IMAGE']
+    part_size = max(MIN_PART_SIZE, options['part_size'])
+    return TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=options['concurrency'],
+    )
+
+
+def object_params(content_type: str) -> dict:
+    """Object headers shared by every upload path (same as default_storage)."""
+    return {'ContentType': content_type, **settings.AWS_S3_OBJECT_PARAMETERS}
+
+
+def upload_file(path: str, key: str, content_type: str, element_type: str, on_bytes=None) -> UploadStats:
+    """
+    Upload a local file. Multipart (parallel parts, resumable) above the
+    part size of the element type, single PUT below it.
+
+    on_bytes(n) — optional, called from worker threads as parts complete.
+    """
+    config = get_transfer_config(element_type)
+    client = _get_s3_client()
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    file_size = os.path.getsize(path)
+    started = time.monotonic()
+
+    if file_size <= config.multipart_threshold:
+        with open(path, 'rb') as f:
+            client.put_object(Bucket=bucket, Key=key, Body=f, **object_params(content_type))
+        if on_bytes:
+            on_bytes(file_size)
+        stats = UploadStats(key=key, bytes=file_size, seconds=time.monotonic() - started)
+    else:
+        parts, resumed = _upload_parts(client, bucket, path, key, content_type, file_size, config, on_bytes)
+        stats = UploadStats(
+            key=key, bytes=file_size, seconds=time.monotonic() - started,
+            parts=parts, resumed_parts=resumed,
+        )
+
+    stats.log(element_type)
+    return stats
+
+
+def abort_pending_upload(key: str) -> None:
+    """Drop unfinished multipart uploads of a key (no retry will resume them)."""
+    client = _get_s3_client()
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    try:
+        for upload in _pending_uploads(client, bucket, key):
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload['UploadId'])
+    except Exception:
+        # Bucket lifecycle rule cleans stale uploads anyway.
+        logger.warning("abort multipart upload failed", extra={"s3_key": key}, exc_info=True)
+
+
+def _pending_uploads(client, bucket: str, key: str) -> list[dict]:
+    response = client.list_multipart_uploads(Bucket=bucket, Prefix=key)
+    return [upload for upload in response.get('Uploads', []) if upload['Key'] == key]
+
+
+def _uploaded_parts(client, bucket: str, key: str, upload_id: str) -> dict[int, dict]:
+    parts: dict[int, dict] = {}
+    kwargs = {'Bucket': bucket, 'Key': key, 'UploadId': upload_id}
+    while True:
+        response = client.list_parts(**kwargs)
+        for part in response.get('Parts', []):
+            parts[part['PartNumber']] = part
+        if not response.get('IsTruncated'):
+            return parts
+        kwargs['PartNumberMarker'] = response['NextPartNumberMarker']
+
+
+def _resume_or_create(client, bucket, key, content_type, part_size, file_size) -> tuple[str, dict[int, dict]]:
+    """Upload id + parts already stored. Pending uploads with another part layout are dropped."""
+    for upload in _pending_uploads(client, bucket, key):
+        upload_id = upload['UploadId']
+        parts = _uploaded_parts(client, bucket, key, upload_id)
+        if all(part['Size'] == min(part_size, file_size - (number - 1) * part_size)
+               for number, part in parts.items()):
+            logger.info(
+                "resuming multipart upload",
+                extra={"s3_key": key, "upload_parts_done": len(parts)},
+            )
+            return upload_id, parts
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+
+    response = client.create_multipart_upload(Bucket=bucket, Key=key, **object_params(content_type))
+    return response['UploadId'], {}
+
+
+def _upload_parts(client, bucket, path, key, content_type, file_size, config, on_bytes) -> tuple[int, int]:
+    part_size = config.multipart_chunksize
+    total_parts = (file_size + part_size - 1) // part_size
+    upload_id, done = _resume_or_create(client, bucket, key, content_type, part_size, file_size)
+
+    etags = {number: part['ETag'] for number, part in done.items()}
+    if on_bytes and done:
+        on_bytes(sum(part['Size'] for part in done.values()))
+    lock = threading.Lock()
+
+    def _send(number: int) -> None:
+        offset = (number - 1) * part_size
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            body = f.read(part_size)
+        response = client.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body,
+        )
+        with lock:
+            etags[number] = response['ETag']
+        if on_bytes:
+            on_bytes(len(body))
+
+    missing = [number for number in range(1, total_parts + 1) if number not in etags]
+    with ThreadPoolExecutor(max_workers=config.max_concurrency, thread_name_prefix='s3-part') as pool:
+        # Part failure propagates; the upload stays pending for the next retry.
+        list(pool.map(_send, missing))
+
+    client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            'Parts': [{'PartNumber': number, 'ETag': etags[number]} for number in range(1, total_parts + 1)],
+        },
+    )
+    return total_parts, len(done)
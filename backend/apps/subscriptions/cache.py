@@ -0,0 +1,96 @@
+"""
+Cache of resolved plan access (plan + feature codes) per user.
+
+Two layers:
+- request scope — memo on the user instance (request.user lives one request);
+- shared — Django cache (Redis in prod), key per user, TTL
+  SUBSCRIPTION_ACCESS_CACHE_TTL.
+
+Entries never outlive the subscription's expires_at, so lazy expiration in
+SubscriptionService.get_active_plan still runs on the first call after it.
+Invalidation: subscriptions/signals.py (subscription → user key; plan or
+feature change → global version bump).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'subscriptions:access:version'
+MEMO_ATTR = '_subscription_access'
+
+
+class PlanAccess(NamedTuple):
+    plan: object  # Plan | None
+    features: frozenset
+    valid_until: datetime | None  # expires_at подписки; None — бессрочно
+    version: int = 0
+
+    def is_fresh(self) -> bool:
+        return self.valid_until is None or self.valid_until > timezone.now()
+
+
+def _key(user_id: int) -> str:
+    return f'subscriptions:access:{user_id}'
+
+
+def get_memo(user) -> PlanAccess | None:
+    access = user.__dict__.get(MEMO_ATTR)
+    return access if access is not None and access.is_fresh() else None
+
+
+def set_memo(user, access: PlanAccess) -> None:
+    user.__dict__[MEMO_ATTR] = access
+
+
+def clear_memo(user) -> None:
+    user.__dict__.pop(MEMO_ATTR, None)
+
+
+def load(user_id: int) -> tuple[PlanAccess | None, int]:
+    """Return (fresh cached access or None, current version)."""
+    try:
+        found = cache.get_many([_key(user_id), VERSION_KEY])
+    except Exception:
+        logger.warning("subscription cache unavailable", exc_info=True)
+        return None, 0
+    version = found.get(VERSION_KEY, 0)
+    access = found.get(_key(user_id))
+    if access is None or access.version != version or not access.is_fresh():
+        return None, version
+    return access, version
+
+
+def store(user_id: int, access: PlanAccess) -> None:
+    timeout = settings.SUBSCRIPTION_ACCESS_CACHE_TTL
+    if access.valid_until is not None:
+        timeout = min(timeout, int((access.valid_until - timezone.now()).total_seconds()))
+    if timeout <= 0:
+        return
+    try:
+        cache.set(_key(user_id), access, timeout)
+    except Exception:
+        logger.warning("subscription cache unavailable", exc_info=True)
+
+
+def invalidate_user(user_id: int) -> None:
+    try:
+        cache.delete(_key(user_id))
+    except Exception:
+        logger.warning("subscription cache invalidation failed", extra={"user_id": user_id}, exc_info=True)
+
+
+def bump_version() -> None:
+    """Plans/features changed — every cached entry becomes stale."""
+    try:
+        cache.add(VERSION_KEY, 0, None)
+        cache.incr(VERSION_KEY)
+    except Exception:
+        logger.warning("subscription cache version bump failed", exc_info=True)
@@ -1,6 +1,8 @@
-from django.db.models import Sum
+from datetime import datetime
+
 from django.utils import timezone
 
+from apps.subscriptions import cache as access_cache
 from apps.subscriptions.models import Feature, Plan, Subscription
 
 
@@ -15,36 +17,63 @@ class SubscriptionService:
     def get_active_plan(user) -> Plan:
         """Return user's active plan.  Lazy expiration check built in.
 
+        Resolved once per request (memo on the user) and shared via the cache
+        until the subscription changes or expires — see subscriptions/cache.py.
+        """
+        return SubscriptionService._access(user).plan
+
+    @staticmethod
+    def _access(user) -> access_cache.PlanAccess:
+        access = access_cache.get_memo(user)
+        if access is not None:
+            return access
+
+        access, version = access_cache.load(user.pk)
+        if access is None:
+            plan, valid_until = SubscriptionService._resolve_plan(user)
+            features = frozenset(plan.features.values_list('code', flat=True)) if plan else frozenset()
+            access = access_cache.PlanAccess(plan, features, valid_until, version)
+            access_cache.store(user.pk, access)
+        access_cache.set_memo(user, access)
+        return access
+
+    @staticmethod
+    def _resolve_plan(user) -> tuple[Plan, datetime | None]:
+        """Resolve the plan from the DB.  Returns (plan, valid_until).
+
         1. Try user.subscription (DoesNotExist -> default plan).
         2. If status in (trial, active, cancelled) AND expired -> mark expired,
            reset to default plan, return default plan.
         3. If status == 'trial' -> return Plan with is_trial_reference=True.
         4. If status in (active, cancelled) -> return sub.plan.
         5. Fallback -> default plan.
+
+        valid_until — когда результат перестаёт быть верным (expires_at
+        подписки), None — пока подписку не изменят.
         """
         default_plan = Plan.objects.filter(is_default=True).first()
 
         try:
             sub = user.subscription
         except Subscription.DoesNotExist:
-            return default_plan
+            return default_plan, None
 
         # Lazy expiration
         if sub.status in ('trial', 'active', 'cancelled') and sub.expires_at <= timezone.now():
             sub.status = 'expired'
             sub.plan = default_plan
             sub.save(update_fields=['status', 'plan'])
-            return default_plan
+            return default_plan, None
 
         if sub.status == 'trial':
             trial_plan = Plan.objects.filter(is_trial_reference=True).first()
-            return trial_plan or default_plan
+            return trial_plan or default_plan, sub.expires_at
 
         if sub.status in ('active', 'cancelled'):
-            return sub.plan
+            return sub.plan, sub.expires_at
 
         # expired or any unexpected status
-        return default_plan
+        return default_plan, None
 
     # ------------------------------------------------------------------
     # Feature gate
@@ -53,8 +82,7 @@ class SubscriptionService:
     @staticmethod
     def has_feature(user, feature_code: str) -> bool:
         """Check if user's active plan includes the feature."""
-        plan = SubscriptionService.get_active_plan(user)
-        return plan.features.filter(code=feature_code).exists()
+        return feature_code in SubscriptionService._access(user).features
 
     # ------------------------------------------------------------------
     # Resource limits
@@ -67,7 +95,7 @@ class SubscriptionService:
         if plan.max_projects == 0:
             return True
         from apps.projects.models import Project  # lazy import
-        return Project.objects.filter(user=user).count() < plan.max_projects
+        return Project.objects.filter(user=user, deleted_at__isnull=True).count() < plan.max_projects
 
     @staticmethod
     def can_create_scene(user, project) -> bool:
@@ -80,13 +108,16 @@ class SubscriptionService:
         plan = SubscriptionService.get_active_plan(user)
         if plan.storage_limit_gb == 0:
             return True
-        from apps.elements.models import Element  # lazy import
-        used = (
-            Element.objects
-            .filter(project__user=user)
-            .aggregate(total=Sum('file_size'))['total']
-        ) or 0
-        return used < plan.storage_limit_bytes
+        return SubscriptionService.storage_used(user) < plan.storage_limit_bytes
+
+    @staticmethod
+    def storage_used(user) -> int:
+        """
+        Bytes stored by the user. Identical files (same content_hash) share
+        one S3 object and are counted once. Read from the usage ledger.
+        """
+        from apps.elements.services import get_user_usage  # lazy import
+        return get_user_usage(user.pk)[0]
 
     # ------------------------------------------------------------------
     # Aggregated limits + usage (for serializers / frontend)
@@ -97,17 +128,11 @@ class SubscriptionService:
         """All limits + current usage.  Keys kept for backward compat."""
         plan = SubscriptionService.get_active_plan(user)
 
-        # Lazy imports
-        from apps.projects.models import Project
-        from apps.elements.models import Element
+        from apps.projects.models import Project  # lazy import
 
-        used_projects = Project.objects.filter(user=user).count()
+        used_projects = Project.objects.filter(user=user, deleted_at__isnull=True).count()
 
-        storage_used = (
-            Element.objects
-            .filter(project__user=user)
-            .aggregate(total=Sum('file_size'))['total']
-        ) or 0
+        storage_used = SubscriptionService.storage_used(user)
 
         return {
             'max_projects': plan.max_projects,
@@ -1,14 +1,39 @@
 import logging
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
-from .models import Subscription
+from . import cache as access_cache
+from .models import Feature, Plan, Subscription
 
 logger = logging.getLogger(__name__)
 
 
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscription_access(sender, instance, **kwargs):
+    """Drop the cached plan of the user — now and once more after commit,
+    so a reader that saw the old row cannot leave it in the cache."""
+    if Subscription._meta.get_field('user').is_cached(instance):
+        access_cache.clear_memo(instance.user)
+    access_cache.invalidate_user(instance.user_id)
+    transaction.on_commit(lambda: access_cache.invalidate_user(instance.user_id))
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+@receiver(m2m_changed, sender=Plan.features.through)
+def invalidate_plan_access(sender, **kwargs):
+    """Plan limits or feature sets changed — every cached plan is stale."""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        access_cache.bump_version()
+        transaction.on_commit(access_cache.bump_version)
+
+
 @receiver(post_save, sender=Subscription)
 def notify_subscription_changed(sender, instance, **kwargs):
     """Send WebSocket notification when subscription is updated."""
@@ -2,7 +2,9 @@
 
 from datetime import timedelta
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -172,6 +174,56 @@ class HasFeatureTest(SubscriptionServiceBaseTest):
         self.assertFalse(SubscriptionService.has_feature(user, 'sharing'))
 
 
+class PlanAccessCacheTest(SubscriptionServiceBaseTest):
+    """Plan/feature resolution is memoized per request and shared via the cache."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_repeated_checks_hit_no_db(self):
+        user = self._make_user()
+        self._set_subscription(user, plan=self.pro_plan, status='active')
+        SubscriptionService.get_active_plan(user)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(SubscriptionService.has_feature(user, 'sharing'))
+            self.assertEqual(SubscriptionService.get_active_plan(user), self.pro_plan)
+
+        # Следующий запрос — новый экземпляр пользователя, но общий кэш.
+        fresh = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(SubscriptionService.has_feature(fresh, 'sharing'))
+
+    def test_subscription_change_invalidates(self):
+        user = self._make_user()
+        self._set_subscription(user, plan=self.free_plan, status='active')
+        self.assertFalse(SubscriptionService.has_feature(user, 'sharing'))
+
+        self._set_subscription(user, plan=self.pro_plan, status='active')
+        self.assertTrue(SubscriptionService.has_feature(user, 'sharing'))
+        self.assertTrue(SubscriptionService.has_feature(User.objects.get(pk=user.pk), 'sharing'))
+
+    def test_plan_feature_change_invalidates(self):
+        user = self._make_user()
+        self._set_subscription(user, plan=self.free_plan, status='active')
+        self.assertFalse(SubscriptionService.has_feature(user, 'sharing'))
+
+        self.free_plan.features.add(self.sharing_feature)
+        self.assertTrue(SubscriptionService.has_feature(User.objects.get(pk=user.pk), 'sharing'))
+
+    def test_cached_plan_still_expires_lazily(self):
+        user = self._make_user()
+        self._set_subscription(user, plan=self.pro_plan, status='active', expires_delta_days=1)
+        self.assertEqual(SubscriptionService.get_active_plan(user), self.pro_plan)
+
+        later = timezone.now() + timedelta(days=2)
+        with patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(SubscriptionService.get_active_plan(user), self.free_plan)
+        user.subscription.refresh_from_db()
+        self.assertEqual(user.subscription.status, 'expired')
+
+
 class CanCreateProjectTest(SubscriptionServiceBaseTest):
     """Tests for SubscriptionService.can_create_project."""
 
@@ -209,6 +209,29 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache — Redis (отдельная БД от Celery/Channels); без REDIS_HOST — память процесса
+_redis_host = os.getenv('REDIS_HOST', '')
+if _redis_host:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_URL', f'redis://{_redis_host}:6379/1'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    }
+
+# Тариф и фичи пользователя в кэше (сек); инвалидация — subscriptions/signals.py
+SUBSCRIPTION_ACCESS_CACHE_TTL = int(os.getenv('SUBSCRIPTION_ACCESS_CACHE_TTL', '300'))
+
+# Снимок публичной страницы шеринга в кэше (сек); инвалидация — sharing/signals.py
+SHARE_PAYLOAD_CACHE_TTL = int(os.getenv('SHARE_PAYLOAD_CACHE_TTL', '600'))
+SHARE_LINK_INDEX_CACHE_TTL = int(os.getenv('SHARE_LINK_INDEX_CACHE_TTL', '3600'))
+# Журнал изменений публичных ссылок (дни); старше — ревьюер перезагружает страницу целиком
+SHARE_CHANGE_LOG_RETENTION_DAYS = int(os.getenv('SHARE_CHANGE_LOG_RETENTION_DAYS', '7'))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
@@ -221,6 +244,49 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 РјРёРЅСѓС‚
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_TASK_SOFT_TIME_LIMIT = 5 * 60  # 5 РјРёРЅ soft limit РґР»СЏ thumbnail-Р·Р°РґР°С‡
 
+# Очереди: celery — сеть (запуск генераций, опрос, загрузки в S3; пул потоков),
+# media — CPU (превью Pillow/ffmpeg; prefork по числу ядер).
+CELERY_TASK_DEFAULT_QUEUE = 'celery'
+CELERY_TASK_ROUTES = {
+    'apps.elements.tasks.render_element_media': {'queue': 'media'},
+    'apps.elements.tasks.render_preview_loop': {'queue': 'media'},
+}
+
+# Outbound HTTP pools (apps/common/http.py): provider API, result downloads, LLM
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.5'))
+HTTP_DEFAULT_TIMEOUT = (
+    float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('HTTP_READ_TIMEOUT', '30')),
+)
+# Per-host (connect, read) overrides, e.g. "api.kie.ai=5:30,tempfile.aiquickdraw.com=5:120"
+HTTP_HOST_TIMEOUTS = {
+    host.strip().lower(): tuple(float(t) for t in timeouts.split(':'))
+    for host, timeouts in (
+        item.split('=', 1)
+        for item in os.getenv('HTTP_HOST_TIMEOUTS', '').split(',')
+        if '=' in item
+    )
+}
+
+
+# Generation status polling (apps/elements/polling.py): one batched beat tick
+# instead of a self-retrying task per element.
+GENERATION_POLL_INTERVAL = int(os.getenv('GENERATION_POLL_INTERVAL', '10'))  # без callback
+GENERATION_POLL_CALLBACK_INTERVAL = int(os.getenv('GENERATION_POLL_CALLBACK_INTERVAL', '60'))  # страховка при callback
+GENERATION_POLL_CALLBACK_FIRST_DELAY = int(os.getenv('GENERATION_POLL_CALLBACK_FIRST_DELAY', '120'))
+GENERATION_POLL_CONCURRENCY = int(os.getenv('GENERATION_POLL_CONCURRENCY', '8'))
+GENERATION_POLL_BATCH_SIZE = int(os.getenv('GENERATION_POLL_BATCH_SIZE', '500'))
+GENERATION_POLL_LEASE = int(os.getenv('GENERATION_POLL_LEASE', '120'))
+GENERATION_POLL_TIMEOUT = int(os.getenv('GENERATION_POLL_TIMEOUT', str(15 * 60)))
+# Адаптивный опрос по гистограммам времени генерации моделей (apps/ai_providers/latency.py)
+GENERATION_POLL_MAX_INTERVAL = int(os.getenv('GENERATION_POLL_MAX_INTERVAL', '120'))
+GENERATION_POLL_BACKOFF_FACTOR = float(os.getenv('GENERATION_POLL_BACKOFF_FACTOR', '1.0'))
+GENERATION_LATENCY_MIN_SAMPLES = int(os.getenv('GENERATION_LATENCY_MIN_SAMPLES', '20'))
+GENERATION_LATENCY_MAX_SAMPLES = int(os.getenv('GENERATION_LATENCY_MAX_SAMPLES', '2000'))
+# Файл уже в S3, а превью так и не отрендерены (media-задача потеряна) — FAILED + возврат
+MEDIA_PROCESSING_TIMEOUT = int(os.getenv('MEDIA_PROCESSING_TIMEOUT', str(30 * 60)))
 
 # YooKassa Configuration
 YOOKASSA_SHOP_ID = os.getenv('YOOKASSA_SHOP_ID', '')
@@ -236,10 +302,31 @@ YOOKASSA_WEBHOOK_IPS = [
 
 # Celery Beat Schedule
 CELERY_BEAT_SCHEDULE = {
+    'poll-generation-statuses': {
+        'task': 'apps.elements.tasks.poll_generation_statuses',
+        'schedule': float(GENERATION_POLL_INTERVAL),
+        'options': {'expires': GENERATION_POLL_INTERVAL},
+    },
     'reconcile-pending-payments': {
         'task': 'reconcile_pending_payments',
         'schedule': 900.0,  # every 15 minutes
     },
+    'reconcile-storage-usage': {
+        'task': 'apps.elements.tasks.reconcile_storage_usage',
+        'schedule': 86400.0,  # every 24 hours
+    },
+    'purge-stale-tombstones': {
+        'task': 'apps.elements.tasks.purge_stale_tombstones',
+        'schedule': 900.0,  # every 15 minutes
+    },
+    'fail-stale-media-processing': {
+        'task': 'apps.elements.tasks.fail_stale_media_processing',
+        'schedule': 900.0,  # every 15 minutes
+    },
+    'prune-share-changes': {
+        'task': 'apps.sharing.tasks.prune_share_changes',
+        'schedule': 86400.0,  # every 24 hours
+    },
     'cleanup-feedback-tmp': {
         'task': 'apps.feedback.tasks.cleanup_feedback_tmp',
         'schedule': 3600.0,  # every hour
@@ -268,6 +355,30 @@ AWS_DEFAULT_ACL = 'public-read'
 AWS_QUERYSTRING_AUTH = False  # РќРµ РґРѕР±Р°РІР»СЏС‚СЊ РїРѕРґРїРёСЃСЊ Рє URL
 AWS_S3_FILE_OVERWRITE = False  # РќРµ РїРµСЂРµР·Р°РїРёСЃС‹РІР°С‚СЊ С„Р°Р№Р»С‹ СЃ РѕРґРёРЅР°РєРѕРІС‹Рј РёРјРµРЅРµРј
 
+# Потоковая загрузка результатов генерации в S3 (apps/storage/streaming.py)
+STORAGE_STREAM_CHUNK_SIZE = int(os.getenv('STORAGE_STREAM_CHUNK_SIZE', str(1024 * 1024)))  # чтение HTTP
+# Multipart-загрузки в S3 по типу элемента (apps/storage/transfer.py): размер part и потоки.
+# В памяти до part_size × concurrency на загрузку, а воркер celery (-P threads,
+# --concurrency=8, лимит 512M) ведёт до 8 загрузок: 8 × 8 MiB × 4 = 256 MiB.
+STORAGE_TRANSFER = {
+    'IMAGE': {
+        'part_size': int(os.getenv('STORAGE_IMAGE_PART_SIZE', str(8 * 1024 * 1024))),
+        'concurrency': int(os.getenv('STORAGE_IMAGE_CONCURRENCY', '4')),
+    },
+    'VIDEO': {
+        'part_size': int(os.getenv('STORAGE_VIDEO_PART_SIZE', str(8 * 1024 * 1024))),
+        'concurrency': int(os.getenv('STORAGE_VIDEO_CONCURRENCY', '4')),
+    },
+}
+
+# Формат серверных превью: jpeg | webp | avif (avif — если Pillow его поддерживает)
+THUMBNAIL_FORMAT = os.getenv('THUMBNAIL_FORMAT', 'jpeg')
+# Постер видео: 0/1 — кадр на 1-й секунде; N > 1 — самый «типичный» из первых N ключевых кадров
+VIDEO_POSTER_KEYFRAMES = int(os.getenv('VIDEO_POSTER_KEYFRAMES', '0'))
+# Hover-луп видео для сеток: mp4 (H.264, fragmented) | webp (анимированный); 0 секунд — не делать
+VIDEO_LOOP_FORMAT = os.getenv('VIDEO_LOOP_FORMAT', 'mp4')
+VIDEO_LOOP_SECONDS = int(os.getenv('VIDEO_LOOP_SECONDS', '3'))
+
 # Media files (Uploads)
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/media/'
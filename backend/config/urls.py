@@ -40,7 +40,7 @@ urlpatterns = [
     path('api/feedback/', include('apps.feedback.urls')),
     path('api/onboarding/', include('apps.onboarding.urls')),
     # Public redirect that hides raw S3 URLs behind a branded route.
-    # Matches /elements/<id>/ (file) and /elements/<id>/<variant>/ (thumb|preview).
+    # Matches /elements/<id>/ (file) and /elements/<id>/<variant>/ (thumb|preview|loop).
     path('elements/<int:element_id>/', element_redirect, name='element_redirect_file'),
     path('elements/<int:element_id>/<str:variant>/', element_redirect, name='element_redirect_variant'),
 ]
@@ -6,7 +6,7 @@ import type { DateRange } from "react-day-picker";
 import { getTransactions } from "@/lib/api/cabinet";
 import { formatDateTime, formatCurrency, formatRubles } from "@/lib/utils/format";
 import { useCreditsStore } from "@/lib/store/credits";
-import type { CabinetTransaction, PaginatedResponse } from "@/lib/types";
+import type { CabinetTransaction, CursorPage } from "@/lib/types";
 import { Skeleton } from "@/components/ui/skeleton";
 import { DateRangePicker } from "@/components/ui/date-range-picker";
 import { ChevronLeft, ChevronRight, CheckCircle2, AlertCircle, Download } from "lucide-react";
@@ -33,10 +33,13 @@ function dateRangeToParams(range: DateRange | undefined) {
 
 export default function BalancePage() {
   const [activeTab, setActiveTab] = useState<Tab>("payment");
-  const [data, setData] = useState<PaginatedResponse<CabinetTransaction> | null>(null);
+  const [data, setData] = useState<CursorPage<CabinetTransaction> | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(false);
-  const [page, setPage] = useState(1);
+  // Стек курсоров пройденных страниц: назад — pop, вперёд — next_cursor
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+  const page = cursors.length;
+  const cursor = cursors[cursors.length - 1];
   const [dateRange, setDateRange] = useState<DateRange | undefined>(defaultRange);
   const balance = useCreditsStore((s) => s.balance);
   const loadBalance = useCreditsStore((s) => s.loadBalance);
@@ -48,7 +51,7 @@ export default function BalancePage() {
     if (page === 1) setError(false);
     try {
       const result = await getTransactions({
-        page,
+        cursor,
         reason: "admin_topup",
         ...dateRangeToParams(dateRange),
       });
@@ -62,12 +65,10 @@ export default function BalancePage() {
     } finally {
       setLoading(false);
     }
-  }, [page, dateRange]);
+  }, [cursor, page, dateRange]);
 
   useEffect(() => { load(); }, [load]);
-  useEffect(() => { setPage(1); }, [dateRange]);
-
-  const totalPages = data ? Math.ceil(data.count / 20) : 0;
+  useEffect(() => { setCursors([undefined]); }, [dateRange]);
 
   return (
     <div className="space-y-6">
@@ -213,24 +214,24 @@ export default function BalancePage() {
               </div>
 
               {/* Pagination */}
-              {data && data.count > 0 && (
+              {data && data.results.length > 0 && (
                 <div className="flex items-center justify-between">
                   <span className="text-[11px] text-muted-foreground">
-                    {`${(page - 1) * 20 + 1}–${Math.min(page * 20, data.count)} из ${data.count}`}
+                    {`${(page - 1) * 20 + 1}–${(page - 1) * 20 + data.results.length}`}
                   </span>
-                  {totalPages > 1 && (
+                  {(page > 1 || data.has_more) && (
                     <div className="flex items-center gap-3">
                       <button
-                        onClick={() => setPage((p) => Math.max(1, p - 1))}
+                        onClick={() => setCursors((c) => c.slice(0, -1))}
                         disabled={page <= 1}
                         className="p-2 rounded-md bg-muted/60 text-muted-foreground hover:text-foreground hover:bg-muted transition-colors disabled:opacity-30"
                       >
                         <ChevronLeft className="h-4 w-4" />
                       </button>
-                      <span className="text-xs text-muted-foreground font-mono">{page} / {totalPages}</span>
+                      <span className="text-xs text-muted-foreground font-mono">{page}</span>
                       <button
-                        onClick={() => setPage((p) => Math.min(totalPages, p + 1))}
-                        disabled={page >= totalPages}
+                        onClick={() => data.next_cursor && setCursors((c) => [...c, data.next_cursor!])}
+                        disabled={!data.has_more}
                         className="p-2 rounded-md bg-muted/60 text-muted-foreground hover:text-foreground hover:bg-muted transition-colors disabled:opacity-30"
                       >
                         <ChevronRight className="h-4 w-4" />
@@ -5,7 +5,7 @@ import { format, subDays } from "date-fns";
 import type { DateRange } from "react-day-picker";
 import { getHistory } from "@/lib/api/cabinet";
 import { formatDateTime, formatStorage, formatCurrency } from "@/lib/utils/format";
-import type { CabinetHistoryEntry, PaginatedResponse, AIModel, Project } from "@/lib/types";
+import type { CabinetHistoryEntry, CursorPage, AIModel, Project } from "@/lib/types";
 import { Skeleton } from "@/components/ui/skeleton";
 import { SelectDropdown } from "@/components/ui/select-dropdown";
 import { DateRangePicker } from "@/components/ui/date-range-picker";
@@ -61,10 +61,13 @@ const IS_GENERATED = new Set(["GENERATED"]);
 /* ── Main Component ─────────────────────────────────────── */
 
 export default function HistoryPage() {
-  const [data, setData] = useState<PaginatedResponse<CabinetHistoryEntry> | null>(null);
+  const [data, setData] = useState<CursorPage<CabinetHistoryEntry> | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(false);
-  const [page, setPage] = useState(1);
+  // Стек курсоров пройденных страниц: назад — pop, вперёд — next_cursor
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+  const page = cursors.length;
+  const cursor = cursors[cursors.length - 1];
   const [status, setStatus] = useState("");
   const [sourceType, setSourceType] = useState("");
   const [modelId, setModelId] = useState<number | undefined>();
@@ -92,7 +95,7 @@ export default function HistoryPage() {
     if (page === 1) setError(false);
     try {
       const result = await getHistory({
-        page,
+        cursor,
         status: status || undefined,
         source_type: sourceType || undefined,
         ai_model_id: modelId,
@@ -109,12 +112,10 @@ export default function HistoryPage() {
     } finally {
       setLoading(false);
     }
-  }, [page, status, sourceType, modelId, projectId, dateRange]);
+  }, [cursor, page, status, sourceType, modelId, projectId, dateRange]);
 
   useEffect(() => { load(); }, [load]);
-  useEffect(() => { setPage(1); }, [status, sourceType, modelId, projectId, dateRange]);
-
-  const totalPages = data ? Math.ceil(data.count / 20) : 0;
+  useEffect(() => { setCursors([undefined]); }, [status, sourceType, modelId, projectId, dateRange]);
 
   return (
     <div className="space-y-5">
@@ -203,23 +204,23 @@ export default function HistoryPage() {
       {data && (
         <div className="flex items-center justify-between">
           <span className="text-[11px] text-muted-foreground">
-            {data.count > 0
-              ? `${(page - 1) * 20 + 1}–${Math.min(page * 20, data.count)} из ${data.count}`
+            {data.results.length > 0
+              ? `${(page - 1) * 20 + 1}–${(page - 1) * 20 + data.results.length}`
               : ""}
           </span>
-          {totalPages > 1 && (
+          {(page > 1 || data.has_more) && (
             <div className="flex items-center gap-3">
               <button
-                onClick={() => setPage((p) => Math.max(1, p - 1))}
+                onClick={() => setCursors((c) => c.slice(0, -1))}
                 disabled={page <= 1}
                 className="p-2 rounded-md bg-muted/60 text-muted-foreground hover:text-foreground hover:bg-muted transition-colors disabled:opacity-30"
               >
                 <ChevronLeft className="h-4 w-4" />
               </button>
-              <span className="text-xs text-muted-foreground font-mono">{page} / {totalPages}</span>
+              <span className="text-xs text-muted-foreground font-mono">{page}</span>
               <button
-                onClick={() => setPage((p) => Math.min(totalPages, p + 1))}
-                disabled={page >= totalPages}
+                onClick={() => data.next_cursor && setCursors((c) => [...c, data.next_cursor!])}
+                disabled={!data.has_more}
                 className="p-2 rounded-md bg-muted/60 text-muted-foreground hover:text-foreground hover:bg-muted transition-colors disabled:opacity-30"
               >
                 <ChevronRight className="h-4 w-4" />
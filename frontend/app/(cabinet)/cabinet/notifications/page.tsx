@@ -97,7 +97,7 @@ function NotificationSkeleton() {
 export default function NotificationsPage() {
   const router = useRouter();
   const {
-    notifications, hasMore, isLoading, error,
+    notifications, hasMore, nextCursor, isLoading, error,
     activeTab, projectId,
     setActiveTab, setProjectId,
     fetchNotifications, markRead, markAllRead,
@@ -106,7 +106,7 @@ export default function NotificationsPage() {
   const [projects, setProjects] = useState<{ id: number; name: string }[]>([]);
 
   useEffect(() => {
-    fetchNotifications(0);
+    fetchNotifications();
   }, [fetchNotifications]);
 
   useEffect(() => {
@@ -183,7 +183,7 @@ export default function NotificationsPage() {
             <p className="text-sm font-medium text-foreground">Не удалось загрузить данные</p>
             <p className="text-xs text-muted-foreground mt-1">Попробуйте обновить страницу</p>
             <button
-              onClick={() => fetchNotifications(0)}
+              onClick={() => fetchNotifications()}
               className="mt-3 px-3 py-1.5 text-xs rounded-sm bg-primary text-primary-foreground hover:bg-primary/90 transition-colors"
             >
               Повторить
@@ -215,7 +215,7 @@ export default function NotificationsPage() {
       {hasMore && !isLoading && (
         <div className="flex justify-center">
           <button
-            onClick={() => fetchNotifications(notifications.length)}
+            onClick={() => fetchNotifications(nextCursor)}
             className="px-4 py-2 text-xs text-muted-foreground hover:text-foreground bg-muted/60 hover:bg-muted rounded-md transition-colors"
           >
             Загрузить ещё
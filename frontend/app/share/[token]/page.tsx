@@ -461,6 +461,9 @@ export default function PublicSharePage() {
   const [project, setProject] = useState<PublicProject | null>(null)
   const [error, setError] = useState<{ status: number; message: string } | null>(null)
   const [loading, setLoading] = useState(true)
+  const [reloadKey, setReloadKey] = useState(0)
+  // seq последнего применённого изменения ссылки (change_seq страницы, затем WS / resync)
+  const lastSeqRef = useRef(0)
 
   // Lightbox state
   const [lightboxOpen, setLightboxOpen] = useState(false)
@@ -534,13 +537,14 @@ export default function PublicSharePage() {
     return () => window.removeEventListener('storage', onStorage)
   }, [])
 
-  // Fetch project
+  // Fetch project (reloadKey — ресинк не покрывается журналом изменений)
   useEffect(() => {
     if (!token) return
     setLoading(true)
     sharingApi
       .getPublicProject(token)
       .then((data) => {
+        lastSeqRef.current = data.change_seq ?? 0
         setProject(data)
         // Apply saved display preferences from the shared link
         if (data.display_preferences && data.display_preferences.size) {
@@ -612,7 +616,7 @@ export default function PublicSharePage() {
         }
       })
       .finally(() => setLoading(false))
-  }, [token])
+  }, [token, reloadKey])
 
   // Flat list of all elements for lightbox navigation
   const allElements = useMemo(() => {
@@ -704,11 +708,171 @@ export default function PublicSharePage() {
     let reconnectAttempts = 0
     const MAX_RECONNECT = 5
 
+    // Событие из WS или из /changes/ при ресинке; seq не больше увиденного — уже применено
+    function applyEvent(data: any) {
+      if (typeof data.seq === 'number') {
+        if (data.seq <= lastSeqRef.current) return
+        lastSeqRef.current = data.seq
+      }
+
+      if (data.type === 'new_comment') {
+        // Skip own comments — already added optimistically from API response
+        if (data.session_id && data.session_id === sessionId) return
+
+        const newComment: Comment = {
+          id: data.comment_id,
+          element: data.element_id || null,
+          scene: data.scene_id || null,
+          parent: data.parent_id || null,
+          author_name: data.author_name,
+          author_user: null,
+          session_id: data.session_id || '',
+          text: data.text,
+          is_read: false,
+          created_at: data.created_at,
+          replies: [],
+        }
+
+        // Helper: check if comment exists anywhere in tree
+        const existsInTree = (comments: Comment[], id: number): boolean =>
+          comments.some((c) => c.id === id || (c.replies || []).some((r) => r.id === id))
+
+        if (data.element_id) {
+          setCommentsMap((prev) => {
+            const existing = prev[data.element_id] || []
+            if (existsInTree(existing, data.comment_id)) return prev
+
+            if (data.parent_id) {
+              return {
+                ...prev,
+                [data.element_id]: existing.map((c) =>
+                  c.id === data.parent_id
+                    ? { ...c, replies: [...(c.replies || []), newComment] }
+                    : c
+                ),
+              }
+            }
+            return { ...prev, [data.element_id]: [...existing, newComment] }
+          })
+          // Track new comment for badge
+          setNewCommentCounts((prev) => ({ ...prev, [data.element_id]: (prev[data.element_id] || 0) + 1 }))
+          // Toast with click-to-open
+          toast.info(`${data.author_name}: ${data.text.slice(0, 60)}${data.text.length > 60 ? '…' : ''}`)
+        } else if (data.shared_link_id) {
+          setGeneralComments((prev) => {
+            if (existsInTree(prev, data.comment_id)) return prev
+
+            if (data.parent_id) {
+              return prev.map((c) =>
+                c.id === data.parent_id
+                  ? { ...c, replies: [...(c.replies || []), newComment] }
+                  : c
+              )
+            }
+            return [...prev, newComment]
+          })
+          setNewGeneralCount((prev) => prev + 1)
+          toast.info(`${data.author_name}: ${data.text.slice(0, 60)}${data.text.length > 60 ? '…' : ''}`)
+        }
+      } else if (data.type === 'reaction_updated') {
+        setProject((prev) => {
+          if (!prev) return prev
+          const updateElement = (el: PublicElement) => {
+            if (el.id === data.element_id) {
+              return { ...el, likes: data.likes, dislikes: data.dislikes }
+            }
+            return el
+          }
+          return {
+            ...prev,
+            ungrouped_elements: prev.ungrouped_elements.map(updateElement),
+            scenes: prev.scenes.map((s) => ({
+              ...s,
+              elements: s.elements.map(updateElement),
+            })),
+          }
+        })
+        if (data.session_id === sessionId) {
+          setReactionsMap((prev) => ({
+            ...prev,
+            [data.element_id]: data.value,
+          }))
+        }
+      } else if (data.type === 'review_updated') {
+        // Обновить reviews на элементе для полоски
+        setProject((prev) => {
+          if (!prev) return prev
+          const updateEl = (el: any) => {
+            if (el.id !== data.element_id) return el
+            const reviews = (el.reviews || []).filter((r: any) => r.session_id !== data.session_id)
+            if (data.action) {
+              reviews.push({ session_id: data.session_id, author_name: data.author_name, action: data.action })
+            }
+            return { ...el, reviews }
+          }
+          return {
+            ...prev,
+            ungrouped_elements: prev.ungrouped_elements.map(updateEl),
+            scenes: prev.scenes.map((s: any) => ({ ...s, elements: s.elements.map(updateEl) })),
+          }
+        })
+        if (data.session_id === sessionId) {
+          setReviewMap((prev) => ({
+            ...prev,
+            [data.element_id]: data.action,
+          }))
+        }
+      } else if (data.type === 'element_updated') {
+        setProject((prev) => {
+          if (!prev) return prev
+          const updateEl = (el: PublicElement) =>
+            el.id === data.element_id
+              ? { ...el, file_url: data.file_url, thumbnail_url: data.thumbnail_url, preview_url: data.preview_url }
+              : el
+          return {
+            ...prev,
+            ungrouped_elements: prev.ungrouped_elements.map(updateEl),
+            scenes: prev.scenes.map((s) => ({ ...s, elements: s.elements.map(updateEl) })),
+          }
+        })
+      }
+    }
+
+    // Переподключение или возврат на вкладку: только изменения после последнего seq
+    let resyncing = false
+    async function resync() {
+      if (resyncing) return
+      resyncing = true
+      try {
+        for (;;) {
+          const res = await sharingApi.getPublicChanges(token, lastSeqRef.current)
+          if (res.reset) {
+            setReloadKey((k) => k + 1)
+            return
+          }
+          res.changes.forEach(applyEvent)
+          if (!res.has_more) return
+        }
+      } catch {
+        // следующий reconnect/фокус попробует снова
+      } finally {
+        resyncing = false
+      }
+    }
+
+    function onVisibilityChange() {
+      if (document.visibilityState === 'visible') resync()
+    }
+    document.addEventListener('visibilitychange', onVisibilityChange)
+    let wasConnected = false
+
     function connect() {
       ws = new WebSocket(wsUrl)
 
       ws.onopen = () => {
         reconnectAttempts = 0
+        if (wasConnected) resync()
+        wasConnected = true
         pingInterval = setInterval(() => {
           if (ws?.readyState === WebSocket.OPEN) {
             ws.send(JSON.stringify({ type: 'ping' }))
@@ -718,116 +882,7 @@ export default function PublicSharePage() {
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data)
-
-          if (data.type === 'new_comment') {
-            // Skip own comments — already added optimistically from API response
-            if (data.session_id && data.session_id === sessionId) return
-
-            const newComment: Comment = {
-              id: data.comment_id,
-              element: data.element_id || null,
-              scene: data.scene_id || null,
-              parent: data.parent_id || null,
-              author_name: data.author_name,
-              author_user: null,
-              session_id: data.session_id || '',
-              text: data.text,
-              is_read: false,
-              created_at: data.created_at,
-              replies: [],
-            }
-
-            // Helper: check if comment exists anywhere in tree
-            const existsInTree = (comments: Comment[], id: number): boolean =>
-              comments.some((c) => c.id === id || (c.replies || []).some((r) => r.id === id))
-
-            if (data.element_id) {
-              setCommentsMap((prev) => {
-                const existing = prev[data.element_id] || []
-                if (existsInTree(existing, data.comment_id)) return prev
-
-                if (data.parent_id) {
-                  return {
-                    ...prev,
-                    [data.element_id]: existing.map((c) =>
-                      c.id === data.parent_id
-                        ? { ...c, replies: [...(c.replies || []), newComment] }
-                        : c
-                    ),
-                  }
-                }
-                return { ...prev, [data.element_id]: [...existing, newComment] }
-              })
-              // Track new comment for badge
-              setNewCommentCounts((prev) => ({ ...prev, [data.element_id]: (prev[data.element_id] || 0) + 1 }))
-              // Toast with click-to-open
-              toast.info(`${data.author_name}: ${data.text.slice(0, 60)}${data.text.length > 60 ? '…' : ''}`)
-            } else if (data.shared_link_id) {
-              setGeneralComments((prev) => {
-                if (existsInTree(prev, data.comment_id)) return prev
-
-                if (data.parent_id) {
-                  return prev.map((c) =>
-                    c.id === data.parent_id
-                      ? { ...c, replies: [...(c.replies || []), newComment] }
-                      : c
-                  )
-                }
-                return [...prev, newComment]
-              })
-              setNewGeneralCount((prev) => prev + 1)
-              toast.info(`${data.author_name}: ${data.text.slice(0, 60)}${data.text.length > 60 ? '…' : ''}`)
-            }
-          } else if (data.type === 'reaction_updated') {
-            setProject((prev) => {
-              if (!prev) return prev
-              const updateElement = (el: PublicElement) => {
-                if (el.id === data.element_id) {
-                  return { ...el, likes: data.likes, dislikes: data.dislikes }
-                }
-                return el
-              }
-              return {
-                ...prev,
-                ungrouped_elements: prev.ungrouped_elements.map(updateElement),
-                scenes: prev.scenes.map((s) => ({
-                  ...s,
-                  elements: s.elements.map(updateElement),
-                })),
-              }
-            })
-            if (data.session_id === sessionId) {
-              setReactionsMap((prev) => ({
-                ...prev,
-                [data.element_id]: data.value,
-              }))
-            }
-          } else if (data.type === 'review_updated') {
-            // Обновить reviews на элементе для полоски
-            setProject((prev) => {
-              if (!prev) return prev
-              const updateEl = (el: any) => {
-                if (el.id !== data.element_id) return el
-                const reviews = (el.reviews || []).filter((r: any) => r.session_id !== data.session_id)
-                if (data.action) {
-                  reviews.push({ session_id: data.session_id, author_name: data.author_name, action: data.action })
-                }
-                return { ...el, reviews }
-              }
-              return {
-                ...prev,
-                ungrouped_elements: prev.ungrouped_elements.map(updateEl),
-                scenes: prev.scenes.map((s: any) => ({ ...s, elements: s.elements.map(updateEl) })),
-              }
-            })
-            if (data.session_id === sessionId) {
-              setReviewMap((prev) => ({
-                ...prev,
-                [data.element_id]: data.action,
-              }))
-            }
-          }
+          applyEvent(JSON.parse(event.data))
         } catch {
           // ignore malformed messages
         }
@@ -851,6 +906,7 @@ export default function PublicSharePage() {
     connect()
 
     return () => {
+      document.removeEventListener('visibilitychange', onVisibilityChange)
       if (pingInterval) clearInterval(pingInterval)
       if (reconnectTimeout) clearTimeout(reconnectTimeout)
       if (ws) {
@@ -147,7 +147,7 @@ export function ElementGrid({ className, onRequestDelete, groups = [], onGroupCl
     selectElement,
     openLightbox,
     toggleFavorite,
-    reorderElements,
+    repositionElement,
     updateApprovalStatus,
   } = useSceneWorkspaceStore();
 
@@ -258,14 +258,7 @@ export function ElementGrid({ className, onRequestDelete, groups = [], onGroupCl
         const oldIndex = allElements.findIndex((e) => e.id === activeParsed.id);
         const newIndex = allElements.findIndex((e) => e.id === overParsed.id);
         if (oldIndex === -1 || newIndex === -1) return;
-        const ids = allElements.map((e) => e.id);
-        const [movedId] = ids.splice(oldIndex, 1);
-        ids.splice(newIndex, 0, movedId);
-        try {
-          await reorderElements(ids);
-        } catch {
-          toast.error("Не удалось сохранить порядок");
-        }
+        await repositionElement(activeParsed.id, newIndex);
       }
 
       // Case 2: Element → Group (cross-container move)
@@ -307,7 +300,7 @@ export function ElementGrid({ className, onRequestDelete, groups = [], onGroupCl
         }
       }
     },
-    [sortedGroups, selectedIds, reorderElements],
+    [sortedGroups, selectedIds, repositionElement],
   );
 
   // Card callbacks
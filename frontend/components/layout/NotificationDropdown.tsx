@@ -93,7 +93,7 @@ export function NotificationDropdown({ children }: NotificationDropdownProps) {
   function handleOpenChange(next: boolean) {
     setOpen(next)
     if (next && bellNotifications.length === 0) {
-      fetchNotifications(0).catch((err) =>
+      fetchNotifications().catch((err) =>
         logger.warn('notification_dropdown.fetch_failed', { cause: err })
       )
     }
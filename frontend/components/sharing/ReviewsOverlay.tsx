@@ -12,7 +12,9 @@ import { logger } from '@/lib/utils/logger'
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription, DialogFooter } from '@/components/ui/dialog'
 import { Button } from '@/components/ui/button'
 import { useNotificationStore } from '@/lib/store/notifications'
-import type { ProjectFeedbackLink, ProjectFeedbackElement, Comment } from '@/lib/types'
+import type {
+  ProjectFeedbackLink, ProjectFeedbackElement, Comment, CommentThreadPreview, LinkFeedbackThreads,
+} from '@/lib/types'
 
 interface ReviewsOverlayProps {
   projectId?: number
@@ -25,6 +27,8 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
   const [links, setLinks] = useState<ProjectFeedbackLink[]>([])
   const [loading, setLoading] = useState(false)
   const [expandedLinks, setExpandedLinks] = useState<Set<number>>(new Set())
+  // Треды грузятся только для раскрытых ссылок
+  const [threads, setThreads] = useState<Record<number, LinkFeedbackThreads>>({})
   const [replyTexts, setReplyTexts] = useState<Record<string, string>>({})
   const [replyTarget, setReplyTarget] = useState<{ key: string; commentId: number; authorName: string } | null>(null)
   const [deleteTarget, setDeleteTarget] = useState<{ id: number; name: string } | null>(null)
@@ -40,6 +44,7 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
       .then((data) => {
         setLinks(data.links || [])
         setExpandedLinks(new Set())
+        setThreads({})
       })
       .catch(() => toast.error('Не удалось загрузить отзывы'))
       .finally(() => setLoading(false))
@@ -69,19 +74,58 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
     })
   }, [links])
 
+  const loadThreads = useCallback((linkId: number) => {
+    return sharingApi.getLinkThreads(linkId)
+      .then((data) => setThreads((prev) => ({ ...prev, [linkId]: data })))
+      .catch(() => toast.error('Не удалось загрузить комментарии'))
+  }, [])
+
   const toggleLink = useCallback((linkId: number) => {
+    const expanding = !expandedLinks.has(linkId)
     setExpandedLinks((prev) => {
       const next = new Set(prev)
       if (next.has(linkId)) {
         next.delete(linkId)
       } else {
         next.add(linkId)
-        // Mark as read when expanding
-        markLinkRead(linkId)
       }
       return next
     })
-  }, [markLinkRead])
+    if (expanding) {
+      // Mark as read when expanding
+      markLinkRead(linkId)
+      if (!threads[linkId]) loadThreads(linkId)
+    }
+  }, [expandedLinks, threads, markLinkRead, loadThreads])
+
+  // Более старые комментарии треда — страница comments/ (от новых к старым) в начало
+  const loadOlder = useCallback(async (linkId: number, elementId?: number) => {
+    const linkThreads = threads[linkId]
+    const thread = elementId ? linkThreads?.elements[elementId] : linkThreads?.general
+    if (!thread?.next_cursor) return
+    try {
+      const page = elementId
+        ? await sharingApi.getElementCommentsPage(elementId, thread.next_cursor)
+        : await sharingApi.getLinkCommentsPage(linkId, thread.next_cursor)
+      const merged: CommentThreadPreview = {
+        comments: [...[...page.results].reverse(), ...thread.comments],
+        has_more: page.has_more,
+        next_cursor: page.next_cursor,
+      }
+      setThreads((prev) => {
+        const current = prev[linkId]
+        if (!current) return prev
+        return {
+          ...prev,
+          [linkId]: elementId
+            ? { ...current, elements: { ...current.elements, [elementId]: merged } }
+            : { ...current, general: merged },
+        }
+      })
+    } catch {
+      toast.error('Не удалось загрузить комментарии')
+    }
+  }, [threads])
 
   const submittingRef = useRef(false)
   const handleReply = useCallback(async (linkId: number, elementKey: string, elementId?: number, parentId?: number) => {
@@ -102,12 +146,13 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
         ? await sharingApi.getProjectFeedback(projectId)
         : await sharingApi.getAllFeedback()
       setLinks(data.links || [])
+      await loadThreads(linkId)
     } catch {
       toast.error('Не удалось отправить ответ')
     } finally {
       submittingRef.current = false
     }
-  }, [replyTexts, projectId])
+  }, [replyTexts, projectId, loadThreads])
 
   // Mark all as read on close + sync notification store
   const handleClose = useCallback(() => {
@@ -266,6 +311,8 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
                     <FeedbackElementRow
                       key={el.id}
                       element={el}
+                      thread={threads[link.id]?.elements[el.id]}
+                      onLoadOlder={() => loadOlder(link.id, el.id)}
                       linkId={link.id}
                       replyText={replyTexts[`el-${el.id}`] || ''}
                       onReplyTextChange={(text) => setReplyTexts((prev) => ({ ...prev, [`el-${el.id}`]: text }))}
@@ -282,19 +329,18 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
                   ))}
 
                   {/* General comments */}
-                  {link.general_comments.length > 0 && (
+                  {link.general_comment_count > 0 && (
                     <div className="px-4 py-3 border-t border-border">
                       <div className="flex items-center gap-1.5 mb-3">
                         <MessageSquare className="w-3.5 h-3.5 text-primary" />
                         <span className="text-xs font-medium text-primary">Общий комментарий к ссылке</span>
                       </div>
-                      {link.general_comments.map((comment) => (
-                        <CommentBubble
-                          key={comment.id}
-                          comment={comment}
-                          onReplyToComment={(commentId, authorName) => setReplyTarget({ key: `gen-${link.id}`, commentId, authorName })}
-                        />
-                      ))}
+                      <CollapsedComments
+                        thread={threads[link.id]?.general}
+                        total={link.general_comment_count}
+                        onLoadOlder={() => loadOlder(link.id)}
+                        onReplyToComment={(commentId, authorName) => setReplyTarget({ key: `gen-${link.id}`, commentId, authorName })}
+                      />
                       <ReplyInput
                         value={replyTexts[`gen-${link.id}`] || ''}
                         onChange={(text) => setReplyTexts((prev) => ({ ...prev, [`gen-${link.id}`]: text }))}
@@ -309,7 +355,7 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
                     </div>
                   )}
 
-                  {link.elements.length === 0 && link.general_comments.length === 0 && (
+                  {link.elements.length === 0 && link.general_comment_count === 0 && (
                     <div className="px-4 py-6 text-center text-xs text-muted-foreground">
                       Нет отзывов по этой ссылке
                     </div>
@@ -358,10 +404,12 @@ export function ReviewsOverlay({ projectId, isOpen, onClose, onOpenLightbox }: R
 // --- Sub-components ---
 
 function FeedbackElementRow({
-  element, linkId, replyText, onReplyTextChange, onSubmitReply, onOpenLightbox,
+  element, thread, onLoadOlder, linkId, replyText, onReplyTextChange, onSubmitReply, onOpenLightbox,
   replyTarget, onReplyToComment, onCancelReply,
 }: {
   element: ProjectFeedbackElement
+  thread?: CommentThreadPreview
+  onLoadOlder: () => void
   linkId: number
   replyText: string
   onReplyTextChange: (text: string) => void
@@ -371,12 +419,8 @@ function FeedbackElementRow({
   onReplyToComment: (commentId: number, authorName: string) => void
   onCancelReply: () => void
 }) {
-  // Count unread comments for this element (not authored by creator)
-  const unreadCount = element.comments.reduce((sum, c) => {
-    let n = (!c.is_read && !c.author_user) ? 1 : 0
-    n += (c.replies || []).filter(r => !r.is_read && !r.author_user).length
-    return sum + n
-  }, 0)
+  // Unread comments for this element (not authored by creator) — counted by the server
+  const unreadCount = element.unread_count
 
   return (
     <div className={cn("flex gap-3 px-4 py-3 border-b border-border last:border-b-0", unreadCount > 0 && "bg-primary/5")}>
@@ -432,8 +476,15 @@ function FeedbackElementRow({
           )}
         </div>
 
-        {/* Comments — last 3 by default, expandable in batches of 10 */}
-        <CollapsedComments comments={element.comments} onReplyToComment={onReplyToComment} />
+        {/* Comments — last 3 by default, older loaded in batches of 10 */}
+        {element.comment_count > 0 && (
+          <CollapsedComments
+            thread={thread}
+            total={element.comment_count}
+            onLoadOlder={onLoadOlder}
+            onReplyToComment={onReplyToComment}
+          />
+        )}
 
         {/* Reply input */}
         <ReplyInput
@@ -542,19 +593,23 @@ function ReplyInput({ value, onChange, onSubmit, replyTarget, onCancelReply }: {
   )
 }
 
-function CollapsedComments({ comments, onReplyToComment }: {
-  comments: Comment[]
+function CollapsedComments({ thread, total, onLoadOlder, onReplyToComment }: {
+  thread?: CommentThreadPreview
+  total: number
+  onLoadOlder: () => void
   onReplyToComment: (commentId: number, authorName: string) => void
 }) {
-  const [showCount, setShowCount] = useState(3)
-  const visible = comments.length > showCount ? comments.slice(-showCount) : comments
-  const hidden = comments.length - visible.length
+  if (!thread) {
+    return <div className="text-[10px] text-muted-foreground py-0.5">Загрузка...</div>
+  }
+  const visible = thread.comments
+  const hidden = thread.has_more ? Math.max(total - visible.length, 1) : 0
 
   return (
     <>
       {hidden > 0 && (
         <button
-          onClick={() => setShowCount((p) => p + 10)}
+          onClick={onLoadOlder}
           className="text-xs text-primary hover:text-primary/80 transition-colors py-0.5"
         >
           Показать ещё {Math.min(hidden, 10)} из {hidden} {pluralizeRu(hidden, 'комментарий', 'комментария', 'комментариев')}
@@ -4,7 +4,7 @@ import type {
   CabinetHistoryEntry,
   CabinetTransaction,
   CabinetStorage,
-  PaginatedResponse,
+  CursorPage,
 } from "@/lib/types";
 
 export interface AnalyticsParams {
@@ -17,7 +17,7 @@ export interface AnalyticsParams {
 }
 
 export interface HistoryParams {
-  page?: number;
+  cursor?: string;
   page_size?: number;
   status?: string;
   ai_model_id?: number;
@@ -29,7 +29,7 @@ export interface HistoryParams {
 }
 
 export interface TransactionParams {
-  page?: number;
+  cursor?: string;
   page_size?: number;
   reason?: string;
   date_from?: string;
@@ -53,14 +53,14 @@ export async function getAnalytics(params: AnalyticsParams = {}): Promise<Cabine
   return data;
 }
 
-export async function getHistory(params: HistoryParams = {}): Promise<PaginatedResponse<CabinetHistoryEntry>> {
+export async function getHistory(params: HistoryParams = {}): Promise<CursorPage<CabinetHistoryEntry>> {
   const { data } = await apiClient.get("/api/cabinet/history/", {
     params: cleanParams(params as Record<string, unknown>),
   });
   return data;
 }
 
-export async function getTransactions(params: TransactionParams = {}): Promise<PaginatedResponse<CabinetTransaction>> {
+export async function getTransactions(params: TransactionParams = {}): Promise<CursorPage<CabinetTransaction>> {
   const { data } = await apiClient.get("/api/cabinet/transactions/", {
     params: cleanParams(params as Record<string, unknown>),
   });
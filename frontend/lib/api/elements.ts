@@ -3,6 +3,7 @@ import type {
   Element,
   UpdateElementPayload,
   ReorderElementsPayload,
+  RepositionPayload,
   DownloadMetaResponse,
 } from "@/lib/types";
 
@@ -62,6 +63,18 @@ export const elementsApi = {
     }
   },
 
+  async reposition(id: number, payload: RepositionPayload): Promise<number> {
+    try {
+      const { data } = await apiClient.post<{ order_index: number }>(
+        `/api/elements/${id}/reposition/`,
+        payload,
+      );
+      return data.order_index;
+    } catch (error) {
+      throw normalizeError(error);
+    }
+  },
+
   async getByProject(
     projectId: number,
     rootOnly?: boolean,
@@ -1,15 +1,9 @@
 import { apiClient } from './client'
-import type { Notification } from '@/lib/types'
-
-interface NotificationListResponse {
-  results: Notification[]
-  has_more: boolean
-  next_offset: number | null
-}
+import type { CursorPage, Notification } from '@/lib/types'
 
 export const notificationsApi = {
-  list: (params?: { type?: string; is_read?: boolean; offset?: number; project?: number }) =>
-    apiClient.get<NotificationListResponse>('/api/notifications/', { params })
+  list: (params?: { type?: string; is_read?: boolean; cursor?: string; project?: number }) =>
+    apiClient.get<CursorPage<Notification>>('/api/notifications/', { params })
       .then(r => r.data),
 
   unreadCount: () =>
@@ -5,6 +5,8 @@ import type {
   CreateProjectPayload,
   UpdateProjectPayload,
   GeneratePayload,
+  GenerateBatchPayload,
+  GenerateBatchResult,
   ReorderItem,
   ProjectStats,
 } from "@/lib/types";
@@ -70,6 +72,19 @@ export const projectsApi = {
     }
   },
 
+  async generateBatchInProject(projectId: number, payload: GenerateBatchPayload): Promise<GenerateBatchResult> {
+    try {
+      const { data } = await apiClient.post<GenerateBatchResult>(
+        `/api/projects/${projectId}/generate-batch/`,
+        payload,
+        { timeout: LONG_API_TIMEOUT_MS }
+      );
+      return data;
+    } catch (error) {
+      throw normalizeError(error);
+    }
+  },
+
   async uploadToProject(
     projectId: number,
     file: File,
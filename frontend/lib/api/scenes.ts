@@ -6,6 +6,8 @@ import type {
   UpdateScenePayload,
   ReorderScenesPayload,
   GeneratePayload,
+  GenerateBatchPayload,
+  GenerateBatchResult,
   SceneStats,
 } from "@/lib/types";
 
@@ -144,6 +146,19 @@ export const scenesApi = {
     }
   },
 
+  async generateBatch(sceneId: number, payload: GenerateBatchPayload): Promise<GenerateBatchResult> {
+    try {
+      const { data } = await apiClient.post<GenerateBatchResult>(
+        `/api/scenes/${sceneId}/generate-batch/`,
+        payload,
+        { timeout: LONG_API_TIMEOUT_MS }
+      );
+      return data;
+    } catch (error) {
+      throw normalizeError(error);
+    }
+  },
+
   async upload(
     sceneId: number,
     file: File,
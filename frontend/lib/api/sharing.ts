@@ -1,7 +1,8 @@
 import axios from 'axios'
 import { apiClient } from './client'
 import type {
-  SharedLink, Comment, PublicProject, PublicElementReaction,
+  SharedLink, Comment, PublicProject, PublicElementReaction, PublicShareChanges,
+  CursorPage, LinkFeedbackThreads,
 } from '@/lib/types'
 
 const publicClient = axios.create({
@@ -50,6 +51,9 @@ export const sharingApi = {
   getPublicProject: (token: string) =>
     publicClient.get<PublicProject>(`/api/sharing/public/${token}/`).then(r => r.data),
 
+  getPublicChanges: (token: string, since: number) =>
+    publicClient.get<PublicShareChanges>(`/api/sharing/public/${token}/changes/`, { params: { since } }).then(r => r.data),
+
   addPublicComment: (token: string, data: {
     text: string; author_name: string; session_id: string;
     element_id?: number; scene_id?: number; parent_id?: number;
@@ -89,6 +93,21 @@ export const sharingApi = {
   getAllFeedback: () =>
     apiClient.get(`/api/sharing/all-feedback/`).then(r => r.data),
 
+  // Comment threads of an expanded link (latest few per element + general)
+  getLinkThreads: (linkId: number) =>
+    apiClient.get<LinkFeedbackThreads>(`/api/sharing/links/${linkId}/threads/`).then(r => r.data),
+
+  // Older comments of a thread, newest first
+  getElementCommentsPage: (elementId: number, cursor: string) =>
+    apiClient.get<CursorPage<Comment>>(`/api/sharing/elements/${elementId}/comments/`, {
+      params: { cursor },
+    }).then(r => r.data),
+
+  getLinkCommentsPage: (linkId: number, cursor: string) =>
+    apiClient.get<CursorPage<Comment>>(`/api/sharing/links/${linkId}/comments/`, {
+      params: { cursor },
+    }).then(r => r.data),
+
   addLinkComment: (linkId: number, data: { text: string; parent_id?: number }) =>
     apiClient.post(`/api/sharing/links/${linkId}/comments/`, data).then(r => r.data),
 }
@@ -18,13 +18,14 @@ interface NotificationState {
   unreadCount: number;
   feedbackUnreadCount: number;
   hasMore: boolean;
+  nextCursor: string | null;
   isLoading: boolean;
   error: boolean;
   activeTab: NotificationTab;
   projectId: number | null;
 
   fetchUnreadCount: () => Promise<void>;
-  fetchNotifications: (offset?: number) => Promise<void>;
+  fetchNotifications: (cursor?: string | null) => Promise<void>;
   setActiveTab: (tab: NotificationTab) => void;
   setProjectId: (id: number | null) => void;
   markRead: (id: number) => Promise<void>;
@@ -42,6 +43,7 @@ export const useNotificationStore = create<NotificationState>((set, get) => ({
   unreadCount: 0,
   feedbackUnreadCount: 0,
   hasMore: false,
+  nextCursor: null,
   isLoading: false,
   error: false,
   activeTab: 'all',
@@ -56,11 +58,12 @@ export const useNotificationStore = create<NotificationState>((set, get) => ({
     }
   },
 
-  fetchNotifications: async (offset = 0) => {
+  fetchNotifications: async (cursor = null) => {
     const { activeTab, projectId } = get();
     set({ isLoading: true, error: false });
     try {
-      const params: Record<string, unknown> = { offset };
+      const params: Record<string, unknown> = {};
+      if (cursor) params.cursor = cursor;
       if (projectId) params.project = projectId;
       const types = TAB_TYPES[activeTab];
       if (types) params.type = types.join(',');
@@ -68,25 +71,26 @@ export const useNotificationStore = create<NotificationState>((set, get) => ({
       const data = await notificationsApi.list(params as any);
       set((state) => ({
         notifications:
-          offset === 0
+          !cursor
             ? data.results
             : [...state.notifications, ...data.results],
         hasMore: data.has_more,
+        nextCursor: data.next_cursor,
         isLoading: false,
       }));
     } catch {
-      set({ isLoading: false, error: offset === 0 });
+      set({ isLoading: false, error: !cursor });
     }
   },
 
   setActiveTab: (tab) => {
     set({ activeTab: tab });
-    get().fetchNotifications(0);
+    get().fetchNotifications();
   },
 
   setProjectId: (id) => {
     set({ projectId: id });
-    get().fetchNotifications(0);
+    get().fetchNotifications();
   },
 
   markRead: async (id) => {
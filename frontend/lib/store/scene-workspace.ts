@@ -314,6 +314,7 @@ interface SceneWorkspaceState {
   deleteElement: (elementId: number, options?: { silent?: boolean }) => Promise<void>;
   deleteSelected: () => Promise<void>;
   reorderElements: (ids: number[]) => Promise<void>;
+  repositionElement: (id: number, newIndex: number) => Promise<void>;
   enqueueUploads: (sceneId: number, files: File[], projectId?: number) => void;
   cancelUploads: () => void;
   resetWorkspace: (showToast?: boolean) => void;
@@ -735,6 +736,33 @@ export const useSceneWorkspaceStore = create<SceneWorkspaceState>()((set, get) =
     }
   },
 
+  repositionElement: async (id: number, newIndex: number) => {
+    const { elements } = get();
+    const oldIndex = elements.findIndex((e) => e.id === id);
+    if (oldIndex === -1 || oldIndex === newIndex) return;
+
+    const prevElements = elements;
+    const reordered = [...elements];
+    const [moved] = reordered.splice(oldIndex, 1);
+    reordered.splice(newIndex, 0, moved);
+
+    set({ elements: reordered.map((e, index) => ({ ...e, order_index: index })) });
+
+    // Сервер меняет одну строку: ключ между соседями (разреженные order_index).
+    // Оптимистичные элементы (отрицательный id) на сервере ещё не существуют.
+    const after = reordered.slice(0, newIndex).reverse().find((e) => e.id > 0);
+    const before = reordered.slice(newIndex + 1).find((e) => e.id > 0);
+    try {
+      await elementsApi.reposition(id, {
+        after_id: after?.id ?? null,
+        before_id: before?.id ?? null,
+      });
+    } catch {
+      set({ elements: prevElements });
+      toast.error("Не удалось изменить порядок");
+    }
+  },
+
   enqueueUploads: (sceneId: number, files: File[], projectId?: number) => {
     let currentOrderMax = get().elements.reduce(
       (max, el) => Math.max(max, el.order_index),
@@ -115,6 +115,7 @@ export interface Scene {
   headliner_url?: string | null;
   headliner_thumbnail_url?: string | null;
   headliner_type?: ElementType | null;
+  headliner_loop_url?: string | null;
   element_count?: number;
   elements_count?: number;
   parent: number | null;
@@ -167,6 +168,7 @@ export interface Element {
   file_url: string;
   thumbnail_url: string;
   preview_url: string;
+  loop_url: string;
   is_favorite: boolean;
   prompt_text: string;
   ai_model: number | null;
@@ -201,6 +203,17 @@ export interface GeneratePayload {
   generation_config?: Record<string, unknown>;
 }
 
+export interface GenerateBatchPayload {
+  ai_model_id: number;
+  generation_config?: Record<string, unknown>;
+  items: { prompt: string; generation_config?: Record<string, unknown> }[];
+}
+
+export interface GenerateBatchResult {
+  elements: Element[];
+  total_cost: string;
+}
+
 export interface CreateOptimisticGenerationInput {
   sceneId: number;
   promptText: string;
@@ -246,6 +259,12 @@ export interface ReorderElementsPayload {
   element_ids: number[];
 }
 
+/** Перемещение одного элемента: соседи на новом месте (null — край списка). */
+export interface RepositionPayload {
+  after_id: number | null;
+  before_id: number | null;
+}
+
 export interface ReorderItem {
   type: 'element' | 'group';
   id: number;
@@ -411,6 +430,8 @@ export interface PublicProject {
   expires_at?: string | null
   total_elements?: number
   link_name?: string
+  /** seq журнала изменений ссылки на момент сборки — точка отсчёта для /changes/ */
+  change_seq?: number
   display_preferences?: {
     size?: string
     aspectRatio?: string
@@ -489,10 +510,10 @@ export interface ProjectFeedbackElement {
   thumbnail_url: string
   element_type: ElementType
   review_summary: { action: string; author_name: string } | null
-  reviews: { session_id: string; author_name: string; action: string }[]
   likes: number
   dislikes: number
-  comments: Comment[]
+  comment_count: number
+  unread_count: number
 }
 
 export interface ProjectFeedbackLink {
@@ -512,13 +533,25 @@ export interface ProjectFeedbackLink {
     total_elements: number
   }
   elements: ProjectFeedbackElement[]
-  general_comments: Comment[]
+  general_comment_count: number
 }
 
 export interface ProjectFeedbackResponse {
   links: ProjectFeedbackLink[]
 }
 
+/** Последние треды, от старых к новым; более старые — по next_cursor через comments/. */
+export interface CommentThreadPreview {
+  comments: Comment[]
+  has_more: boolean
+  next_cursor: string | null
+}
+
+export interface LinkFeedbackThreads {
+  elements: Record<number, CommentThreadPreview>
+  general: CommentThreadPreview
+}
+
 /* ── WebSocket events ─────────────────────────────────────── */
 
 export interface WSElementStatusChangedEvent {
@@ -578,7 +611,17 @@ export interface WSReviewUpdatedEvent {
   author_name: string
 }
 
-export type WSEvent = WSElementStatusChangedEvent | WSNewCommentEvent | WSReactionUpdatedEvent | WSReviewUpdatedEvent
+/** Фоновая очистка S3 после удаления группы/проекта (DELETE отвечает 202). */
+export interface WSDeletionProgressEvent {
+  type: 'deletion_progress'
+  target_type: 'scene' | 'project'
+  target_id: number
+  deleted: number
+  total: number
+  done: boolean
+}
+
+export type WSEvent = WSElementStatusChangedEvent | WSNewCommentEvent | WSReactionUpdatedEvent | WSReviewUpdatedEvent | WSDeletionProgressEvent
 
 // --- Share page WebSocket events ---
 
@@ -591,6 +634,7 @@ export interface WSShareNewCommentEvent {
   text: string
   created_at: string
   session_id: string
+  seq?: number
 }
 
 export interface WSShareReactionUpdatedEvent {
@@ -600,6 +644,7 @@ export interface WSShareReactionUpdatedEvent {
   dislikes: number
   session_id: string
   value: 'like' | 'dislike' | null
+  seq?: number
 }
 
 export interface WSShareReviewUpdatedEvent {
@@ -608,9 +653,28 @@ export interface WSShareReviewUpdatedEvent {
   session_id: string
   author_name: string
   action: 'approved' | 'changes_requested' | 'rejected' | null
+  seq?: number
+}
+
+export interface WSShareElementUpdatedEvent {
+  type: 'element_updated'
+  element_id: number
+  status: string
+  file_url: string
+  thumbnail_url: string
+  preview_url: string
+  seq?: number
 }
 
-export type WSShareEvent = WSShareNewCommentEvent | WSShareReactionUpdatedEvent | WSShareReviewUpdatedEvent
+export type WSShareEvent = WSShareNewCommentEvent | WSShareReactionUpdatedEvent | WSShareReviewUpdatedEvent | WSShareElementUpdatedEvent
+
+/** GET /api/sharing/public/{token}/changes/?since= — reset: журнал не покрывает since, перезагрузить страницу. */
+export interface PublicShareChanges {
+  changes: WSShareEvent[]
+  last_seq: number
+  has_more: boolean
+  reset: boolean
+}
 
 /* ── UI Types ─────────────────────────────────────────────── */
 
@@ -649,6 +713,14 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+/** Keyset-страница: без общего числа, вперёд — по next_cursor. */
+export interface CursorPage<T> {
+  results: T[];
+  has_more: boolean;
+  next_cursor: string | null;
+  next: string | null;
+}
+
 export interface ApiError {
   message: string;
   detail?: string;